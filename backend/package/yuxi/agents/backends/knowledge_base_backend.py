@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import fnmatch
+import os
 import re
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterator
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path, PurePosixPath
 from typing import Any
 
@@ -15,7 +19,11 @@ from yuxi import knowledge_base
 from yuxi.knowledge.utils.kb_utils import is_minio_url, parse_minio_url
 from yuxi.storage.minio import get_minio_client
 
+from .knowledge_base_grep import GrepTarget, knowledge_base_grep_engine
+
 KBS_PATH = "/home/gem/kbs"
+KB_TREE_INDEX_MAX_SUBTREES = int(os.getenv("KB_TREE_INDEX_MAX_SUBTREES", "256"))
+KB_TREE_INDEX_MAX_LAYOUTS = int(os.getenv("KB_TREE_INDEX_MAX_LAYOUTS", "256"))
 _INVALID_SEGMENT_RE = re.compile(r"[\\/\x00-\x1f\x7f]+")
 _WHITESPACE_RE = re.compile(r"\s+")
 
@@ -26,6 +34,8 @@ class _MaterializedFile:
     cache_path: Path
     source_path: str
     modified_at: str | None = None
+    content_key: str = ""
+    db_id: str = ""
 
 
 @dataclass(frozen=True)
@@ -385,43 +395,61 @@ async def inject_filepaths_into_retrieval_result(
     )
 
 
-class KnowledgeBaseReadonlyBackend(FilesystemBackend):
-    def __init__(self, *, visible_kbs: list[dict[str, Any]] | None, cache_root: Path | str | None = None):
-        self._cache_root = Path(cache_root or (Path(conf.save_dir) / "knowledge_base_data" / "kb-cache")).resolve()
-        self._cache_root.mkdir(parents=True, exist_ok=True)
-        super().__init__(root_dir=self._cache_root, virtual_mode=True)
-        self._visible_kbs = list(visible_kbs or [])
-        self._entries_by_dir: dict[str, list[FileInfo]] = defaultdict(list)
-        self._dir_paths: set[str] = {"/"}
-        self._files: dict[str, _MaterializedFile] = {}
-        self._all_files: list[FileInfo] = []
-        self._build_virtual_tree()
-
-    def has_entries(self) -> bool:
-        return bool(self._visible_kbs)
+def _live_db_ids() -> set[str]:
+    db_ids: set[str] = set()
+    for kb_instance in getattr(knowledge_base, "kb_instances", {}).values():
+        db_ids.update(getattr(kb_instance, "databases_meta", {}))
+    return db_ids
 
-    def _build_virtual_tree(self) -> None:
-        layout = _resolve_virtual_layout(visible_kbs=self._visible_kbs)
 
-        for db_id, kb_virtual_name in layout.kb_virtual_names.items():
-            kb_root = f"/{kb_virtual_name}"
-            self._add_entry("/", kb_root, is_dir=True)
-            records = layout.files_by_db.get(db_id, {})
-            self._build_source_tree(db_id=db_id, records=records, nodes=layout.nodes_by_db.get(db_id, []))
-            self._build_parsed_tree(db_id=db_id, kb_root=kb_root, records=records)
+def _files_version(db_id: str) -> int:
+    for kb_instance in getattr(knowledge_base, "kb_instances", {}).values():
+        if db_id in getattr(kb_instance, "databases_meta", {}):
+            return kb_instance.files_version(db_id)
+    return 0
+
+
+class _KnowledgeBaseSubtree:
+    """单个知识库在虚拟文件系统中的目录树，构建后只读，可被多个 backend 共享"""
+
+    def __init__(self, *, db_id: str, kb_root: str, cache_root: Path, version: int):
+        self.db_id = db_id
+        self.kb_root = kb_root
+        self.version = version
+        self._cache_root = cache_root
+        self.entries_by_dir: dict[str, list[FileInfo]] = defaultdict(list)
+        self.dir_paths: set[str] = {kb_root}
+        self.files: dict[str, _MaterializedFile] = {}
+        self.all_files: list[FileInfo] = []
+        self.entries_by_dir[kb_root] = []
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        db_id: str,
+        kb_root: str,
+        records: dict[str, dict[str, Any]],
+        cache_root: Path,
+        version: int,
+    ) -> _KnowledgeBaseSubtree:
+        subtree = cls(db_id=db_id, kb_root=kb_root, cache_root=cache_root, version=version)
+        nodes = _resolve_db_virtual_nodes(db_id=db_id, kb_root=kb_root, records=records)
+        parent_paths, source_names = subtree._build_source_tree(records=records, nodes=nodes)
+        subtree._build_parsed_tree(records=records, parent_paths=parent_paths, source_names=source_names)
 
-        for path, entries in list(self._entries_by_dir.items()):
+        for path, entries in list(subtree.entries_by_dir.items()):
             entries.sort(key=lambda item: str(item.get("path") or ""))
-            self._entries_by_dir[path] = entries
-        self._all_files = sorted(self._all_files, key=lambda item: str(item.get("path") or ""))
+            subtree.entries_by_dir[path] = entries
+        subtree.all_files.sort(key=lambda item: str(item.get("path") or ""))
+        return subtree
 
     def _build_source_tree(
         self,
         *,
-        db_id: str,
         records: dict[str, dict[str, Any]],
         nodes: list[_ResolvedVirtualNode],
-    ) -> None:
+    ) -> tuple[dict[str, str], dict[str, str]]:
         resolved_parent_paths: dict[str, str] = {}
         resolved_source_names: dict[str, str] = {}
 
@@ -441,14 +469,17 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
             )
             resolved_parent_paths[node.file_id] = node.parent_path
             resolved_source_names[node.file_id] = node.name
-            cache_path = self._cache_root / db_id / "source" / node.file_id / node.name
-            self._files[node.path] = _MaterializedFile(
+            cache_path = self._cache_root / self.db_id / "source" / node.file_id / node.name
+            source_path = str(meta.get("path") or "")
+            self.files[node.path] = _MaterializedFile(
                 virtual_path=node.path,
                 cache_path=cache_path,
-                source_path=str(meta.get("path") or ""),
+                source_path=source_path,
                 modified_at=modified_at,
+                content_key=str(meta.get("content_hash") or f"{source_path}@{modified_at or ''}"),
+                db_id=self.db_id,
             )
-            self._all_files.append(
+            self.all_files.append(
                 {
                     "path": node.path,
                     "is_dir": False,
@@ -457,12 +488,15 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
                 }
             )
 
-        self._resolved_parent_paths = getattr(self, "_resolved_parent_paths", {})
-        self._resolved_parent_paths[db_id] = resolved_parent_paths
-        self._resolved_source_names = getattr(self, "_resolved_source_names", {})
-        self._resolved_source_names[db_id] = resolved_source_names
+        return resolved_parent_paths, resolved_source_names
 
-    def _build_parsed_tree(self, *, db_id: str, kb_root: str, records: dict[str, dict[str, Any]]) -> None:
+    def _build_parsed_tree(
+        self,
+        *,
+        records: dict[str, dict[str, Any]],
+        parent_paths: dict[str, str],
+        source_names: dict[str, str],
+    ) -> None:
         parsed_records = {
             file_id: meta
             for file_id, meta in records.items()
@@ -471,10 +505,9 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
         if not parsed_records:
             return
 
+        kb_root = self.kb_root
         parsed_root = f"{kb_root}/parsed"
         self._add_entry(kb_root, parsed_root, is_dir=True)
-        parent_paths = getattr(self, "_resolved_parent_paths", {}).get(db_id, {})
-        source_names = getattr(self, "_resolved_source_names", {}).get(db_id, {})
 
         grouped: dict[str, list[tuple[str, dict[str, Any], str]]] = defaultdict(list)
         for file_id, meta in parsed_records.items():
@@ -492,7 +525,7 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
             while str(current) not in {"", "."} and str(current) != "/":
                 current_str = str(current)
                 parent_str = str(current.parent) if str(current.parent) != "." else "/"
-                if current_str not in self._dir_paths:
+                if current_str not in self.dir_paths:
                     self._add_entry(parent_str, current_str, is_dir=True)
                 current = current.parent
 
@@ -507,14 +540,19 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
                     size=0,
                     modified_at=meta.get("updated_at") or meta.get("created_at"),
                 )
-                cache_path = self._cache_root / db_id / "parsed" / f"{file_id}.md"
-                self._files[file_path] = _MaterializedFile(
+                cache_path = self._cache_root / self.db_id / "parsed" / f"{file_id}.md"
+                modified_at = meta.get("updated_at") or meta.get("created_at")
+                markdown_file = str(meta.get("markdown_file") or "")
+                self.files[file_path] = _MaterializedFile(
                     virtual_path=file_path,
                     cache_path=cache_path,
-                    source_path=str(meta.get("markdown_file") or ""),
-                    modified_at=meta.get("updated_at") or meta.get("created_at"),
+                    source_path=markdown_file,
+                    modified_at=modified_at,
+                    # 重新解析会覆盖同名 markdown，以更新时间区分内容版本
+                    content_key=f"{markdown_file}@{modified_at or ''}",
+                    db_id=self.db_id,
                 )
-                self._all_files.append(
+                self.all_files.append(
                     {
                         "path": file_path,
                         "is_dir": False,
@@ -541,37 +579,224 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
             "size": int(size or 0),
             "modified_at": str(modified_at or ""),
         }
-        if entry_path not in {str(item.get("path")) for item in self._entries_by_dir[normalized_parent]}:
-            self._entries_by_dir[normalized_parent].append(entry)
+        if entry_path not in {str(item.get("path")) for item in self.entries_by_dir[normalized_parent]}:
+            self.entries_by_dir[normalized_parent].append(entry)
         if is_dir:
-            self._dir_paths.add(normalized_child)
-            self._entries_by_dir.setdefault(normalized_child, [])
+            self.dir_paths.add(normalized_child)
+            self.entries_by_dir.setdefault(normalized_child, [])
+
+
+class KnowledgeBaseTreeIndex:
+    """
+    共享的知识库虚拟文件树索引
+
+    按知识库缓存子树并记录构建时的文件版本号；文件新增、删除、解析或入库后版本号变化，
+    下次访问时只重建对应知识库的子树。可见知识库集合对应的根目录布局同样缓存复用。
+    """
+
+    def __init__(self, max_subtrees: int | None = None, max_layouts: int | None = None):
+        self.max_subtrees = max(1, max_subtrees or KB_TREE_INDEX_MAX_SUBTREES)
+        self.max_layouts = max(1, max_layouts or KB_TREE_INDEX_MAX_LAYOUTS)
+        self._lock = threading.Lock()
+        self._subtrees: OrderedDict[tuple[str, str, str], _KnowledgeBaseSubtree] = OrderedDict()
+        self._layouts: OrderedDict[tuple, dict[str, str]] = OrderedDict()
+
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+
+    def view(self, *, visible_kbs: list[dict[str, Any]], cache_root: Path) -> KnowledgeBaseTreeView:
+        key = tuple(sorted((str(db.get("db_id") or ""), str(db.get("name") or "")) for db in visible_kbs))
+        with self._lock:
+            kb_virtual_names = self._layouts.get(key)
+            if kb_virtual_names is not None:
+                self._layouts.move_to_end(key)
+        if kb_virtual_names is None:
+            kb_virtual_names = _resolve_kb_virtual_names(visible_kbs)
+            with self._lock:
+                self._layouts[key] = kb_virtual_names
+                while len(self._layouts) > self.max_layouts:
+                    self._layouts.popitem(last=False)
+        return KnowledgeBaseTreeView(self, kb_virtual_names=kb_virtual_names, cache_root=cache_root)
+
+    def subtree(self, *, db_id: str, kb_root: str, cache_root: Path) -> _KnowledgeBaseSubtree:
+        key = (str(cache_root), db_id, kb_root)
+        version = _files_version(db_id)
+        with self._lock:
+            cached = self._subtrees.get(key)
+            if cached is not None and cached.version == version:
+                self._subtrees.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        # 构建在锁外进行；并发重建同一子树时以后写入的为准，结果一致
+        records = {
+            file_id: meta for file_id, meta in _all_files_meta().items() if str(meta.get("database_id") or "") == db_id
+        }
+        subtree = _KnowledgeBaseSubtree.build(
+            db_id=db_id,
+            kb_root=kb_root,
+            records=records,
+            cache_root=cache_root,
+            version=version,
+        )
+        with self._lock:
+            self.builds += 1
+            self._subtrees[key] = subtree
+            self._subtrees.move_to_end(key)
+            while len(self._subtrees) > self.max_subtrees:
+                self._subtrees.popitem(last=False)
+                self.evictions += 1
+        return subtree
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subtrees.clear()
+            self._layouts.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "subtrees": len(self._subtrees),
+                "layouts": len(self._layouts),
+                "max_subtrees": self.max_subtrees,
+                "hits": self.hits,
+                "builds": self.builds,
+                "evictions": self.evictions,
+            }
+
+
+class KnowledgeBaseTreeView:
+    """backend 持有的轻量视图：只记录根目录布局，子树按需从共享索引取用"""
+
+    def __init__(self, index: KnowledgeBaseTreeIndex, *, kb_virtual_names: dict[str, str], cache_root: Path):
+        self._index = index
+        self._cache_root = cache_root
+        # 以 "/<name>/" 排序后拼接各子树的文件列表即为全局按路径有序
+        self._db_by_root = {
+            f"/{name}": db_id for db_id, name in sorted(kb_virtual_names.items(), key=lambda item: f"/{item[1]}/")
+        }
+        self._root_entries: list[FileInfo] = sorted(
+            ({"path": f"{root}/", "is_dir": True, "size": 0, "modified_at": ""} for root in self._db_by_root),
+            key=lambda item: item["path"],
+        )
 
-    def _ensure_local_file(self, descriptor: _MaterializedFile) -> Path:
-        if descriptor.cache_path.exists():
-            return descriptor.cache_path
+    def _subtree_for_root(self, kb_root: str) -> _KnowledgeBaseSubtree | None:
+        db_id = self._db_by_root.get(kb_root)
+        if db_id is None:
+            return None
+        return self._index.subtree(db_id=db_id, kb_root=kb_root, cache_root=self._cache_root)
+
+    def _subtree_for_path(self, normalized_path: str) -> _KnowledgeBaseSubtree | None:
+        parts = PurePosixPath(normalized_path).parts
+        if len(parts) < 2:
+            return None
+        return self._subtree_for_root(f"/{parts[1]}")
+
+    def entries(self, normalized_path: str) -> list[FileInfo]:
+        if normalized_path == "/":
+            return [dict(entry) for entry in self._root_entries]
+        subtree = self._subtree_for_path(normalized_path)
+        if subtree is None:
+            return []
+        return [dict(entry) for entry in subtree.entries_by_dir.get(normalized_path, [])]
+
+    def file(self, normalized_path: str) -> _MaterializedFile | None:
+        subtree = self._subtree_for_path(normalized_path)
+        return subtree.files.get(normalized_path) if subtree is not None else None
+
+    def is_dir(self, normalized_path: str) -> bool:
+        if normalized_path == "/":
+            return True
+        subtree = self._subtree_for_path(normalized_path)
+        return subtree is not None and normalized_path in subtree.dir_paths
+
+    def iter_files(self, normalized_path: str = "/") -> Iterator[FileInfo]:
+        if normalized_path == "/":
+            for kb_root in self._db_by_root:
+                subtree = self._subtree_for_root(kb_root)
+                if subtree is not None:
+                    yield from subtree.all_files
+            return
+        subtree = self._subtree_for_path(normalized_path)
+        if subtree is not None:
+            yield from subtree.all_files
+
+    def iter_descriptors(self, normalized_path: str = "/") -> Iterator[_MaterializedFile]:
+        """按路径顺序返回文件描述，供全文检索批量取候选文件"""
+        subtrees = (
+            [self._subtree_for_root(kb_root) for kb_root in self._db_by_root]
+            if normalized_path == "/"
+            else [self._subtree_for_path(normalized_path)]
+        )
+        for subtree in subtrees:
+            if subtree is None:
+                continue
+            for item in subtree.all_files:
+                yield subtree.files[str(item["path"])]
 
-        source = descriptor.source_path.strip()
-        if not source:
-            raise FileNotFoundError(descriptor.virtual_path)
-        if not is_minio_url(source):
-            raise FileNotFoundError(descriptor.virtual_path)
 
-        bucket_name, object_name = parse_minio_url(source)
-        payload = get_minio_client().download_file(bucket_name, object_name)
-        descriptor.cache_path.parent.mkdir(parents=True, exist_ok=True)
-        descriptor.cache_path.write_bytes(payload)
-        return descriptor.cache_path
+def _cache_key_path(cache_path: Path) -> Path:
+    return cache_path.with_name(f".{cache_path.name}.key")
+
+
+def _ensure_local_file(descriptor: _MaterializedFile) -> Path:
+    """返回本地缓存文件；缓存缺失或内容校验键与记录不一致时重新下载"""
+    cache_path = descriptor.cache_path
+    key_path = _cache_key_path(cache_path)
+    if cache_path.exists():
+        if not descriptor.content_key:
+            return cache_path
+        try:
+            if key_path.read_text(encoding="utf-8") == descriptor.content_key:
+                return cache_path
+        except OSError:
+            pass
+
+    source = descriptor.source_path.strip()
+    if not source:
+        raise FileNotFoundError(descriptor.virtual_path)
+    if not is_minio_url(source):
+        raise FileNotFoundError(descriptor.virtual_path)
+
+    bucket_name, object_name = parse_minio_url(source)
+    payload = get_minio_client().download_file(bucket_name, object_name)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # 先写临时文件再替换，并发检索同一文件时不会读到半截内容
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, cache_path)
+    if descriptor.content_key:
+        key_path.write_text(descriptor.content_key, encoding="utf-8")
+    return cache_path
+
+
+knowledge_base_tree_index = KnowledgeBaseTreeIndex()
+
+
+class KnowledgeBaseReadonlyBackend(FilesystemBackend):
+    def __init__(self, *, visible_kbs: list[dict[str, Any]] | None, cache_root: Path | str | None = None):
+        self._cache_root = Path(cache_root or (Path(conf.save_dir) / "knowledge_base_data" / "kb-cache")).resolve()
+        self._cache_root.mkdir(parents=True, exist_ok=True)
+        super().__init__(root_dir=self._cache_root, virtual_mode=True)
+        self._visible_kbs = list(visible_kbs or [])
+        self._tree = knowledge_base_tree_index.view(visible_kbs=self._visible_kbs, cache_root=self._cache_root)
+
+    def has_entries(self) -> bool:
+        return bool(self._visible_kbs)
+
+    def _ensure_local_file(self, descriptor: _MaterializedFile) -> Path:
+        return _ensure_local_file(descriptor)
 
     def ls_info(self, path: str) -> list[FileInfo]:
         normalized_path = _normalize_virtual_path(path)
-        return list(self._entries_by_dir.get(normalized_path, []))
+        return self._tree.entries(normalized_path)
 
     def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
         normalized_path = _normalize_virtual_path(file_path)
-        descriptor = self._files.get(normalized_path)
+        descriptor = self._tree.file(normalized_path)
         if descriptor is None:
-            if normalized_path in self._dir_paths:
+            if self._tree.is_dir(normalized_path):
                 return f"Error: Path '{file_path}' is a directory"
             return f"Error: File '{file_path}' not found"
 
@@ -593,7 +818,7 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
         prefix = "/" if normalized_path == "/" else f"{normalized_path.rstrip('/')}/"
 
         matches: list[FileInfo] = []
-        for item in self._all_files:
+        for item in self._tree.iter_files(normalized_path):
             item_path = str(item.get("path") or "")
             if normalized_path != "/" and not item_path.startswith(prefix):
                 continue
@@ -605,35 +830,36 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
     def grep_raw(self, pattern: str, path: str | None = None, glob: str | None = None) -> list[dict[str, Any]] | str:
         normalized_path = _normalize_virtual_path(path or "/")
         prefix = "/" if normalized_path == "/" else f"{normalized_path.rstrip('/')}/"
-        if normalized_path in self._files:
-            targets = [normalized_path]
+        single = self._tree.file(normalized_path)
+        if single is not None:
+            candidates = [single]
         else:
-            targets = [
-                item["path"]
-                for item in self._all_files
-                if normalized_path == "/" or str(item["path"]).startswith(prefix)
+            candidates = [
+                descriptor
+                for descriptor in self._tree.iter_descriptors(normalized_path)
+                if normalized_path == "/" or descriptor.virtual_path.startswith(prefix)
             ]
 
-        matches: list[dict[str, Any]] = []
-        for target in targets:
-            display_target = str(target)
+        targets: list[GrepTarget] = []
+        for descriptor in candidates:
+            display_target = descriptor.virtual_path
             relative = display_target.lstrip("/") if normalized_path == "/" else display_target[len(prefix) :]
             if glob and not fnmatch.fnmatch(relative, glob):
                 continue
-            descriptor = self._files.get(display_target)
-            if descriptor is None:
-                continue
-            try:
-                content = self._ensure_local_file(descriptor).read_bytes()
-                if b"\x00" in content:
-                    continue
-                text = content.decode("utf-8")
-            except Exception:  # noqa: BLE001
-                continue
-            for line_num, line in enumerate(text.splitlines(), start=1):
-                if pattern in line:
-                    matches.append({"path": display_target, "line": line_num, "text": line})
-        return matches
+            targets.append(
+                GrepTarget(
+                    path=display_target,
+                    scope=descriptor.db_id,
+                    content_key=descriptor.content_key,
+                    load=partial(self._read_local_bytes, descriptor),
+                )
+            )
+        # 已删除知识库的索引不会再被命中，顺带释放其占用的预算
+        knowledge_base_grep_engine.retain_scopes(_live_db_ids())
+        return knowledge_base_grep_engine.grep(pattern, targets)
+
+    def _read_local_bytes(self, descriptor: _MaterializedFile) -> bytes:
+        return self._ensure_local_file(descriptor).read_bytes()
 
     def write(self, file_path: str, content: str) -> WriteResult:
         return WriteResult(error="Knowledge base path is read-only.")
@@ -653,9 +879,9 @@ class KnowledgeBaseReadonlyBackend(FilesystemBackend):
                 responses.append(FileDownloadResponse(path=path, content=None, error="invalid_path"))
                 continue
 
-            descriptor = self._files.get(normalized_path)
+            descriptor = self._tree.file(normalized_path)
             if descriptor is None:
-                if normalized_path in self._dir_paths:
+                if self._tree.is_dir(normalized_path):
                     responses.append(FileDownloadResponse(path=path, content=None, error="is_directory"))
                 else:
                     responses.append(FileDownloadResponse(path=path, content=None, error="file_not_found"))
@@ -0,0 +1,279 @@
+"""
+知识库虚拟文件系统的全文检索引擎
+
+候选文件按路径顺序以有限的在途窗口提交到线程池，由工作线程按需从本地 kb-cache 取内容（缺失时下载），
+先用字节级子串查找快速排除不含关键词的文件，命中后再逐行匹配；累计匹配数达到上限时停止调度
+剩余文件。可选的 trigram 位图索引记录已扫描文件包含的三字节片段，后续检索可在不读取文件的情况下
+排除不可能命中的文件；位图按文件的片段数确定大小，所有知识库共享一个字节预算并按 LRU 淘汰。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from yuxi.utils import logger
+
+KB_GREP_CONCURRENCY = int(os.getenv("KB_GREP_CONCURRENCY", "8"))
+KB_GREP_MAX_MATCHES = int(os.getenv("KB_GREP_MAX_MATCHES", "1000"))
+KB_GREP_NGRAM_INDEX = os.getenv("KB_GREP_NGRAM_INDEX", "true").lower() in ("1", "true", "yes")
+# 全部知识库的位图索引合计占用上限（字节）
+KB_GREP_NGRAM_MAX_BYTES = int(os.getenv("KB_GREP_NGRAM_MAX_BYTES", str(64 * 1024 * 1024)))
+# 超过该大小的文件不建索引，每次检索都直接扫描
+KB_GREP_NGRAM_MAX_FILE_BYTES = int(os.getenv("KB_GREP_NGRAM_MAX_FILE_BYTES", str(4 * 1024 * 1024)))
+# 位图位数为片段数的 8 倍（取 2 的幂），单个片段的误判率约 12%，三个片段同时误判约 0.2%
+_NGRAM_BITS_PER_TRIGRAM = 8
+_NGRAM_MIN_BITS = 1 << 9
+# 索引条目除位图外的固定开销估算（路径、键与字典项）
+_NGRAM_ENTRY_OVERHEAD = 256
+
+
+@dataclass(frozen=True)
+class GrepTarget:
+    path: str
+    scope: str
+    content_key: str
+    load: Callable[[], bytes]
+
+
+def _trigram_hashes(data: bytes) -> set[int]:
+    return {hash(data[i : i + 3]) for i in range(len(data) - 2)}
+
+
+def _build_bitmap(content: bytes) -> bytes:
+    hashes = _trigram_hashes(content)
+    bits = _NGRAM_MIN_BITS
+    while bits < len(hashes) * _NGRAM_BITS_PER_TRIGRAM:
+        bits <<= 1
+    mask = bits - 1
+    bitmap = bytearray(bits // 8)
+    for value in hashes:
+        slot = value & mask
+        bitmap[slot >> 3] |= 1 << (slot & 7)
+    return bytes(bitmap)
+
+
+def _bitmap_contains(bitmap: bytes, hashes: set[int]) -> bool:
+    mask = len(bitmap) * 8 - 1
+    return all(bitmap[(value & mask) >> 3] & (1 << (value & 7)) for value in hashes)
+
+
+class _NgramIndex:
+    """所有知识库共享的 trigram 位图索引；条目以内容校验键区分版本，超出字节预算时按 LRU 淘汰"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[str, bytes | None]] = OrderedDict()
+        self._paths_by_scope: dict[str, set[str]] = {}
+
+    @staticmethod
+    def _entry_bytes(path: str, bitmap: bytes | None) -> int:
+        return _NGRAM_ENTRY_OVERHEAD + len(path) + len(bitmap or b"")
+
+    def may_contain(self, scope: str, path: str, content_key: str, hashes: set[int]) -> bool | None:
+        """返回 False 表示一定不命中，None 表示没有可用的索引条目"""
+        entry = self._entries.get((scope, path))
+        if entry is None or entry[0] != content_key:
+            return None
+        self._entries.move_to_end((scope, path))
+        bitmap = entry[1]
+        if bitmap is None:
+            return False
+        return _bitmap_contains(bitmap, hashes)
+
+    def record(self, scope: str, path: str, content_key: str, bitmap: bytes | None) -> None:
+        self._discard((scope, path))
+        self._entries[(scope, path)] = (content_key, bitmap)
+        self._paths_by_scope.setdefault(scope, set()).add(path)
+        self.bytes += self._entry_bytes(path, bitmap)
+        while self.bytes > self.max_bytes and self._entries:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        scope, path = key
+        self.bytes -= self._entry_bytes(path, entry[1])
+        paths = self._paths_by_scope.get(scope)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._paths_by_scope[scope]
+
+    def scopes(self) -> set[str]:
+        return set(self._paths_by_scope)
+
+    def drop_scope(self, scope: str) -> None:
+        for path in list(self._paths_by_scope.get(scope, ())):
+            self._discard((scope, path))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class KnowledgeBaseGrepEngine:
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_matches: int | None = None,
+        ngram_index: bool | None = None,
+        ngram_max_bytes: int | None = None,
+        ngram_max_file_bytes: int | None = None,
+    ):
+        self.max_workers = max(1, max_workers or KB_GREP_CONCURRENCY)
+        self.max_matches = max(1, max_matches or KB_GREP_MAX_MATCHES)
+        self.ngram_index = KB_GREP_NGRAM_INDEX if ngram_index is None else ngram_index
+        self.ngram_max_file_bytes = max(0, ngram_max_file_bytes or KB_GREP_NGRAM_MAX_FILE_BYTES)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._index = _NgramIndex(max(0, ngram_max_bytes or KB_GREP_NGRAM_MAX_BYTES))
+
+        self.searches = 0
+        self.files_scanned = 0
+        self.files_pruned = 0
+        self.load_errors = 0
+        self.early_stops = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kb-grep")
+            return self._executor
+
+    def _lookup(self, target: GrepTarget, hashes: set[int]) -> bool | None:
+        with self._lock:
+            return self._index.may_contain(target.scope, target.path, target.content_key, hashes)
+
+    def _record(self, target: GrepTarget, bitmap: bytes | None) -> None:
+        with self._lock:
+            self._index.record(target.scope, target.path, target.content_key, bitmap)
+
+    def retain_scopes(self, scopes: Iterable[str]) -> None:
+        """丢弃不在 scopes 中的知识库索引（知识库已删除）"""
+        live = set(scopes)
+        with self._lock:
+            for scope in self._index.scopes() - live:
+                self._index.drop_scope(scope)
+
+    def _scan(
+        self,
+        target: GrepTarget,
+        pattern: str,
+        needle: bytes,
+        hashes: set[int],
+        stop: threading.Event,
+    ) -> list[dict[str, Any]]:
+        if stop.is_set():
+            return []
+        verdict = self._lookup(target, hashes) if self.ngram_index and target.content_key else True
+        if verdict is False:
+            with self._lock:
+                self.files_pruned += 1
+            return []
+
+        try:
+            content = target.load()
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"Skip knowledge base file {target.path} during grep: {e}")
+            with self._lock:
+                self.load_errors += 1
+            return []
+        with self._lock:
+            self.files_scanned += 1
+
+        text: str | None = None
+        if b"\x00" not in content:
+            try:
+                text = content.decode("utf-8")
+            except UnicodeDecodeError:
+                text = None
+        if verdict is None:
+            if text is None:
+                self._record(target, None)
+            elif len(content) <= self.ngram_max_file_bytes:
+                self._record(target, _build_bitmap(content))
+        # UTF-8 下字节子串命中与字符子串命中等价，不命中的文件无需切分行
+        if text is None or needle not in content:
+            return []
+
+        return [
+            {"path": target.path, "line": line_num, "text": line}
+            for line_num, line in enumerate(text.splitlines(), start=1)
+            if pattern in line
+        ]
+
+    def grep(
+        self,
+        pattern: str,
+        targets: Iterable[GrepTarget],
+        *,
+        max_matches: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """按 targets 顺序返回前 max_matches 条匹配，结果与串行逐个扫描一致"""
+        limit = max(1, max_matches or self.max_matches)
+        needle = pattern.encode("utf-8")
+        hashes = _trigram_hashes(needle) if len(needle) >= 3 else set()
+        stop = threading.Event()
+        executor = self._get_executor()
+        with self._lock:
+            self.searches += 1
+
+        # 只保持有限个在途任务，按顺序消费后再补充，达到上限时未调度的文件不会被读取
+        pending: deque[Future] = deque()
+        target_iter = iter(targets)
+        window = self.max_workers * 2
+        matches: list[dict[str, Any]] = []
+        try:
+            while True:
+                while len(pending) < window:
+                    target = next(target_iter, None)
+                    if target is None:
+                        break
+                    pending.append(executor.submit(self._scan, target, pattern, needle, hashes, stop))
+                if not pending:
+                    return matches
+                matches.extend(pending.popleft().result())
+                if len(matches) >= limit:
+                    with self._lock:
+                        self.early_stops += 1
+                    return matches[:limit]
+        finally:
+            stop.set()
+            for future in pending:
+                future.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_matches": self.max_matches,
+                "ngram_index": self.ngram_index,
+                "indexed_files": len(self._index),
+                "indexed_scopes": len(self._index.scopes()),
+                "index_bytes": self._index.bytes,
+                "index_max_bytes": self._index.max_bytes,
+                "index_evictions": self._index.evictions,
+                "searches": self.searches,
+                "files_scanned": self.files_scanned,
+                "files_pruned": self.files_pruned,
+                "load_errors": self.load_errors,
+                "early_stops": self.early_stops,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+knowledge_base_grep_engine = KnowledgeBaseGrepEngine()
@@ -7,7 +7,10 @@
 
 from __future__ import annotations
 
+import hashlib
+import threading
 import uuid
+from collections import OrderedDict
 from collections.abc import Callable, Iterable, Mapping
 from functools import partial
 from typing import Any, Literal, cast, override
@@ -78,6 +81,7 @@ Messages to summarize:
 _DEFAULT_MESSAGES_TO_KEEP = 20
 _DEFAULT_FALLBACK_MESSAGE_COUNT = 15
 _OFFLOAD_DIR = "summary_offload"
+_TOKEN_CACHE_MAX_ENTRIES = 8192
 
 ContextFraction = tuple[Literal["fraction"], float]
 ContextTokens = tuple[Literal["tokens"], int]
@@ -93,6 +97,80 @@ def _get_approximate_token_counter(model: BaseChatModel) -> TokenCounter:
     return count_tokens_approximately
 
 
+def _message_signature(msg: AnyMessage) -> tuple:
+    """Fingerprint of the message fields that affect its token count."""
+    content = msg.content
+    if isinstance(content, str):
+        # str 会缓存自身的 hash，长工具输出重复计算时为 O(1)
+        content_key: Any = (len(content), hash(content))
+    else:
+        content_key = hashlib.blake2b(repr(content).encode("utf-8"), digest_size=16).hexdigest()
+    tool_calls = getattr(msg, "tool_calls", None)
+    return (
+        msg.id,
+        msg.type,
+        msg.name,
+        content_key,
+        repr(tool_calls) if tool_calls else None,
+        getattr(msg, "tool_call_id", None),
+    )
+
+
+class _MessageTokenCache:
+    """Per-message token counts keyed by message id and content fingerprint.
+
+    The token counter is assumed to be additive over messages (as ``count_tokens_approximately``
+    is), so the count of any message list is the sum of its per-message counts.
+    """
+
+    def __init__(self, token_counter: TokenCounter, max_entries: int = _TOKEN_CACHE_MAX_ENTRIES) -> None:
+        self._token_counter = token_counter
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, msg: AnyMessage) -> int:
+        key = _message_signature(msg)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        tokens = self._token_counter([msg])
+        with self._lock:
+            self._entries[key] = tokens
+            self.misses += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return tokens
+
+    def total(self, messages: Iterable[AnyMessage]) -> int:
+        return sum(self.count(msg) for msg in messages)
+
+    def suffix_sums(self, messages: list[AnyMessage]) -> list[int]:
+        """``suffix[i]`` is the token count of ``messages[i:]``; ``suffix[len(messages)] == 0``."""
+        suffix = [0] * (len(messages) + 1)
+        for idx in range(len(messages) - 1, -1, -1):
+            suffix[idx] = suffix[idx + 1] + self.count(messages[idx])
+        return suffix
+
+
+def _first_index_within(suffix: list[int], limit: int) -> int:
+    """Smallest index whose suffix token count is <= limit (suffix sums are non-increasing)."""
+    left, right = 0, len(suffix) - 1
+    while left < right:
+        mid = (left + right) // 2
+        if suffix[mid] <= limit:
+            right = mid
+        else:
+            left = mid + 1
+    return left
+
+
 def _get_content_str(content: Any) -> str | None:
     """Convert plain-text ToolMessage content to string for size checking."""
     if isinstance(content, str):
@@ -335,6 +413,7 @@ class SummaryOffloadMiddleware(AgentMiddleware):
             self.token_counter = _get_approximate_token_counter(self.model)
         else:
             self.token_counter = token_counter
+        self._token_cache = _MessageTokenCache(self.token_counter)
         self.summary_prompt = summary_prompt
         self.trim_tokens_to_summarize = trim_tokens_to_summarize
 
@@ -378,7 +457,7 @@ class SummaryOffloadMiddleware(AgentMiddleware):
 
         self._ensure_message_ids(messages)
 
-        total_tokens = self.token_counter(messages)
+        total_tokens = self._token_cache.total(messages)
 
         # 1. 检查是否触发 Summary
         if not self._should_summarize(messages, total_tokens):
@@ -389,13 +468,13 @@ class SummaryOffloadMiddleware(AgentMiddleware):
         modified_messages: list[AnyMessage] = []
 
         agg_files, agg_msgs = _offload_tool_results(
-            messages, self.summary_offload_threshold, self.token_counter, runtime
+            messages, self.summary_offload_threshold, self._token_cache.total, runtime
         )
         files_update = agg_files
         modified_messages = agg_msgs
 
-        # 3. 检查 Retention Ratio
-        current_tokens = self.token_counter(messages)
+        # 3. 检查 Retention Ratio（只有被卸载的消息需要重新计数）
+        current_tokens = self._token_cache.total(messages)
         trigger_value = self._get_token_trigger_value()
 
         if trigger_value is None:
@@ -466,7 +545,7 @@ class SummaryOffloadMiddleware(AgentMiddleware):
 
         self._ensure_message_ids(messages)
 
-        total_tokens = self.token_counter(messages)
+        total_tokens = self._token_cache.total(messages)
 
         # 1. 检查是否触发 Summary
         if not self._should_summarize(messages, total_tokens):
@@ -477,13 +556,13 @@ class SummaryOffloadMiddleware(AgentMiddleware):
         modified_messages: list[AnyMessage] = []
 
         agg_files, agg_msgs = await _aoffload_tool_results(
-            messages, self.summary_offload_threshold, self.token_counter, runtime
+            messages, self.summary_offload_threshold, self._token_cache.total, runtime
         )
         files_update = agg_files
         modified_messages = agg_msgs
 
-        # 3. 检查 Retention Ratio
-        current_tokens = self.token_counter(messages)
+        # 3. 检查 Retention Ratio（只有被卸载的消息需要重新计数）
+        current_tokens = self._token_cache.total(messages)
         trigger_value = self._get_token_trigger_value()
 
         if trigger_value is None:
@@ -596,26 +675,12 @@ class SummaryOffloadMiddleware(AgentMiddleware):
         if target_token_count <= 0:
             target_token_count = 1
 
-        if self.token_counter(messages) <= target_token_count:
+        suffix = self._token_cache.suffix_sums(messages)
+        if suffix[0] <= target_token_count:
             return 0
 
-        # 二分查找
-        left, right = 0, len(messages)
-        cutoff_candidate = len(messages)
-        max_iterations = len(messages).bit_length() + 1
-        for _ in range(max_iterations):
-            if left >= right:
-                break
-
-            mid = (left + right) // 2
-            if self.token_counter(messages[mid:]) <= target_token_count:
-                cutoff_candidate = mid
-                right = mid
-            else:
-                left = mid + 1
-
-        if cutoff_candidate == len(messages):
-            cutoff_candidate = left
+        # 在后缀和上二分查找
+        cutoff_candidate = _first_index_within(suffix, target_token_count)
 
         if cutoff_candidate >= len(messages):
             if len(messages) == 1:
@@ -626,28 +691,15 @@ class SummaryOffloadMiddleware(AgentMiddleware):
 
     def _find_cutoff_by_token_limit(self, messages: list[AnyMessage], max_tokens: int) -> int:
         """Find cutoff index to ensure total tokens <= max_tokens."""
-        if not messages or self.token_counter(messages) <= max_tokens:
+        if not messages:
+            return 0
+
+        suffix = self._token_cache.suffix_sums(messages)
+        if suffix[0] <= max_tokens:
             return 0
 
-        # Binary search for cutoff
-        left, right = 0, len(messages)
-        cutoff_candidate = len(messages)
-        max_iterations = len(messages).bit_length() + 1
-
-        for _ in range(max_iterations):
-            if left >= right:
-                break
-
-            mid = (left + right) // 2
-            # Calculate tokens for preserved part: messages[mid:]
-            if self.token_counter(messages[mid:]) <= max_tokens:
-                cutoff_candidate = mid
-                right = mid
-            else:
-                left = mid + 1
-
-        if cutoff_candidate == len(messages):
-            cutoff_candidate = left
+        # Binary search over suffix sums: suffix[i] is the token count of the preserved part messages[i:]
+        cutoff_candidate = _first_index_within(suffix, max_tokens)
 
         return self._find_safe_cutoff_point(messages, cutoff_candidate)
 
@@ -1,20 +1,90 @@
+import json
 import os
+import threading
 import traceback
+from collections import OrderedDict
+from collections.abc import Callable
 
 from langchain.chat_models import BaseChatModel, init_chat_model
 from pydantic import SecretStr
 
 from yuxi import config
-from yuxi.services.model_cache import is_v2_spec_format
+from yuxi.services.model_cache import ModelInfo, is_v2_spec_format
 from yuxi.utils import get_docker_safe_url
 from yuxi.utils.logging_config import logger
 
+# 聊天模型实例缓存的条数上限，0 表示不缓存
+CHAT_MODEL_CACHE_SIZE = int(os.getenv("CHAT_MODEL_CACHE_SIZE") or 64)
+
+
+class ChatModelCache:
+    """聊天模型实例的 LRU 缓存。
+
+    模型实例本身无状态，可在请求间复用；复用实例即复用其底层 SDK 客户端与连接池，
+    避免每次调用都重新创建客户端、重新握手。模型配置（model_cache 版本）变化时整体清空。
+    """
+
+    def __init__(self, max_size: int = CHAT_MODEL_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: OrderedDict[tuple, BaseChatModel] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key: tuple | None, version: int, factory: Callable[[], BaseChatModel]) -> BaseChatModel:
+        if key is None or self.max_size <= 0:
+            return factory()
+
+        with self._lock:
+            if version != self._version:
+                self._items.clear()
+                self._version = version
+            model = self._items.get(key)
+            if model is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+
+        model = factory()
+        with self._lock:
+            if version == self._version:
+                # 并发构造时保留先写入的实例
+                model = self._items.setdefault(key, model)
+                self._items.move_to_end(key)
+                while len(self._items) > self.max_size:
+                    self._items.popitem(last=False)
+        return model
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._version = None
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._items), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+chat_model_cache = ChatModelCache()
+
+
+def _chat_model_cache_key(info: ModelInfo, kwargs: dict) -> tuple | None:
+    """由模型配置与构造参数组成缓存 key；参数无法序列化（如回调对象）时返回 None，不走缓存。"""
+    try:
+        params = json.dumps(kwargs, sort_keys=True)
+        provider_options = json.dumps([info.headers, info.extra], sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+    return (info.spec, info.provider_type, info.base_url, info.api_key, provider_options, params)
+
 
 def load_chat_model_v2(spec: str, **kwargs) -> BaseChatModel:
     """根据 v2 spec（provider_id:model_id）加载 LangChain 聊天模型。
 
     v2 spec 格式使用冒号分隔，如: siliconflow-cn:deepseek-ai/DeepSeek-V4-Flash
     数据来源为数据库中的 model_providers 表，通过全局缓存访问。
+    相同配置与参数的模型实例会被复用，见 ChatModelCache。
     """
     from yuxi.services.model_cache import model_cache
 
@@ -25,6 +95,15 @@ def load_chat_model_v2(spec: str, **kwargs) -> BaseChatModel:
     if info.model_type != "chat":
         raise ValueError(f"Model {spec} is not a chat model (type={info.model_type})")
 
+    return chat_model_cache.get_or_create(
+        _chat_model_cache_key(info, kwargs),
+        model_cache.version,
+        lambda: _create_chat_model_v2(info, **kwargs),
+    )
+
+
+def _create_chat_model_v2(info: ModelInfo, **kwargs) -> BaseChatModel:
+    spec = info.spec
     api_key = info.api_key
     base_url = get_docker_safe_url(info.base_url)
 
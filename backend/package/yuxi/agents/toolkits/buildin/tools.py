@@ -276,11 +276,11 @@ KG_QUERY_DESCRIPTION = """
 
 
 @tool(category="buildin", tags=["图谱"], display_name="查询知识图谱", description=KG_QUERY_DESCRIPTION)
-def query_knowledge_graph(query: Annotated[str, "The keyword to query knowledge graph."]) -> Any:
+async def query_knowledge_graph(query: Annotated[str, "The keyword to query knowledge graph."]) -> Any:
     """使用这个工具可以查询知识图谱中包含的三元组信息。关键词（query），使用可能帮助回答这个问题的关键词进行查询，不要直接使用用户的原始输入去查询。"""
     try:
         logger.debug(f"Querying knowledge graph with: {query}")
-        result = graph_base.query_node(query, hops=2, return_format="triples")
+        result = await graph_base.query_node(query, hops=2, return_format="triples")
         logger.debug(
             f"Knowledge graph query returned "
             f"{len(result.get('triples', [])) if isinstance(result, dict) else 'N/A'} triples"
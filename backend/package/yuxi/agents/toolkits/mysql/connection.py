@@ -1,55 +1,119 @@
+"""
+MySQL 连接池
+
+pymysql 是阻塞驱动，连接池把每条连接上的操作放到与池同样大小的专用线程池中执行，
+并发的智能体运行各自占用一条连接，不再串行、也不阻塞事件循环。
+查询超时由服务端会话变量（MySQL max_execution_time / MariaDB max_statement_time）执行，
+客户端超时只作为兜底并会 KILL QUERY；查询结果使用服务端游标流式读取，达到行数或字节预算即停止。
+"""
+
+import asyncio
 import concurrent.futures
-import threading
+import os
 import time
-from contextlib import contextmanager
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from typing import Any
 
 import pymysql
 from pymysql import MySQLError
-from pymysql.cursors import DictCursor
+from pymysql.cursors import DictCursor, SSDictCursor
 
 from yuxi.utils import logger
 
+from .exceptions import MySQLConnectionError
+
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "5"))
+MYSQL_POOL_ACQUIRE_TIMEOUT = float(os.getenv("MYSQL_POOL_ACQUIRE_TIMEOUT", "30"))
+MYSQL_MAX_RESULT_ROWS = int(os.getenv("MYSQL_MAX_RESULT_ROWS", "500"))
+MYSQL_MAX_RESULT_BYTES = int(os.getenv("MYSQL_MAX_RESULT_BYTES", "10000"))
+# 客户端兜底超时在服务端超时基础上额外等待的秒数
+MYSQL_CLIENT_TIMEOUT_GRACE = 5.0
+# 连接空闲超过该秒数后复用前先 ping
+MYSQL_IDLE_PING_INTERVAL = 60.0
+
+_ER_UNKNOWN_SYSTEM_VARIABLE = 1193
+
+
+class QueryTimeoutError(Exception):
+    """查询超时异常"""
+
+    pass
+
+
+@dataclass
+class QueryResult:
+    """流式查询结果，truncated_by 为 rows / bytes 表示达到预算后停止读取"""
+
+    rows: list[dict[str, Any]]
+    truncated_by: str | None = None
+    elapsed_s: float = 0.0
+
+    @property
+    def truncated(self) -> bool:
+        return self.truncated_by is not None
+
+
+@dataclass
+class _PooledConnection:
+    conn: pymysql.Connection
+    created_at: float
+    last_used: float
+    # 服务端超时变量名：max_execution_time（毫秒）/ max_statement_time（秒）/ None（不支持）
+    timeout_variable: str | None = None
+    timeout_value: float | None = None
+    broken: bool = False
+    # 超时或取消后仍在使用该连接的工作线程
+    worker: concurrent.futures.Future | None = None
+
+
+def _row_bytes(row: dict[str, Any]) -> int:
+    return len(str(row).encode("utf-8"))
 
-class MySQLConnectionManager:
-    """MySQL 数据库连接管理器"""
 
-    def __init__(self, config: dict[str, Any]):
+class MySQLConnectionManager:
+    """MySQL 异步连接池"""
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        *,
+        pool_size: int | None = None,
+        acquire_timeout: float | None = None,
+        connect: Callable[[], pymysql.Connection] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.config = config
-        self.connection = None
-        self._lock = threading.Lock()
-        self.last_connection_time = 0
+        self.pool_size = max(1, pool_size or MYSQL_POOL_SIZE)
+        self.acquire_timeout = MYSQL_POOL_ACQUIRE_TIMEOUT if acquire_timeout is None else acquire_timeout
         self.max_connection_age = 3600  # 1小时后重新连接
-
-    def _get_connection(self) -> pymysql.Connection:
-        """获取数据库连接"""
-        current_time = time.time()
-
-        # 检查连接是否过期或断开
-        if (
-            self.connection is None
-            or not self.connection.open
-            or current_time - self.last_connection_time > self.max_connection_age
-        ):
-            with self._lock:
-                # 双重检查
-                if (
-                    self.connection is None
-                    or not self.connection.open
-                    or current_time - self.last_connection_time > self.max_connection_age
-                ):
-                    # 关闭旧连接
-                    if self.connection and self.connection.open:
-                        try:
-                            self.connection.close()
-                        except Exception as _:
-                            pass
-
-                    # 创建新连接
-                    self.connection = self._create_connection()
-                    self.last_connection_time = current_time
-
-        return self.connection
+        self._connect = connect or self._create_connection
+        self._clock = clock
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.pool_size, thread_name_prefix="mysql-pool"
+        )
+        self._slots = asyncio.Semaphore(self.pool_size)
+        self._idle: deque[_PooledConnection] = deque()
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        self.metrics: dict[str, float] = {
+            "acquired": 0,
+            "acquire_timeouts": 0,
+            "wait_time_total_s": 0.0,
+            "wait_time_max_s": 0.0,
+            "connections_created": 0,
+            "connections_discarded": 0,
+            "query_timeouts": 0,
+            "truncated_results": 0,
+        }
+
+    # =========================================================================
+    # 连接管理（以下同步方法均在池线程中执行）
+    # =========================================================================
 
     def _create_connection(self) -> pymysql.Connection:
         """创建新的数据库连接"""
@@ -65,7 +129,8 @@ class MySQLConnectionManager:
                     charset=self.config.get("charset", "utf8mb4"),
                     cursorclass=DictCursor,
                     connect_timeout=10,
-                    read_timeout=60,  # 增加读取超时
+                    # 查询超时由服务端执行，读超时只需覆盖最长允许的查询时间
+                    read_timeout=600 + int(MYSQL_CLIENT_TIMEOUT_GRACE) * 2,
                     write_timeout=30,
                     autocommit=True,  # 自动提交
                 )
@@ -78,94 +143,249 @@ class MySQLConnectionManager:
                     time.sleep(2**attempt)  # 指数退避
                 else:
                     logger.error(f"Failed to connect to MySQL after {max_retries} attempts: {e}")
-                    raise ConnectionError(f"MySQL connection failed: {e}")
-
-    def test_connection(self) -> bool:
-        """测试连接是否有效"""
-        try:
-            if self.connection and self.connection.open:
-                # 执行简单查询测试连接
-                with self.connection.cursor() as cursor:
-                    cursor.execute("SELECT 1")
+                    raise MySQLConnectionError(f"MySQL connection failed: {e}")
+
+    def _open(self) -> _PooledConnection:
+        now = self._clock()
+        pooled = _PooledConnection(conn=self._connect(), created_at=now, last_used=now)
+        pooled.timeout_variable = self._detect_timeout_variable(pooled.conn)
+        self.metrics["connections_created"] += 1
+        return pooled
+
+    @staticmethod
+    def _detect_timeout_variable(conn: pymysql.Connection) -> str | None:
+        for variable in ("max_execution_time", "max_statement_time"):
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"SELECT @@SESSION.{variable}")
                     cursor.fetchone()
-                return True
-        except Exception as _:
-            pass
-        return False
-
-    def _invalidate_connection(self, connection: pymysql.Connection | None = None):
-        """关闭并清理失效的连接"""
+                return variable
+            except MySQLError as e:
+                if not e.args or e.args[0] != _ER_UNKNOWN_SYSTEM_VARIABLE:
+                    raise
+        logger.warning("MySQL server supports neither max_execution_time nor max_statement_time")
+        return None
+
+    def _checkout(self, pooled: _PooledConnection | None) -> _PooledConnection:
+        """校验空闲连接，过期或失效时重建"""
+        if pooled is not None:
+            now = self._clock()
+            stale = now - pooled.created_at > self.max_connection_age
+            if not stale and now - pooled.last_used > MYSQL_IDLE_PING_INTERVAL:
+                try:
+                    pooled.conn.ping(reconnect=False)
+                except Exception:
+                    stale = True
+            if not stale and pooled.conn.open:
+                return pooled
+            self._close_quietly(pooled)
+        return self._open()
+
+    def _close_quietly(self, pooled: _PooledConnection) -> None:
+        self.metrics["connections_discarded"] += 1
         try:
-            if connection:
-                connection.close()
+            pooled.conn.close()
         except Exception:
             pass
-        finally:
-            self.connection = None
-
-    @contextmanager
-    def get_cursor(self):
-        """获取数据库游标的上下文管理器"""
-        max_retries = 2
-        cursor = None
-        connection = None
-        last_error: Exception | None = None
 
-        # 优先确保成功获取游标再交给调用方执行查询
-        for attempt in range(max_retries):
-            try:
-                connection = self._get_connection()
-                cursor = connection.cursor()
-                break
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Failed to acquire cursor (attempt {attempt + 1}): {e}")
-                self._invalidate_connection(connection)
-                cursor = None
-                connection = None
-                if attempt == max_retries - 1:
-                    raise e
-                time.sleep(1)
-
-        if cursor is None or connection is None:
-            raise last_error or ConnectionError("Unable to acquire MySQL cursor")
+    def _set_server_timeout(self, pooled: _PooledConnection, timeout: float | None) -> None:
+        if pooled.timeout_variable is None or pooled.timeout_value == timeout:
+            return
+        if pooled.timeout_variable == "max_execution_time":
+            value = int(timeout * 1000) if timeout else 0
+        else:
+            value = float(timeout or 0)
+        with pooled.conn.cursor() as cursor:
+            cursor.execute(f"SET SESSION {pooled.timeout_variable} = %s", (value,))
+        pooled.timeout_value = timeout
+
+    # =========================================================================
+    # 异步接口
+    # =========================================================================
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[_PooledConnection]:
+        if self._closed:
+            raise MySQLConnectionError("MySQL connection pool is closed")
+
+        started = self._clock()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout or None)
+        except TimeoutError:
+            self.metrics["acquire_timeouts"] += 1
+            raise MySQLConnectionError(
+                f"Timed out after {self.acquire_timeout}s waiting for a MySQL connection (pool_size={self.pool_size})"
+            )
+        finally:
+            self._waiting -= 1
+        waited = self._clock() - started
+        self.metrics["acquired"] += 1
+        self.metrics["wait_time_total_s"] += waited
+        self.metrics["wait_time_max_s"] = max(self.metrics["wait_time_max_s"], waited)
+        self._in_use += 1
+
+        idle = self._idle.popleft() if self._idle else None
+        checkout = self._executor.submit(self._checkout, idle)
+        try:
+            pooled = await asyncio.shield(asyncio.wrap_future(checkout))
+        except BaseException:
+            self._release_after(checkout)
+            raise
 
         try:
-            yield cursor
-            connection.commit()
+            yield pooled
         except Exception as e:
-            try:
-                connection.rollback()
-            except Exception:
-                pass
-
-            # 标记连接失效，等待下一次获取时重建
-            if "MySQL" in str(e) or "connection" in str(e).lower():
-                logger.warning(f"MySQL connection error encountered, invalidating connection: {e}")
-                self._invalidate_connection(connection)
-
+            pooled.broken = pooled.broken or _connection_lost(pooled, e)
             raise
         finally:
-            if cursor:
-                try:
-                    cursor.close()
-                except Exception:
-                    pass
+            if pooled.worker is None:
+                self._release(pooled)
+            else:
+                self._release_after(pooled.worker, pooled)
+
+    def _release(self, pooled: _PooledConnection | None) -> None:
+        self._in_use -= 1
+        if pooled is not None:
+            if pooled.broken or self._closed:
+                self._close_quietly(pooled)
+            else:
+                pooled.last_used = self._clock()
+                self._idle.append(pooled)
+        self._slots.release()
+
+    def _release_after(self, future: concurrent.futures.Future, pooled: _PooledConnection | None = None) -> None:
+        """工作线程仍占用连接（超时或调用方被取消）时，待线程结束后再归还槽位并丢弃连接"""
+        loop = asyncio.get_running_loop()
+
+        def on_done(done: concurrent.futures.Future) -> None:
+            target = pooled
+            if target is None and not done.cancelled() and done.exception() is None:
+                target = done.result()
+            if target is not None:
+                target.broken = True
+            loop.call_soon_threadsafe(self._release, target)
+
+        future.add_done_callback(on_done)
+
+    async def _execute(self, pooled: _PooledConnection, work: Callable, timeout: float) -> Any:
+        """在池线程中执行 work(pooled)，超过 timeout 时终止查询并抛出 QueryTimeoutError"""
+        future = self._executor.submit(work, pooled)
+        try:
+            done, _ = await asyncio.wait({asyncio.wrap_future(future)}, timeout=timeout + MYSQL_CLIENT_TIMEOUT_GRACE)
+        except asyncio.CancelledError:
+            if not future.done():
+                pooled.worker = future
+            raise
+        if not done:
+            pooled.worker = future
+            self.metrics["query_timeouts"] += 1
+            await self._kill_query(pooled)
+            raise QueryTimeoutError(f"Query timeout after {timeout} seconds")
+        try:
+            return done.pop().result()
+        except MySQLError as e:
+            if _is_server_timeout(e):
+                self.metrics["query_timeouts"] += 1
+                raise QueryTimeoutError(f"Query timeout after {timeout} seconds") from e
+            raise
+
+    async def run(self, fn: Callable[[Any], Any], timeout: float = 30) -> Any:
+        """在池线程中以一条连接的游标执行 fn(cursor)，适用于结果较小的元数据查询"""
+
+        def work(pooled: _PooledConnection):
+            self._set_server_timeout(pooled, timeout)
+            with pooled.conn.cursor() as cursor:
+                return fn(cursor)
+
+        async with self._acquire() as pooled:
+            return await self._execute(pooled, work, timeout)
+
+    async def stream_query(
+        self,
+        sql: str,
+        params: tuple | None = None,
+        *,
+        timeout: float = 60,
+        max_rows: int | None = None,
+        max_bytes: int | None = None,
+    ) -> QueryResult:
+        """以服务端游标执行查询，流式读取到行数 / 字节预算为止"""
+        max_rows = max_rows or MYSQL_MAX_RESULT_ROWS
+        max_bytes = max_bytes or MYSQL_MAX_RESULT_BYTES
+
+        def work(pooled: _PooledConnection) -> QueryResult:
+            started = time.monotonic()
+            self._set_server_timeout(pooled, timeout)
+            cursor = pooled.conn.cursor(SSDictCursor)
+            rows: list[dict[str, Any]] = []
+            used_bytes = 0
+            truncated_by = None
+            try:
+                cursor.execute(sql, params)
+                for row in cursor:
+                    row_size = _row_bytes(row)
+                    if rows and used_bytes + row_size > max_bytes:
+                        truncated_by = "bytes"
+                        break
+                    rows.append(row)
+                    used_bytes += row_size
+                    if len(rows) >= max_rows:
+                        if cursor.fetchone() is not None:
+                            truncated_by = "rows"
+                        break
+            finally:
+                if truncated_by is None:
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pooled.broken = True
+                else:
+                    # 服务端游标关闭时会读完剩余结果，截断时直接丢弃连接
+                    pooled.broken = True
+            return QueryResult(rows=rows, truncated_by=truncated_by, elapsed_s=time.monotonic() - started)
+
+        async with self._acquire() as pooled:
+            result = await self._execute(pooled, work, timeout)
+        if result.truncated:
+            self.metrics["truncated_results"] += 1
+        return result
 
-    def close(self):
-        """关闭数据库连接"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-            logger.info("MySQL connection closed")
+    async def _kill_query(self, pooled: _PooledConnection) -> None:
+        """客户端兜底超时：用临时连接终止仍在执行的查询"""
+        thread_id = pooled.conn.thread_id()
 
-    def get_connection(self) -> pymysql.Connection:
-        """对外暴露的连接获取方法"""
-        return self._get_connection()
+        def kill():
+            conn = self._connect()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"KILL QUERY {int(thread_id)}")
+            finally:
+                conn.close()
 
-    def invalidate_connection(self):
-        """手动标记连接失效"""
-        self._invalidate_connection(self.connection)
+        try:
+            await asyncio.to_thread(kill)
+        except Exception as e:
+            logger.warning(f"Failed to kill timed out MySQL query (thread {thread_id}): {e}")
+
+    def stats(self) -> dict[str, Any]:
+        acquired = self.metrics["acquired"]
+        return {
+            "pool_size": self.pool_size,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "waiting": self._waiting,
+            **self.metrics,
+            "wait_time_avg_s": round(self.metrics["wait_time_total_s"] / acquired, 6) if acquired else 0.0,
+        }
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        self._closed = True
+        while self._idle:
+            self._close_quietly(self._idle.popleft())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("MySQL connection pool closed")
 
     @property
     def database_name(self) -> str:
@@ -173,65 +393,13 @@ class MySQLConnectionManager:
         return self.config["database"]
 
 
-class QueryTimeoutError(Exception):
-    """查询超时异常"""
-
-    pass
-
-
-class QueryResultTooLargeError(Exception):
-    """查询结果过大异常"""
+def _is_server_timeout(error: MySQLError) -> bool:
+    # MySQL 3024: ER_QUERY_TIMEOUT；MariaDB 1969: ER_STATEMENT_TIMEOUT
+    return bool(error.args) and error.args[0] in (3024, 1969)
 
-    pass
-
-
-def execute_query_with_timeout(connection: pymysql.Connection, sql: str, params: tuple = None, timeout: int = 10):
-    """使用线程池实现超时控制，避免信号导致的生成器问题"""
-
-    def query_worker():
-        """查询工作函数，在单独线程中执行"""
-        cursor = connection.cursor(DictCursor)
-        try:
-            if params is None:
-                cursor.execute(sql)
-            else:
-                cursor.execute(sql, params)
-            result = cursor.fetchall()
-            return result
-        finally:
-            cursor.close()
-
-    # 使用线程池执行查询，设置超时
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(query_worker)
-        try:
-            return future.result(timeout=timeout)
-        except concurrent.futures.TimeoutError:
-            # 尝试取消任务
-            future.cancel()
-            raise QueryTimeoutError(f"Query timeout after {timeout} seconds")
-
-
-def limit_result_size(result: list, max_chars: int = 10000) -> list:
-    """限制结果大小"""
-    if not result:
-        return result
 
-    # 计算结果的字符大小
-    result_str = str(result)
-    if len(result_str) > max_chars:
-        # 返回部分结果并提示
-        limited_result = []
-        current_chars = 0
-        for row in result:
-            row_str = str(row)
-            if current_chars + len(row_str) > max_chars:
-                break
-            limited_result.append(row)
-            current_chars += len(row_str)
-
-        # 记录警告
-        logger.warning(f"Query result truncated from {len(result)} to {len(limited_result)} rows due to size limit")
-        return limited_result
-
-    return result
+def _connection_lost(pooled: _PooledConnection, error: Exception) -> bool:
+    # 2006: server has gone away；2013: lost connection during query
+    if isinstance(error, pymysql.err.InterfaceError) or not pooled.conn.open:
+        return True
+    return isinstance(error, MySQLError) and bool(error.args) and error.args[0] in (2006, 2013)
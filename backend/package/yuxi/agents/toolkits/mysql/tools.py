@@ -5,12 +5,7 @@ from pydantic import BaseModel, Field
 from yuxi.agents.toolkits.registry import tool
 from yuxi.utils import logger
 
-from .connection import (
-    MySQLConnectionManager,
-    QueryTimeoutError,
-    execute_query_with_timeout,
-    limit_result_size,
-)
+from .connection import MySQLConnectionManager, QueryTimeoutError
 from .exceptions import MySQLConnectionError
 from .security import MySQLSecurityChecker
 
@@ -29,6 +24,8 @@ MYSQL_CONFIG_GUIDE = """
 
 可选环境变量：
 - `MYSQL_DATABASE_DESCRIPTION`：数据库说明，会追加到工具描述中，帮助模型理解库表语义
+- `MYSQL_POOL_SIZE`：连接池大小（默认 5），`MYSQL_POOL_ACQUIRE_TIMEOUT`：等待空闲连接的秒数（默认 30）
+- `MYSQL_MAX_RESULT_ROWS` / `MYSQL_MAX_RESULT_BYTES`：单次查询最多读取的行数 / 字节数（默认 500 / 10000）
 
 请在后端运行环境中完成以上配置后再使用这些 MySQL 工具。
 """.strip()
@@ -62,6 +59,18 @@ def get_connection_manager() -> MySQLConnectionManager:
     return _connection_manager
 
 
+def get_mysql_pool_stats() -> dict[str, Any] | None:
+    """获取连接池统计（含等待时间），连接池尚未创建时返回 None"""
+    return _connection_manager.stats() if _connection_manager is not None else None
+
+
+async def close_mysql_connection_pool() -> None:
+    global _connection_manager
+    manager, _connection_manager = _connection_manager, None
+    if manager is not None:
+        await manager.close()
+
+
 @tool(
     category="mysql",
     tags=["数据库", "查询"],
@@ -69,7 +78,7 @@ def get_connection_manager() -> MySQLConnectionManager:
     config_guide=MYSQL_CONFIG_GUIDE,
     name_or_callable="mysql_list_tables",
 )
-def mysql_list_tables() -> str:
+async def mysql_list_tables() -> str:
     """【查询表名及说明】获取数据库中的所有表名
 
     这个工具用来列出当前数据库中所有的表名，帮助你了解数据库的结构。
@@ -77,39 +86,40 @@ def mysql_list_tables() -> str:
     try:
         conn_manager = get_connection_manager()
 
-        with conn_manager.get_cursor() as cursor:
-            # 获取表名
+        def show_tables(cursor):
             cursor.execute("SHOW TABLES")
             logger.debug("Executed `SHOW TABLES` query")
-            tables = cursor.fetchall()
-
-            if not tables:
-                return "数据库中没有找到任何表"
-
-            # 提取表名
-            table_names = []
-            for table in tables:
-                table_name = list(table.values())[0]
-                table_names.append(table_name)
-
-            # 获取每个表的行数信息
-            # table_info = []
-            # for table_name in table_names:
-            #     try:
-            #         cursor.execute(f"SELECT COUNT(*) as count FROM `{table_name}`")
-            #         logger.debug(f"Executed `SELECT COUNT(*) FROM {table_name}` query")
-            #         count_result = cursor.fetchone()
-            #         row_count = count_result["count"]
-            #         table_info.append(f"- {table_name} (约 {row_count} 行)")
-            #     except Exception:
-            #         table_info.append(f"- {table_name} (无法获取行数)")
-
-            all_table_names = "\n".join(table_names)
-            result = f"数据库中的表:\n{all_table_names}"
-            if db_note := conn_manager.config.get("description"):
-                result = f"数据库说明: {db_note}\n\n" + result
-            logger.info(f"Retrieved {len(table_names)} tables from database")
-            return result
+            return cursor.fetchall()
+
+        # 获取表名
+        tables = await conn_manager.run(show_tables)
+        if not tables:
+            return "数据库中没有找到任何表"
+
+        # 提取表名
+        table_names = []
+        for table in tables:
+            table_name = list(table.values())[0]
+            table_names.append(table_name)
+
+        # 获取每个表的行数信息
+        # table_info = []
+        # for table_name in table_names:
+        #     try:
+        #         cursor.execute(f"SELECT COUNT(*) as count FROM `{table_name}`")
+        #         logger.debug(f"Executed `SELECT COUNT(*) FROM {table_name}` query")
+        #         count_result = cursor.fetchone()
+        #         row_count = count_result["count"]
+        #         table_info.append(f"- {table_name} (约 {row_count} 行)")
+        #     except Exception:
+        #         table_info.append(f"- {table_name} (无法获取行数)")
+
+        all_table_names = "\n".join(table_names)
+        result = f"数据库中的表:\n{all_table_names}"
+        if db_note := conn_manager.config.get("description"):
+            result = f"数据库说明: {db_note}\n\n" + result
+        logger.info(f"Retrieved {len(table_names)} tables from database")
+        return result
 
     except Exception as e:
         error_msg = f"获取表名失败: {str(e)}"
@@ -131,7 +141,7 @@ class TableDescribeModel(BaseModel):
     name_or_callable="mysql_describe_table",
     args_schema=TableDescribeModel,
 )
-def mysql_describe_table(table_name: Annotated[str, "要查询结构的表名"]) -> str:
+async def mysql_describe_table(table_name: Annotated[str, "要查询结构的表名"]) -> str:
     """【描述表】获取指定表的详细结构信息
 
     这个工具用来查看表的字段信息、数据类型、是否允许NULL、默认值、键类型等。
@@ -144,13 +154,12 @@ def mysql_describe_table(table_name: Annotated[str, "要查询结构的表名"])
 
         conn_manager = get_connection_manager()
 
-        with conn_manager.get_cursor() as cursor:
+        def fetch_structure(cursor):
             # 获取表结构
             cursor.execute(f"DESCRIBE `{table_name}`")
             columns = cursor.fetchall()
-
             if not columns:
-                return f"表 {table_name} 不存在或没有字段"
+                return columns, {}, []
 
             # 获取字段备注信息
             column_comments: dict[str, str] = {}
@@ -171,47 +180,55 @@ def mysql_describe_table(table_name: Annotated[str, "要查询结构的表名"])
             except Exception as e:
                 logger.warning(f"Failed to fetch column comments for table {table_name}: {e}")
 
-            # 格式化输出
-            result = f"表 `{table_name}` 的结构:\n\n"
-            result += "字段名\t\t类型\t\tNULL\t键\t默认值\t\t额外\t备注\n"
-            result += "-" * 80 + "\n"
-
-            for col in columns:
-                field = col["Field"] or ""
-                type_str = col["Type"] or ""
-                null_str = col["Null"] or ""
-                key_str = col["Key"] or ""
-                default_str = col.get("Default") or ""
-                extra_str = col.get("Extra") or ""
-                comment_str = column_comments.get(field, "")
-
-                # 格式化输出
-                result += (
-                    f"{field:<16}\t{type_str:<16}\t{null_str:<8}\t{key_str:<4}\t"
-                    f"{default_str:<16}\t{extra_str:<16}\t{comment_str}\n"
-                )
-
             # 获取索引信息
+            indexes = []
             try:
                 cursor.execute(f"SHOW INDEX FROM `{table_name}`")
                 indexes = cursor.fetchall()
-
-                if indexes:
-                    result += "\n索引信息:\n"
-                    index_dict = {}
-                    for idx in indexes:
-                        key_name = idx["Key_name"]
-                        if key_name not in index_dict:
-                            index_dict[key_name] = []
-                        index_dict[key_name].append(idx["Column_name"])
-
-                    for key_name, columns in index_dict.items():
-                        result += f"- {key_name}: {', '.join(columns)}\n"
             except Exception as e:
                 logger.warning(f"Failed to get index info for table {table_name}: {e}")
 
-            logger.info(f"Retrieved structure for table {table_name}")
-            return result
+            return columns, column_comments, indexes
+
+        columns, column_comments, indexes = await conn_manager.run(fetch_structure)
+
+        if not columns:
+            return f"表 {table_name} 不存在或没有字段"
+
+        # 格式化输出
+        result = f"表 `{table_name}` 的结构:\n\n"
+        result += "字段名\t\t类型\t\tNULL\t键\t默认值\t\t额外\t备注\n"
+        result += "-" * 80 + "\n"
+
+        for col in columns:
+            field = col["Field"] or ""
+            type_str = col["Type"] or ""
+            null_str = col["Null"] or ""
+            key_str = col["Key"] or ""
+            default_str = col.get("Default") or ""
+            extra_str = col.get("Extra") or ""
+            comment_str = column_comments.get(field, "")
+
+            # 格式化输出
+            result += (
+                f"{field:<16}\t{type_str:<16}\t{null_str:<8}\t{key_str:<4}\t"
+                f"{default_str:<16}\t{extra_str:<16}\t{comment_str}\n"
+            )
+
+        if indexes:
+            result += "\n索引信息:\n"
+            index_dict = {}
+            for idx in indexes:
+                key_name = idx["Key_name"]
+                if key_name not in index_dict:
+                    index_dict[key_name] = []
+                index_dict[key_name].append(idx["Column_name"])
+
+            for key_name, index_columns in index_dict.items():
+                result += f"- {key_name}: {', '.join(index_columns)}\n"
+
+        logger.info(f"Retrieved structure for table {table_name}")
+        return result
 
     except Exception as e:
         error_msg = f"获取表 {table_name} 结构失败: {str(e)}"
@@ -234,7 +251,7 @@ class QueryModel(BaseModel):
     name_or_callable="mysql_query",
     args_schema=QueryModel,
 )
-def mysql_query(
+async def mysql_query(
     sql: Annotated[str, "要执行的SQL查询语句（只能是SELECT语句）"],
     timeout: Annotated[int | None, "查询超时时间（秒），默认60秒，最大600秒"] = 60,
 ) -> str:
@@ -256,27 +273,22 @@ def mysql_query(
             return "timeout参数必须在1-600之间"
 
         conn_manager = get_connection_manager()
-        connection = conn_manager.get_connection()
 
         effective_timeout = timeout or 60
         try:
-            result = execute_query_with_timeout(connection, sql, timeout=effective_timeout)
+            # 服务端游标流式读取，达到行数 / 字节预算后停止，不再一次性取回全部结果
+            query_result = await conn_manager.stream_query(sql, timeout=effective_timeout)
         except QueryTimeoutError as timeout_error:
             logger.error(f"MySQL query timed out after {effective_timeout} seconds: {timeout_error}")
             raise
-        except Exception:
-            conn_manager.invalidate_connection()
-            raise
 
-        if not result:
+        limited_result = query_result.rows
+        if not limited_result:
             return "查询执行成功，但没有返回任何结果"
 
-        # 限制结果大小
-        limited_result = limit_result_size(result, max_chars=10000)
-
         # 检查结果是否被截断
-        if len(limited_result) < len(result):
-            warning = f"\n\n⚠️ 警告: 查询结果过大，只显示了前 {len(limited_result)} 行（共 {len(result)} 行）。\n"
+        if query_result.truncated:
+            warning = f"\n\n⚠️ 警告: 查询结果过大，只读取了前 {len(limited_result)} 行。\n"
             warning += "建议使用更精确的查询条件或使用LIMIT子句来减少返回的数据量。"
         else:
             warning = ""
@@ -33,7 +33,7 @@ if _LITE_MODE or _SKIP_APP_INIT:
         def is_running(self):
             return False
 
-        def get_graph_info(self, *args, **kwargs):
+        async def get_graph_info(self, *args, **kwargs):
             return None
 
     graph_base = _LiteGraphStub()
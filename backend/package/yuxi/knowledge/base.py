@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 import os
 from abc import ABC, abstractmethod
 from typing import Any
@@ -25,6 +26,10 @@ class FileStatus:
     FAILED = "failed"  # Generic failure
 
 
+# 所有实例共享的单调递增计数器，保证任何一次变更得到的版本号都不会与旧版本重复
+_FILES_VERSION_COUNTER = itertools.count(1)
+
+
 class KnowledgeBaseException(Exception):
     """知识库统一异常基类"""
 
@@ -64,6 +69,8 @@ class KnowledgeBase(ABC):
         self.files_meta: dict[str, dict] = {}
         self.benchmarks_meta: dict[str, dict] = {}
         self._metadata_loaded = False  # 标记元数据是否已加载
+        self._files_versions: dict[str, int] = {}
+        self._files_base_version = next(_FILES_VERSION_COUNTER)
 
         # 初始化类级别的锁
         if KnowledgeBase._processing_lock is None:
@@ -113,9 +120,22 @@ class KnowledgeBase(ABC):
                 self.benchmarks_meta[kb_id] = benchmarks
 
         self._normalize_metadata_state()
+        self._touch_files()
         self._metadata_loaded = True
         logger.info(f"{self.kb_type}: 加载了 {len(self.databases_meta)} 个数据库的元数据")
 
+    def files_version(self, db_id: str) -> int:
+        """知识库文件列表的版本号，文件增删、移动、解析或入库后变化"""
+        return self._files_versions.get(db_id, self._files_base_version)
+
+    def _touch_files(self, db_id: str | None = None) -> None:
+        """标记文件元数据已变化；不指定 db_id 时视为全部知识库变化"""
+        if db_id is None:
+            self._files_versions.clear()
+            self._files_base_version = next(_FILES_VERSION_COUNTER)
+        else:
+            self._files_versions[db_id] = next(_FILES_VERSION_COUNTER)
+
     def _ensure_metadata_loaded(self):
         """确保元数据已加载（延迟加载）"""
         if not self._metadata_loaded:
@@ -290,6 +310,7 @@ class KnowledgeBase(ABC):
             markdown_content = await Parser.aparse(
                 source=file_path,
                 params=params,
+                content_hash=file_meta.get("content_hash"),
             )
 
             # Save Markdown to MinIO
@@ -501,6 +522,7 @@ class KnowledgeBase(ABC):
                 await minio_client.adelete_file(minio_client.KB_BUCKETS["parsed"], parsed_object)
 
                 del self.files_meta[file_id]
+            self._touch_files(db_id)
 
             # 2. 并行删除所有知识库 bucket 中该 db_id 下的文件
             prefix = f"{db_id}/"
@@ -1117,6 +1139,7 @@ class KnowledgeBase(ABC):
                     "updated_at": utc_isoformat(bench.updated_at) if bench.updated_at else None,
                 }
 
+        self._touch_files()
         logger.info(f"Loaded {self.kb_type} metadata from database for {len(self.databases_meta)} databases")
 
     async def _save_metadata(self) -> None:
@@ -1129,6 +1152,7 @@ class KnowledgeBase(ABC):
         eval_repo = EvaluationRepository()
 
         self._normalize_metadata_state()
+        self._touch_files()
 
         for db_id, meta in self.databases_meta.items():
             existing = await kb_repo.get_by_id(db_id)
@@ -1216,6 +1240,7 @@ class KnowledgeBase(ABC):
         if not db_id:
             return
 
+        self._touch_files(db_id)
         await file_repo.upsert(
             file_id=file_id,
             data={
@@ -45,36 +45,76 @@ BULLET_PATTERN = [
 
 MARKDOWN_BULLET_GROUP_INDEX = 4
 
+# 预编译的模式：分块过程中会对同一批文本反复匹配，避免每次调用时查找/编译正则
+BULLET_REGEXES: list[list[re.Pattern[str]]] = [[re.compile(p) for p in group] for group in BULLET_PATTERN]
+
+# 英文单词 + 数字 + CJK 单字
+_TOKEN_RE = re.compile(r"[A-Za-z0-9_]+|[\u4e00-\u9fff]")
+_MD_HEADING_RE = re.compile(r"^#{1,6}\s+\S")
+_HTML_TABLE_TAG_RE = re.compile(r"</?(table|tr|td|th|caption|tbody|thead)[^>]*>", flags=re.IGNORECASE)
+_HEADING_PUNCT_RE = re.compile(r"[，。；！？!?:：]")
+_MID_SENTENCE_BULLET_RE = re.compile(
+    r"([一二三四五六七八九十百]+、|[\(（][一二三四五六七八九十百]+[\)）]|[0-9]{1,2}[\.、])"
+)
+_NOT_BULLET_RES = [re.compile(p) for p in (r"0", r"[0-9]+ +[0-9~个只-]", r"[0-9]+\.{2,}")]
+_ENGLISH_RE = re.compile(r"[`a-zA-Z0-9\s.,':;/\"?<>!\(\)\-]+")
+_TOC_SPACES_RE = re.compile(r"( |　|\u3000)+", flags=re.IGNORECASE)
+_TOC_TITLE_RE = re.compile(r"(contents|目录|目次|tableofcontents|致谢|acknowledge)$", flags=re.IGNORECASE)
+_SENTENCE_END_REV_RE = re.compile(r"([。？！!?;；]| \.)")
+_LAW_ARTICLE_RE = re.compile(r"第[零一二三四五六七八九十百0-9]+条")
+_NOT_TITLE_PUNCT_RE = re.compile(r"[,;，。；！!]")
+_DIGITS_ONLY_RE = re.compile(r"[0-9]+$")
+_TITLE_LAYOUT_RE = re.compile(r"(title|head)")
+_POSITION_SUFFIX_RE = re.compile(r"@@[0-9]+.*")
+_PDF_TAG_RE = re.compile(r"@@[0-9-]+\t[0-9.\t]+##")
+_CUSTOM_DELIMITER_RE = re.compile(r"`([^`]+)`")
+
+
+def is_word_char(ch: str) -> bool:
+    """是否属于英文单词/数字 token 的字符（与 count_tokens 的切分规则一致）"""
+    return ch.isascii() and (ch.isalnum() or ch == "_")
+
+
+def is_cjk_char(ch: str) -> bool:
+    return "\u4e00" <= ch <= "\u9fff"
+
 
 def count_tokens(text: str) -> int:
     """近似 token 计数，避免引入额外依赖。"""
-    if not text:
+    if not text or text.isspace():
         return 0
-    # 英文单词 + 数字 + CJK 单字
-    parts = re.findall(r"[A-Za-z0-9_]+|[\u4e00-\u9fff]", text)
-    return max(1, len(parts)) if text.strip() else 0
+    count = 0
+    for _ in _TOKEN_RE.finditer(text):
+        count += 1
+    return max(1, count)
 
 
 def hard_split_by_token_limit(text: str, chunk_token_num: int) -> list[str]:
-    """将文本按 token 上限硬切，用于 naive_merge 之后的兜底保护。"""
-    token_iter = list(re.finditer(r"[A-Za-z0-9_]+|[一-鿿]", text or ""))
-    if not token_iter:
-        cleaned = (text or "").strip()
-        return [cleaned] if cleaned else []
-
+    """将文本按 token 上限硬切，用于 naive_merge 之后的兜底保护。单次扫描，不缓存全部匹配。"""
+    text = text or ""
+    max_tokens = max(int(chunk_token_num or 0), 1)
     chunks: list[str] = []
     start = 0
-    index = 0
-    max_tokens = max(int(chunk_token_num or 0), 1)
+    last_end = 0
+    tokens_in_piece = 0
 
-    while index < len(token_iter):
-        end_index = min(index + max_tokens, len(token_iter)) - 1
-        end = token_iter[end_index].end()
-        piece = text[start:end].strip()
+    for match in _TOKEN_RE.finditer(text):
+        tokens_in_piece += 1
+        last_end = match.end()
+        if tokens_in_piece < max_tokens:
+            continue
+        piece = text[start:last_end].strip()
         if piece:
             chunks.append(piece)
-        start = end
-        index = end_index + 1
+        start = last_end
+        tokens_in_piece = 0
+
+    # 末尾不足上限的 token 单独成块，其后的残余字符（如标点）再作为最后一块
+    if tokens_in_piece:
+        piece = text[start:last_end].strip()
+        if piece:
+            chunks.append(piece)
+        start = last_end
 
     tail = text[start:].strip()
     if tail:
@@ -92,7 +132,6 @@ def is_english(texts: str | list[str]) -> bool:
     if not texts:
         return False
 
-    patt = re.compile(r"[`a-zA-Z0-9\s.,':;/\"?<>!\(\)\-]+")
     if isinstance(texts, str):
         seq = [texts]
     else:
@@ -101,17 +140,12 @@ def is_english(texts: str | list[str]) -> bool:
     if not seq:
         return False
 
-    hits = sum(1 for t in seq if patt.fullmatch(t.strip()))
+    hits = sum(1 for t in seq if _ENGLISH_RE.fullmatch(t.strip()))
     return (hits / len(seq)) > 0.8
 
 
 def not_bullet(line: str) -> bool:
-    patt = [
-        r"0",
-        r"[0-9]+ +[0-9~个只-]",
-        r"[0-9]+\.{2,}",
-    ]
-    return any(re.match(p, line) for p in patt)
+    return any(p.match(line) for p in _NOT_BULLET_RES)
 
 
 def is_probable_heading_line(line: str) -> bool:
@@ -119,11 +153,11 @@ def is_probable_heading_line(line: str) -> bool:
     if not text:
         return False
 
-    if re.match(r"^#{1,6}\s+\S", text):
+    if _MD_HEADING_RE.match(text):
         return True
 
     # 表格/HTML 残留通常不是标题。
-    if re.search(r"</?(table|tr|td|th|caption|tbody|thead)[^>]*>", text, flags=re.IGNORECASE):
+    if _HTML_TABLE_TAG_RE.search(text):
         return False
 
     # 超长行基本是正文或条款，不是章节标题。
@@ -133,7 +167,7 @@ def is_probable_heading_line(line: str) -> bool:
         return False
 
     # 标题前段通常不会出现明显句号/逗号；出现则大概率是正文。
-    if re.search(r"[，。；！？!?:：]", text[:24]):
+    if _HEADING_PUNCT_RE.search(text[:24]):
         return False
 
     if text.endswith(("。", "；", "！", "!", "？", "?")) and len(text) > 20:
@@ -147,13 +181,10 @@ def _is_mid_sentence_bullet(line: str) -> bool:
     if not text:
         return False
 
-    if re.match(r"^#{1,6}\s+\S", text):
+    if _MD_HEADING_RE.match(text):
         return False
 
-    marker = re.search(
-        r"([一二三四五六七八九十百]+、|[\(（][一二三四五六七八九十百]+[\)）]|[0-9]{1,2}[\.、])",
-        text,
-    )
+    marker = _MID_SENTENCE_BULLET_RE.search(text)
     if not marker:
         return False
 
@@ -173,7 +204,7 @@ def bullets_category(sections: list[str]) -> int:
             return 1.0
 
         heading = line.strip()
-        if not re.match(r"^#{1,6}\s+\S", heading):
+        if not _MD_HEADING_RE.match(heading):
             return 1.0
 
         level = len(heading) - len(heading.lstrip("#"))
@@ -183,11 +214,11 @@ def bullets_category(sections: list[str]) -> int:
             return 3.0
         return 2.0
 
-    for i, pro in enumerate(BULLET_PATTERN):
-        for sec in sections:
-            sec = sec.strip()
+    stripped_sections = [sec.strip() for sec in sections]
+    for i, pro in enumerate(BULLET_REGEXES):
+        for sec in stripped_sections:
             for p in pro:
-                if re.match(p, sec) and not not_bullet(sec):
+                if p.match(sec) and not not_bullet(sec):
                     w = bullet_weight(i, sec)
                     if _is_mid_sentence_bullet(sec):
                         w *= 0.1
@@ -214,8 +245,8 @@ def _get_text(section: str | tuple[str, str]) -> str:
 def remove_contents_table(sections: list[str] | list[tuple[str, str]], eng: bool = False) -> None:
     i = 0
     while i < len(sections):
-        line = re.sub(r"( |　|\u3000)+", "", _get_text(sections[i]).split("@@")[0], flags=re.IGNORECASE)
-        if not re.match(r"(contents|目录|目次|tableofcontents|致谢|acknowledge)$", line, flags=re.IGNORECASE):
+        line = _TOC_SPACES_RE.sub("", _get_text(sections[i]).split("@@")[0])
+        if not _TOC_TITLE_RE.match(line):
             i += 1
             continue
 
@@ -238,7 +269,7 @@ def remove_contents_table(sections: list[str] | list[tuple[str, str]], eng: bool
             break
 
         for j in range(i, min(i + 128, len(sections))):
-            if not re.match(re.escape(prefix), _get_text(sections[j])):
+            if not _get_text(sections[j]).startswith(prefix):
                 continue
             for _ in range(i, j):
                 sections.pop(i)
@@ -260,7 +291,7 @@ def make_colon_as_title(sections: list[str] | list[tuple[str, str]]) -> list[str
             continue
 
         rev = text[::-1]
-        arr = re.split(r"([。？！!?;；]| \.)", rev)
+        arr = _SENTENCE_END_REV_RE.split(rev)
         if len(arr) < 2 or len(arr[1]) < 32:
             continue
 
@@ -271,11 +302,16 @@ def make_colon_as_title(sections: list[str] | list[tuple[str, str]]) -> list[str
 
 
 def not_title(text: str) -> bool:
-    if re.match(r"第[零一二三四五六七八九十百0-9]+条", text):
+    if _LAW_ARTICLE_RE.match(text):
         return False
     if len(text.split()) > 12 or (" " not in text and len(text) >= 32):
         return True
-    return bool(re.search(r"[,;，。；！!]", text))
+    return bool(_NOT_TITLE_PUNCT_RE.search(text))
+
+
+def _is_meaningful_section(text: str) -> bool:
+    head = text.split("@")[0].strip() if text else ""
+    return len(head) > 1 and not _DIGITS_ONLY_RE.match(head)
 
 
 def tree_merge(bull: int, sections: list[str] | list[tuple[str, str]], depth: int) -> list[str]:
@@ -287,21 +323,17 @@ def tree_merge(bull: int, sections: list[str] | list[tuple[str, str]], depth: in
     else:
         typed_sections = sections  # type: ignore[assignment]
 
-    typed_sections = [
-        (t, o)
-        for t, o in typed_sections
-        if t and len(t.split("@")[0].strip()) > 1 and not re.match(r"[0-9]+$", t.split("@")[0].strip())
-    ]
+    typed_sections = [(t, o) for t, o in typed_sections if _is_meaningful_section(t)]
 
     def get_level(section: tuple[str, str]) -> tuple[int, str]:
         text, layout = section
-        text = re.sub(r"\u3000", " ", text).strip()
+        text = text.replace("\u3000", " ").strip()
 
-        for i, patt in enumerate(BULLET_PATTERN[bull]):
-            if re.match(patt, text) and is_probable_heading_line(text):
+        for i, patt in enumerate(BULLET_REGEXES[bull]):
+            if patt.match(text) and is_probable_heading_line(text):
                 return i + 1, text
 
-        if re.search(r"(title|head)", layout) and not not_title(text):
+        if _TITLE_LAYOUT_RE.search(layout) and not not_title(text):
             return len(BULLET_PATTERN[bull]) + 1, text
 
         return len(BULLET_PATTERN[bull]) + 2, text
@@ -339,22 +371,19 @@ def hierarchical_merge(bull: int, sections: list[str] | list[tuple[str, str]], d
     else:
         typed_sections = sections  # type: ignore[assignment]
 
-    typed_sections = [
-        (t, o)
-        for t, o in typed_sections
-        if t and len(t.split("@")[0].strip()) > 1 and not re.match(r"[0-9]+$", t.split("@")[0].strip())
-    ]
+    typed_sections = [(t, o) for t, o in typed_sections if _is_meaningful_section(t)]
 
     bullets_size = len(BULLET_PATTERN[bull])
     levels: list[list[int]] = [[] for _ in range(bullets_size + 2)]
 
     for i, (text, layout) in enumerate(typed_sections):
-        for j, patt in enumerate(BULLET_PATTERN[bull]):
-            if re.match(patt, text.strip()) and is_probable_heading_line(text):
+        stripped = text.strip()
+        for j, patt in enumerate(BULLET_REGEXES[bull]):
+            if patt.match(stripped) and is_probable_heading_line(text):
                 levels[j].append(i)
                 break
         else:
-            if re.search(r"(title|head)", layout) and not not_title(text):
+            if _TITLE_LAYOUT_RE.search(layout) and not not_title(text):
                 levels[bullets_size].append(i)
             else:
                 levels[bullets_size + 1].append(i)
@@ -413,7 +442,7 @@ def hierarchical_merge(bull: int, sections: list[str] | list[tuple[str, str]], d
     num = [0]
     for ck in cks:
         if len(ck) == 1:
-            n = count_tokens(re.sub(r"@@[0-9]+.*", "", ck[0]))
+            n = count_tokens(_POSITION_SUFFIX_RE.sub("", ck[0]))
             if n + num[-1] < 218:
                 res[-1].append(ck[0])
                 num[-1] += n
@@ -428,11 +457,11 @@ def hierarchical_merge(bull: int, sections: list[str] | list[tuple[str, str]], d
 
 
 def _remove_pdf_tags(text: str) -> str:
-    return re.sub(r"@@[0-9-]+\t[0-9.\t]+##", "", text or "")
+    return _PDF_TAG_RE.sub("", text or "")
 
 
 def _extract_custom_delimiters(delimiter: str) -> list[str]:
-    return [m.group(1) for m in re.finditer(r"`([^`]+)`", delimiter or "")]
+    return [m.group(1) for m in _CUSTOM_DELIMITER_RE.finditer(delimiter or "")]
 
 
 def naive_merge(
@@ -457,11 +486,12 @@ def naive_merge(
     custom_delimiters = _extract_custom_delimiters(delimiter)
     if custom_delimiters:
         pattern = "|".join(re.escape(t) for t in sorted(set(custom_delimiters), key=len, reverse=True))
+        split_re = re.compile(rf"({pattern})", flags=re.DOTALL)
+        delimiter_re = re.compile(pattern)
         chunks: list[str] = []
         for sec, pos in typed_sections:
-            split_sec = re.split(rf"({pattern})", sec, flags=re.DOTALL)
-            for sub in split_sec:
-                if re.fullmatch(pattern, sub or ""):
+            for sub in split_re.split(sec):
+                if delimiter_re.fullmatch(sub or ""):
                     continue
                 text = "\n" + sub
                 local_pos = pos if count_tokens(text) >= 8 else ""
@@ -475,8 +505,10 @@ def naive_merge(
         merged = "\n".join(sec for sec, _ in typed_sections if sec and sec.strip())
         return [merged] if merged.strip() else []
 
-    chunks = [""]
+    # 每个 chunk 以片段列表累积，token 数随片段累加，避免反复拼接和重新计数
+    chunk_parts: list[list[str]] = [[]]
     token_nums = [0]
+    threshold = chunk_token_num * (100 - overlap) / 100.0
 
     def add_chunk(text: str, pos: str) -> None:
         tnum = count_tokens(text)
@@ -484,20 +516,18 @@ def naive_merge(
         if tnum < 8:
             local_pos = ""
 
-        threshold = chunk_token_num * (100 - overlap) / 100.0
-        if chunks[-1] == "" or token_nums[-1] > threshold:
-            if chunks:
-                prev = _remove_pdf_tags(chunks[-1])
-                start = int(len(prev) * (100 - overlap) / 100.0)
-                text = prev[start:] + text
+        if not any(chunk_parts[-1]) or token_nums[-1] > threshold:
+            prev = _remove_pdf_tags("".join(chunk_parts[-1]))
+            start = int(len(prev) * (100 - overlap) / 100.0)
+            text = prev[start:] + text
             if local_pos and local_pos not in text:
                 text += local_pos
-            chunks.append(text)
+            chunk_parts.append([text])
             token_nums.append(tnum)
         else:
-            if local_pos and local_pos not in chunks[-1]:
+            if local_pos and local_pos not in "".join(chunk_parts[-1]):
                 text += local_pos
-            chunks[-1] += text
+            chunk_parts[-1].append(text)
             token_nums[-1] += tnum
 
     for sec, pos in typed_sections:
@@ -505,6 +535,7 @@ def naive_merge(
             continue
         add_chunk("\n" + sec, pos)
 
+    chunks = ["".join(parts) for parts in chunk_parts]
     return [chunk for chunk in chunks if chunk.strip()]
 
 
@@ -6,6 +6,11 @@ from typing import Any
 from yuxi.knowledge.chunking.ragflow_like import nlp
 
 _ARTICLE_PATTERN = re.compile(r"^(第[零一二三四五六七八九十百千万0-9]+条)[\s　:：]*(.*)$")
+_HEADING_PREFIX_PATTERN = re.compile(r"^#{1,6}\s+")
+_LIST_PREFIX_PATTERN = re.compile(r"^[-*+]\s+")
+_INLINE_SPACES_PATTERN = re.compile(r"[ \t]+")
+_MD_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*)$")
+_SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[。！？；;!?])")
 
 
 def _unescape_delimiter(delimiter: str) -> str:
@@ -19,10 +24,10 @@ def _iter_lines(markdown_content: str) -> list[str]:
 def _normalize_law_line(line: str) -> str:
     # 法规 markdown 常见的 #、-、** 装饰会干扰层级识别，这里先做轻量归一化。
     text = (line or "").strip()
-    text = re.sub(r"^#{1,6}\s+", "", text)
-    text = re.sub(r"^[-*+]\s+", "", text)
+    text = _HEADING_PREFIX_PATTERN.sub("", text)
+    text = _LIST_PREFIX_PATTERN.sub("", text)
     text = text.replace("**", "").replace("__", "").replace("`", "")
-    text = re.sub(r"[ \t]+", " ", text)
+    text = _INLINE_SPACES_PATTERN.sub(" ", text)
     return text.strip()
 
 
@@ -58,7 +63,7 @@ def _docx_heading_tree(markdown_content: str) -> list[str]:
         if not text:
             continue
 
-        heading_match = re.match(r"^(#{1,6})\s+(.*)$", text)
+        heading_match = _MD_HEADING_PATTERN.match(text)
         if heading_match:
             level = len(heading_match.group(1))
             value = heading_match.group(2).strip()
@@ -120,7 +125,7 @@ def _ensure_chunk_token_limit(
                 protected.append(cleaned)
             else:
                 sentence_refined = nlp.naive_merge(
-                    [(_sentence, "") for _sentence in re.split(r"(?<=[。！？；;!?])", cleaned) if _sentence.strip()],
+                    [(_sentence, "") for _sentence in _SENTENCE_SPLIT_PATTERN.split(cleaned) if _sentence.strip()],
                     chunk_token_num=max_tokens,
                     delimiter=delimiter,
                     overlapped_percent=overlapped_percent,
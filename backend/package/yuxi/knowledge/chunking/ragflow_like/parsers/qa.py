@@ -4,14 +4,18 @@ import csv
 import re
 from typing import Any
 
+_QA_PREFIX_PATTERN = re.compile(
+    r"^(问题|答案|回答|user|assistant|Q|A|Question|Answer|问|答)[\t:： ]+",
+    flags=re.IGNORECASE,
+)
+_TABLE_SEPARATOR_CELL_PATTERN = re.compile(r":?-{3,}:?")
+_MD_HEADING_MARK_PATTERN = re.compile(r"^#*")
+_QUESTION_PREFIX_PATTERN = re.compile(r"^(Q|Question|问|问题)\s*[:：]", flags=re.IGNORECASE)
+_ANSWER_PREFIX_PATTERN = re.compile(r"^(A|Answer|答|回答)\s*[:：]", flags=re.IGNORECASE)
+
 
 def _rm_prefix(text: str) -> str:
-    return re.sub(
-        r"^(问题|答案|回答|user|assistant|Q|A|Question|Answer|问|答)[\t:： ]+",
-        "",
-        (text or "").strip(),
-        flags=re.IGNORECASE,
-    )
+    return _QA_PREFIX_PATTERN.sub("", (text or "").strip())
 
 
 def _to_qa_chunk(question: str, answer: str, eng: bool = False) -> str:
@@ -92,7 +96,7 @@ def _parse_markdown_table_row(line: str) -> list[str] | None:
     if not cells:
         return None
 
-    if all(re.fullmatch(r":?-{3,}:?", c.replace(" ", "")) for c in cells if c):
+    if all(_TABLE_SEPARATOR_CELL_PATTERN.fullmatch(c.replace(" ", "")) for c in cells if c):
         return None
 
     return cells
@@ -115,7 +119,7 @@ def _extract_pairs_from_markdown_tables(markdown_content: str) -> list[tuple[str
 
 
 def _md_question_level(line: str) -> tuple[int, str]:
-    match = re.match(r"^#*", line)
+    match = _MD_HEADING_MARK_PATTERN.match(line)
     if not match:
         return 0, line
     return len(match.group(0)), line.lstrip("#").lstrip()
@@ -172,15 +176,15 @@ def _extract_pairs_by_prefix(lines: list[str]) -> list[tuple[str, str]]:
     answer_lines: list[str] = []
 
     for line in lines:
-        if re.match(r"^(Q|Question|问|问题)\s*[:：]", line, flags=re.IGNORECASE):
+        if _QUESTION_PREFIX_PATTERN.match(line):
             if question:
                 pairs.append((question, "\n".join(answer_lines)))
-            question = re.sub(r"^(Q|Question|问|问题)\s*[:：]", "", line, flags=re.IGNORECASE).strip()
+            question = _QUESTION_PREFIX_PATTERN.sub("", line).strip()
             answer_lines = []
             continue
 
-        if re.match(r"^(A|Answer|答|回答)\s*[:：]", line, flags=re.IGNORECASE):
-            answer_lines.append(re.sub(r"^(A|Answer|答|回答)\s*[:：]", "", line, flags=re.IGNORECASE).strip())
+        if _ANSWER_PREFIX_PATTERN.match(line):
+            answer_lines.append(_ANSWER_PREFIX_PATTERN.sub("", line).strip())
             continue
 
         if question:
@@ -14,6 +14,7 @@ from ..utils.md_parser_utils import (
     get_title_path,
     split_text_by_length_and_newline,
 )
+from ..utils.semantic_utils import CachedEmbedder, semantic_options_from_config
 from ..utils.table_utils import html_table_to_key_value
 
 
@@ -23,6 +24,7 @@ def _flush_content(
     title_stack: list,
     max_length: int,
     embed_fn: Any,
+    segment_options: dict[str, Any],
     special_element: str = None,
     allow_split: bool = False,
 ) -> None:
@@ -43,7 +45,7 @@ def _flush_content(
     else:
         if count_tokens(content) > max_length:
             chunks = split_text_by_length_and_newline(
-                content, max_length, embed_fn=embed_fn, token_count_fn=count_tokens
+                content, max_length, embed_fn=embed_fn, token_count_fn=count_tokens, **segment_options
             )
             for idx, chunk in enumerate(chunks, 1):
                 base_header = f"{'#' * level} {title_path}" if title_path else f"{'#' * level}"
@@ -67,7 +69,7 @@ def _flush_content(
     current_content.clear()
 
 
-def _handle_image_caption(tokens, i, result, current_content, title_stack, max_length, embed_fn):
+def _handle_image_caption(tokens, i, result, current_content, title_stack, max_length, embed_fn, segment_options):
     token = tokens[i]
     if token.type != "paragraph_open":
         return False, i
@@ -84,10 +86,18 @@ def _handle_image_caption(tokens, i, result, current_content, title_stack, max_l
     if img_match:
         rest = content[img_match.end() :].strip()
         if rest and re.match(caption_pattern, rest, re.IGNORECASE):
-            _flush_content(result, current_content, title_stack, max_length, embed_fn)
+            _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
             current_content.append(content)
             caption_title = rest.split("\n")[0].strip()
-            _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element=caption_title)
+            _flush_content(
+                result,
+                current_content,
+                title_stack,
+                max_length,
+                embed_fn,
+                segment_options,
+                special_element=caption_title,
+            )
             return True, i + 3
 
     if re.match(image_pattern, content):
@@ -97,11 +107,17 @@ def _handle_image_caption(tokens, i, result, current_content, title_stack, max_l
             if next_inline.type == "inline":
                 next_content = next_inline.content.strip()
                 if re.match(caption_pattern, next_content, re.IGNORECASE):
-                    _flush_content(result, current_content, title_stack, max_length, embed_fn)
+                    _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
                     current_content.append(content)
                     current_content.append(next_content)
                     _flush_content(
-                        result, current_content, title_stack, max_length, embed_fn, special_element=next_content
+                        result,
+                        current_content,
+                        title_stack,
+                        max_length,
+                        embed_fn,
+                        segment_options,
+                        special_element=next_content,
                     )
                     return True, i + 6
 
@@ -109,10 +125,12 @@ def _handle_image_caption(tokens, i, result, current_content, title_stack, max_l
         last_item = current_content[-1].strip()
         if re.match(image_pattern, last_item):
             image_tag = current_content.pop()
-            _flush_content(result, current_content, title_stack, max_length, embed_fn)
+            _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
             current_content.append(image_tag)
             current_content.append(content)
-            _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element=content)
+            _flush_content(
+                result, current_content, title_stack, max_length, embed_fn, segment_options, special_element=content
+            )
             return True, i + 3
 
     return False, i
@@ -132,7 +150,10 @@ def chunk_markdown(
     """
     parser_config = parser_config or {}
     max_length = int(parser_config.get("chunk_token_num", 512))
-    logger.info(f"语义切分开始: max_length={max_length}, content_length={len(markdown_content)}")
+    segment_options = semantic_options_from_config(parser_config)
+    logger.info(
+        f"语义切分开始: max_length={max_length}, content_length={len(markdown_content)}, options={segment_options}"
+    )
 
     # 延迟加载重型资源，仅在没有注入 embed_fn 时触发
     if embed_fn is None:
@@ -143,10 +164,13 @@ def chunk_markdown(
             embed_model_id = parser_config.get("embed_model_id") or config.embed_model
             logger.info(f"语义切分加载Embedding模型: {embed_model_id}")
             embed_model = select_embedding_model(embed_model_id)
-            embed_fn = embed_model.encode
+            embed_fn = CachedEmbedder(embed_model.encode, batch_size=getattr(embed_model, "batch_size", None))
         except Exception as e:
             logger.error(f"加载 Embedding 模型失败: {e}。将退化为简单切分。")
             embed_fn = None
+    elif not isinstance(embed_fn, CachedEmbedder):
+        # 同一文档内共享句向量缓存，重复句子只请求一次
+        embed_fn = CachedEmbedder(embed_fn)
 
     md = MarkdownIt("commonmark").enable("table")
     md.use(dollarmath_plugin, allow_space=True, allow_digits=True)
@@ -162,7 +186,7 @@ def chunk_markdown(
     while i < len(tokens):
         token = tokens[i]
         if token.type == "heading_open":
-            _flush_content(result, current_content, title_stack, max_length, embed_fn)
+            _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
             level = int(token.tag[1:]) if token.tag and len(token.tag) > 1 else 1
             inline_token = tokens[i + 1]
             if inline_token.type == "inline":
@@ -173,15 +197,17 @@ def chunk_markdown(
             i += 3
             continue
         elif token.type == "table_open":
-            _flush_content(result, current_content, title_stack, max_length, embed_fn)
+            _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
             j, table_content = extract_table_block(tokens, i, original_lines)
             current_content.append(table_content)
-            _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element="Table")
+            _flush_content(
+                result, current_content, title_stack, max_length, embed_fn, segment_options, special_element="Table"
+            )
             i = j + 1 if j < len(tokens) else len(tokens)
             continue
         elif token.type == "paragraph_open":
             handled, new_i = _handle_image_caption(
-                tokens, i, result, current_content, title_stack, max_length, embed_fn
+                tokens, i, result, current_content, title_stack, max_length, embed_fn, segment_options
             )
             if handled:
                 i = new_i
@@ -215,7 +241,15 @@ def chunk_markdown(
                 j += 1
             if list_content:
                 current_content.extend(list_content)
-                _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element=token.type)
+                _flush_content(
+                    result,
+                    current_content,
+                    title_stack,
+                    max_length,
+                    embed_fn,
+                    segment_options,
+                    special_element=token.type,
+                )
             i = j + 1
             continue
         elif token.type == "bullet_list_open":
@@ -236,11 +270,19 @@ def chunk_markdown(
                 j += 1
             if list_content:
                 current_content.extend(list_content)
-                _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element=token.type)
+                _flush_content(
+                    result,
+                    current_content,
+                    title_stack,
+                    max_length,
+                    embed_fn,
+                    segment_options,
+                    special_element=token.type,
+                )
             i = j + 1
             continue
         elif token.type == "html_block":
-            _flush_content(result, current_content, title_stack, max_length, embed_fn)
+            _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
             content = token.content.strip()
             is_converted_table = False
             if "<table" in content.lower():
@@ -260,11 +302,20 @@ def chunk_markdown(
                     title_stack,
                     max_length,
                     embed_fn,
+                    segment_options,
                     special_element="Table KV",
                     allow_split=True,
                 )
             else:
-                _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element=token.type)
+                _flush_content(
+                    result,
+                    current_content,
+                    title_stack,
+                    max_length,
+                    embed_fn,
+                    segment_options,
+                    special_element=token.type,
+                )
             i += 1
             continue
         elif token.type in ["list_item_close", "ordered_list_close", "bullet_list_close", "list_item_open"]:
@@ -273,13 +324,21 @@ def chunk_markdown(
         elif token.type == "math_block":
             # _flush_content(result, current_content, title_stack, max_length, embed_fn)
             current_content.append(f"$ {token.content} $")
-            _flush_content(result, current_content, title_stack, max_length, embed_fn, special_element="Math Block")
+            _flush_content(
+                result,
+                current_content,
+                title_stack,
+                max_length,
+                embed_fn,
+                segment_options,
+                special_element="Math Block",
+            )
             i += 1
             continue
         else:
             i += 1
 
-    _flush_content(result, current_content, title_stack, max_length, embed_fn)
+    _flush_content(result, current_content, title_stack, max_length, embed_fn, segment_options)
 
     chunks = []
     current_chunk_parts = []
@@ -6,35 +6,49 @@ from yuxi.knowledge.chunking.ragflow_like import nlp
 from yuxi.knowledge.chunking.ragflow_like.parsers.general import _iter_sections, _unescape_delimiter
 
 
+def _token_delta(ch: str, joins_word: bool) -> int:
+    """向窗口追加一个字符时 token 数的增量；joins_word 表示与相邻的英文/数字 token 连在一起"""
+    if nlp.is_cjk_char(ch):
+        return 1
+    if nlp.is_word_char(ch) and not joins_word:
+        return 1
+    return 0
+
+
 def _slice_text_by_tokens(text: str, max_tokens: int, overlap_tokens: int) -> list[str]:
+    """按 token 上限切分文本，并回退 overlap_tokens 个 token 作为重叠。
+
+    逐字符增量维护窗口的 token 数（与 nlp.count_tokens 的结果一致），整体为线性复杂度。
+    """
     if max_tokens <= 0:
         return [text] if text.strip() else []
 
-    units = [part for part in text]
+    length = len(text)
     chunks: list[str] = []
     start = 0
 
-    while start < len(units):
-        current = ""
-        current_tokens = 0
+    while start < length:
+        raw_tokens = 0
+        has_content = False
         end = start
 
-        while end < len(units):
-            next_text = current + units[end]
-            next_tokens = nlp.count_tokens(next_text)
-            if current and next_tokens > max_tokens:
+        while end < length:
+            ch = text[end]
+            next_raw = raw_tokens + _token_delta(ch, end > start and nlp.is_word_char(text[end - 1]))
+            next_content = has_content or not ch.isspace()
+            next_tokens = max(1, next_raw) if next_content else 0
+            if end > start and next_tokens > max_tokens:
                 break
-            current = next_text
-            current_tokens = next_tokens
+            raw_tokens, has_content = next_raw, next_content
             end += 1
-            if current_tokens >= max_tokens:
+            if next_tokens >= max_tokens:
                 break
 
-        chunk = current.strip()
+        chunk = text[start:end].strip()
         if chunk:
             chunks.append(chunk)
 
-        if end >= len(units):
+        if end >= length:
             break
 
         if overlap_tokens <= 0:
@@ -42,12 +56,15 @@ def _slice_text_by_tokens(text: str, max_tokens: int, overlap_tokens: int) -> li
             continue
 
         backtrack = end
-        overlap_text = ""
+        raw_tokens = 0
+        has_content = False
         while backtrack > start:
-            candidate = units[backtrack - 1] + overlap_text
-            if nlp.count_tokens(candidate) > overlap_tokens:
+            ch = text[backtrack - 1]
+            next_raw = raw_tokens + _token_delta(ch, backtrack < end and nlp.is_word_char(text[backtrack]))
+            next_content = has_content or not ch.isspace()
+            if (max(1, next_raw) if next_content else 0) > overlap_tokens:
                 break
-            overlap_text = candidate
+            raw_tokens, has_content = next_raw, next_content
             backtrack -= 1
 
         start = backtrack if backtrack < end else end
@@ -85,10 +85,16 @@ def extract_table_block(tokens: list[Any], i: int, original_lines: list[str]) ->
 
 
 def split_text_by_length_and_newline(
-    text: str, max_length: int, embed_fn: Callable[[list[str]], Any] | None, token_count_fn: Callable[[str], int]
+    text: str,
+    max_length: int,
+    embed_fn: Callable[[list[str]], Any] | None,
+    token_count_fn: Callable[[str], int],
+    **segment_options: Any,
 ) -> list[str]:
     """
     层次化文本切分策略。
+
+    超长单行交给语义分段处理，segment_options（断点策略、阈值、聚类窗口等）原样透传。
     """
     chunks = []
 
@@ -128,7 +134,11 @@ def split_text_by_length_and_newline(
                     current_chunk_tokens = 0
 
                 sub_chunks = semantic_chunking_with_auto_clusters(
-                    line, embed_fn=embed_fn, token_count_fn=token_count_fn, max_chunk_size=max_length
+                    line,
+                    embed_fn=embed_fn,
+                    token_count_fn=token_count_fn,
+                    max_chunk_size=max_length,
+                    **segment_options,
                 )
                 chunks.extend(sub_chunks)
             # 如果当前行的 Token 数量与当前分块的 Token 数量合并后超过最大 Token 数量，直接作为独立分块放入chunks
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
+import bisect
 import re
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
 from typing import Any
 
 import nltk
+import numpy as np
 from nltk.tokenize import sent_tokenize
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics import silhouette_score
+
+from yuxi.utils.logging_config import logger
+
+# 相邻句子相似度断点的切分策略：percentile 按语义距离的分位数，gradient 按距离变化率的分位数，
+# cluster 在有界窗口内做层次聚类（每个窗口的代价固定，整体仍随句子数线性增长）
+BREAKPOINT_METHODS = ("percentile", "gradient", "cluster")
+DEFAULT_BREAKPOINT_METHOD = "percentile"
+# 分位数阈值：语义距离高于该分位数的间隙视为断点
+DEFAULT_BREAKPOINT_THRESHOLD = 90.0
+# 计算相邻相似度时，间隙两侧各取多少个句子的平均向量
+DEFAULT_SIMILARITY_WINDOW = 1
+# cluster 策略下单个聚类窗口的句子数
+DEFAULT_CLUSTER_WINDOW = 64
+# 句向量请求的批大小与缓存条数
+DEFAULT_EMBED_BATCH_SIZE = 40
+DEFAULT_EMBED_CACHE_SIZE = 4096
 
 _punkt_checked = False
 
@@ -81,42 +98,248 @@ def split_mixed_sentences(text: str) -> list[str]:
     return sentences
 
 
-def find_best_num_clusters(embeddings: Any, min_clusters: int = 2, max_clusters: int = 10) -> int:
+class CachedEmbedder:
     """
-    使用轮廓系数选择最佳聚类数量。让每个分段语义集中，且分段之间界限分明
+    句向量的批量 + 缓存封装。
 
-    逻辑：
-    - 遍历可能的聚类数量（从 min_clusters 到 max_clusters）。
-    - 对每个聚类数量，使用 `AgglomerativeClustering` 进行聚类。
-    - 计算轮廓系数（Silhouette Score）。
-    - 选择轮廓系数最高的聚类数量作为最佳聚类数量。
-    - 如果聚类数量为 1 或更少，直接返回 1。
+    同一文本只向量化一次，未命中的文本去重后按 batch_size 分批调用 embed_fn；
+    返回 L2 归一化后的矩阵，便于直接用点积计算余弦相似度。
+    """
 
-    Args:
-        embeddings: 待聚类的向量数据（所有句子的嵌入向量列表）。
-        min_clusters: 搜索的最佳聚类数量下限，默认为 2。
-        max_clusters: 搜索的最佳聚类数量上限，默认为 10。
+    def __init__(
+        self,
+        embed_fn: Callable[[list[str]], Any],
+        batch_size: int = DEFAULT_EMBED_BATCH_SIZE,
+        max_entries: int = DEFAULT_EMBED_CACHE_SIZE,
+    ):
+        self.embed_fn = embed_fn
+        self.batch_size = max(1, int(batch_size or DEFAULT_EMBED_BATCH_SIZE))
+        self.max_entries = max(1, int(max_entries))
+        self._cache: OrderedDict[str, np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.calls = 0
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        missing = list(dict.fromkeys(t for t in texts if t not in self._cache))
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+
+        fresh: dict[str, np.ndarray] = {}
+        for i in range(0, len(missing), self.batch_size):
+            batch = missing[i : i + self.batch_size]
+            vectors = np.asarray(self.embed_fn(batch), dtype=np.float32)
+            self.calls += 1
+            if vectors.ndim != 2 or len(vectors) != len(batch):
+                raise ValueError(f"embed_fn 返回的向量数量与输入不一致: {vectors.shape} != {len(batch)}")
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+            fresh.update(zip(batch, vectors))
+
+        rows = []
+        for text in texts:
+            vector = fresh.get(text)
+            if vector is None:
+                vector = self._cache[text]
+                self._cache.move_to_end(text)
+            rows.append(vector)
+
+        for text, vector in fresh.items():
+            self._cache[text] = vector
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        if not rows:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(rows)
+
+
+def adjacent_similarities(vectors: np.ndarray, window: int = DEFAULT_SIMILARITY_WINDOW) -> np.ndarray:
+    """
+    计算相邻句子间隙的语义相似度，长度为 n-1，第 i 项对应句子 i 与 i+1 之间的间隙。
 
-    Returns:
-        int: 轮廓系数表现最好的聚类数量。
+    window > 1 时比较间隙左右各 window 个句子的平均向量，可平滑单句噪声；
+    借助前缀和，整体为 O(n·d)。
     """
-    if len(embeddings) <= min_clusters:
-        return len(embeddings)
+    n = len(vectors)
+    if n < 2:
+        return np.empty(0, dtype=np.float32)
+
+    window = max(1, int(window))
+    prefix = np.vstack([np.zeros((1, vectors.shape[1]), dtype=np.float64), np.cumsum(vectors, axis=0)])
+    gaps = np.arange(1, n)
+    left = prefix[gaps] - prefix[np.maximum(gaps - window, 0)]
+    right = prefix[np.minimum(gaps + window, n)] - prefix[gaps]
+    denom = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+    return (np.einsum("ij,ij->i", left, right) / np.maximum(denom, 1e-12)).astype(np.float32)
+
+
+def find_breakpoints(
+    similarities: np.ndarray,
+    method: str = DEFAULT_BREAKPOINT_METHOD,
+    threshold: float = DEFAULT_BREAKPOINT_THRESHOLD,
+) -> list[int]:
+    """
+    根据相邻相似度确定断点（间隙下标）。
+
+    - percentile: 语义距离 (1 - 相似度) 高于 threshold 分位数的间隙
+    - gradient: 语义距离的跃升量高于 threshold 分位数的间隙，适合整体相似度偏高、差异集中在突变处的文本
+    """
+    if method not in ("percentile", "gradient"):
+        raise ValueError(f"不支持的断点策略: {method}")
+    if len(similarities) == 0:
+        return []
+
+    scores = 1.0 - np.asarray(similarities, dtype=np.float64)
+    if method == "gradient":
+        # 前向差分：距离相对前一个间隙的跃升量，断点落在跃升发生的间隙上
+        scores = np.diff(scores, prepend=scores[0])
+    cutoff = np.percentile(scores, min(max(float(threshold), 0.0), 100.0))
+    return np.flatnonzero(scores > cutoff).tolist()
+
+
+def window_cluster_breakpoints(
+    vectors: np.ndarray,
+    token_counts: Sequence[int],
+    max_chunk_size: int,
+    window: int = DEFAULT_CLUSTER_WINDOW,
+) -> list[int]:
+    """
+    有界窗口聚类：每 window 个句子独立做层次聚类，聚类数按窗口 token 总量估算，
+    标签变化处即为断点。单个窗口代价固定，避免对整篇文档做 O(n²) 聚类。
+    """
+    from sklearn.cluster import AgglomerativeClustering
+
+    window = max(2, int(window))
+    breakpoints: list[int] = []
+    for start in range(0, len(vectors), window):
+        end = min(start + window, len(vectors))
+        n_clusters = min(-(-sum(token_counts[start:end]) // max(1, max_chunk_size)), end - start)
+        if n_clusters <= 1:
+            continue
+        labels = AgglomerativeClustering(n_clusters=n_clusters, metric="cosine", linkage="average").fit_predict(
+            vectors[start:end]
+        )
+        breakpoints.extend(start + i for i in range(end - start - 1) if labels[i] != labels[i + 1])
+    return breakpoints
+
+
+def _merge_sentences(
+    sentences: Sequence[str],
+    token_counts: Sequence[int],
+    similarities: np.ndarray | None,
+    breakpoints: Sequence[int],
+    max_chunk_size: int,
+) -> list[str]:
+    """
+    按原文顺序合并句子：遇到断点切分；超出长度上限时，在当前块后半段相似度最低的间隙处切分，
+    其余句子顺延到下一块。
+    """
+    prefix = [0]
+    for cnt in token_counts:
+        prefix.append(prefix[-1] + cnt)
+
+    breaks = set(breakpoints)
+    chunks: list[str] = []
+    start = 0
+
+    def emit(end: int) -> None:
+        chunk = "".join(sentences[start:end]).strip()
+        if chunk:
+            chunks.append(chunk)
+
+    for i in range(len(sentences)):
+        while i > start and prefix[i + 1] - prefix[start] > max_chunk_size:
+            cut = i
+            if similarities is not None and i - start > 1:
+                # 候选切点限定在当前块的后半段，避免切出过小的块；切点 c 对应间隙 c-1
+                half = bisect.bisect_left(prefix, prefix[start] + (prefix[i] - prefix[start]) / 2, start + 1, i)
+                lo = min(max(half, start + 1), i)
+                cut = lo + int(np.argmin(similarities[lo - 1 : i]))
+            emit(cut)
+            start = cut
+        if i in breaks:
+            emit(i + 1)
+            start = i + 1
+
+    emit(len(sentences))
+    return chunks
 
-    best_score = -1
-    best_k = min_clusters
 
-    limit_k = min(max_clusters, len(embeddings))
-    for k in range(min_clusters, limit_k + 1):
-        labels = AgglomerativeClustering(n_clusters=k, metric="cosine", linkage="average").fit_predict(embeddings)
-        if len(set(labels)) <= 1:
+def semantic_options_from_config(parser_config: dict[str, Any] | None) -> dict[str, Any]:
+    """
+    从切分配置 (parser_config) 中读取语义分段参数，只返回显式配置且合法的项，
+    未配置的参数使用 semantic_segment_sentences 的默认值。
+
+    支持的键: breakpoint_method、breakpoint_threshold、similarity_window、cluster_window。
+    """
+    parser_config = parser_config or {}
+    options: dict[str, Any] = {}
+
+    method = parser_config.get("breakpoint_method")
+    if method is not None:
+        method = str(method).strip().lower()
+        if method in BREAKPOINT_METHODS:
+            options["breakpoint_method"] = method
+        else:
+            logger.warning(f"忽略不支持的断点策略 {method!r}，使用 {DEFAULT_BREAKPOINT_METHOD}")
+
+    for key, cast in (
+        ("breakpoint_threshold", float),
+        ("similarity_window", int),
+        ("cluster_window", int),
+    ):
+        value = parser_config.get(key)
+        if value is None:
             continue
-        score = silhouette_score(embeddings, labels, metric="cosine")
-        if score > best_score:
-            best_score = score
-            best_k = k
+        try:
+            options[key] = cast(value)
+        except (TypeError, ValueError):
+            logger.warning(f"忽略无效的语义分段参数 {key}={value!r}")
+    return options
+
 
-    return best_k
+def semantic_segment_sentences(
+    sentences: Sequence[str],
+    embed_fn: Callable[[list[str]], Any],
+    token_count_fn: Callable[[str], int],
+    max_chunk_size: int = 512,
+    breakpoint_method: str = DEFAULT_BREAKPOINT_METHOD,
+    breakpoint_threshold: float = DEFAULT_BREAKPOINT_THRESHOLD,
+    similarity_window: int = DEFAULT_SIMILARITY_WINDOW,
+    cluster_window: int = DEFAULT_CLUSTER_WINDOW,
+) -> list[str]:
+    """
+    基于相邻句子相似度断点的语义分段，向量化、相似度计算与合并均随句子数线性增长。
+
+    Args:
+        sentences: 已分好的句子列表。
+        embed_fn: 句子向量化函数，会被包装为 CachedEmbedder 以批量请求并复用结果。
+        token_count_fn: token 计数函数。
+        max_chunk_size: 单块 token 上限。
+        breakpoint_method: 断点策略，见 BREAKPOINT_METHODS。
+        breakpoint_threshold: percentile / gradient 策略的分位数阈值 (0-100)。
+        similarity_window: 计算相邻相似度时间隙两侧的句子数。
+        cluster_window: cluster 策略下单个聚类窗口的句子数。
+    """
+    if breakpoint_method not in BREAKPOINT_METHODS:
+        raise ValueError(f"不支持的断点策略: {breakpoint_method}")
+
+    token_counts = [token_count_fn(s) for s in sentences]
+    if len(sentences) < 2:
+        return _merge_sentences(sentences, token_counts, None, [], max_chunk_size)
+
+    embedder = embed_fn if isinstance(embed_fn, CachedEmbedder) else CachedEmbedder(embed_fn)
+    vectors = embedder(list(sentences))
+    similarities = adjacent_similarities(vectors, similarity_window)
+
+    if breakpoint_method == "cluster":
+        breakpoints = window_cluster_breakpoints(vectors, token_counts, max_chunk_size, cluster_window)
+    else:
+        breakpoints = find_breakpoints(similarities, breakpoint_method, breakpoint_threshold)
+
+    return _merge_sentences(sentences, token_counts, similarities, breakpoints, max_chunk_size)
 
 
 def semantic_chunking_with_auto_clusters(
@@ -124,16 +347,16 @@ def semantic_chunking_with_auto_clusters(
     embed_fn: Callable[[list[str]], Any] | None,
     token_count_fn: Callable[[str], int],
     max_chunk_size: int = 512,
+    **segment_options: Any,
 ) -> list[str]:
     """
-    对传入的文本进行语义切分，过程中会自动选择最佳的聚集数量。
+    对传入的文本进行语义切分。
 
     逻辑：
     - 先将文本中的句子按语言进行分发，英文/混合文本使用NLTK的sent_tokenize，中文文本使用split_sentences_chinese。
-    - 对每个句子进行嵌入向量化。
-    - 确定最佳的聚类数量（根据轮廓系数）。
-    - 对句子进行聚类后，按原文顺序遍历：当聚类标签变化或达到长度上限时切分，形成连续分块。
-    - 如果嵌入模型缺失，则退化为原始切分方式
+    - 整体未超长或缺少嵌入模型时，按长度上限顺序合并句子。
+    - 否则批量向量化句子，计算相邻句子的语义相似度，在相似度骤降处（断点）切分，
+      并保证每块不超过长度上限，详见 semantic_segment_sentences。
     """
     sentences = split_mixed_sentences(text)
     if len(sentences) < 2:
@@ -160,34 +383,6 @@ def semantic_chunking_with_auto_clusters(
             chunks.append(current_chunk.strip())
         return chunks
 
-    # 向量化每个句子, 得到他们的嵌入向量
-    embeddings = embed_fn(sentences)
-
-    # 决定合适的聚集数量：超长时按上限向上取整，避免整除时多切一块
-    best_k = (total_tokens + max_chunk_size - 1) // max_chunk_size
-    best_k = min(best_k, len(sentences))
-
-    # 根据指定的聚集数量、相似度判断方式、联动方式，对句子进行聚类
-    # labels 是每个句子的聚类标签列表（如 [0,0,1,2,2]），后续会按原文顺序在标签变化处切分连续分块
-    labels = AgglomerativeClustering(n_clusters=best_k, metric="cosine", linkage="average").fit_predict(embeddings)
-
-    chunks = []
-    current_chunk = ""
-    current_chunk_tokens = 0
-    current_label = labels[0]
-
-    for sentence, label, token_count in zip(sentences, labels, sentence_token_counts):
-        if label != current_label or current_chunk_tokens + token_count > max_chunk_size:
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
-            current_chunk = sentence
-            current_chunk_tokens = token_count
-            current_label = label
-        else:
-            current_chunk += sentence
-            current_chunk_tokens += token_count
-
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
-
-    return chunks
+    return semantic_segment_sentences(
+        sentences, embed_fn, token_count_fn, max_chunk_size=max_chunk_size, **segment_options
+    )
@@ -0,0 +1,153 @@
+"""
+评估并发执行器
+
+基准问题以有界并发评估，完成顺序任意，但结果按题号顺序提交：
+只有连续完成的前缀会进入提交批次，因此已提交的题数即可作为断点，进度单调且准确。
+各模型调用可按每分钟请求数限流。
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "8"))
+EVAL_DETAIL_BATCH_SIZE = int(os.getenv("EVAL_DETAIL_BATCH_SIZE", "20"))
+EVAL_MODEL_RPM = float(os.getenv("EVAL_MODEL_RPM", "0"))
+
+# 答案评判写入 detail.metrics 的字段，其余字段为检索指标
+ANSWER_METRIC_KEYS = ("score", "reasoning")
+
+
+class AsyncRateLimiter:
+    """按固定间隔放行请求的限流器，rpm 为每分钟请求数"""
+
+    def __init__(self, rpm: float, clock: Callable[[], float] = time.monotonic):
+        self.interval = 60.0 / rpm
+        self._clock = clock
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _RateLimitedModel:
+    """在 call 前获取限流令牌的模型代理，其余属性透传"""
+
+    def __init__(self, model: Any, limiter: AsyncRateLimiter):
+        self._model = model
+        self._limiter = limiter
+
+    async def call(self, *args, **kwargs):
+        await self._limiter.acquire()
+        return await self._model.call(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._model, name)
+
+
+class ModelRateLimits:
+    """按模型 spec 共享的限流器集合
+
+    limits 为 {model_spec: rpm}，未列出的模型使用 default_rpm，rpm <= 0 表示不限流。
+    """
+
+    def __init__(self, limits: dict[str, float] | None = None, default_rpm: float | None = None):
+        self.limits = dict(limits or {})
+        self.default_rpm = EVAL_MODEL_RPM if default_rpm is None else default_rpm
+        self._limiters: dict[str, AsyncRateLimiter] = {}
+
+    def limiter(self, model_spec: str) -> AsyncRateLimiter | None:
+        rpm = float(self.limits.get(model_spec, self.default_rpm) or 0)
+        if rpm <= 0:
+            return None
+        if model_spec not in self._limiters:
+            self._limiters[model_spec] = AsyncRateLimiter(rpm)
+        return self._limiters[model_spec]
+
+    def wrap(self, model: Any, model_spec: str) -> Any:
+        limiter = self.limiter(model_spec)
+        return _RateLimitedModel(model, limiter) if limiter and model is not None else model
+
+    def wrap_select(self, select_model_fn: Callable[..., Any]) -> Callable[..., Any]:
+        def select(*args, model_spec: str | None = None, **kwargs):
+            model = select_model_fn(*args, model_spec=model_spec, **kwargs)
+            return self.wrap(model, model_spec) if model_spec else model
+
+        return select
+
+
+def split_detail_metrics(metrics: dict[str, Any] | None) -> tuple[dict[str, Any], dict[str, Any]]:
+    """把已提交 detail 中合并存储的指标拆回 (检索指标, 答案指标)，用于断点续跑时恢复聚合结果"""
+    metrics = metrics or {}
+    retrieval = {key: value for key, value in metrics.items() if key not in ANSWER_METRIC_KEYS}
+    answer = {key: metrics[key] for key in ANSWER_METRIC_KEYS if key in metrics}
+    return retrieval, answer
+
+
+async def run_ordered_evaluation(
+    items: Iterable[tuple[int, Any]],
+    evaluate: Callable[[int, Any], Awaitable[Any]],
+    commit: Callable[[list[tuple[int, Any, Any]]], Awaitable[None]],
+    *,
+    concurrency: int | None = None,
+    batch_size: int | None = None,
+    before_each: Callable[[], Awaitable[None]] | None = None,
+) -> int:
+    """并发评估 items 中的 (query_index, question)，按输入顺序分批调用 commit
+
+    commit 收到 [(query_index, question, result), ...]，批次之间严格串行且保持顺序。
+    任一题评估失败时取消其余题目，并提交失败前已连续完成的前缀后再抛出异常。
+    返回提交的题目数量。
+    """
+    concurrency = max(1, concurrency or EVAL_CONCURRENCY)
+    batch_size = max(1, batch_size or EVAL_DETAIL_BATCH_SIZE)
+    queue = enumerate(items)
+    finished: dict[int, tuple[int, Any, Any]] = {}
+    batch: list[tuple[int, Any, Any]] = []
+    next_position = 0
+    committed = 0
+    commit_lock = asyncio.Lock()
+
+    async def flush(limit: int | None = None) -> None:
+        nonlocal batch, committed
+        while batch and (limit is None or len(batch) >= limit):
+            size = limit or len(batch)
+            pending, batch = batch[:size], batch[size:]
+            await commit(pending)
+            committed += len(pending)
+
+    async def worker() -> None:
+        nonlocal next_position
+        for position, (query_index, question) in queue:
+            if before_each is not None:
+                await before_each()
+            result = await evaluate(query_index, question)
+            async with commit_lock:
+                finished[position] = (query_index, question, result)
+                while next_position in finished:
+                    batch.append(finished.pop(next_position))
+                    next_position += 1
+                await flush(batch_size)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        async with commit_lock:
+            await flush()
+        raise
+
+    async with commit_lock:
+        await flush()
+    return committed
@@ -40,6 +40,15 @@ class RetrievalMetrics:
             return 0.0
         return 2 * precision * recall / (precision + recall)
 
+    @staticmethod
+    def reciprocal_rank(retrieved_ids: list[str], relevant_ids: list[str]) -> float:
+        """计算首个相关结果的倒数排名（多个查询取平均即为 MRR）"""
+        relevant_set = set(relevant_ids)
+        for rank, retrieved_id in enumerate(retrieved_ids, start=1):
+            if retrieved_id in relevant_set:
+                return 1.0 / rank
+        return 0.0
+
 
 class AnswerMetrics:
     """答案评估指标计算"""
@@ -1,10 +1,12 @@
 import os
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any
 
 from neo4j import GraphDatabase as GD
 
+from yuxi.knowledge.graphs.neo4j_client import get_async_neo4j_client
 from yuxi.utils import logger
 
 
@@ -146,6 +148,22 @@ class GraphAdapter(ABC):
         }
 
 
+_LABEL_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def label_clause(label: str | None) -> str:
+    """生成 ``:`label``` 形式的标签子句
+
+    Cypher 的标签无法作为参数传入，这里只接受字母、数字和下划线组成的标签并加反引号转义，
+    其余取值仍全部通过参数传递。
+    """
+    if not label:
+        return ""
+    if not _LABEL_PATTERN.match(label):
+        raise ValueError(f"Invalid graph label: {label}")
+    return f":`{label}`"
+
+
 class Neo4jConnectionManager:
     """
     Neo4j 连接管理器
@@ -155,6 +173,8 @@ class Neo4jConnectionManager:
     def __init__(self):
         self.driver = None
         self.status = "closed"
+        # 查询统一走共享的异步客户端，同步驱动只用于启动时的连通性检查与状态维护
+        self.client = get_async_neo4j_client()
         if os.environ.get("LITE_MODE", "").lower() in ("true", "1"):
             logger.info("LITE_MODE enabled, skipping Neo4j connection")
             return
@@ -205,21 +225,12 @@ class Neo4jConnectionManager:
 
 class BaseNeo4jAdapter:
     """
-    Neo4j 公共操作类，提供基础的数据库连接和查询方法
-    专注于图谱本身的管理，与 upload 解耦
+    Neo4j 公共操作类，提供基础的查询方法
+    专注于图谱本身的管理，与 upload 解耦；查询经由进程内共享的异步客户端执行
     """
 
     def __init__(self):
-        self.connection = Neo4jConnectionManager()
-
-    @property
-    def driver(self):
-        """获取数据库驱动（向后兼容）"""
-        return self.connection.driver
-
-    def _is_connected(self) -> bool:
-        """检查连接是否有效"""
-        return self.connection._is_connected()
+        self.client = get_async_neo4j_client()
 
     def _process_record_props(self, record: dict) -> dict:
         """
@@ -239,23 +250,20 @@ class BaseNeo4jAdapter:
         # 合并属性（优先保留原字典中的 id, name, type 等核心字段）
         return {**props, **data}
 
-    def _get_sample_nodes_with_connections(self, num: int = 50, label_filter: str = None) -> dict[str, list]:
+    async def _get_sample_nodes_with_connections(self, num: int = 50, label_filter: str = None) -> dict[str, list]:
         """
         获取连通的节点子图，优先返回连通的节点
         Args:
             num: 返回的节点数量
             label_filter: 节点标签过滤器 (例如: "kb_123")
         """
-        if not self._is_connected():
-            raise Exception("Neo4j connection is not available")
-
-        label_clause = f":{label_filter}" if label_filter else ""
+        label = label_clause(label_filter)
 
-        def query(tx, num):
+        async def query(tx, num):
             # 连通子图查询
             query_str = f"""
                 // 获取高度数节点作为种子节点
-                MATCH (seed{label_clause})
+                MATCH (seed{label})
                 WITH seed, COUNT{{(seed)-[]->()}} + COUNT{{(seed)<-[]-()}} as degree
                 WHERE degree > 0
                 ORDER BY degree DESC
@@ -263,14 +271,14 @@ class BaseNeo4jAdapter:
 
                 // 为每个种子节点收集更多邻居节点
                 UNWIND seed as s
-                MATCH (s)-[*1..1]-(neighbor{label_clause})
+                MATCH (s)-[*1..1]-(neighbor{label})
                 WITH s, neighbor, COUNT{{(s)-[]->()}} + COUNT{{(s)<-[]-()}} as s_degree
                 WITH s, s_degree, collect(DISTINCT neighbor) as neighbors
                 WITH s, s_degree, neighbors[0..toInteger($num * 0.15)] as limited_neighbors
 
                 // 从邻居节点扩展到二跳节点
                 UNWIND limited_neighbors as neighbor
-                OPTIONAL MATCH (neighbor)-[*1..1]-(second_hop{label_clause})
+                OPTIONAL MATCH (neighbor)-[*1..1]-(second_hop{label})
                 WHERE second_hop <> s
                 WITH s, limited_neighbors, neighbor, collect(DISTINCT second_hop)[0..5] as second_hops
 
@@ -303,117 +311,116 @@ class BaseNeo4jAdapter:
                     ELSE null END AS t
             """
 
-            try:
-                results = tx.run(query_str, num=int(num))
-                formatted_results = {"nodes": [], "edges": []}
-                node_ids = set()
-
-                for item in results:
-                    h_node = self._process_record_props(item["h"])
-                    if h_node and h_node["id"] not in node_ids:
-                        formatted_results["nodes"].append(h_node)
-                        node_ids.add(h_node["id"])
-
-                    if item["r"] is not None and item["t"] is not None:
-                        t_node = self._process_record_props(item["t"])
-                        r_edge = self._process_record_props(item["r"])
-
-                        if t_node and t_node["id"] not in node_ids:
-                            formatted_results["nodes"].append(t_node)
-                            node_ids.add(t_node["id"])
-
-                        if r_edge:
-                            formatted_results["edges"].append(r_edge)
-
-                # 如果节点数不足，补充更多节点
-                if len(formatted_results["nodes"]) < num:
-                    remaining_count = num - len(formatted_results["nodes"])
-                    supplement_query = f"""
-                    MATCH (n{label_clause})
-                    WHERE NOT elementId(n) IN $existing_ids
-                    RETURN {{id: elementId(n), name: n.name, properties: properties(n)}} AS node
-                    LIMIT $count
-                    """
-                    supplement_results = tx.run(supplement_query, existing_ids=list(node_ids), count=remaining_count)
-                    for item in supplement_results:
-                        node = self._process_record_props(item["node"])
-                        if node:
-                            formatted_results["nodes"].append(node)
-
-                return formatted_results
-
-            except Exception as e:
-                logger.warning(f"Connected subgraph query failed, using fallback: {e}")
-                # 简单的备选查询
-                fallback_query = f"""
-                MATCH (n{label_clause})-[r]-(m{label_clause})
-                WHERE elementId(n) < elementId(m)
-                RETURN
-                    {{id: elementId(n), name: n.name, properties: properties(n)}} AS h,
-                    {{
-                        id: elementId(r),
-                        type: r.type,
-                        source_id: elementId(startNode(r)),
-                        target_id: elementId(endNode(r)),
-                        properties: properties(r)
-                    }} AS r,
-                    {{id: elementId(m), name: m.name, properties: properties(m)}} AS t
-                LIMIT $num
-                """
-                results = tx.run(fallback_query, num=int(num))
-                formatted_results = {"nodes": [], "edges": []}
-                node_ids = set()
+            results = await tx.run(query_str, num=int(num))
+            formatted_results = {"nodes": [], "edges": []}
+            node_ids = set()
+
+            async for item in results:
+                h_node = self._process_record_props(item["h"])
+                if h_node and h_node["id"] not in node_ids:
+                    formatted_results["nodes"].append(h_node)
+                    node_ids.add(h_node["id"])
 
-                for item in results:
-                    h_node = self._process_record_props(item["h"])
+                if item["r"] is not None and item["t"] is not None:
                     t_node = self._process_record_props(item["t"])
                     r_edge = self._process_record_props(item["r"])
 
-                    if h_node and h_node["id"] not in node_ids:
-                        formatted_results["nodes"].append(h_node)
-                        node_ids.add(h_node["id"])
                     if t_node and t_node["id"] not in node_ids:
                         formatted_results["nodes"].append(t_node)
                         node_ids.add(t_node["id"])
+
                     if r_edge:
                         formatted_results["edges"].append(r_edge)
 
-                return formatted_results
+            # 如果节点数不足，补充更多节点
+            if len(formatted_results["nodes"]) < num:
+                remaining_count = num - len(formatted_results["nodes"])
+                supplement_query = f"""
+                MATCH (n{label})
+                WHERE NOT elementId(n) IN $existing_ids
+                RETURN {{id: elementId(n), name: n.name, properties: properties(n)}} AS node
+                LIMIT $count
+                """
+                supplement_results = await tx.run(supplement_query, existing_ids=list(node_ids), count=remaining_count)
+                async for item in supplement_results:
+                    node = self._process_record_props(item["node"])
+                    if node:
+                        formatted_results["nodes"].append(node)
+
+            return formatted_results
+
+        async def fallback(tx, num):
+            # 简单的备选查询
+            fallback_query = f"""
+            MATCH (n{label})-[r]-(m{label})
+            WHERE elementId(n) < elementId(m)
+            RETURN
+                {{id: elementId(n), name: n.name, properties: properties(n)}} AS h,
+                {{
+                    id: elementId(r),
+                    type: r.type,
+                    source_id: elementId(startNode(r)),
+                    target_id: elementId(endNode(r)),
+                    properties: properties(r)
+                }} AS r,
+                {{id: elementId(m), name: m.name, properties: properties(m)}} AS t
+            LIMIT $num
+            """
+            results = await tx.run(fallback_query, num=int(num))
+            formatted_results = {"nodes": [], "edges": []}
+            node_ids = set()
+
+            async for item in results:
+                h_node = self._process_record_props(item["h"])
+                t_node = self._process_record_props(item["t"])
+                r_edge = self._process_record_props(item["r"])
+
+                if h_node and h_node["id"] not in node_ids:
+                    formatted_results["nodes"].append(h_node)
+                    node_ids.add(h_node["id"])
+                if t_node and t_node["id"] not in node_ids:
+                    formatted_results["nodes"].append(t_node)
+                    node_ids.add(t_node["id"])
+                if r_edge:
+                    formatted_results["edges"].append(r_edge)
+
+            return formatted_results
 
-        with self.driver.session() as session:
-            return session.execute_read(query, num)
+        try:
+            return await self.client.execute_read("graph.sample_subgraph", query, num)
+        except Exception as e:
+            # 失败的事务不能继续执行语句，备选查询在新事务中执行
+            logger.warning(f"Connected subgraph query failed, using fallback: {e}")
+            return await self.client.execute_read("graph.sample_subgraph_fallback", fallback, num)
 
-    def _get_graph_stats(self, label_filter: str = None) -> dict[str, Any]:
+    async def _get_graph_stats(self, label_filter: str = None) -> dict[str, Any]:
         """
         获取图统计信息
         Args:
             label_filter: 节点标签过滤器 (例如: "kb_123")
         """
-        if not self._is_connected():
-            return {"total_nodes": 0, "total_edges": 0, "entity_types": []}
+        label = label_clause(label_filter)
 
-        label_clause = f":{label_filter}" if label_filter else ""
-
-        def query(tx):
+        async def query(tx):
             # 统计节点
-            node_query = f"MATCH (n{label_clause}) RETURN count(n) as node_count"
-            node_count = tx.run(node_query).single()["node_count"]
+            node_result = await tx.run(f"MATCH (n{label}) RETURN count(n) as node_count")
+            node_count = (await node_result.single())["node_count"]
 
             # 统计边
-            edge_query = f"MATCH (n{label_clause})-[r]-(m{label_clause}) RETURN count(r) as edge_count"
-            edge_count = tx.run(edge_query).single()["edge_count"]
+            edge_result = await tx.run(f"MATCH (n{label})-[r]-(m{label}) RETURN count(r) as edge_count")
+            edge_count = (await edge_result.single())["edge_count"]
 
             # 统计标签分布 (排除系统标签)
             label_dist_query = f"""
-            MATCH (n{label_clause})
+            MATCH (n{label})
             UNWIND labels(n) as label
-            WHERE label <> 'Entity' AND NOT label STARTS WITH 'kb_'
             WITH label, count(*) as count
+            WHERE label <> 'Entity' AND NOT label STARTS WITH 'kb_'
             RETURN label, count
             ORDER BY count DESC
             """
-            label_stats = tx.run(label_dist_query)
-            entity_types = [{"type": record["label"], "count": record["count"]} for record in label_stats]
+            label_stats = await tx.run(label_dist_query)
+            entity_types = [{"type": record["label"], "count": record["count"]} async for record in label_stats]
 
             return {
                 "total_nodes": node_count,
@@ -422,37 +429,26 @@ class BaseNeo4jAdapter:
             }
 
         try:
-            with self.driver.session() as session:
-                return session.execute_read(query)
+            return await self.client.execute_read("graph.stats", query)
         except Exception as e:
             logger.error(f"Failed to get graph stats: {e}")
             return {"total_nodes": 0, "total_edges": 0, "entity_types": []}
 
-    def _get_all_labels(self, exclude_system_labels: bool = True) -> list[str]:
+    async def _get_all_labels(self, exclude_system_labels: bool = True) -> list[str]:
         """
         获取所有标签
         Args:
             exclude_system_labels: 是否排除系统标签 (kb_ 开头)
         """
-        if not self._is_connected():
-            return []
-
-        def query(tx):
-            result = tx.run("CALL db.labels() YIELD label RETURN collect(label) AS labels")
-            labels = result.single()["labels"]
-
-            if exclude_system_labels:
-                labels = [label for label in labels if not label.startswith("kb_")]
-
-            return labels
-
         try:
-            with self.driver.session() as session:
-                return session.execute_read(query)
+            records = await self.client.read(
+                "graph.labels", "CALL db.labels() YIELD label RETURN collect(label) AS labels"
+            )
         except Exception as e:
             logger.error(f"Failed to get labels: {e}")
             return []
 
-    def close(self):
-        """关闭数据库连接"""
-        self.connection.close()
+        labels = records[0]["labels"] if records else []
+        if exclude_system_labels:
+            labels = [label for label in labels if not label.startswith("kb_")]
+        return labels
@@ -2,7 +2,7 @@ from typing import Any
 
 from yuxi.utils import logger
 
-from .base import BaseNeo4jAdapter, GraphAdapter, GraphMetadata
+from .base import BaseNeo4jAdapter, GraphAdapter, GraphMetadata, label_clause
 
 
 class LightRAGGraphAdapter(GraphAdapter):
@@ -40,20 +40,17 @@ class LightRAGGraphAdapter(GraphAdapter):
         query = self._build_cypher_query(keyword, kb_id, limit, max_depth)
 
         try:
-            with self._db.driver.session() as session:
-                result = session.run(query, keyword=keyword, kb_id=kb_id, limit=limit)
-                return self._process_query_result(result, limit=limit)
+            records = await self._db.client.read("lightrag_graph.query_nodes", query, keyword=keyword, limit=int(limit))
+            return self._process_query_result(records, limit=limit)
         except Exception as e:
             logger.error(f"Neo4j query failed: {e}")
             return {"nodes": [], "edges": []}
 
     async def get_labels(self) -> list[str]:
         """获取所有标签 (Get all labels)"""
-        query = "CALL db.labels()"
         try:
-            with self._db.driver.session() as session:
-                result = session.run(query)
-                return [record["label"] for record in result if not record["label"].startswith("kb_")]
+            records = await self._db.client.read("lightrag_graph.labels", "CALL db.labels()")
+            return [record["label"] for record in records if not record["label"].startswith("kb_")]
         except Exception as e:
             logger.error(f"Failed to get labels: {e}")
             return []
@@ -71,36 +68,37 @@ class LightRAGGraphAdapter(GraphAdapter):
             # 如果没有 kb_id，可能返回全局统计或空
             return {"total_nodes": 0, "total_edges": 0, "entity_types": []}
 
-        try:
-            # 统计节点和边
-            query = f"""
-            MATCH (n:`{kb_id}`)
-            WITH count(n) as node_count
-            OPTIONAL MATCH (n:`{kb_id}`)-[r]->(m:`{kb_id}`)
-            RETURN node_count, count(r) as edge_count
-            """
-
-            # 统计标签分布
-            label_query = f"""
-            MATCH (n:`{kb_id}`)
-            UNWIND labels(n) as label
-            WITH label, count(*) as count
-            WHERE label <> 'Entity' AND NOT label STARTS WITH 'kb_'
-            RETURN label, count
-            ORDER BY count DESC
-            """
+        label = label_clause(kb_id)
+        # 统计节点和边
+        query = f"""
+        MATCH (n{label})
+        WITH count(n) as node_count
+        OPTIONAL MATCH (n{label})-[r]->(m{label})
+        RETURN node_count, count(r) as edge_count
+        """
 
-            with self._db.driver.session() as session:
-                stats = session.run(query).single()
-                label_stats = session.run(label_query)
+        # 统计标签分布
+        label_query = f"""
+        MATCH (n{label})
+        UNWIND labels(n) as label
+        WITH label, count(*) as count
+        WHERE label <> 'Entity' AND NOT label STARTS WITH 'kb_'
+        RETURN label, count
+        ORDER BY count DESC
+        """
 
-                entity_types_list = [{"type": record["label"], "count": record["count"]} for record in label_stats]
+        async def read_stats(tx):
+            stats = await (await tx.run(query)).single()
+            label_stats = await tx.run(label_query)
+            entity_types_list = [{"type": record["label"], "count": record["count"]} async for record in label_stats]
+            return {
+                "total_nodes": stats["node_count"],
+                "total_edges": stats["edge_count"],
+                "entity_types": entity_types_list,
+            }
 
-                return {
-                    "total_nodes": stats["node_count"],
-                    "total_edges": stats["edge_count"],
-                    "entity_types": entity_types_list,
-                }
+        try:
+            return await self._db.client.execute_read("lightrag_graph.stats", read_stats)
         except Exception as e:
             logger.error(f"Failed to get stats: {e}")
             return {"total_nodes": 0, "total_edges": 0, "entity_types": []}
@@ -166,7 +164,7 @@ class LightRAGGraphAdapter(GraphAdapter):
         )
 
     def _build_cypher_query(self, keyword: str, kb_id: str = None, limit: int = 50, max_depth: int = 0) -> str:
-        """构建 Cypher 查询"""
+        """构建 Cypher 查询，keyword 与 limit 通过 $keyword / $limit 参数传入"""
         # 安全性检查：kb_id 只能包含字母、数字和下划线
         if kb_id:
             if not all(c.isalnum() or c == "_" for c in kb_id):
@@ -179,7 +177,7 @@ class LightRAGGraphAdapter(GraphAdapter):
         if kb_id:
             # 如果提供了 kb_id，直接匹配该标签
             # 这样即使节点没有 Entity 标签也能匹配到
-            match_clause = f"MATCH (n:`{kb_id}`)"
+            match_clause = f"MATCH (n{label_clause(kb_id)})"
         else:
             match_clause = "MATCH (n:Entity)"
 
@@ -193,54 +191,15 @@ class LightRAGGraphAdapter(GraphAdapter):
         if where_str:
             where_str = "WHERE " + where_str
 
-        # 如果 max_depth > 0，我们需要扩展查询
-        # 为了避免查询过于复杂，我们使用两步法：
-        # 1. 找到种子节点
-        # 2. 找到这些节点及其周围的关系
-
-        # 步骤 1: 找到种子节点
-        # 如果 keyword 是 * 且有 kb_id，我们使用采样逻辑进行随机采样
-        # 但这里 query_nodes 主要是为了搜索
-
         if max_depth > 0:
-            # 如果需要扩展，返回子图
-            query = f"""
-            {match_clause}
-            {where_str}
-            WITH n LIMIT {limit}
-
-            // 收集种子节点
-            WITH collect(n) as seeds
-
-            // 扩展 1 跳 (如果 max_depth >= 1)
-            UNWIND seeds as s
-            OPTIONAL MATCH (s)-[r1]-(m1)
-            // 确保 m1 也在同一个 KB 中 (如果指定了 kb_id)
-            {f"WHERE m1:`{kb_id}`" if kb_id else ""}
-
-            WITH seeds, collect(DISTINCT {{h: s, r: r1, t: m1}}) as hop1
-
-            // 扩展 2 跳 (如果 max_depth >= 2)
-            // 这里为了简化，只做 1 跳扩展，或者如果需要 2 跳，可以在这里添加
-            // 考虑到性能，通常只做 1 跳或者只找种子节点内部的关系
-
-            // 重新整理返回结果
-            UNWIND hop1 as triple
-            RETURN triple.h as h, triple.r as r, triple.t as t
-            LIMIT {limit * 10}
-            """
-
-            # 简化版扩展查询：只返回种子节点及其直接连接的边（如果另一端也在 seeds 中，或者不限制）
-            # 下面这个查询返回种子节点以及它们之间的关系，加上它们的一跳邻居
-
+            # 扩展查询：返回种子节点及其一跳邻居（邻居限定在同一个 KB 中）
             query = f"""
             {match_clause}
             {where_str}
-            WITH n LIMIT {limit}
+            WITH n LIMIT $limit
 
-            // 扩展查询：获取 n 和它的邻居
             OPTIONAL MATCH (n)-[r]-(m)
-            {f"WHERE m:`{kb_id}`" if kb_id else ""}
+            {f"WHERE m{label_clause(kb_id)}" if kb_id else ""}
 
             RETURN n, r, m
             """
@@ -250,26 +209,26 @@ class LightRAGGraphAdapter(GraphAdapter):
             {match_clause}
             {where_str}
             RETURN n
-            LIMIT {limit}
+            LIMIT $limit
             """
 
         return query
 
-    def _build_subgraph_query(self, limit: int, kb_id: str = None) -> str:
-        """构建子图查询"""
+    def _build_subgraph_query(self, kb_id: str = None) -> str:
+        """构建子图查询，节点数量通过 $limit 参数传入"""
         # 安全性检查
         if kb_id:
             if not all(c.isalnum() or c == "_" for c in kb_id):
                 kb_id = None
 
         if kb_id:
-            match_clause = f"MATCH (n:`{kb_id}`)"
+            match_clause = f"MATCH (n{label_clause(kb_id)})"
         else:
             match_clause = "MATCH (n:Entity)"
 
         query = f"""
         {match_clause}
-        WITH n LIMIT {limit}
+        WITH n LIMIT $limit
         WITH collect(n) as nodes
         UNWIND nodes as n
         UNWIND nodes as m
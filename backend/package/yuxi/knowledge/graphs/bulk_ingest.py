@@ -0,0 +1,223 @@
+"""
+Upload 图谱批量导入
+
+三元组按批组装成 ``UNWIND $rows`` 参数化语句写入，一批只需一次 Bolt 往返；
+JSONL 文件逐行流式读取，内存占用只与批大小相关；
+实体向量化与下一批写入以流水线方式重叠执行。
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from yuxi.utils import logger
+
+GRAPH_INGEST_BATCH_SIZE = int(os.getenv("GRAPH_INGEST_BATCH_SIZE", "1000"))
+GRAPH_INGEST_MAX_PENDING_EMBEDDINGS = int(os.getenv("GRAPH_INGEST_MAX_PENDING_EMBEDDINGS", "2"))
+
+VECTOR_INDEX_NAME = "entityEmbeddings"
+
+ENTITY_NAME_CONSTRAINT_CYPHER = """
+CREATE CONSTRAINT entity_name_unique IF NOT EXISTS
+FOR (n:Entity) REQUIRE n.name IS UNIQUE
+"""
+
+ENTITY_NAME_INDEX_CYPHER = """
+CREATE INDEX entity_name IF NOT EXISTS
+FOR (n:Entity) ON (n.name)
+"""
+
+MERGE_TRIPLES_CYPHER = """
+UNWIND $rows AS row
+MERGE (h:Entity:Upload {name: row.h_name})
+SET h += row.h_props
+MERGE (t:Entity:Upload {name: row.t_name})
+SET t += row.t_props
+MERGE (h)-[r:RELATION {type: row.r_type}]->(t)
+SET r += row.r_props
+"""
+
+MISSING_EMBEDDING_CYPHER = """
+UNWIND $names AS name
+MATCH (n:Entity {name: name})
+WHERE n.embedding IS NULL
+RETURN DISTINCT n.name AS name
+"""
+
+SET_EMBEDDINGS_CYPHER = """
+UNWIND $rows AS row
+MATCH (e:Entity {name: row.name})
+CALL db.create.setNodeVectorProperty(e, 'embedding', row.embedding)
+"""
+
+
+def build_vector_index_cypher(dimension: int) -> str:
+    return f"""
+    CREATE VECTOR INDEX {VECTOR_INDEX_NAME} IF NOT EXISTS
+    FOR (n: Entity) ON (n.embedding)
+    OPTIONS {{indexConfig: {{
+    `vector.dimensions`: {int(dimension)},
+    `vector.similarity_function`: 'cosine'
+    }} }}
+    """
+
+
+def _parse_node(node_data) -> tuple[str, dict]:
+    """解析节点数据，返回 (name, props)"""
+    if isinstance(node_data, dict):
+        props = node_data.copy()
+        name = props.pop("name", "")
+        return name, props
+    return str(node_data), {}
+
+
+def _parse_relation(rel_data) -> tuple[str, dict]:
+    """解析关系数据，返回 (type, props)"""
+    if isinstance(rel_data, dict):
+        props = rel_data.copy()
+        rel_type = props.pop("type", "")
+        return rel_type, props
+    return str(rel_data), {}
+
+
+def triple_to_row(entry: dict) -> dict[str, Any] | None:
+    """把一条三元组转换成 UNWIND 行，缺少头、尾或关系类型时返回 None"""
+    h_name, h_props = _parse_node(entry.get("h"))
+    t_name, t_props = _parse_node(entry.get("t"))
+    r_type, r_props = _parse_relation(entry.get("r"))
+    if not h_name or not t_name or not r_type:
+        return None
+    return {
+        "h_name": h_name,
+        "h_props": h_props,
+        "t_name": t_name,
+        "t_props": t_props,
+        "r_type": r_type,
+        "r_props": r_props,
+    }
+
+
+def iter_jsonl_triples(file_path: str) -> Iterator[dict]:
+    """逐行读取 JSONL 三元组文件"""
+    with open(file_path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+@dataclass
+class IngestStats:
+    triples: int = 0
+    skipped: int = 0
+    batches: int = 0
+    embedded: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def triples_per_sec(self) -> float:
+        return self.triples / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "triples_per_sec": round(self.triples_per_sec, 1)}
+
+
+class GraphBulkIngestor:
+    """Upload 图谱批量导入器
+
+    client 为 Neo4j 异步客户端（见 neo4j_client.AsyncNeo4jClient）；
+    embed_fn 为异步的批量向量化函数，传 None 时只写图不计算向量。
+    """
+
+    def __init__(
+        self,
+        client,
+        embed_fn: Callable[[list[str]], Awaitable[list[list[float]]]] | None = None,
+        *,
+        batch_size: int | None = None,
+        max_pending_embeddings: int | None = None,
+    ):
+        self.client = client
+        self.embed_fn = embed_fn
+        self.batch_size = max(1, batch_size or GRAPH_INGEST_BATCH_SIZE)
+        self.max_pending_embeddings = max(1, max_pending_embeddings or GRAPH_INGEST_MAX_PENDING_EMBEDDINGS)
+
+    async def ensure_schema(self, dimension: int) -> None:
+        """创建实体名唯一约束与向量索引，均为幂等语句"""
+        try:
+            await self.client.write("graph_ingest.entity_constraint", ENTITY_NAME_CONSTRAINT_CYPHER)
+        except Exception as e:
+            # 历史数据中存在同名实体时唯一约束会创建失败，退化为普通索引保证 MERGE 走索引
+            logger.warning(f"创建 Entity.name 唯一约束失败，改用普通索引: {e}")
+            await self.client.write("graph_ingest.entity_index", ENTITY_NAME_INDEX_CYPHER)
+        await self.client.write("graph_ingest.vector_index", build_vector_index_cypher(dimension))
+
+    def iter_batches(self, triples: Iterable[dict], stats: IngestStats) -> Iterator[list[dict[str, Any]]]:
+        rows: list[dict[str, Any]] = []
+        for entry in triples:
+            row = triple_to_row(entry)
+            if row is None:
+                stats.skipped += 1
+                continue
+            rows.append(row)
+            if len(rows) >= self.batch_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+    async def _embed_names(self, names: list[str]) -> int:
+        records = await self.client.read("graph_ingest.missing_embeddings", MISSING_EMBEDDING_CYPHER, names=names)
+        missing = [record["name"] for record in records]
+        if not missing:
+            return 0
+        embeddings = await self.embed_fn(missing)
+        rows = [{"name": name, "embedding": embedding} for name, embedding in zip(missing, embeddings)]
+        await self.client.write("graph_ingest.set_embeddings", SET_EMBEDDINGS_CYPHER, rows=rows)
+        return len(rows)
+
+    async def ingest(self, triples: Iterable[dict]) -> IngestStats:
+        """写入三元组并为缺少向量的实体补齐 embedding"""
+        stats = IngestStats()
+        start = time.perf_counter()
+        pending: deque[asyncio.Task] = deque()
+        inflight: set[str] = set()
+
+        async def _embed(names: list[str]) -> None:
+            try:
+                embedded = await self._embed_names(names)
+                stats.embedded += embedded
+            finally:
+                inflight.difference_update(names)
+
+        try:
+            for rows in self.iter_batches(triples, stats):
+                await self.client.write("graph_ingest.merge_triples", MERGE_TRIPLES_CYPHER, rows=rows)
+                stats.batches += 1
+                stats.triples += len(rows)
+                if self.embed_fn is None:
+                    continue
+
+                # 同名实体已在前序批次的向量化流水线中时跳过，避免重复计算
+                names = list(dict.fromkeys(n for row in rows for n in (row["h_name"], row["t_name"])))
+                names = [name for name in names if name not in inflight]
+                if not names:
+                    continue
+                while len(pending) >= self.max_pending_embeddings:
+                    await pending.popleft()
+                inflight.update(names)
+                pending.append(asyncio.create_task(_embed(names)))
+
+            while pending:
+                await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
@@ -0,0 +1,159 @@
+"""
+Neo4j 异步访问层
+
+所有图谱查询统一通过进程内共享的 ``AsyncGraphDatabase`` 驱动执行，避免同步驱动阻塞事件循环；
+连接池大小、获取连接超时、单条查询超时均可通过环境变量调整，
+每条查询按名称记录次数、失败数与耗时分布，慢查询会打印告警日志。
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from neo4j import AsyncGraphDatabase, unit_of_work
+
+from yuxi.utils import logger
+
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "30"))
+NEO4J_QUERY_TIMEOUT = float(os.getenv("NEO4J_QUERY_TIMEOUT", "60"))
+NEO4J_SLOW_QUERY_MS = float(os.getenv("NEO4J_SLOW_QUERY_MS", "1000"))
+
+# 每条查询保留的耗时样本数，用于计算分位数
+_LATENCY_SAMPLES = 256
+
+
+class Neo4jQueryMetrics:
+    """按查询名称聚合的耗时统计"""
+
+    def __init__(self):
+        self._queries: dict[str, dict[str, Any]] = {}
+
+    def record(self, name: str, elapsed_ms: float, ok: bool) -> None:
+        item = self._queries.setdefault(name, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "samples": []})
+        item["count"] += 1
+        item["errors"] += 0 if ok else 1
+        item["total_ms"] += elapsed_ms
+        item["max_ms"] = max(item["max_ms"], elapsed_ms)
+        samples = item["samples"]
+        samples.append(elapsed_ms)
+        if len(samples) > _LATENCY_SAMPLES:
+            del samples[0]
+        if elapsed_ms >= NEO4J_SLOW_QUERY_MS:
+            logger.warning(f"Slow Neo4j query '{name}': {elapsed_ms:.1f}ms")
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        result = {}
+        for name, item in self._queries.items():
+            ordered = sorted(item["samples"])
+            result[name] = {
+                "count": item["count"],
+                "errors": item["errors"],
+                "avg_ms": round(item["total_ms"] / item["count"], 2),
+                "p50_ms": round(ordered[len(ordered) // 2], 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                "max_ms": round(item["max_ms"], 2),
+            }
+        return result
+
+    def reset(self) -> None:
+        self._queries.clear()
+
+
+class AsyncNeo4jClient:
+    """共享的 Neo4j 异步客户端
+
+    驱动按事件循环懒加载：异步驱动的连接池绑定创建时的事件循环，
+    同一进程内出现新的事件循环（如后台线程中的 asyncio.run）时会为其单独创建驱动。
+    """
+
+    def __init__(self, uri: str | None = None, auth: tuple[str, str] | None = None):
+        self.uri = uri or os.environ.get("NEO4J_URI", "bolt://localhost:7687")
+        self.auth = auth or (
+            os.environ.get("NEO4J_USERNAME", "neo4j"),
+            os.environ.get("NEO4J_PASSWORD", "0123456789"),
+        )
+        self.metrics = Neo4jQueryMetrics()
+        self._drivers: dict[asyncio.AbstractEventLoop, Any] = {}
+
+    @property
+    def driver(self):
+        loop = asyncio.get_running_loop()
+        driver = self._drivers.get(loop)
+        if driver is None:
+            for stale_loop in [item for item in self._drivers if item.is_closed()]:
+                self._drivers.pop(stale_loop, None)
+            driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=self.auth,
+                max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+                connection_acquisition_timeout=NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+            )
+            self._drivers[loop] = driver
+        return driver
+
+    async def _execute(self, mode: str, name: str, work: Callable[..., Awaitable[Any]], /, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        ok = False
+        try:
+            async with self.driver.session() as session:
+                execute = session.execute_read if mode == "read" else session.execute_write
+                # 托管事务中 Query.timeout 不生效，需通过 unit_of_work 设置事务超时
+                result = await execute(unit_of_work(timeout=NEO4J_QUERY_TIMEOUT)(work), *args, **kwargs)
+            ok = True
+            return result
+        finally:
+            self.metrics.record(name, (time.perf_counter() - start) * 1000, ok)
+
+    async def execute_read(self, name: str, work: Callable[..., Awaitable[Any]], /, *args, **kwargs) -> Any:
+        """在读事务中执行 work(tx, *args, **kwargs)，适合一次事务内多条语句"""
+        return await self._execute("read", name, work, *args, **kwargs)
+
+    async def execute_write(self, name: str, work: Callable[..., Awaitable[Any]], /, *args, **kwargs) -> Any:
+        return await self._execute("write", name, work, *args, **kwargs)
+
+    async def read(self, name: str, query: str, /, **params) -> list:
+        """执行单条参数化只读查询，返回全部记录；name 与 query 仅限位置传参，避免与查询参数重名"""
+        return await self.execute_read(name, _fetch_records, query, params)
+
+    async def write(self, name: str, query: str, /, **params) -> list:
+        return await self.execute_write(name, _fetch_records, query, params)
+
+    async def verify_connectivity(self) -> bool:
+        try:
+            await self.driver.verify_connectivity()
+            return True
+        except Exception as e:
+            logger.warning(f"Neo4j async connectivity check failed: {e}")
+            return False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_pool_size": NEO4J_MAX_POOL_SIZE,
+            "query_timeout_s": NEO4J_QUERY_TIMEOUT,
+            "queries": self.metrics.stats(),
+        }
+
+    async def close(self) -> None:
+        drivers, self._drivers = self._drivers, {}
+        loop = asyncio.get_running_loop()
+        for driver_loop, driver in drivers.items():
+            if driver_loop is loop:
+                await driver.close()
+
+
+async def _fetch_records(tx, query: str, params: dict) -> list:
+    result = await tx.run(query, **params)
+    return [record async for record in result]
+
+
+_client: AsyncNeo4jClient | None = None
+
+
+def get_async_neo4j_client() -> AsyncNeo4jClient:
+    global _client
+    if _client is None:
+        _client = AsyncNeo4jClient()
+    return _client
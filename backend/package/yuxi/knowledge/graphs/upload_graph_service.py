@@ -1,12 +1,17 @@
 import json
 import os
-import tempfile
 import traceback
 import warnings
 from urllib.parse import urlparse
 
 from yuxi import config
 from yuxi.knowledge.graphs.adapters.base import Neo4jConnectionManager
+from yuxi.knowledge.graphs.bulk_ingest import (
+    SET_EMBEDDINGS_CYPHER,
+    VECTOR_INDEX_NAME,
+    GraphBulkIngestor,
+    iter_jsonl_triples,
+)
 from yuxi.models import select_embedding_model
 from yuxi.storage.minio.client import get_minio_client
 from yuxi.utils import logger
@@ -14,6 +19,79 @@ from yuxi.utils.datetime_utils import utc_isoformat
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
+# 向量检索 + 模糊匹配 -> 按分数取前 max_entities 个实体 -> 每个实体 2 跳出入边展开
+QUERY_NODE_CYPHER = """
+UNWIND range(0, size($tokens) - 1) AS i
+CALL {
+    WITH i
+    CALL db.index.vector.queryNodes($index_name, $top_k, $embeddings[i])
+    YIELD node, score
+    WHERE 'Upload' IN labels(node) AND score > $threshold
+    RETURN node.name AS name, score
+    UNION ALL
+    WITH i
+    MATCH (node:Upload)
+    WHERE toLower(node.name) CONTAINS toLower($tokens[i])
+    RETURN DISTINCT node.name AS name, $fuzzy_score AS score
+}
+WITH name, max(score) AS score
+ORDER BY score DESC, name
+LIMIT $max_entities
+WITH collect(name) AS names
+UNWIND range(0, size(names) - 1) AS rank
+WITH rank, names[rank] AS entity_name
+CALL {
+    WITH entity_name
+    WITH [
+        // 1跳出边
+        [(n:Upload {name: entity_name})-[r1]->(m1) |
+         {h: {id: elementId(n), name: n.name, properties: properties(n)},
+          r: {id: elementId(r1), type: r1.type, source_id: elementId(n), target_id: elementId(m1),
+              properties: properties(r1)},
+          t: {id: elementId(m1), name: m1.name, properties: properties(m1)}}],
+        // 2跳出边
+        [(n:Upload {name: entity_name})-[r1]->(m1)-[r2]->(m2) |
+         {h: {id: elementId(m1), name: m1.name, properties: properties(m1)},
+          r: {id: elementId(r2), type: r2.type, source_id: elementId(m1), target_id: elementId(m2),
+              properties: properties(r2)},
+          t: {id: elementId(m2), name: m2.name, properties: properties(m2)}}],
+        // 1跳入边
+        [(m1)-[r1]->(n:Upload {name: entity_name}) |
+         {h: {id: elementId(m1), name: m1.name, properties: properties(m1)},
+          r: {id: elementId(r1), type: r1.type, source_id: elementId(m1), target_id: elementId(n),
+              properties: properties(r1)},
+          t: {id: elementId(n), name: n.name, properties: properties(n)}}],
+        // 2跳入边
+        [(m2)-[r2]->(m1)-[r1]->(n:Upload {name: entity_name}) |
+         {h: {id: elementId(m2), name: m2.name, properties: properties(m2)},
+          r: {id: elementId(r2), type: r2.type, source_id: elementId(m2), target_id: elementId(m1),
+              properties: properties(r2)},
+          t: {id: elementId(m1), name: m1.name, properties: properties(m1)}}]
+    ] AS all_results
+    UNWIND all_results AS result_list
+    UNWIND result_list AS item
+    RETURN item
+    LIMIT $limit
+}
+RETURN rank, entity_name, item.h AS h, item.r AS r, item.t AS t
+"""
+
+
+def _flatten_record_props(record):
+    """处理记录中的属性：扁平化 properties 并移除 embedding"""
+    if record is None:
+        return None
+
+    # 复制一份以避免修改原字典
+    data = dict(record)
+    props = data.pop("properties", {}) or {}
+
+    # 移除 embedding
+    props.pop("embedding", None)
+
+    # 合并属性（优先保留原字典中的 id, name, type 等核心字段）
+    return {**props, **data}
+
 
 class UploadGraphService:
     """
@@ -30,6 +108,7 @@ class UploadGraphService:
         self.work_dir = os.path.join(config.save_dir, "knowledge_graph", self.kgdb_name)
         os.makedirs(self.work_dir, exist_ok=True)
         self.is_initialized_from_file = False
+        self._vector_index_ready = False
 
         # 尝试加载已保存的图数据库信息
         if not self.load_graph_info():
@@ -40,6 +119,11 @@ class UploadGraphService:
         """获取数据库驱动"""
         return self.connection.driver
 
+    @property
+    def client(self):
+        """获取 Neo4j 异步客户端，所有查询都经由它执行"""
+        return self.connection.client
+
     @property
     def status(self):
         """获取连接状态"""
@@ -50,7 +134,7 @@ class UploadGraphService:
         # Neo4jConnectionManager 在初始化时已经自动连接
         if not self.connection.is_running():
             self.connection._connect()
-            logger.info(f"Connected to Neo4j: {self.get_graph_info(self.kgdb_name)}")
+            logger.info(f"Connected to Neo4j: {self.kgdb_name}")
 
     def close(self):
         """关闭数据库连接"""
@@ -60,20 +144,19 @@ class UploadGraphService:
         """检查图数据库是否正在运行"""
         return self.connection.is_running()
 
-    def create_graph_database(self, kgdb_name):
+    async def create_graph_database(self, kgdb_name):
         """创建新的数据库，如果已存在则返回已有数据库的名称"""
         assert self.driver is not None, "Database is not connected"
-        with self.driver.session() as session:
-            existing_databases = session.run("SHOW DATABASES")
-            existing_db_names = [db["name"] for db in existing_databases]
+        existing_databases = await self.client.read("graph.show_databases", "SHOW DATABASES")
+        existing_db_names = [db["name"] for db in existing_databases]
 
-            if existing_db_names:
-                print(f"已存在数据库: {existing_db_names[0]}")
-                return existing_db_names[0]  # 返回所有已有数据库名称
+        if existing_db_names:
+            print(f"已存在数据库: {existing_db_names[0]}")
+            return existing_db_names[0]  # 返回所有已有数据库名称
 
-            session.run(f"CREATE DATABASE {kgdb_name}")  # type: ignore
-            print(f"数据库 '{kgdb_name}' 创建成功.")
-            return kgdb_name  # 返回创建的数据库名称
+        await self.client.write("graph.create_database", f"CREATE DATABASE {kgdb_name}")
+        print(f"数据库 '{kgdb_name}' 创建成功.")
+        return kgdb_name  # 返回创建的数据库名称
 
     def use_database(self, kgdb_name="neo4j"):
         """切换到指定数据库"""
@@ -104,29 +187,11 @@ class UploadGraphService:
                 bucket_name, object_name = parse_minio_url(file_path)
                 minio_client = get_minio_client()
 
-                # 直接下载文件内容
-                file_data = await minio_client.adownload_file(bucket_name, object_name)
-                logger.info(f"成功从 MinIO 下载文件: {object_name} ({len(file_data)} bytes)")
-
-                # 创建临时文件
-                with tempfile.NamedTemporaryFile(mode="wb", suffix=".jsonl", delete=False) as temp_file:
-                    temp_file.write(file_data)
-                    actual_file_path = temp_file.name
-
-                try:
-
-                    def read_triples(file_path):
-                        with open(file_path, encoding="utf-8") as file:
-                            for line in file:
-                                if line.strip():
-                                    yield json.loads(line.strip())
-
-                    triples = list(read_triples(actual_file_path))
+                # 流式下载到临时文件，退出上下文时自动清理
+                async with minio_client.adownload_to_tempfile(bucket_name, object_name, suffix=".jsonl") as temp_path:
+                    # 逐行流式读取，避免大文件整体载入内存
+                    triples = iter_jsonl_triples(temp_path)
                     await self.txt_add_vector_entity(triples, kgdb_name, embed_model_name, batch_size)
-                finally:
-                    # 清理临时文件
-                    if os.path.exists(actual_file_path):
-                        os.unlink(actual_file_path)
 
             else:
                 # 本地文件路径 - 拒绝不安全的本地路径
@@ -139,7 +204,7 @@ class UploadGraphService:
             self.connection.status = "open"
 
         # 更新并保存图数据库信息
-        self.save_graph_info()
+        await self.save_graph_info()
         return kgdb_name
 
     async def txt_add_vector_entity(self, triples, kgdb_name="neo4j", embed_model_name=None, batch_size=None):
@@ -147,106 +212,6 @@ class UploadGraphService:
         assert self.driver is not None, "Database is not connected"
         self.use_database(kgdb_name)
 
-        def _index_exists(tx, index_name):
-            """检查索引是否存在"""
-            result = tx.run("SHOW INDEXES")
-            for record in result:
-                if record["name"] == index_name:
-                    return True
-            return False
-
-        def _parse_node(node_data):
-            """解析节点数据，返回 (name, props)"""
-            if isinstance(node_data, dict):
-                props = node_data.copy()
-                name = props.pop("name", "")
-                return name, props
-            return str(node_data), {}
-
-        def _parse_relation(rel_data):
-            """解析关系数据，返回 (type, props)"""
-            if isinstance(rel_data, dict):
-                props = rel_data.copy()
-                rel_type = props.pop("type", "")
-                return rel_type, props
-            return str(rel_data), {}
-
-        def _create_graph(tx, data):
-            """添加一个三元组"""
-            for entry in data:
-                h_name, h_props = _parse_node(entry.get("h"))
-                t_name, t_props = _parse_node(entry.get("t"))
-                r_type, r_props = _parse_relation(entry.get("r"))
-
-                if not h_name or not t_name or not r_type:
-                    continue
-
-                tx.run(
-                    """
-                MERGE (h:Entity:Upload {name: $h_name})
-                SET h += $h_props
-                MERGE (t:Entity:Upload {name: $t_name})
-                SET t += $t_props
-                MERGE (h)-[r:RELATION {type: $r_type}]->(t)
-                SET r += $r_props
-                """,
-                    h_name=h_name,
-                    h_props=h_props,
-                    t_name=t_name,
-                    t_props=t_props,
-                    r_type=r_type,
-                    r_props=r_props,
-                )
-
-        def _create_vector_index(tx, dim):
-            """创建向量索引"""
-            # NOTE 这里是否是会重复构建索引？
-            index_name = "entityEmbeddings"
-            if not _index_exists(tx, index_name):
-                tx.run(f"""
-                CREATE VECTOR INDEX {index_name}
-                FOR (n: Entity) ON (n.embedding)
-                OPTIONS {{indexConfig: {{
-                `vector.dimensions`: {dim},
-                `vector.similarity_function`: 'cosine'
-                }} }};
-                """)
-
-        def _get_nodes_without_embedding(tx, entity_names):
-            """获取没有embedding的节点列表"""
-            # 构建参数字典，将列表转换为"param0"、"param1"等键值对形式
-            params = {f"param{i}": name for i, name in enumerate(entity_names)}
-
-            if not params:
-                return []
-
-            # 构建查询参数列表
-            param_placeholders = ", ".join([f"${key}" for key in params.keys()])
-
-            # 执行查询
-            result = tx.run(
-                f"""
-            MATCH (n:Entity)
-            WHERE n.name IN [{param_placeholders}] AND n.embedding IS NULL
-            RETURN n.name AS name
-            """,
-                params,
-            )
-
-            return [record["name"] for record in result]
-
-        def _batch_set_embeddings(tx, entity_embedding_pairs):
-            """批量设置实体的嵌入向量"""
-            for entity_name, embedding in entity_embedding_pairs:
-                tx.run(
-                    """
-                MATCH (e:Entity {name: $name})
-                CALL db.create.setNodeVectorProperty(e, 'embedding', $embedding)
-                """,
-                    name=entity_name,
-                    embedding=embedding,
-                )
-
         # 检查是否允许更新模型
         if embed_model_name and not self.is_initialized_from_file:
             if embed_model_name != self.embed_model_name:
@@ -265,54 +230,20 @@ class UploadGraphService:
         # 但必须在支持的模型列表中
         assert self.embed_model_name in config.embed_model_names, f"Unsupported embed model: {self.embed_model_name}"
 
-        with self.driver.session() as session:
-            logger.info(f"Adding entity to {kgdb_name}")
-            session.execute_write(_create_graph, triples)
-            logger.info(f"Creating vector index for {kgdb_name} with {config.embed_model}")
-            session.execute_write(_create_vector_index, getattr(cur_embed_info, "dimension", 1024))
-
-            # 收集所有需要处理的实体名称，去重
-            all_entities = set()
-            for entry in triples:
-                h_name, _ = _parse_node(entry.get("h"))
-                t_name, _ = _parse_node(entry.get("t"))
-                if h_name:
-                    all_entities.add(h_name)
-                if t_name:
-                    all_entities.add(t_name)
-
-            all_entities_list = list(all_entities)
-
-            # 筛选出没有embedding的节点
-            nodes_without_embedding = session.execute_read(_get_nodes_without_embedding, all_entities_list)
-            if not nodes_without_embedding:
-                logger.info("所有实体已有embedding，无需重新计算")
-                return
-
-            logger.info(f"需要为{len(nodes_without_embedding)}/{len(all_entities_list)}个实体计算embedding")
-
-            # 批量处理实体
-            max_batch_size = 1024  # 限制此部分的主要是内存大小 1024 * 1024 * 4 / 1024 / 1024 = 4GB
-            total_entities = len(nodes_without_embedding)
-
-            for i in range(0, total_entities, max_batch_size):
-                batch_entities = nodes_without_embedding[i : i + max_batch_size]
-                logger.debug(
-                    f"Processing entities batch {i // max_batch_size + 1}/"
-                    f"{(total_entities - 1) // max_batch_size + 1} ({len(batch_entities)} entities)"
-                )
-
-                # 批量获取嵌入向量
-                batch_embeddings = await self.aget_embedding(batch_entities, batch_size=batch_size)
-
-                # 将实体名称和嵌入向量配对
-                entity_embedding_pairs = list(zip(batch_entities, batch_embeddings))
+        ingestor = GraphBulkIngestor(
+            self.client,
+            embed_fn=lambda names: self.aget_embedding(names, batch_size=batch_size),
+        )
+        logger.info(f"Creating constraints and vector index for {kgdb_name} with {self.embed_model_name}")
+        await ingestor.ensure_schema(getattr(cur_embed_info, "dimension", 1024))
+        self._vector_index_ready = True
 
-                # 批量写入数据库
-                session.execute_write(_batch_set_embeddings, entity_embedding_pairs)
+        logger.info(f"Adding entity to {kgdb_name}")
+        stats = await ingestor.ingest(triples)
+        logger.info(f"Graph ingestion finished for {kgdb_name}: {stats.to_dict()}")
 
-            # 数据添加完成后保存图信息
-            self.save_graph_info()
+        # 数据添加完成后保存图信息
+        await self.save_graph_info()
 
     async def add_embedding_to_nodes(self, node_names=None, kgdb_name="neo4j", batch_size=None):
         """为节点添加嵌入向量
@@ -330,45 +261,33 @@ class UploadGraphService:
 
         # 如果node_names为None，则获取所有没有嵌入向量的节点
         if node_names is None:
-            node_names = self.query_nodes_without_embedding(kgdb_name)
+            node_names = await self.query_nodes_without_embedding(kgdb_name)
 
         count = 0
-        with self.driver.session() as session:
-            for node_name in node_names:
-                try:
-                    embedding = await self.aget_embedding(node_name, batch_size=batch_size)
-                    session.execute_write(self.set_embedding, node_name, embedding)
-                    count += 1
-                except Exception as e:
-                    logger.error(f"为节点 '{node_name}' 添加嵌入向量失败: {e}, {traceback.format_exc()}")
+        max_batch_size = 1024
+        for i in range(0, len(node_names), max_batch_size):
+            batch_names = node_names[i : i + max_batch_size]
+            try:
+                embeddings = await self.aget_embedding(batch_names, batch_size=batch_size)
+                await self.set_embeddings(list(zip(batch_names, embeddings)))
+                count += len(batch_names)
+            except Exception as e:
+                logger.error(f"为 {len(batch_names)} 个节点添加嵌入向量失败: {e}, {traceback.format_exc()}")
 
         return count
 
-    def delete_entity(self, entity_name=None, kgdb_name="neo4j"):
+    async def delete_entity(self, entity_name=None, kgdb_name="neo4j"):
         """删除数据库中的指定实体三元组, 参数entity_name为空则删除全部实体"""
         assert self.driver is not None, "Database is not connected"
         self.use_database(kgdb_name)
-        with self.driver.session() as session:
-            if entity_name:
-                session.execute_write(self._delete_specific_entity, entity_name)
-            else:
-                session.execute_write(self._delete_all_entities)
-
-    def _delete_specific_entity(self, tx, entity_name):
-        query = """
-        MATCH (n {name: $entity_name})
-        DETACH DELETE n
-        """
-        tx.run(query, entity_name=entity_name)
-
-    def _delete_all_entities(self, tx):
-        query = """
-        MATCH (n)
-        DETACH DELETE n
-        """
-        tx.run(query)
+        if entity_name:
+            await self.client.write(
+                "graph.delete_entity", "MATCH (n {name: $entity_name}) DETACH DELETE n", entity_name=entity_name
+            )
+        else:
+            await self.client.write("graph.delete_all_entities", "MATCH (n) DETACH DELETE n")
 
-    def query_nodes_without_embedding(self, kgdb_name="neo4j"):
+    async def query_nodes_without_embedding(self, kgdb_name="neo4j"):
         """查询没有嵌入向量的节点
 
         Returns:
@@ -377,32 +296,39 @@ class UploadGraphService:
         assert self.driver is not None, "Database is not connected"
         self.use_database(kgdb_name)
 
-        def query(tx):
-            result = tx.run("""
+        records = await self.client.read(
+            "graph.nodes_without_embedding",
+            """
             MATCH (n:Entity)
             WHERE n.embedding IS NULL
             RETURN n.name AS name
-            """)
-            return [record["name"] for record in result]
-
-        with self.driver.session() as session:
-            return session.execute_read(query)
+            """,
+        )
+        return [record["name"] for record in records]
 
-    def get_graph_info(self, graph_name="neo4j"):
+    async def get_graph_info(self, graph_name="neo4j"):
         assert self.driver is not None, "Database is not connected"
         self.use_database(graph_name)
 
-        def query(tx):
+        async def single(tx, query, key):
+            result = await tx.run(query)
+            record = await result.single()
+            return record[key]
+
+        async def query(tx):
             # 只统计包含Entity标签的节点
-            entity_count = tx.run("MATCH (n:Entity) RETURN count(n) AS count").single()["count"]
+            entity_count = await single(tx, "MATCH (n:Entity) RETURN count(n) AS count", "count")
             # 只统计包含RELATION标签的关系
-            relationship_count = tx.run("MATCH ()-[r:RELATION]->() RETURN count(r) AS count").single()["count"]
-            triples_count = tx.run("MATCH (n:Entity)-[r:RELATION]->(m:Entity) RETURN count(n) AS count").single()[
-                "count"
-            ]
+            relationship_count = await single(tx, "MATCH ()-[r:RELATION]->() RETURN count(r) AS count", "count")
+            triples_count = await single(
+                tx, "MATCH (n:Entity)-[r:RELATION]->(m:Entity) RETURN count(n) AS count", "count"
+            )
+            unindexed_count = await single(
+                tx, "MATCH (n:Entity) WHERE n.embedding IS NULL RETURN count(n) AS count", "count"
+            )
 
             # 获取所有标签
-            labels = tx.run("CALL db.labels() YIELD label RETURN collect(label) AS labels").single()["labels"]
+            labels = await single(tx, "CALL db.labels() YIELD label RETURN collect(label) AS labels", "labels")
 
             return {
                 "graph_name": graph_name,
@@ -413,18 +339,17 @@ class UploadGraphService:
                 "status": self.status,
                 "embed_model_name": self.embed_model_name,
                 "embed_model_configurable": not self.is_initialized_from_file,
-                "unindexed_node_count": len(self.query_nodes_without_embedding(graph_name)),
+                "unindexed_node_count": unindexed_count,
             }
 
         try:
             if self.is_running():
                 # 获取数据库信息
-                with self.driver.session() as session:
-                    graph_info = session.execute_read(query)
+                graph_info = await self.client.execute_read("graph.info", query)
 
-                    # 添加时间戳
-                    graph_info["last_updated"] = utc_isoformat()
-                    return graph_info
+                # 添加时间戳
+                graph_info["last_updated"] = utc_isoformat()
+                return graph_info
             else:
                 logger.warning(f"图数据库未连接或未运行:{self.status=}")
                 return None
@@ -433,13 +358,13 @@ class UploadGraphService:
             logger.error(f"获取图数据库信息失败：{e}, {traceback.format_exc()}")
             return None
 
-    def save_graph_info(self, graph_name="neo4j"):
+    async def save_graph_info(self, graph_name="neo4j"):
         """
         将图数据库的基本信息保存到工作目录中的JSON文件
         保存的信息包括：数据库名称、状态、嵌入模型名称等
         """
         try:
-            graph_info = self.get_graph_info(graph_name)
+            graph_info = await self.get_graph_info(graph_name)
             if graph_info is None:
                 logger.error("图数据库信息为空，无法保存")
                 return False
@@ -511,23 +436,27 @@ class UploadGraphService:
             outputs = self.embed_model.encode([text])[0]
             return outputs
 
-    def set_embedding(self, tx, entity_name, embedding):
+    async def set_embedding(self, entity_name, embedding):
         """为单个实体设置嵌入向量"""
-        tx.run(
-            """
-        MATCH (e:Entity {name: $name})
-        CALL db.create.setNodeVectorProperty(e, 'embedding', $embedding)
-        """,
-            name=entity_name,
-            embedding=embedding,
-        )
+        await self.set_embeddings([(entity_name, embedding)])
 
-    def query_node(
+    async def set_embeddings(self, entity_embedding_pairs):
+        """批量设置实体的嵌入向量，一批只需一条 UNWIND 语句"""
+        rows = [{"name": name, "embedding": embedding} for name, embedding in entity_embedding_pairs]
+        await self.client.write("graph.set_embeddings", SET_EMBEDDINGS_CYPHER, rows=rows)
+
+    async def query_node(
         self, keyword, threshold=0.9, kgdb_name="neo4j", hops=2, max_entities=8, return_format="graph", **kwargs
     ):
-        """知识图谱查询节点的入口"""
+        """知识图谱查询节点的入口
+
+        所有分词一次批量向量化，向量检索、模糊匹配与多跳扩展合并为一条 Cypher，
+        每次查询只需一次 Bolt 往返（向量索引存在性检查结果会被缓存）。
+        """
         assert self.driver is not None, "Database is not connected"
         assert self.is_running(), "图数据库未启动"
+        if return_format not in ("graph", "triples"):
+            raise ValueError(f"Invalid return_format: {return_format}")
 
         self.use_database(kgdb_name)
 
@@ -536,46 +465,33 @@ class UploadGraphService:
         if not tokens:
             tokens = [str(keyword)]
 
-        # name -> score 聚合；向量分数累加，模糊命中给予轻权重
-        entity_to_score = {}
-        for token in tokens:
-            # 使用向量索引进行查询
-            results_sim = self._query_with_vector_sim(token, kgdb_name, threshold)
-            for r in results_sim:
-                name = r[0]  # 与下方保持统一的 [0] 取 name 的方式
-                score = 0.0
-                try:
-                    score = float(r["score"])  # neo4j.Record 支持键访问
-                except Exception:
-                    # 兜底：若无法取到score，给个基础分
-                    score = 0.5
-                entity_to_score[name] = max(entity_to_score.get(name, 0.0), score)
-
-            # 模糊查询（不区分大小写），命中加一个较小分
-            results_fuzzy = self._query_with_fuzzy_match(token, kgdb_name)
-            for fr in results_fuzzy:
-                # _query_with_fuzzy_match 返回 values()，形如 [name]
-                name = fr[0]
-                # 给予轻权重，避免覆盖向量高分
-                entity_to_score[name] = max(entity_to_score.get(name, 0.0), 0.3)
-
-        # 排序并截断
-        sorted_entity_to_score = sorted(entity_to_score.items(), key=lambda x: x[1], reverse=True)
-        qualified_entities = [name for name, _ in sorted_entity_to_score][:max_entities]
-
-        logger.debug(f"Graph Query Entities: {keyword}, {qualified_entities=}")
-
-        # 对每个合格的实体进行查询
+        await self._ensure_vector_index_exists()
+        embeddings = await self.aget_embedding(tokens)
+        params = {
+            "tokens": tokens,
+            "embeddings": [list(embedding) for embedding in embeddings],
+            "index_name": VECTOR_INDEX_NAME,
+            "top_k": 10,
+            "threshold": threshold,
+            "fuzzy_score": 0.3,
+            "max_entities": max_entities,
+            "limit": 100,
+        }
+
+        records = [record.data() for record in await self.client.read("graph.query_node", QUERY_NODE_CYPHER, **params)]
+        records.sort(key=lambda record: record["rank"])
+        logger.debug(f"Graph Query Entities: {keyword}, {list(dict.fromkeys(r['entity_name'] for r in records))}")
+
         all_query_results = {"nodes": [], "edges": [], "triples": []}
-        for entity in qualified_entities:
-            query_result = self._query_specific_entity(entity_name=entity, kgdb_name=kgdb_name, hops=hops)
+        for record in records:
+            h = _flatten_record_props(record["h"])
+            r = _flatten_record_props(record["r"])
+            t = _flatten_record_props(record["t"])
             if return_format == "graph":
-                all_query_results["nodes"].extend(query_result["nodes"])
-                all_query_results["edges"].extend(query_result["edges"])
-            elif return_format == "triples":
-                all_query_results["triples"].extend(query_result["triples"])
+                all_query_results["nodes"].extend([h, t])
+                all_query_results["edges"].append(r)
             else:
-                raise ValueError(f"Invalid return_format: {return_format}")
+                all_query_results["triples"].append((h["name"], r["type"], t["name"]))
 
         # 基础去重
         if return_format == "graph":
@@ -597,181 +513,23 @@ class UploadGraphService:
                     dedup_edges.append(e)
             all_query_results["edges"] = dedup_edges
 
-        elif return_format == "triples":
-            seen_triples = set()
-            dedup_triples = []
-            for t in all_query_results["triples"]:
-                if t not in seen_triples:
-                    seen_triples.add(t)
-                    dedup_triples.append(t)
-            all_query_results["triples"] = dedup_triples
+        else:
+            all_query_results["triples"] = list(dict.fromkeys(all_query_results["triples"]))
 
         return all_query_results
 
-    def _query_with_fuzzy_match(self, keyword, kgdb_name="neo4j"):
-        """模糊查询"""
-        assert self.driver is not None, "Database is not connected"
-        self.use_database(kgdb_name)
-
-        def query_fuzzy_match(tx, keyword):
-            result = tx.run(
-                """
-            MATCH (n:Upload)
-            WHERE toLower(n.name) CONTAINS toLower($keyword)
-            RETURN DISTINCT n.name AS name
-            """,
-                keyword=keyword,
-            )
-            values = result.values()
-            logger.debug(f"Fuzzy Query Results: {values}")
-            return values
-
-        with self.driver.session() as session:
-            return session.execute_read(query_fuzzy_match, keyword)
-
-    def _query_with_vector_sim(self, keyword, kgdb_name="neo4j", threshold=0.9):
-        """向量查询"""
-        assert self.driver is not None, "Database is not connected"
-        self.use_database(kgdb_name)
+    async def _ensure_vector_index_exists(self):
+        """检查向量索引是否存在，存在后缓存结果不再重复检查"""
+        if self._vector_index_ready:
+            return
 
-        def _index_exists(tx, index_name):
-            """检查索引是否存在"""
-            result = tx.run("SHOW INDEXES")
-            for record in result:
-                if record["name"] == index_name:
-                    return True
-            return False
-
-        def query_by_vector(tx, text, threshold):
-            # 首先检查索引是否存在
-            if not _index_exists(tx, "entityEmbeddings"):
-                raise Exception(
-                    "向量索引不存在，请先创建索引，或当前图谱中未上传任何三元组（知识库中自动构建的，不会在此处展示和检索）。"
-                )
-
-            embedding = self.get_embedding(text)
-            result = tx.run(
-                """
-            CALL db.index.vector.queryNodes('entityEmbeddings', 10, $embedding)
-            YIELD node AS similarEntity, score
-            WHERE 'Upload' IN labels(similarEntity)
-            RETURN similarEntity.name AS name, score
-            """,
-                embedding=embedding,
+        records = await self.client.read(
+            "graph.vector_index_exists",
+            "SHOW INDEXES YIELD name WHERE name = $name RETURN count(*) AS count",
+            name=VECTOR_INDEX_NAME,
+        )
+        self._vector_index_ready = records[0]["count"] > 0
+        if not self._vector_index_ready:
+            raise ValueError(
+                "向量索引不存在，请先创建索引，或当前图谱中未上传任何三元组（知识库中自动构建的，不会在此处展示和检索）。"
             )
-            return [r for r in result if r["score"] > threshold]
-
-        with self.driver.session() as session:
-            results = session.execute_read(query_by_vector, keyword, threshold=threshold)
-            return results
-
-    def _query_specific_entity(self, entity_name, kgdb_name="neo4j", hops=2, limit=100):
-        """查询指定实体三元组信息（无向关系）"""
-        assert self.driver is not None, "Database is not connected"
-        if not entity_name:
-            logger.warning("实体名称为空")
-            return []
-
-        self.use_database(kgdb_name)
-
-        def _process_record_props(record):
-            """处理记录中的属性：扁平化 properties 并移除 embedding"""
-            if record is None:
-                return None
-
-            # 复制一份以避免修改原字典
-            data = dict(record)
-            props = data.pop("properties", {}) or {}
-
-            # 移除 embedding
-            if "embedding" in props:
-                del props["embedding"]
-
-            # 合并属性（优先保留原字典中的 id, name, type 等核心字段）
-            return {**props, **data}
-
-        def query(tx, entity_name, hops, limit):
-            try:
-                query_str = """
-                WITH [
-                    // 1跳出边
-                    [(n:Upload {name: $entity_name})-[r1]->(m1) |
-                     {h: {id: elementId(n), name: n.name, properties: properties(n)},
-                      r: {
-                        id: elementId(r1),
-                        type: r1.type,
-                        source_id: elementId(n),
-                        target_id: elementId(m1),
-                        properties: properties(r1)
-                      },
-                      t: {id: elementId(m1), name: m1.name, properties: properties(m1)}}],
-                    // 2跳出边
-                    [(n:Upload {name: $entity_name})-[r1]->(m1)-[r2]->(m2) |
-                     {h: {id: elementId(m1), name: m1.name, properties: properties(m1)},
-                      r: {
-                        id: elementId(r2),
-                        type: r2.type,
-                        source_id: elementId(m1),
-                        target_id: elementId(m2),
-                        properties: properties(r2)
-                      },
-                      t: {id: elementId(m2), name: m2.name, properties: properties(m2)}}],
-                    // 1跳入边
-                    [(m1)-[r1]->(n:Upload {name: $entity_name}) |
-                     {h: {id: elementId(m1), name: m1.name, properties: properties(m1)},
-                      r: {
-                        id: elementId(r1),
-                        type: r1.type,
-                        source_id: elementId(m1),
-                        target_id: elementId(n),
-                        properties: properties(r1)
-                      },
-                      t: {id: elementId(n), name: n.name, properties: properties(n)}}],
-                    // 2跳入边
-                    [(m2)-[r2]->(m1)-[r1]->(n:Upload {name: $entity_name}) |
-                     {h: {id: elementId(m2), name: m2.name, properties: properties(m2)},
-                      r: {
-                        id: elementId(r2),
-                        type: r2.type,
-                        source_id: elementId(m2),
-                        target_id: elementId(m1),
-                        properties: properties(r2)
-                      },
-                      t: {id: elementId(m1), name: m1.name, properties: properties(m1)}}]
-                ] AS all_results
-                UNWIND all_results AS result_list
-                UNWIND result_list AS item
-                RETURN item.h AS h, item.r AS r, item.t AS t
-                LIMIT $limit
-                """
-                results = tx.run(query_str, entity_name=entity_name, limit=limit)
-
-                if not results:
-                    logger.info(f"未找到实体 {entity_name} 的相关信息")
-                    return {}
-
-                formatted_results = {"nodes": [], "edges": [], "triples": []}
-
-                for item in results:
-                    h = _process_record_props(item["h"])
-                    r = _process_record_props(item["r"])
-                    t = _process_record_props(item["t"])
-
-                    formatted_results["nodes"].extend([h, t])
-                    formatted_results["edges"].append(r)
-                    formatted_results["triples"].append((h["name"], r["type"], t["name"]))
-
-                logger.debug(f"Query Results: {results}")
-                return formatted_results
-
-            except Exception as e:
-                logger.error(f"查询实体 {entity_name} 失败: {str(e)}")
-                return []
-
-        try:
-            with self.driver.session() as session:
-                return session.execute_read(query, entity_name, hops, limit)
-
-        except Exception as e:
-            logger.error(f"数据库会话异常: {str(e)}")
-            return []
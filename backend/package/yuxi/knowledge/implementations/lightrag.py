@@ -7,13 +7,15 @@ from lightrag import LightRAG, QueryParam
 from lightrag.kg.shared_storage import initialize_pipeline_status
 from lightrag.llm.openai import openai_complete_if_cache, openai_embed
 from lightrag.utils import EmbeddingFunc
-from neo4j import GraphDatabase
 from pymilvus import connections, utility
 
 from yuxi import config
 from yuxi.knowledge.base import FileStatus, KnowledgeBase
 from yuxi.knowledge.chunking.ragflow_like.dispatcher import chunk_markdown
 from yuxi.knowledge.chunking.ragflow_like.presets import resolve_chunk_processing_params
+from yuxi.knowledge.graphs.adapters.base import label_clause
+from yuxi.knowledge.graphs.neo4j_client import get_async_neo4j_client
+from yuxi.knowledge.implementations.lightrag_registry import LightRAGInstanceRegistry, estimate_workspace_bytes
 from yuxi.models.embed import get_embedding_model_info_by_id
 from yuxi.plugins.parser.unified import Parser
 from yuxi.utils import hashstr, logger
@@ -33,11 +35,15 @@ class LightRagKB(KnowledgeBase):
         """
         super().__init__(work_dir)
 
-        # 存储 LightRAG 实例映射 {db_id: LightRAG}
-        self.instances: dict[str, LightRAG] = {}
         self._db_write_locks: dict[str, asyncio.Lock] = {}
-        self._db_instance_locks: dict[str, asyncio.Lock] = {}
         self._lock_guard = asyncio.Lock()
+        # 常驻的 LightRAG 实例 {db_id: LightRAG}，按数量、空闲时间与内存预算淘汰
+        self._instances = LightRAGInstanceRegistry(
+            self._load_kb_instance,
+            self._finalize_kb_instance,
+            size_estimator=lambda db_id, _rag: estimate_workspace_bytes(os.path.join(self.work_dir, db_id)),
+            is_busy=self._is_db_writing,
+        )
 
         logger.info("LightRagKB initialized")
 
@@ -58,8 +64,10 @@ class LightRagKB(KnowledgeBase):
         payload = delimiter.join(chunk["content"] for chunk in chunks if chunk.get("content"))
         return payload, delimiter, False  # 允许 LightRAG 基于进行二次切分，避免超限
 
-    def delete_database(self, db_id: str) -> dict:
+    async def delete_database(self, db_id: str) -> dict:
         """删除数据库，同时清除Milvus和Neo4j中的数据"""
+        await self._instances.evict(db_id)
+
         # Drop Milvus collection
         try:
             milvus_uri = os.getenv("MILVUS_URI") or "http://localhost:19530"
@@ -82,32 +90,16 @@ class LightRagKB(KnowledgeBase):
             logger.error(f"Failed to drop Milvus collection {db_id}: {e}")
 
         # Delete Neo4j data
-        neo4j_uri = os.getenv("NEO4J_URI") or "bolt://localhost:7687"
-        neo4j_username = os.getenv("NEO4J_USERNAME") or "neo4j"
-        neo4j_password = os.getenv("NEO4J_PASSWORD") or "0123456789"
-
         try:
-            driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_username, neo4j_password))
-            with driver.session() as session:
-                # 删除带有特定 db_id 标签的节点和关系
-                session.run(
-                    """
-                    MATCH (n:`"""
-                    + db_id
-                    + """`)
-                    DETACH DELETE n
-                """
-                )
-
-                logger.info(f"Deleted Neo4j nodes and relationships for workspace {db_id}")
+            # 删除带有特定 db_id 标签的节点和关系
+            client = get_async_neo4j_client()
+            await client.write("lightrag.delete_workspace", f"MATCH (n{label_clause(db_id)}) DETACH DELETE n")
+            logger.info(f"Deleted Neo4j nodes and relationships for workspace {db_id}")
         except Exception as e:
             logger.error(f"Failed to delete Neo4j data for {db_id}: {e}")
-        finally:
-            if "driver" in locals():
-                driver.close()
 
         # Delete local files and metadata
-        return super().delete_database(db_id)
+        return await super().delete_database(db_id)
 
     def update_database(self, db_id: str, name: str, description: str, llm_info: dict = None) -> dict:
         """
@@ -127,9 +119,8 @@ class LightRagKB(KnowledgeBase):
         result = super().update_database(db_id, name, description, llm_info)
 
         # 如果 llm_info 发生变化，清除缓存的实例，确保下次使用新模型
-        if llm_info_changed and db_id in self.instances:
+        if llm_info_changed and self._instances.invalidate(db_id):
             logger.info(f"LLM model changed, invalidating cached LightRAG instance for {db_id}")
-            del self.instances[db_id]
 
         return result
 
@@ -179,6 +170,16 @@ class LightRagKB(KnowledgeBase):
         await instance.initialize_storages()
         await initialize_pipeline_status()
 
+    async def _load_kb_instance(self, db_id: str) -> LightRAG:
+        rag = await self._create_kb_instance(db_id, {})
+        await self._initialize_kb_instance(rag)
+        return rag
+
+    async def _finalize_kb_instance(self, instance: LightRAG) -> None:
+        """淘汰实例时落盘缓存并关闭存储连接"""
+        logger.info(f"Finalizing LightRAG instance for {instance.working_dir}")
+        await instance.finalize_storages()
+
     @staticmethod
     async def _ensure_doc_processed(rag: LightRAG, file_id: str) -> None:
         """确保 LightRAG 文档处理成功，否则抛出异常。"""
@@ -194,41 +195,29 @@ class LightRagKB(KnowledgeBase):
 
     async def _get_lightrag_instance(self, db_id: str) -> LightRAG | None:
         """获取或创建 LightRAG 实例"""
-        if db_id in self.instances:
+        if db_id in self._instances:
             logger.info(f"Using cached LightRAG instance for {db_id}")
-            return self.instances[db_id]
-
-        if db_id not in self.databases_meta:
+        elif db_id not in self.databases_meta:
             return None
 
-        instance_lock = await self._get_db_instance_lock(db_id)
-        async with instance_lock:
-            if db_id in self.instances:
-                logger.info(f"Using cached LightRAG instance for {db_id}")
-                return self.instances[db_id]
-
-            try:
-                # 创建实例
-                rag = await self._create_kb_instance(db_id, {})
-
-                # 异步初始化存储
-                await self._initialize_kb_instance(rag)
-
-                self.instances[db_id] = rag
-                return rag
+        try:
+            return await self._instances.get(db_id)
+        except Exception as e:
+            logger.error(f"Failed to create LightRAG instance for {db_id}: {e}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            return None
 
-            except Exception as e:
-                logger.error(f"Failed to create LightRAG instance for {db_id}: {e}")
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                return None
+    def get_instance_stats(self) -> dict:
+        """常驻 LightRAG 实例的数量、内存估算、命中与淘汰统计"""
+        return self._instances.stats()
 
     async def _get_db_write_lock(self, db_id: str) -> asyncio.Lock:
         async with self._lock_guard:
             return self._db_write_locks.setdefault(db_id, asyncio.Lock())
 
-    async def _get_db_instance_lock(self, db_id: str) -> asyncio.Lock:
-        async with self._lock_guard:
-            return self._db_instance_locks.setdefault(db_id, asyncio.Lock())
+    def _is_db_writing(self, db_id: str) -> bool:
+        lock = self._db_write_locks.get(db_id)
+        return lock is not None and lock.locked()
 
     def _get_llm_func(self, llm_info: dict):
         """获取 LLM 函数"""
@@ -470,7 +459,9 @@ class LightRagKB(KnowledgeBase):
                     # 重新解析文件为 markdown
                     params["image_bucket"] = "public"
                     params["image_prefix"] = f"{db_id}/kb-images"
-                    markdown_content = await Parser.aparse(source=file_path, params=params)
+                    markdown_content = await Parser.aparse(
+                        source=file_path, params=params, content_hash=file_meta.get("content_hash")
+                    )
                     markdown_content_lines = markdown_content[:100].replace("\n", " ")
                     logger.info(f"Markdown content: {markdown_content_lines}...")
                     filename = file_meta.get("filename") or file_id
@@ -570,8 +561,9 @@ class LightRagKB(KnowledgeBase):
             } | filtered_kwargs
             param = QueryParam(**params_dict)
 
-            # 执行查询
-            response = await rag.aquery_data(query_text, param)
+            # 执行查询，查询期间持有租约，实例不会被淘汰
+            async with self._instances.lease(db_id) as rag:
+                response = await rag.aquery_data(query_text, param)
             logger.debug(f"Query response: {str(response)[:1000]}...")
 
             if agent_call:
@@ -610,7 +602,8 @@ class LightRagKB(KnowledgeBase):
         if rag:
             try:
                 # 使用 LightRAG 删除文档
-                await rag.adelete_by_doc_id(file_id)
+                async with self._instances.lease(db_id) as rag:
+                    await rag.adelete_by_doc_id(file_id)
                 logger.info(f"Deleted chunks for file {file_id} from LightRAG")
             except Exception as e:
                 logger.error(f"Error deleting file {file_id} from LightRAG: {e}")
@@ -624,6 +617,7 @@ class LightRagKB(KnowledgeBase):
         # 删除文件记录
         if file_id in self.files_meta:
             del self.files_meta[file_id]
+            self._touch_files(db_id)
             from yuxi.repositories.knowledge_file_repository import KnowledgeFileRepository
 
             await KnowledgeFileRepository().delete(file_id)
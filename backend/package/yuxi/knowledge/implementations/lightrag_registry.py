@@ -0,0 +1,307 @@
+"""
+LightRAG 实例注册表
+
+按 db_id 常驻的 LightRAG 实例受数量上限、空闲 TTL 与内存预算三重约束，按 LRU 顺序淘汰；
+淘汰时调用 finalizer 落盘缓存并关闭 Milvus / Neo4j 连接，同一 db_id 的并发加载只执行一次。
+正在使用（持有租约或 is_busy 返回 True）的实例不会被淘汰。空闲淘汰由后台任务按间隔执行，不在请求路径上进行。
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from yuxi.utils import logger
+
+LIGHTRAG_MAX_INSTANCES = int(os.getenv("LIGHTRAG_MAX_INSTANCES", "32"))
+LIGHTRAG_INSTANCE_IDLE_TTL = float(os.getenv("LIGHTRAG_INSTANCE_IDLE_TTL", "1800"))
+LIGHTRAG_MEMORY_BUDGET_MB = float(os.getenv("LIGHTRAG_MEMORY_BUDGET_MB", "0"))
+# 后台空闲淘汰的执行间隔（秒）
+LIGHTRAG_IDLE_SWEEP_INTERVAL = float(os.getenv("LIGHTRAG_IDLE_SWEEP_INTERVAL", "60"))
+
+
+def estimate_workspace_bytes(working_dir: str) -> int:
+    """以工作目录下 JSON 存储的文件大小估算实例常驻内存（JsonKV / DocStatus 会整体载入内存）"""
+    total = 0
+    for root, _dirs, files in os.walk(working_dir):
+        for name in files:
+            if name.endswith(".json"):
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+    return total
+
+
+@dataclass
+class _Entry:
+    instance: Any
+    size_bytes: int
+    loaded_at: float
+    last_used: float
+
+
+class LightRAGInstanceRegistry:
+    """LRU + TTL 的 LightRAG 实例注册表
+
+    loader(db_id) 创建并初始化实例，失败时抛出异常；finalizer(instance) 释放实例持有的资源；
+    size_estimator(db_id, instance) 返回实例的估算字节数，用于内存预算（在线程中执行，可访问磁盘）。
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Any]],
+        finalizer: Callable[[Any], Awaitable[None]],
+        *,
+        max_instances: int | None = None,
+        idle_ttl: float | None = None,
+        memory_budget_bytes: int | None = None,
+        size_estimator: Callable[[str, Any], int] | None = None,
+        is_busy: Callable[[str], bool] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._loader = loader
+        self._finalizer = finalizer
+        self.max_instances = max(1, max_instances if max_instances is not None else LIGHTRAG_MAX_INSTANCES)
+        self.idle_ttl = LIGHTRAG_INSTANCE_IDLE_TTL if idle_ttl is None else idle_ttl
+        if memory_budget_bytes is None:
+            memory_budget_bytes = int(LIGHTRAG_MEMORY_BUDGET_MB * 1024 * 1024)
+        self.memory_budget_bytes = memory_budget_bytes
+        self._size_estimator = size_estimator or (lambda _db_id, _instance: 0)
+        self._is_busy = is_busy or (lambda _db_id: False)
+        self._clock = clock
+
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._loading: dict[str, asyncio.Future] = {}
+        self._closing: dict[str, asyncio.Task] = {}
+        self._leases: dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load_failures = 0
+        self.evictions: dict[str, int] = {"capacity": 0, "memory": 0, "idle": 0, "invalidated": 0}
+        _registries.add(self)
+
+    def __contains__(self, db_id: str) -> bool:
+        return db_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, db_id: str) -> Any | None:
+        """返回常驻实例但不更新 LRU 顺序"""
+        entry = self._entries.get(db_id)
+        return entry.instance if entry else None
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.size_bytes for entry in self._entries.values())
+
+    async def get(self, db_id: str) -> Any:
+        """获取实例，不存在时加载；同一 db_id 的并发加载共享一次 loader 调用"""
+        entry = self._entries.get(db_id)
+        if entry is not None:
+            entry.last_used = self._clock()
+            self._entries.move_to_end(db_id)
+            self.hits += 1
+            return entry.instance
+
+        future = self._loading.get(db_id)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[db_id] = future
+        try:
+            # 同一 db_id 的旧实例仍在释放时，等待其落盘后再重新加载
+            closing = self._closing.get(db_id)
+            if closing is not None:
+                await asyncio.shield(closing)
+            instance = await self._loader(db_id)
+            size_bytes = int(await asyncio.to_thread(self._size_estimator, db_id, instance) or 0)
+        except BaseException as e:
+            self.load_failures += 1
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # 标记异常已被读取，避免无人等待时出现 "exception was never retrieved"
+                future.exception()
+            raise
+        finally:
+            self._loading.pop(db_id, None)
+
+        now = self._clock()
+        self._entries[db_id] = _Entry(instance=instance, size_bytes=size_bytes, loaded_at=now, last_used=now)
+        future.set_result(instance)
+        await self._enforce_limits(protect=db_id)
+        return instance
+
+    @asynccontextmanager
+    async def lease(self, db_id: str) -> AsyncIterator[Any]:
+        """获取实例并在使用期间阻止其被淘汰"""
+        instance = await self.get(db_id)
+        self._leases[db_id] = self._leases.get(db_id, 0) + 1
+        try:
+            yield instance
+        finally:
+            remaining = self._leases.get(db_id, 1) - 1
+            if remaining > 0:
+                self._leases[db_id] = remaining
+            else:
+                self._leases.pop(db_id, None)
+
+    def _in_use(self, db_id: str) -> bool:
+        return self._leases.get(db_id, 0) > 0 or self._is_busy(db_id)
+
+    async def evict_idle(self) -> int:
+        """淘汰空闲超过 idle_ttl 的实例，返回淘汰数量"""
+        if self.idle_ttl <= 0 or not self._entries:
+            return 0
+        deadline = self._clock() - self.idle_ttl
+        expired = [
+            db_id for db_id, entry in self._entries.items() if entry.last_used <= deadline and not self._in_use(db_id)
+        ]
+        for db_id in expired:
+            await self._evict(db_id, "idle")
+        return len(expired)
+
+    async def _enforce_limits(self, protect: str | None = None) -> None:
+        while True:
+            if len(self._entries) > self.max_instances:
+                reason = "capacity"
+            elif self.memory_budget_bytes > 0 and self.resident_bytes > self.memory_budget_bytes:
+                reason = "memory"
+            else:
+                return
+            victim = next((key for key in self._entries if key != protect and not self._in_use(key)), None)
+            if victim is None:
+                logger.warning(f"LightRAG registry over {reason} limit but all resident instances are in use")
+                return
+            await self._evict(victim, reason)
+
+    async def _evict(self, db_id: str, reason: str) -> None:
+        entry = self._entries.pop(db_id, None)
+        if entry is None:
+            return
+        self.evictions[reason] = self.evictions.get(reason, 0) + 1
+        logger.info(f"Evicting LightRAG instance {db_id} ({reason}), resident={len(self._entries)}")
+        task = asyncio.create_task(self._finalize(db_id, entry.instance))
+        self._closing[db_id] = task
+        await asyncio.shield(task)
+
+    async def _finalize(self, db_id: str, instance: Any) -> None:
+        try:
+            await self._finalizer(instance)
+        except Exception as e:
+            logger.error(f"Failed to finalize LightRAG instance {db_id}: {e}")
+        finally:
+            if self._closing.get(db_id) is asyncio.current_task():
+                self._closing.pop(db_id, None)
+
+    async def evict(self, db_id: str) -> bool:
+        """立即释放指定实例（如删除知识库时）"""
+        if db_id not in self._entries:
+            return False
+        await self._evict(db_id, "invalidated")
+        return True
+
+    def invalidate(self, db_id: str) -> bool:
+        """同步上下文中移除实例，资源在后台释放，下次访问重新加载"""
+        entry = self._entries.pop(db_id, None)
+        if entry is None:
+            return False
+        self.evictions["invalidated"] += 1
+        try:
+            self._closing[db_id] = asyncio.get_running_loop().create_task(self._finalize(db_id, entry.instance))
+        except RuntimeError:
+            logger.warning(f"No running event loop, dropped LightRAG instance {db_id} without finalizing")
+        return True
+
+    async def close(self) -> None:
+        """释放全部常驻实例"""
+        for db_id in list(self._entries):
+            await self._evict(db_id, "invalidated")
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "resident": len(self._entries),
+            "max_instances": self.max_instances,
+            "idle_ttl_s": self.idle_ttl,
+            "memory_budget_bytes": self.memory_budget_bytes,
+            "resident_bytes": self.resident_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "load_failures": self.load_failures,
+            "evictions": dict(self.evictions),
+            "instances": [
+                {
+                    "db_id": db_id,
+                    "size_bytes": entry.size_bytes,
+                    "idle_s": round(now - entry.last_used, 1),
+                    "age_s": round(now - entry.loaded_at, 1),
+                    "leases": self._leases.get(db_id, 0),
+                }
+                for db_id, entry in self._entries.items()
+            ],
+        }
+
+
+# 进程内全部注册表，由同一个后台任务统一执行空闲淘汰；实例按需创建，注册表随之加入
+_registries: weakref.WeakSet[LightRAGInstanceRegistry] = weakref.WeakSet()
+
+
+async def sweep_idle_instances() -> int:
+    """对所有注册表执行一次空闲淘汰，返回淘汰数量"""
+    evicted = 0
+    for registry in list(_registries):
+        evicted += await registry.evict_idle()
+    return evicted
+
+
+async def _idle_sweep_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await sweep_idle_instances()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"LightRAG idle sweep failed: {e}")
+
+
+_idle_sweep_task: asyncio.Task | None = None
+
+
+def start_lightrag_idle_sweeper(interval: float | None = None) -> None:
+    """启动后台任务：按间隔淘汰空闲的 LightRAG 实例"""
+    global _idle_sweep_task
+    if _idle_sweep_task is not None and not _idle_sweep_task.done():
+        return
+    interval = max(1.0, LIGHTRAG_IDLE_SWEEP_INTERVAL if interval is None else interval)
+    _idle_sweep_task = asyncio.create_task(_idle_sweep_loop(interval))
+    logger.info(f"LightRAG idle sweeper started (interval={interval}s)")
+
+
+async def stop_lightrag_idle_sweeper() -> None:
+    global _idle_sweep_task
+    task, _idle_sweep_task = _idle_sweep_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
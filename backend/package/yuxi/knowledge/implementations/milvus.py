@@ -13,6 +13,7 @@ from pymilvus import (
     FieldSchema,
     Function,
     FunctionType,
+    RRFRanker,
     WeightedRanker,
     connections,
     db,
@@ -33,6 +34,23 @@ MILVUS_AVAILABLE = True
 CONTENT_SPARSE_FIELD = "content_sparse"
 CONTENT_ANALYZER_PARAMS = {"type": "chinese"}
 VECTOR_METRIC_TYPE = "COSINE"
+DEFAULT_INDEX_PROFILE = "ivf_flat"
+DEFAULT_FUSION_STRATEGY = "weighted"
+# 向量索引档位：建索引参数与对应的检索参数需要成对使用
+VECTOR_INDEX_PROFILES = {
+    "flat": {
+        "index": {"index_type": "FLAT", "params": {}},
+        "search": {},
+    },
+    "ivf_flat": {
+        "index": {"index_type": "IVF_FLAT", "params": {"nlist": 1024}},
+        "search": {"nprobe": 10},
+    },
+    "hnsw": {
+        "index": {"index_type": "HNSW", "params": {"M": 16, "efConstruction": 200}},
+        "search": {"ef": 64},
+    },
+}
 
 
 class MilvusKB(KnowledgeBase):
@@ -190,7 +208,8 @@ class MilvusKB(KnowledgeBase):
         collection = Collection(name=collection_name, schema=schema, using=self.connection_alias)
 
         # 创建索引
-        index_params = {"metric_type": VECTOR_METRIC_TYPE, "index_type": "IVF_FLAT", "params": {"nlist": 1024}}
+        index_profile = VECTOR_INDEX_PROFILES[self._get_index_profile(db_id)]
+        index_params = {"metric_type": VECTOR_METRIC_TYPE, **index_profile["index"]}
         collection.create_index("embedding", index_params)
         sparse_index_params = {
             "metric_type": "BM25",
@@ -203,6 +222,20 @@ class MilvusKB(KnowledgeBase):
 
         return collection
 
+    def _get_index_profile(self, db_id: str) -> str:
+        """读取知识库配置的向量索引档位，未知档位回退到默认值。"""
+        metadata = (self.databases_meta.get(db_id) or {}).get("metadata") or {}
+        profile = str(metadata.get("index_profile") or DEFAULT_INDEX_PROFILE).lower()
+        if profile not in VECTOR_INDEX_PROFILES:
+            logger.warning(f"Unknown index profile '{profile}' for {db_id}, using {DEFAULT_INDEX_PROFILE}")
+            profile = DEFAULT_INDEX_PROFILE
+        return profile
+
+    def _get_vector_search_params(self, db_id: str) -> dict:
+        """根据索引档位生成向量检索参数"""
+        profile = VECTOR_INDEX_PROFILES[self._get_index_profile(db_id)]
+        return {"metric_type": VECTOR_METRIC_TYPE, "params": dict(profile["search"])}
+
     def _collection_supports_bm25(self, collection: Collection) -> bool:
         """检查集合是否具备 Milvus 内置 BM25 所需的 schema。"""
         fields = {field.name: field for field in collection.schema.fields}
@@ -473,7 +506,9 @@ class MilvusKB(KnowledgeBase):
                 # 重新解析文件为 markdown
                 params["image_bucket"] = "public"
                 params["image_prefix"] = f"{db_id}/kb-images"
-                markdown_content = await Parser.aparse(source=file_path, params=params)
+                markdown_content = await Parser.aparse(
+                    source=file_path, params=params, content_hash=file_meta.get("content_hash")
+                )
 
                 # 先删除现有的 Milvus 数据（仅删除chunks，保留元数据）
                 await self.delete_file_chunks_only(db_id, file_id)
@@ -603,7 +638,7 @@ class MilvusKB(KnowledgeBase):
                 embedding_function = self._get_embedding_function(embed_info)
                 query_embedding = embedding_function([query_text])
 
-                search_params = {"metric_type": metric_type, "params": {"nprobe": 10}}
+                search_params = self._get_vector_search_params(db_id)
 
                 results = collection.search(
                     data=query_embedding,
@@ -660,11 +695,16 @@ class MilvusKB(KnowledgeBase):
                 bm25_drop_ratio_search = float(merged_kwargs.get("bm25_drop_ratio_search", 0.0))
                 vector_weight = float(merged_kwargs.get("vector_weight", 0.7))
                 bm25_weight = float(merged_kwargs.get("bm25_weight", 0.3))
+                fusion_strategy = str(merged_kwargs.get("fusion_strategy", DEFAULT_FUSION_STRATEGY)).lower()
+                if fusion_strategy == "rrf":
+                    ranker = RRFRanker(int(merged_kwargs.get("rrf_k", 60)))
+                else:
+                    ranker = WeightedRanker(vector_weight, bm25_weight)
 
                 vector_request = AnnSearchRequest(
                     data=query_embedding,
                     anns_field="embedding",
-                    param={"metric_type": metric_type, "params": {"nprobe": 10}},
+                    param=self._get_vector_search_params(db_id),
                     limit=recall_top_k,
                     expr=file_expr,
                 )
@@ -680,14 +720,15 @@ class MilvusKB(KnowledgeBase):
                 )
                 results = collection.hybrid_search(
                     reqs=[vector_request, bm25_request],
-                    rerank=WeightedRanker(vector_weight, bm25_weight),
+                    rerank=ranker,
                     limit=recall_top_k,
                     output_fields=output_fields,
                 )
                 if results and len(results) > 0 and len(results[0]) > 0:
                     for hit in results[0]:
                         score = float(hit.distance or 0.0)
-                        if score < similarity_threshold:
+                        # RRF 得分只反映排名，不适用相似度阈值
+                        if fusion_strategy != "rrf" and score < similarity_threshold:
                             continue
                         retrieved_chunks.append(
                             self._build_chunk_from_hit(hit, score, include_distances, score_field="hybrid_score")
@@ -774,6 +815,7 @@ class MilvusKB(KnowledgeBase):
         async with self._metadata_lock:
             if file_id in self.files_meta:
                 del self.files_meta[file_id]
+                self._touch_files(db_id)
                 from yuxi.repositories.knowledge_file_repository import KnowledgeFileRepository
 
                 await KnowledgeFileRepository().delete(file_id)
@@ -902,6 +944,17 @@ class MilvusKB(KnowledgeBase):
                 "max": 200,
                 "description": "BM25 全文检索和混合检索中的 BM25 候选数量",
             },
+            {
+                "key": "fusion_strategy",
+                "label": "混合检索融合策略",
+                "type": "select",
+                "default": DEFAULT_FUSION_STRATEGY,
+                "options": [
+                    {"value": "weighted", "label": "加权融合", "description": "按向量/BM25 权重融合得分"},
+                    {"value": "rrf", "label": "RRF 融合", "description": "按排名倒数融合，不依赖得分尺度"},
+                ],
+                "description": "混合检索中向量与 BM25 结果的融合方式",
+            },
             {
                 "key": "vector_weight",
                 "label": "向量检索权重",
@@ -680,6 +680,13 @@ class KnowledgeBaseManager:
             }
         return info
 
+    def get_lightrag_instance_stats(self) -> dict:
+        """获取常驻 LightRAG 实例的注册表统计（当前进程）"""
+        kb_instance = self.kb_instances.get("lightrag")
+        if kb_instance is None or not hasattr(kb_instance, "get_instance_stats"):
+            return {}
+        return kb_instance.get_instance_stats()
+
     async def get_statistics(self) -> dict:
         """获取统计信息"""
         from yuxi.repositories.knowledge_base_repository import KnowledgeBaseRepository
@@ -3,8 +3,11 @@ from yuxi.plugins.parser.base import (
     DocumentParserException,
     DocumentProcessorException,
     OCRException,
+    parse_progress_callback,
 )
+from yuxi.plugins.parser.docling_pool import get_docling_pool_stats, shutdown_docling_pool, start_docling_pool
 from yuxi.plugins.parser.factory import DocumentProcessorFactory
+from yuxi.plugins.parser.parse_cache import get_parse_cache_stats, invalidate_parse_cache
 from yuxi.plugins.parser.unified import (
     SUPPORTED_FILE_EXTENSIONS,
     MarkdownParseResult,
@@ -22,6 +25,12 @@ __all__ = [
     "MarkdownParseResult",
     "Parser",
     "SUPPORTED_FILE_EXTENSIONS",
+    "get_docling_pool_stats",
+    "get_parse_cache_stats",
+    "invalidate_parse_cache",
     "is_supported_file_extension",
+    "parse_progress_callback",
     "parse_source_to_markdown",
+    "shutdown_docling_pool",
+    "start_docling_pool",
 ]
@@ -5,8 +5,28 @@
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextvars import ContextVar
 from typing import Any
 
+from yuxi.utils import logger
+
+# 解析进度回调 (done, total)，由调用方在任务上下文中设置；asyncio.to_thread 会复制上下文到工作线程
+parse_progress_callback: ContextVar[Callable[[int, int], None] | None] = ContextVar(
+    "parse_progress_callback", default=None
+)
+
+
+def report_parse_progress(done: int, total: int) -> None:
+    """向当前上下文的进度回调报告解析进度，未设置回调时忽略"""
+    callback = parse_progress_callback.get()
+    if callback is None:
+        return
+    try:
+        callback(done, total)
+    except Exception as e:  # noqa: BLE001
+        logger.debug(f"解析进度回调失败: {e}")
+
 
 class DocumentProcessorException(Exception):
     """文档处理异常基类"""
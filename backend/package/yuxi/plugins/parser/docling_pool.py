@@ -0,0 +1,416 @@
+"""Docling 文档转换进程池。
+
+Docling 转换是 CPU 密集的同步调用，直接在事件循环上执行会阻塞整个 API 进程。
+这里把转换放到独立的子进程中：每个子进程启动时预先创建好 DocumentConverter，
+按格式限制并发，单个文档超时后强制结束子进程并补充新的子进程。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import multiprocessing
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from docling.datamodel.base_models import InputFormat
+from docling.document_converter import DocumentConverter
+
+from yuxi.plugins.parser.base import DocumentParserException
+from yuxi.utils import logger
+
+# 子进程数量，0 表示在当前进程的线程中转换（无法强制超时）
+DOCLING_WORKERS = int(os.getenv("DOCLING_WORKERS") or min(2, os.cpu_count() or 1))
+# 单个文档的转换超时（秒）
+DOCLING_TIMEOUT = float(os.getenv("DOCLING_TIMEOUT") or 300)
+# 子进程加载模型的超时（秒）
+DOCLING_STARTUP_TIMEOUT = float(os.getenv("DOCLING_STARTUP_TIMEOUT") or 120)
+# 服务启动时预先启动子进程并等待模型加载完成；关闭后进程池在首次转换时才启动
+DOCLING_PREWARM = os.getenv("DOCLING_PREWARM", "true").lower() in ("1", "true", "yes")
+# 各格式的并发上限，格式如 "pptx=1,docx=2"；未配置的格式只受进程数限制
+DOCLING_FORMAT_CONCURRENCY = os.getenv("DOCLING_FORMAT_CONCURRENCY") or "pptx=1,xls=1"
+
+ImageRef = tuple[str, bytes]
+
+
+class DoclingTimeoutError(DocumentParserException, TimeoutError):
+    """Docling 转换超时"""
+
+    pass
+
+
+def parse_format_limits(spec: str | None) -> dict[str, int]:
+    """解析 "pptx=1,docx=2" 形式的并发配置，键为带点的小写扩展名"""
+    limits: dict[str, int] = {}
+    for item in (spec or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip().lower().lstrip(".")
+        if not name or not value.strip():
+            continue
+        try:
+            limits[f".{name}"] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"忽略无效的 Docling 并发配置: {item}")
+    return limits
+
+
+def create_docling_converter() -> DocumentConverter:
+    return DocumentConverter(
+        format_options={
+            InputFormat.DOCX: None,
+            InputFormat.XLSX: None,
+            InputFormat.PPTX: None,
+        }
+    )
+
+
+def _parse_data_uri(data_uri: str) -> tuple[bytes, str]:
+    """解析 data URI，返回 (image_data, mime_type)。"""
+    header, base64_data = data_uri.split(",", 1)
+    mime_type = header.split(":")[1].split(";")[0]
+    return base64.b64decode(base64_data), mime_type
+
+
+def convert_document(converter: DocumentConverter, file_path: Path) -> tuple[str, list[ImageRef]]:
+    """转换文档，返回带 ``<!-- image -->`` 占位符的 Markdown 与按出现顺序排列的图片数据。
+
+    图片上传由调用方完成，子进程不需要访问对象存储。
+    """
+    result = converter.convert(file_path)
+    if result.status.name != "SUCCESS":
+        raise RuntimeError(f"Docling 转换失败: {result.status}")
+
+    doc = result.document
+    image_refs: list[ImageRef] = []
+    for pic in getattr(doc, "pictures", None) or []:
+        if hasattr(pic, "image") and hasattr(pic.image, "uri"):
+            uri = str(pic.image.uri)
+            if uri.startswith("data:"):
+                image_data, mime_type = _parse_data_uri(uri)
+                timestamp = int(time.time() * 1000000)
+                image_refs.append((f"image_{timestamp}.{mime_type.split('/')[-1]}", image_data))
+
+    return doc.export_to_markdown(), image_refs
+
+
+def _serve_jobs(conn, handler: Callable[[str], Any]) -> None:
+    """子进程主循环：报告就绪后逐个处理任务，收到 None 或连接断开时退出"""
+    conn.send(("ready", None))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        try:
+            conn.send(("ok", handler(job)))
+        except Exception as e:  # noqa: BLE001
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def _docling_worker_main(conn) -> None:
+    converter = create_docling_converter()
+    _serve_jobs(conn, lambda file_path: convert_document(converter, Path(file_path)))
+
+
+class _DoclingWorker:
+    """一个预热的 Docling 子进程"""
+
+    def __init__(self, ctx, target: Callable):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=target, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        self._ready_lock = threading.Lock()
+
+    def wait_ready(self, timeout: float) -> None:
+        """等待子进程加载完模型；超时抛出 TimeoutError，子进程异常退出抛出 EOFError"""
+        with self._ready_lock:
+            if self.ready:
+                return
+            if not self.conn.poll(timeout):
+                raise TimeoutError("Docling 子进程启动超时")
+            self.conn.recv()
+            self.ready = True
+
+    def run(self, file_path: str, timeout: float) -> Any:
+        """阻塞执行一次转换；超时抛出 TimeoutError，子进程异常退出抛出 EOFError"""
+        self.wait_ready(DOCLING_STARTUP_TIMEOUT)
+        self.conn.send(file_path)
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        status, payload = self.conn.recv()
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class DoclingPool:
+    """Docling 子进程池，提供按格式限流、超时强制结束与排队指标"""
+
+    def __init__(
+        self,
+        workers: int = DOCLING_WORKERS,
+        timeout: float = DOCLING_TIMEOUT,
+        format_limits: dict[str, int] | None = None,
+        worker_target: Callable = _docling_worker_main,
+        mp_context: str = "spawn",
+    ):
+        self.workers = max(0, workers)
+        self.timeout = timeout
+        self.format_limits = format_limits if format_limits is not None else {}
+        self._worker_target = worker_target
+        # 使用 spawn，避免 fork 继承主进程中的线程与事件循环状态
+        self._ctx = multiprocessing.get_context(mp_context)
+        self._lock = threading.Lock()
+        self._idle: list[_DoclingWorker] = []
+        self._all: set[_DoclingWorker] = set()
+        self._slots: asyncio.Semaphore | None = None
+        self._format_slots: dict[str, asyncio.Semaphore] = {}
+        self._inline_converter: DocumentConverter | None = None
+        self._inline_lock = threading.Lock()
+        self._closed = False
+
+        self._waiting: dict[str, int] = defaultdict(int)
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._restarts = 0
+        self._total_seconds = 0.0
+
+    def start(self) -> None:
+        """预先启动全部子进程，子进程在后台并行加载模型"""
+        with self._lock:
+            while len(self._all) < self.workers:
+                self._spawn_locked()
+
+    def warm_up(self, timeout: float = DOCLING_STARTUP_TIMEOUT) -> int:
+        """阻塞等待子进程完成模型加载，返回就绪的子进程数；启动失败的子进程会被替换"""
+        if self.workers == 0:
+            with self._inline_lock:
+                if self._inline_converter is None:
+                    self._inline_converter = create_docling_converter()
+            return 0
+        with self._lock:
+            workers = list(self._all)
+        deadline = time.monotonic() + timeout
+        ready = 0
+        for worker in workers:
+            try:
+                worker.wait_ready(max(0.0, deadline - time.monotonic()))
+            except (TimeoutError, EOFError, OSError) as e:
+                logger.warning(f"Docling 子进程预热失败，已替换: {type(e).__name__}: {e}")
+                self._replace(worker)
+                continue
+            ready += 1
+        return ready
+
+    def _spawn_locked(self) -> _DoclingWorker:
+        worker = _DoclingWorker(self._ctx, self._worker_target)
+        self._all.add(worker)
+        self._idle.append(worker)
+        return worker
+
+    def _checkout(self) -> _DoclingWorker:
+        with self._lock:
+            if not self._idle:
+                self._spawn_locked()
+            return self._idle.pop()
+
+    def _checkin(self, worker: _DoclingWorker) -> None:
+        with self._lock:
+            if self._closed:
+                worker.close()
+                self._all.discard(worker)
+            else:
+                self._idle.append(worker)
+
+    def _replace(self, worker: _DoclingWorker) -> None:
+        worker.kill()
+        with self._lock:
+            self._all.discard(worker)
+            # 预热失败的子进程仍在空闲列表中，必须一并移除，否则会被分配出去
+            if worker in self._idle:
+                self._idle.remove(worker)
+            self._restarts += 1
+            if not self._closed:
+                self._spawn_locked()
+
+    def _run_on_worker(self, file_path: str) -> Any:
+        worker = self._checkout()
+        try:
+            result = worker.run(file_path, self.timeout)
+        except TimeoutError:
+            self._replace(worker)
+            raise
+        except (EOFError, OSError) as e:
+            self._replace(worker)
+            raise RuntimeError(f"Docling 子进程异常退出: {e}") from e
+        except RuntimeError:
+            self._checkin(worker)
+            raise
+        self._checkin(worker)
+        return result
+
+    def _run_inline(self, file_path: str) -> tuple[str, list[ImageRef]]:
+        with self._inline_lock:
+            if self._inline_converter is None:
+                self._inline_converter = create_docling_converter()
+            return convert_document(self._inline_converter, Path(file_path))
+
+    def _format_slot(self, file_ext: str) -> asyncio.Semaphore | None:
+        limit = self.format_limits.get(file_ext)
+        if not limit:
+            return None
+        if file_ext not in self._format_slots:
+            self._format_slots[file_ext] = asyncio.Semaphore(limit)
+        return self._format_slots[file_ext]
+
+    async def convert(self, file_path: str | Path) -> tuple[str, list[ImageRef]]:
+        """转换文档，返回 (markdown, image_refs)；不会阻塞事件循环"""
+        file_path = str(file_path)
+        file_ext = Path(file_path).suffix.lower()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+        format_slot = self._format_slot(file_ext)
+
+        self._waiting[file_ext] += 1
+        acquired = False
+        try:
+            if format_slot is not None:
+                await format_slot.acquire()
+            try:
+                async with self._slots:
+                    self._waiting[file_ext] -= 1
+                    acquired = True
+                    self._active += 1
+                    start_time = time.monotonic()
+                    try:
+                        if self.workers == 0:
+                            result = await asyncio.to_thread(self._run_inline, file_path)
+                        else:
+                            result = await asyncio.to_thread(self._run_on_worker, file_path)
+                    except TimeoutError:
+                        self._timeouts += 1
+                        self._failed += 1
+                        logger.error(f"Docling 转换超时 ({self.timeout}s)，已终止子进程: {file_path}")
+                        raise DoclingTimeoutError(f"Docling 转换超时 ({self.timeout}s)", "docling", "timeout")
+                    except Exception:
+                        self._failed += 1
+                        raise
+                    finally:
+                        self._active -= 1
+                        self._total_seconds += time.monotonic() - start_time
+                    self._completed += 1
+                    return result
+            finally:
+                if format_slot is not None:
+                    format_slot.release()
+        finally:
+            if not acquired:
+                self._waiting[file_ext] -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total_workers = len(self._all)
+            idle_workers = len(self._idle)
+            ready_workers = sum(1 for worker in self._all if worker.ready)
+        finished = self._completed + self._failed
+        return {
+            "workers": self.workers,
+            "alive_workers": total_workers,
+            "idle_workers": idle_workers,
+            "ready_workers": ready_workers,
+            "active": self._active,
+            "queue_depth": sum(self._waiting.values()),
+            "queue_depth_by_format": {ext: count for ext, count in self._waiting.items() if count},
+            "format_limits": dict(self.format_limits),
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "restarts": self._restarts,
+            "avg_seconds": self._total_seconds / finished if finished else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = list(self._idle)
+            self._idle.clear()
+            self._all.difference_update(workers)
+        for worker in workers:
+            worker.close()
+
+
+_docling_pool: DoclingPool | None = None
+_warm_up_task: asyncio.Task | None = None
+
+
+def get_docling_pool() -> DoclingPool:
+    """获取全局 Docling 进程池；服务内由 start_docling_pool 提前启动，脚本中首次使用时才启动"""
+    global _docling_pool
+    if _docling_pool is None:
+        _docling_pool = DoclingPool(format_limits=parse_format_limits(DOCLING_FORMAT_CONCURRENCY))
+        _docling_pool.start()
+        logger.info(f"Docling 进程池已启动 (workers={_docling_pool.workers})")
+    return _docling_pool
+
+
+async def _warm_up_docling_pool(pool: DoclingPool) -> None:
+    start_time = time.monotonic()
+    try:
+        ready = await asyncio.to_thread(pool.warm_up)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Docling 进程池预热失败: {e}")
+        return
+    logger.info(f"Docling 进程池预热完成 (ready={ready}/{pool.workers}, {time.monotonic() - start_time:.1f}s)")
+
+
+def start_docling_pool() -> None:
+    """服务启动时创建进程池，并在后台等待子进程加载模型，不阻塞启动流程"""
+    global _warm_up_task
+    if not DOCLING_PREWARM or _warm_up_task is not None:
+        return
+    _warm_up_task = asyncio.create_task(_warm_up_docling_pool(get_docling_pool()))
+
+
+def get_docling_pool_stats() -> dict[str, Any]:
+    """返回 Docling 进程池指标，进程池未启动时返回空指标"""
+    if _docling_pool is None:
+        return {"workers": DOCLING_WORKERS, "started": False}
+    return _docling_pool.stats() | {"started": True}
+
+
+def shutdown_docling_pool() -> None:
+    global _docling_pool, _warm_up_task
+    if _warm_up_task is not None:
+        _warm_up_task.cancel()
+        _warm_up_task = None
+    if _docling_pool is not None:
+        _docling_pool.shutdown()
+        _docling_pool = None
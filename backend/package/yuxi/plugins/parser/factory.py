@@ -143,5 +143,10 @@ class DocumentProcessorFactory:
     @classmethod
     def clear_cache(cls):
         """清除处理器缓存"""
+        for processor in _PROCESSOR_CACHE.values():
+            # 释放处理器持有的进程池等资源
+            shutdown = getattr(processor, "shutdown", None)
+            if callable(shutdown):
+                shutdown()
         _PROCESSOR_CACHE.clear()
         logger.debug("文档处理器缓存已清除")
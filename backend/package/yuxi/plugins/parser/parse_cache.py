@@ -0,0 +1,193 @@
+"""基于内容哈希的解析结果缓存。
+
+解析（Docling / OCR / MinerU 等）是文件入库中最耗时的环节。同一份文件在重新分块、
+``update_content`` 或上传到多个知识库时内容不变，因此以
+``(content_hash, parser_kind, params_version)`` 为键把 Markdown 结果缓存到 MinIO，
+再次解析时直接复用。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from yuxi.storage.minio import StorageError, get_minio_client
+from yuxi.utils import logger
+from yuxi.utils.datetime_utils import utc_isoformat
+
+PARSE_CACHE_BUCKET = "parse-cache"
+
+# 解析器实现发生不兼容变化时递增，使旧缓存自然失效
+PARSE_CACHE_VERSION = "v1"
+
+# 会影响解析结果的参数；分块、索引等后续阶段的参数不参与缓存键
+PARSE_PARAM_KEYS: tuple[str, ...] = (
+    "enable_ocr",
+    "lang_list",
+    "backend",
+    "parse_method",
+    "enable_formula",
+    "enable_table",
+    "language",
+    "is_ocr",
+    "page_ranges",
+    "use_table_recognition",
+    "use_formula_recognition",
+    "use_seal_recognition",
+    "zoom_x",
+    "zoom_y",
+    "table_rows_per_block",
+)
+
+_OCR_EXTENSIONS = {".pdf", ".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"}
+_DOCLING_EXTENSIONS = {".docx", ".pptx", ".xls"}
+# txt/md/json/csv/html 解析成本很低，不值得占用对象存储
+CACHEABLE_EXTENSIONS = _OCR_EXTENSIONS | _DOCLING_EXTENSIONS | {".xlsx", ".doc", ".zip"}
+
+
+class ParseCacheStats:
+    """进程内缓存命中统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    def incr(self, field: str, value: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + value)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "errors": self.errors,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.writes = self.errors = self.invalidations = 0
+
+
+parse_cache_stats = ParseCacheStats()
+
+
+def resolve_parser_kind(file_ext: str, params: dict | None = None) -> str | None:
+    """根据文件类型和参数确定实际使用的解析器，不可缓存时返回 None。"""
+    file_ext = (file_ext or "").lower()
+    if file_ext not in CACHEABLE_EXTENSIONS:
+        return None
+    if file_ext in _OCR_EXTENSIONS:
+        return f"ocr-{(params or {}).get('enable_ocr') or 'disable'}"
+    if file_ext in _DOCLING_EXTENSIONS:
+        return "docling"
+    if file_ext == ".xlsx":
+        return "tabular"
+    if file_ext == ".doc":
+        return "unstructured"
+    return "zip"
+
+
+def compute_params_version(params: dict | None = None) -> str:
+    """对影响解析结果的参数求摘要，作为缓存键的一部分。"""
+    params = params or {}
+    relevant = {key: params[key] for key in PARSE_PARAM_KEYS if params.get(key) is not None}
+    payload = json.dumps({"version": PARSE_CACHE_VERSION, "params": relevant}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_cache_key(content_hash: str, source: str, params: dict | None = None) -> str | None:
+    """构造缓存对象名，不可缓存时返回 None。"""
+    if not content_hash:
+        return None
+    parser_kind = resolve_parser_kind(Path(source.split("?")[0]).suffix, params)
+    if not parser_kind:
+        return None
+    return f"{content_hash}/{parser_kind}/{compute_params_version(params)}.json"
+
+
+def _image_location(params: dict | None) -> str:
+    params = params or {}
+    image_prefix = str(params.get("image_prefix") or "").strip("/") or "unknown/kb-images"
+    return f"{params.get('image_bucket') or 'public'}/{image_prefix}"
+
+
+async def get_cached_markdown(content_hash: str | None, source: str, params: dict | None = None) -> str | None:
+    """查询解析缓存，未命中返回 None。
+
+    含图片的结果只在图片存储位置一致时复用，避免跨知识库复用后因原知识库删除而出现失效图片。
+    """
+    key = build_cache_key(content_hash or "", source, params)
+    if not key:
+        return None
+
+    minio_client = get_minio_client()
+    try:
+        if not await asyncio.to_thread(minio_client.file_exists, PARSE_CACHE_BUCKET, key):
+            parse_cache_stats.incr("misses")
+            return None
+        payload = json.loads(await minio_client.adownload_file(PARSE_CACHE_BUCKET, key))
+    except (StorageError, ValueError) as e:
+        logger.warning(f"读取解析缓存失败 {key}: {e}")
+        parse_cache_stats.incr("errors")
+        parse_cache_stats.incr("misses")
+        return None
+
+    if payload.get("has_images") and payload.get("image_location") != _image_location(params):
+        parse_cache_stats.incr("misses")
+        return None
+
+    parse_cache_stats.incr("hits")
+    logger.info(f"解析缓存命中: {key}")
+    return payload.get("markdown", "")
+
+
+async def save_cached_markdown(content_hash: str | None, source: str, params: dict | None, markdown: str) -> None:
+    """写入解析缓存，失败只记录日志，不影响解析流程。"""
+    key = build_cache_key(content_hash or "", source, params)
+    if not key:
+        return
+
+    payload = {
+        "markdown": markdown,
+        "has_images": "![" in markdown,
+        "image_location": _image_location(params),
+        "created_at": utc_isoformat(),
+    }
+    try:
+        await get_minio_client().aupload_file(
+            PARSE_CACHE_BUCKET,
+            key,
+            json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+            content_type="application/json",
+        )
+        parse_cache_stats.incr("writes")
+    except StorageError as e:
+        logger.warning(f"写入解析缓存失败 {key}: {e}")
+        parse_cache_stats.incr("errors")
+
+
+async def invalidate_parse_cache(content_hash: str | None = None) -> int:
+    """删除指定文件的解析缓存；不传 content_hash 时清空全部缓存。返回删除的对象数量。"""
+    prefix = f"{content_hash}/" if content_hash else ""
+    deleted = await get_minio_client().adelete_objects_by_prefix(PARSE_CACHE_BUCKET, prefix)
+    parse_cache_stats.incr("invalidations", deleted)
+    logger.info(f"已清理解析缓存 {prefix or '*'}: {deleted} 个对象")
+    return deleted
+
+
+def get_parse_cache_stats() -> dict[str, Any]:
+    """返回当前进程的解析缓存命中统计"""
+    return parse_cache_stats.snapshot()
@@ -4,9 +4,15 @@ RapidOCR 解析器 - 纯OCR文字识别
 使用 RapidOCR (PP-OCRv4) 进行文字识别
 """
 
+import multiprocessing
 import os
 import tempfile
+import threading
 import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 import fitz
@@ -14,16 +20,52 @@ import numpy as np
 from PIL import Image
 from rapidocr_onnxruntime import RapidOCR
 
-from yuxi.plugins.parser.base import BaseDocumentProcessor, OCRException
+from yuxi.plugins.parser.base import BaseDocumentProcessor, OCRException, report_parse_progress
 from yuxi.utils import logger
 
+# PDF 按页分片并行 OCR：进程数与每批页数，可被解析参数 ocr_workers / ocr_page_batch_size 覆盖
+RAPID_OCR_WORKERS = int(os.getenv("RAPID_OCR_WORKERS") or min(4, os.cpu_count() or 1))
+RAPID_OCR_PAGE_BATCH_SIZE = int(os.getenv("RAPID_OCR_PAGE_BATCH_SIZE") or 4)
+
+# 子进程内的 OCR 模型，由 _init_ocr_worker 加载
+_worker_ocr: RapidOCR | None = None
+
+
+def _init_ocr_worker(det_box_thresh: float, det_model_path: str, rec_model_path: str) -> None:
+    """进程池初始化：每个子进程只加载一次模型"""
+    global _worker_ocr
+    _worker_ocr = RapidOCR(det_box_thresh=det_box_thresh, det_model_path=det_model_path, rec_model_path=rec_model_path)
+
+
+def _render_page(pdf_doc: fitz.Document, page_num: int, zoom_x: float, zoom_y: float) -> Image.Image:
+    pix = pdf_doc[page_num].get_pixmap(matrix=fitz.Matrix(zoom_x, zoom_y), alpha=False)
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+
+def _ocr_to_text(ocr, image) -> str:
+    result, _ = ocr(image)
+    return "\n".join(line[1] for line in result) if result else ""
+
+
+def _ocr_page_batch(pdf_path: str, page_numbers: list[int], zoom_x: float, zoom_y: float) -> list[tuple[int, str]]:
+    """在子进程中渲染并识别一批页面，页面逐张渲染，不在内存中堆积图像"""
+    results = []
+    with fitz.open(pdf_path) as pdf_doc:
+        for page_num in page_numbers:
+            results.append((page_num, _ocr_to_text(_worker_ocr, _render_page(pdf_doc, page_num, zoom_x, zoom_y))))
+    return results
+
 
 class RapidOCRParser(BaseDocumentProcessor):
     """RapidOCR 解析器 - 使用 ONNX 模型进行文字识别"""
 
-    def __init__(self, det_box_thresh: float = 0.3):
+    def __init__(self, det_box_thresh: float = 0.3, workers: int | None = None, page_batch_size: int | None = None):
         self.ocr = None
         self.det_box_thresh = det_box_thresh
+        self.workers = max(1, workers or RAPID_OCR_WORKERS)
+        self.page_batch_size = max(1, page_batch_size or RAPID_OCR_PAGE_BATCH_SIZE)
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
         self.model_dir_root = (
             os.getenv("MODEL_DIR") if not os.getenv("RUNNING_IN_DOCKER") else os.getenv("MODEL_DIR_IN_DOCKER")
         )
@@ -175,18 +217,88 @@ class RapidOCRParser(BaseDocumentProcessor):
         except Exception as e:
             raise OCRException(f"临时图像文件创建失败: {str(e)}", self.get_service_name(), "temp_file_error")
 
-    def process_pdf(self, pdf_path: str, params: dict | None = None) -> str:
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """延迟创建 OCR 进程池，解析器实例由工厂缓存，进程池随之复用"""
+        with self._executor_lock:
+            if self._executor is None:
+                health = self.check_health()
+                if health["status"] != "healthy":
+                    raise OCRException(health["message"], self.get_service_name(), health["status"])
+
+                det_model_path, rec_model_path = self._get_model_paths()
+                # 使用 spawn，避免 fork 继承主进程中的线程与 onnxruntime 状态
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_ocr_worker,
+                    initargs=(self.det_box_thresh, det_model_path, rec_model_path),
+                )
+                logger.info(f"RapidOCR 进程池已启动 (workers={self.workers})")
+            return self._executor
+
+    def shutdown(self) -> None:
+        """关闭 OCR 进程池"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _iter_pages_inline(
+        self, pdf_path: str, total_pages: int, zoom_x: float, zoom_y: float
+    ) -> Iterator[tuple[int, str]]:
+        self._load_model()
+        with fitz.open(pdf_path) as pdf_doc:
+            for page_num in range(total_pages):
+                text = _ocr_to_text(self.ocr, _render_page(pdf_doc, page_num, zoom_x, zoom_y))
+                report_parse_progress(page_num + 1, total_pages)
+                yield page_num, text
+
+    def _iter_pages_parallel(
+        self, pdf_path: str, total_pages: int, zoom_x: float, zoom_y: float, workers: int, batch_size: int
+    ) -> Iterator[tuple[int, str]]:
+        executor = self._get_executor()
+        batches = (
+            list(range(start, min(start + batch_size, total_pages))) for start in range(0, total_pages, batch_size)
+        )
+        # 在途批次数有上限：主进程只持有文本结果，内存占用与页数无关
+        max_in_flight = workers * 2
+        pending: deque[Future] = deque()
+        done_pages = 0
+
+        def submit_next() -> None:
+            batch = next(batches, None)
+            if batch is not None:
+                pending.append(executor.submit(_ocr_page_batch, pdf_path, batch, zoom_x, zoom_y))
+
+        try:
+            for _ in range(max_in_flight):
+                submit_next()
+
+            # 按提交顺序取回结果，保证页面顺序
+            while pending:
+                page_results = pending.popleft().result()
+                submit_next()
+                for page_num, text in page_results:
+                    done_pages += 1
+                    report_parse_progress(done_pages, total_pages)
+                    yield page_num, text
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise OCRException(f"OCR 子进程异常退出: {e}", self.get_service_name(), "worker_crashed")
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def iter_pdf_pages(self, pdf_path: str, params: dict | None = None) -> Iterator[tuple[int, str]]:
         """
-        处理 PDF 文件并提取文本 (流式处理,避免内存占用)
+        按页流式识别 PDF，按页码顺序产出 (page_num, text)
 
         Args:
             pdf_path: PDF 文件路径
             params: 处理参数
-                - zoom_x: 横向缩放 (默认 2)
-                - zoom_y: 纵向缩放 (默认 2)
-
-        Returns:
-            str: 提取的文本
+                - zoom_x / zoom_y: 渲染缩放 (默认 2)
+                - ocr_workers: 并行进程数 (默认 RAPID_OCR_WORKERS，<=1 时在当前进程内顺序处理)
+                - ocr_page_batch_size: 每个任务包含的页数 (默认 RAPID_OCR_PAGE_BATCH_SIZE)
         """
         if not os.path.exists(pdf_path):
             raise OCRException(f"PDF 文件不存在: {pdf_path}", self.get_service_name(), "file_not_found")
@@ -194,34 +306,39 @@ class RapidOCRParser(BaseDocumentProcessor):
         params = params or {}
         zoom_x = params.get("zoom_x", 2)
         zoom_y = params.get("zoom_y", 2)
+        workers = min(int(params.get("ocr_workers") or self.workers), self.workers)
+        batch_size = max(1, int(params.get("ocr_page_batch_size") or self.page_batch_size))
 
-        try:
-            all_text = []
-            pdf_doc = fitz.open(pdf_path)
+        with fitz.open(pdf_path) as pdf_doc:
             total_pages = pdf_doc.page_count
 
-            logger.info(f"开始处理 PDF: {os.path.basename(pdf_path)} ({total_pages} 页)")
-
-            # 流式处理每一页,避免一次性加载所有图片到内存
-            for page_num in range(total_pages):
-                page = pdf_doc[page_num]
-
-                # 转换为图像
-                mat = fitz.Matrix(zoom_x, zoom_y)
-                pix = page.get_pixmap(matrix=mat, alpha=False)
-                img_pil = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-                # 立即处理,不保存到列表
-                text = self.process_image(img_pil)
-                all_text.append(text)
+        logger.info(
+            f"开始处理 PDF: {os.path.basename(pdf_path)} ({total_pages} 页, workers={workers}, batch={batch_size})"
+        )
+        if workers <= 1 or total_pages <= batch_size:
+            yield from self._iter_pages_inline(pdf_path, total_pages, zoom_x, zoom_y)
+        else:
+            yield from self._iter_pages_parallel(pdf_path, total_pages, zoom_x, zoom_y, workers, batch_size)
 
-                if (page_num + 1) % 10 == 0:
-                    logger.info(f"已处理 {page_num + 1}/{total_pages} 页")
+    def process_pdf(self, pdf_path: str, params: dict | None = None) -> str:
+        """
+        处理 PDF 文件并提取文本 (按页分片并行,流式汇总)
 
-            pdf_doc.close()
+        Args:
+            pdf_path: PDF 文件路径
+            params: 处理参数，见 iter_pdf_pages
 
+        Returns:
+            str: 提取的文本
+        """
+        try:
+            start_time = time.time()
+            all_text = [text for _, text in self.iter_pdf_pages(pdf_path, params)]
             result_text = "\n\n".join(all_text)
-            logger.info(f"PDF OCR 完成: {os.path.basename(pdf_path)} - {len(result_text)} 字符")
+            logger.info(
+                f"PDF OCR 完成: {os.path.basename(pdf_path)} - {len(all_text)} 页, {len(result_text)} 字符"
+                f" ({time.time() - start_time:.2f}s)"
+            )
             return result_text
 
         except OCRException:
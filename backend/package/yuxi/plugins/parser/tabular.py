@@ -0,0 +1,117 @@
+"""表格文件 (CSV / XLSX) 转 Markdown。
+
+逐行流式读取，按固定行数切成多个 Markdown 表格，每个表格重复表头，
+使分块后的每段内容都能独立理解；整个转换只遍历一次数据，内存占用与行数无关（输出文本除外）。
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any
+
+# 每个 Markdown 表格包含的数据行数，可被解析参数 table_rows_per_block 覆盖
+TABLE_ROWS_PER_BLOCK = int(os.getenv("TABLE_ROWS_PER_BLOCK") or 10)
+
+# CSV 在 UTF-8 解码失败时回退的编码（常见于 Excel 导出的中文 CSV）
+_CSV_FALLBACK_ENCODING = "gb18030"
+
+
+def _format_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, datetime | date | time):
+        value = value.isoformat()
+    text = str(value).strip()
+    if not text:
+        return ""
+    return text.replace("\r\n", " ").replace("\n", " ").replace("|", "\\|")
+
+
+def _normalize_row(row: Iterable[Any]) -> list[str]:
+    """格式化单元格并去掉行尾空单元格"""
+    cells = [_format_cell(value) for value in row]
+    while cells and not cells[-1]:
+        cells.pop()
+    return cells
+
+
+def _write_block(out: io.StringIO, header: list[str], rows: list[list[str]]) -> None:
+    width = max([len(header), *(len(row) for row in rows)])
+    padded_header = header + [""] * (width - len(header))
+    out.write("| " + " | ".join(padded_header) + " |\n")
+    out.write("|" + "---|" * width + "\n")
+    for row in rows:
+        out.write("| " + " | ".join(row + [""] * (width - len(row))) + " |\n")
+    out.write("\n")
+
+
+def _write_table(out: io.StringIO, rows: Iterator[Iterable[Any]], rows_per_block: int) -> None:
+    """以首个非空行作为表头，把其余行按 rows_per_block 切块写出"""
+    header: list[str] | None = None
+    block: list[list[str]] = []
+
+    for raw_row in rows:
+        row = _normalize_row(raw_row)
+        if not row:
+            continue
+        if header is None:
+            header = row
+            continue
+        block.append(row)
+        if len(block) >= rows_per_block:
+            _write_block(out, header, block)
+            block = []
+
+    if block:
+        _write_block(out, header, block)
+    elif header is not None and not out.tell():
+        # 只有表头的表格
+        _write_block(out, header, [])
+
+
+def _resolve_rows_per_block(params: dict | None) -> int:
+    return max(1, int((params or {}).get("table_rows_per_block") or TABLE_ROWS_PER_BLOCK))
+
+
+def _convert_csv(file_path: Path, rows_per_block: int, encoding: str) -> str:
+    out = io.StringIO()
+    with open(file_path, encoding=encoding, newline="") as f:
+        _write_table(out, csv.reader(f), rows_per_block)
+    return out.getvalue().strip()
+
+
+def convert_csv_to_markdown(file_path: str | Path, params: dict | None = None) -> str:
+    """将 CSV 转换为 Markdown 表格"""
+    file_path = Path(file_path)
+    rows_per_block = _resolve_rows_per_block(params)
+    try:
+        return _convert_csv(file_path, rows_per_block, "utf-8-sig")
+    except UnicodeDecodeError:
+        return _convert_csv(file_path, rows_per_block, _CSV_FALLBACK_ENCODING)
+
+
+def convert_xlsx_to_markdown(file_path: str | Path, params: dict | None = None) -> str:
+    """将 XLSX 转换为 Markdown，每个工作表一个二级标题"""
+    from openpyxl import load_workbook
+
+    rows_per_block = _resolve_rows_per_block(params)
+    # read_only 模式按行流式读取，不把整个工作表加载进内存
+    workbook = load_workbook(Path(file_path), read_only=True, data_only=True)
+    try:
+        sections: list[str] = []
+        for sheet in workbook.worksheets:
+            out = io.StringIO()
+            _write_table(out, sheet.iter_rows(values_only=True), rows_per_block)
+            table = out.getvalue().strip()
+            if table:
+                sections.append(f"## {sheet.title}\n\n{table}")
+        return "\n\n".join(sections)
+    finally:
+        workbook.close()
@@ -3,21 +3,20 @@
 from __future__ import annotations
 
 import asyncio
-import base64
 import os
 import re
-import tempfile
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import aiofiles
-from docling.datamodel.base_models import InputFormat
-from docling.document_converter import DocumentConverter
 from langchain_community.document_loaders import PyPDFLoader
 from markdownify import markdownify as md_convert
 
+from yuxi.plugins.parser.docling_pool import get_docling_pool
+from yuxi.plugins.parser.parse_cache import get_cached_markdown, save_cached_markdown
+from yuxi.plugins.parser.tabular import convert_csv_to_markdown, convert_xlsx_to_markdown
 from yuxi.plugins.parser.zip_utils import process_zip_file as _process_zip_file
 from yuxi.storage.minio import get_minio_client
 from yuxi.utils import logger
@@ -58,23 +57,6 @@ class MarkdownParseResult:
     artifacts: dict[str, Any] = field(default_factory=dict)
 
 
-_docling_converter: DocumentConverter | None = None
-
-
-def _get_docling_converter() -> DocumentConverter:
-    """获取 Docling 文档转换器单例。"""
-    global _docling_converter
-    if _docling_converter is None:
-        _docling_converter = DocumentConverter(
-            format_options={
-                InputFormat.DOCX: None,
-                InputFormat.XLSX: None,
-                InputFormat.PPTX: None,
-            }
-        )
-    return _docling_converter
-
-
 def _resolve_image_storage_params(params: dict | None) -> tuple[str, str]:
     params = params or {}
 
@@ -105,56 +87,28 @@ def _upload_image_to_minio(image_data: bytes, filename: str, bucket_name: str, o
     return result.url
 
 
-def _parse_data_uri(data_uri: str) -> tuple[bytes, str]:
-    """解析 data URI，返回 (image_data, mime_type)。"""
-    header, base64_data = data_uri.split(",", 1)
-    mime_type = header.split(":")[1].split(";")[0]
-    image_data = base64.b64decode(base64_data)
-    return image_data, mime_type
+async def _convert_with_docling(file_path: Path, params: dict | None = None) -> str:
+    """使用 Docling 进程池将 docx/xlsx/pptx 转换为 Markdown，并上传其中的图片。"""
+    markdown, image_refs = await get_docling_pool().convert(file_path)
+    if not image_refs:
+        return markdown
+    return await asyncio.to_thread(_replace_docling_images, markdown, image_refs, params)
 
 
-def _convert_with_docling(file_path: Path, params: dict | None = None) -> str:
-    """使用 Docling 将 docx/xlsx/pptx 转换为 Markdown。"""
-    params = params or {}
+def _replace_docling_images(markdown: str, image_refs: list[tuple[str, bytes]], params: dict | None = None) -> str:
+    """上传 Docling 提取的图片，并依次替换 Markdown 中的图片占位符。"""
     image_bucket, image_prefix = _resolve_image_storage_params(params)
 
-    converter = _get_docling_converter()
-    result = converter.convert(file_path)
-
-    if result.status.name != "SUCCESS":
-        raise RuntimeError(f"Docling 转换失败: {result.status}")
-
-    doc = result.document
-
-    if hasattr(doc, "pictures") and doc.pictures:
-        image_refs: list[tuple[str, bytes]] = []
-
-        for pic in doc.pictures:
-            if hasattr(pic, "image") and hasattr(pic.image, "uri"):
-                uri = str(pic.image.uri)
-                if uri.startswith("data:"):
-                    image_data, mime_type = _parse_data_uri(uri)
-                    timestamp = int(time.time() * 1000000)
-                    filename = f"image_{timestamp}.{mime_type.split('/')[-1]}"
-                    image_refs.append((filename, image_data))
-
-        image_urls: list[str] = []
-        for filename, image_data in image_refs:
-            try:
-                url = _upload_image_to_minio(image_data, filename, image_bucket, image_prefix)
-                image_urls.append(f"![{filename}]({url})")
-            except Exception as e:  # noqa: BLE001
-                logger.error(f"上传图片失败 {filename}: {e}")
-                image_urls.append(f"[图片: {filename}]")
-
-        markdown = doc.export_to_markdown()
-
-        for url in image_urls:
-            markdown = re.sub(r"<!--\s*image\s*-->", url, markdown, count=1)
-
-        return markdown
+    for filename, image_data in image_refs:
+        try:
+            url = _upload_image_to_minio(image_data, filename, image_bucket, image_prefix)
+            image_md = f"![{filename}]({url})"
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"上传图片失败 {filename}: {e}")
+            image_md = f"[图片: {filename}]"
+        markdown = re.sub(r"<!--\s*image\s*-->", image_md, markdown, count=1)
 
-    return doc.export_to_markdown()
+    return markdown
 
 
 def _convert_docx_with_python_docx(file_path: Path) -> str:
@@ -192,6 +146,15 @@ def _convert_docx_with_python_docx(file_path: Path) -> str:
     return "\n\n".join(blocks).strip()
 
 
+def _convert_doc_with_unstructured(file_path: Path) -> str:
+    """使用 unstructured 解析旧版 DOC。"""
+    from langchain_community.document_loaders import UnstructuredWordDocumentLoader
+
+    loader = UnstructuredWordDocumentLoader(str(file_path))
+    docs = loader.load()
+    return "\n".join(doc.page_content for doc in docs).strip()
+
+
 def pdfreader(file_path, params=None):
     """读取 PDF 文件并返回 text 文本。"""
     if isinstance(file_path, str):
@@ -268,155 +231,128 @@ async def parse_image_async(file, params=None):
 
 
 async def _process_file_to_markdown_core(
-    file_path: str, params: dict | None = None
+    file_path: str, params: dict | None = None, content_hash: str | None = None
 ) -> tuple[str, str | None, dict[str, Any]]:
     """将不同类型的文件转换为 markdown，支持本地文件和 MinIO 文件。"""
     from yuxi.knowledge.utils.kb_utils import is_minio_url, parse_minio_url
-    from yuxi.storage.minio.client import get_minio_client
+    from yuxi.storage.minio.client import StorageError, get_minio_client
+
+    if not is_minio_url(file_path):
+        return await _convert_local_file_to_markdown(Path(file_path), params=params)
+
+    logger.debug(f"Downloading file from MinIO: {file_path}")
+    original_filename = file_path.split("?")[0].split("/")[-1]
+    bucket_name, object_name = parse_minio_url(file_path)
+
+    # 流式下载到临时文件，避免大文件整体读入内存；退出上下文时自动清理临时文件
+    downloaded = False
+    try:
+        async with get_minio_client().adownload_to_tempfile(
+            bucket_name,
+            object_name,
+            suffix=Path(original_filename).suffix,
+            expected_sha256=content_hash,
+        ) as temp_path:
+            downloaded = True
+            logger.debug(f"File downloaded to temp path: {temp_path}")
+            return await _convert_local_file_to_markdown(Path(temp_path), params=params)
+    except StorageError as e:
+        if downloaded:
+            raise
+        logger.error(f"Failed to download file from MinIO: {e}")
+        raise ValueError(f"无法从MinIO下载文件: {e}")
 
-    if is_minio_url(file_path):
-        logger.debug(f"Downloading file from MinIO: {file_path}")
 
-        if "?" in file_path:
-            file_path_clean = file_path.split("?")[0]
-        else:
-            file_path_clean = file_path
+async def _convert_local_file_to_markdown(
+    file_path_obj: Path, params: dict | None = None
+) -> tuple[str, str | None, dict[str, Any]]:
+    """按扩展名将本地文件转换为 markdown。"""
+    file_ext = file_path_obj.suffix.lower()
+    artifacts: dict[str, Any] = {}
 
-        original_filename = file_path_clean.split("/")[-1]
+    if file_ext == ".pdf":
+        text = await parse_pdf_async(str(file_path_obj), params=params)
+        result = f"{text}"
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(original_filename).suffix) as temp_file:
-            temp_path = temp_file.name
+    elif file_ext in [".txt", ".md"]:
+        async with aiofiles.open(file_path_obj, encoding="utf-8") as f:
+            content = await f.read()
+        result = f"{content}"
 
+    elif file_ext == ".docx":
         try:
-            bucket_name, object_name = parse_minio_url(file_path)
-            minio_client = get_minio_client()
-            file_content = await minio_client.adownload_file(bucket_name, object_name)
+            result = await _convert_with_docling(file_path_obj, params=params)
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Docling 解析 DOCX 失败，回退到 python-docx: {file_path_obj.name}, {e}")
+            result = await asyncio.to_thread(_convert_docx_with_python_docx, file_path_obj)
 
-            async with aiofiles.open(temp_path, "wb") as f:
-                await f.write(file_content)
+    elif file_ext == ".pptx":
+        result = await _convert_with_docling(file_path_obj, params=params)
 
-            logger.debug(f"File downloaded to temp path: {temp_path}")
-            actual_file_path = temp_path
+    elif file_ext == ".doc":
+        result = await asyncio.to_thread(_convert_doc_with_unstructured, file_path_obj)
 
-        except Exception as e:  # noqa: BLE001
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-            logger.error(f"Failed to download file from MinIO: {e}")
-            raise ValueError(f"无法从MinIO下载文件: {e}")
-    else:
-        actual_file_path = file_path
+    elif file_ext in [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"]:
+        text = await parse_image_async(str(file_path_obj), params=params)
+        result = f"{text}"
 
-    file_ext: str | None = None
-    artifacts: dict[str, Any] = {}
+    elif file_ext in [".html", ".htm"]:
+        async with aiofiles.open(file_path_obj, encoding="utf-8") as f:
+            content = await f.read()
+        text = await asyncio.to_thread(md_convert, content, heading_style="ATX")
+        result = f"{text}"
 
-    try:
-        file_path_obj = Path(actual_file_path)
-        file_ext = file_path_obj.suffix.lower()
-
-        if file_ext == ".pdf":
-            text = await parse_pdf_async(str(file_path_obj), params=params)
-            result = f"{text}"
-
-        elif file_ext in [".txt", ".md"]:
-            with open(file_path_obj, encoding="utf-8") as f:
-                content = f.read()
-            result = f"{content}"
-
-        elif file_ext == ".docx":
-            try:
-                result = _convert_with_docling(file_path_obj, params=params)
-            except Exception as e:  # noqa: BLE001
-                logger.warning(f"Docling 解析 DOCX 失败，回退到 python-docx: {file_path_obj.name}, {e}")
-                result = _convert_docx_with_python_docx(file_path_obj)
-
-        elif file_ext == ".pptx":
-            result = _convert_with_docling(file_path_obj, params=params)
-
-        elif file_ext == ".doc":
-            from langchain_community.document_loaders import UnstructuredWordDocumentLoader
-
-            loader = UnstructuredWordDocumentLoader(str(file_path_obj))
-            docs = loader.load()
-            result = "\n".join(doc.page_content for doc in docs).strip()
-
-        elif file_ext in [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"]:
-            text = await parse_image_async(str(file_path_obj), params=params)
-            result = f"{text}"
-
-        elif file_ext in [".html", ".htm"]:
-            with open(file_path_obj, encoding="utf-8") as f:
-                content = f.read()
-            text = md_convert(content, heading_style="ATX")
-            result = f"{text}"
-
-        elif file_ext == ".csv":
-            import pandas as pd
-
-            df = pd.read_csv(file_path_obj)
-            markdown_content = ""
-
-            for _, row in df.iterrows():
-                row_df = pd.DataFrame([row], columns=df.columns)
-                markdown_table = row_df.to_markdown(index=False)
-                markdown_content += f"{markdown_table}\n\n"
-
-            result = markdown_content.strip()
-
-        elif file_ext in [".xls", ".xlsx"]:
-            result = _convert_with_docling(file_path_obj, params=params)
-
-        elif file_ext == ".json":
-            import json
-
-            async with aiofiles.open(file_path_obj, encoding="utf-8") as f:
-                content = await f.read()
-            data = json.loads(content)
-            json_str = json.dumps(data, ensure_ascii=False, indent=2)
-            result = f"```json\n{json_str}\n```"
-
-        elif file_ext == ".zip":
-            image_bucket, image_prefix = _resolve_image_storage_params(params)
-            zip_result = await _process_zip_file(
-                str(file_path_obj),
-                image_bucket=image_bucket,
-                image_prefix=image_prefix,
-            )
-
-            artifacts = {
-                "zip_images_info": zip_result["images_info"],
-                "zip_content_hash": zip_result["content_hash"],
-                "zip_image_bucket": image_bucket,
-                "zip_image_prefix": image_prefix,
-            }
-
-            result = zip_result["markdown_content"]
-
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-
-    except Exception:
-        if is_minio_url(file_path) and os.path.exists(actual_file_path):
-            try:
-                os.unlink(actual_file_path)
-                logger.debug(f"Cleaned up temp file: {actual_file_path}")
-            except Exception as cleanup_e:  # noqa: BLE001
-                logger.warning(f"Failed to clean up temp file {actual_file_path}: {cleanup_e}")
-        raise
+    elif file_ext == ".csv":
+        result = await asyncio.to_thread(convert_csv_to_markdown, file_path_obj, params)
+
+    elif file_ext == ".xlsx":
+        result = await asyncio.to_thread(convert_xlsx_to_markdown, file_path_obj, params)
+
+    elif file_ext == ".xls":
+        result = await _convert_with_docling(file_path_obj, params=params)
+
+    elif file_ext == ".json":
+        import json
+
+        async with aiofiles.open(file_path_obj, encoding="utf-8") as f:
+            content = await f.read()
+        data = json.loads(content)
+        json_str = json.dumps(data, ensure_ascii=False, indent=2)
+        result = f"```json\n{json_str}\n```"
+
+    elif file_ext == ".zip":
+        image_bucket, image_prefix = _resolve_image_storage_params(params)
+        zip_result = await _process_zip_file(
+            str(file_path_obj),
+            image_bucket=image_bucket,
+            image_prefix=image_prefix,
+        )
+
+        artifacts = {
+            "zip_images_info": zip_result["images_info"],
+            "zip_content_hash": zip_result["content_hash"],
+            "zip_image_bucket": image_bucket,
+            "zip_image_prefix": image_prefix,
+        }
+
+        result = zip_result["markdown_content"]
 
-    finally:
-        if is_minio_url(file_path) and os.path.exists(actual_file_path):
-            try:
-                os.unlink(actual_file_path)
-                logger.debug(f"Cleaned up temp file: {actual_file_path}")
-            except Exception as e:  # noqa: BLE001
-                logger.warning(f"Failed to clean up temp file {actual_file_path}: {e}")
+    else:
+        raise ValueError(f"Unsupported file type: {file_ext}")
 
     return result, file_ext, artifacts
 
 
-async def parse_source_to_markdown(source: str, params: dict | None = None) -> MarkdownParseResult:
-    """统一入口: 将文件解析为 Markdown（URL 解析已废弃）。"""
-    markdown, file_ext, artifacts = await _process_file_to_markdown_core(source, params=params)
+async def parse_source_to_markdown(
+    source: str, params: dict | None = None, content_hash: str | None = None
+) -> MarkdownParseResult:
+    """统一入口: 将文件解析为 Markdown（URL 解析已废弃）。
+
+    content_hash 为源文件的 SHA-256，提供时在下载 MinIO 文件过程中校验内容完整性。
+    """
+    markdown, file_ext, artifacts = await _process_file_to_markdown_core(
+        source, params=params, content_hash=content_hash
+    )
     return MarkdownParseResult(
         markdown=markdown,
         file_ext=file_ext,
@@ -428,9 +364,26 @@ class Parser:
     """Lightweight facade for converting file sources to markdown."""
 
     @staticmethod
-    async def aparse(source: str, params: dict | None = None) -> str:
-        """Asynchronously parse source content and return markdown text."""
-        parsed = await parse_source_to_markdown(source=source, params=params)
+    async def aparse(
+        source: str,
+        params: dict | None = None,
+        content_hash: str | None = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Asynchronously parse source content and return markdown text.
+
+        When ``content_hash`` is given, the content-addressed parse cache is consulted first
+        and populated after a successful parse.
+        """
+        if use_cache and content_hash:
+            cached = await get_cached_markdown(content_hash, source, params)
+            if cached is not None:
+                return cached
+
+        parsed = await parse_source_to_markdown(source=source, params=params, content_hash=content_hash)
+
+        if use_cache and content_hash:
+            await save_cached_markdown(content_hash, source, params, parsed.markdown)
         return parsed.markdown
 
     @classmethod
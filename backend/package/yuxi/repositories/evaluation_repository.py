@@ -102,6 +102,33 @@ class EvaluationRepository:
                 setattr(record, key, value)
             return record
 
+    async def commit_result_details(
+        self, task_id: str, details: list[tuple[int, dict[str, Any]]], completed_questions: int
+    ) -> None:
+        """在同一事务中写入一批详情并推进 completed_questions，作为断点续跑的提交点"""
+        if not details:
+            return
+        indexes = [query_index for query_index, _ in details]
+        async with pg_manager.get_async_session_context() as session:
+            result = await session.execute(
+                select(EvaluationResultDetail).where(
+                    (EvaluationResultDetail.task_id == task_id) & (EvaluationResultDetail.query_index.in_(indexes))
+                )
+            )
+            existing = {record.query_index: record for record in result.scalars().all()}
+            for query_index, data in details:
+                record = existing.get(query_index)
+                if record is None:
+                    session.add(EvaluationResultDetail(task_id=task_id, query_index=query_index, **data))
+                    continue
+                for key, value in data.items():
+                    setattr(record, key, value)
+
+            result = await session.execute(select(EvaluationResult).where(EvaluationResult.task_id == task_id))
+            result_row = result.scalar_one_or_none()
+            if result_row is not None:
+                result_row.completed_questions = completed_questions
+
     async def list_result_details(self, task_id: str) -> list[EvaluationResultDetail]:
         async with pg_manager.get_async_session_context() as session:
             result = await session.execute(
@@ -0,0 +1,274 @@
+"""
+仪表盘统计聚合
+
+按天（北京时间）的活跃用户、工具调用数由后台任务增量写入 dashboard_daily_rollups：
+已结束且已汇总的日期不再重复扫描明细表，每轮只重算今天、昨天（迟到数据）与尚未汇总的日期。
+接口读取已汇总的日期，当天及缺失日期用一条 GROUP BY 查询实时补齐；
+接口响应另有短 TTL 的进程内缓存。
+"""
+
+import asyncio
+import datetime as dt
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import Date, String, cast, delete, distinct, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from yuxi.storage.postgres.manager import pg_manager
+from yuxi.storage.postgres.models_business import Conversation, DashboardDailyRollup, ToolCall, User
+from yuxi.utils import logger
+from yuxi.utils.datetime_utils import shanghai_now, utc_now_naive
+
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+DASHBOARD_ROLLUP_INTERVAL = float(os.getenv("DASHBOARD_ROLLUP_INTERVAL", "300"))
+DASHBOARD_ROLLUP_BACKFILL_DAYS = int(os.getenv("DASHBOARD_ROLLUP_BACKFILL_DAYS", "30"))
+
+METRIC_ACTIVE_USERS = "active_users"
+METRIC_TOOL_CALLS = "tool_calls"
+# 标记某天已完成汇总（该天没有任何数据时也需要记录）
+ROLLUP_MARKER = "_rolled_up"
+
+# 业务时间以 UTC naive 存储，按北京时间自然日分桶
+_LOCAL_OFFSET = dt.timedelta(hours=8)
+
+
+def local_day_expr(column):
+    """把 UTC naive 时间列转换为北京时间自然日"""
+    return cast(func.date_trunc("day", column + text("INTERVAL '8 hours'")), Date)
+
+
+def local_today() -> dt.date:
+    return shanghai_now().date()
+
+
+def day_start_utc(day: dt.date) -> dt.datetime:
+    """北京时间某天 00:00 对应的 UTC naive 时间"""
+    return dt.datetime.combine(day, dt.time()) - _LOCAL_OFFSET
+
+
+def user_join_condition():
+    # Conversations may store either the numeric user primary key or the login user_id string.
+    return or_(Conversation.user_id == User.user_id, Conversation.user_id == cast(User.id, String))
+
+
+# =============================================================================
+# 明细表实时聚合（一条 GROUP BY 覆盖整个日期区间）
+# =============================================================================
+
+
+async def _active_users_by_day(db: AsyncSession, start: dt.date, end: dt.date) -> dict[tuple[dt.date, str], int]:
+    day = local_day_expr(Conversation.updated_at)
+    result = await db.execute(
+        select(day.label("day"), func.count(distinct(User.id)))
+        .select_from(Conversation)
+        .join(User, user_join_condition())
+        .filter(
+            Conversation.updated_at >= day_start_utc(start),
+            Conversation.updated_at < day_start_utc(end + dt.timedelta(days=1)),
+            User.is_deleted == 0,
+        )
+        .group_by(day)
+    )
+    return {(row_day, ""): count for row_day, count in result.all()}
+
+
+async def _tool_calls_by_day(db: AsyncSession, start: dt.date, end: dt.date) -> dict[tuple[dt.date, str], int]:
+    day = local_day_expr(ToolCall.created_at)
+    result = await db.execute(
+        select(day.label("day"), ToolCall.tool_name, func.count(ToolCall.id))
+        .filter(
+            ToolCall.created_at >= day_start_utc(start),
+            ToolCall.created_at < day_start_utc(end + dt.timedelta(days=1)),
+        )
+        .group_by(day, ToolCall.tool_name)
+    )
+    return {(row_day, tool_name or ""): count for row_day, tool_name, count in result.all()}
+
+
+_METRIC_QUERIES: dict[str, Callable[[AsyncSession, dt.date, dt.date], Awaitable[dict]]] = {
+    METRIC_ACTIVE_USERS: _active_users_by_day,
+    METRIC_TOOL_CALLS: _tool_calls_by_day,
+}
+
+
+# =============================================================================
+# 日汇总表维护
+# =============================================================================
+
+
+async def refresh_daily_rollup(db: AsyncSession, days: list[dt.date]) -> int:
+    """重算指定日期的全部指标并替换汇总行，返回写入行数"""
+    if not days:
+        return 0
+    start, end = min(days), max(days)
+    wanted = set(days)
+    rows: list[DashboardDailyRollup] = []
+    now = utc_now_naive()
+    for metric, query in _METRIC_QUERIES.items():
+        values = await query(db, start, end)
+        rows.extend(
+            DashboardDailyRollup(day=day, metric=metric, dimension=dimension, value=value, refreshed_at=now)
+            for (day, dimension), value in values.items()
+            if day in wanted
+        )
+    rows.extend(
+        DashboardDailyRollup(day=day, metric=ROLLUP_MARKER, dimension="", value=1, refreshed_at=now) for day in wanted
+    )
+    await db.execute(delete(DashboardDailyRollup).where(DashboardDailyRollup.day.in_(wanted)))
+    db.add_all(rows)
+    return len(rows)
+
+
+async def _rolled_up_days(db: AsyncSession, start: dt.date, end: dt.date) -> set[dt.date]:
+    result = await db.execute(
+        select(DashboardDailyRollup.day).where(
+            DashboardDailyRollup.metric == ROLLUP_MARKER,
+            DashboardDailyRollup.day >= start,
+            DashboardDailyRollup.day <= end,
+        )
+    )
+    return set(result.scalars().all())
+
+
+def days_to_refresh(today: dt.date, rolled_up: set[dt.date], backfill_days: int) -> list[dt.date]:
+    """今天与昨天总是重算，更早的日期只补齐尚未汇总的"""
+    start = today - dt.timedelta(days=max(backfill_days, 2) - 1)
+    days = []
+    day = start
+    while day <= today:
+        if day >= today - dt.timedelta(days=1) or day not in rolled_up:
+            days.append(day)
+        day += dt.timedelta(days=1)
+    return days
+
+
+async def run_rollup_cycle(backfill_days: int | None = None) -> int:
+    backfill_days = backfill_days or DASHBOARD_ROLLUP_BACKFILL_DAYS
+    today = local_today()
+    async with pg_manager.get_async_session_context() as db:
+        rolled_up = await _rolled_up_days(db, today - dt.timedelta(days=backfill_days), today)
+        days = days_to_refresh(today, rolled_up, backfill_days)
+        written = await refresh_daily_rollup(db, days)
+    logger.debug(f"Dashboard rollup refreshed {len(days)} days ({written} rows)")
+    return written
+
+
+async def daily_series(db: AsyncSession, metric: str, days: int) -> list[tuple[dt.date, int]]:
+    """最近 days 天（含今天）的指标日序列：已汇总的日期读汇总表，其余日期实时聚合"""
+    today = local_today()
+    start = today - dt.timedelta(days=days - 1)
+    totals: dict[dt.date, int] = {}
+
+    result = await db.execute(
+        select(DashboardDailyRollup.day, DashboardDailyRollup.metric, func.sum(DashboardDailyRollup.value))
+        .where(
+            DashboardDailyRollup.metric.in_([metric, ROLLUP_MARKER]),
+            DashboardDailyRollup.day >= start,
+            DashboardDailyRollup.day < today,
+        )
+        .group_by(DashboardDailyRollup.day, DashboardDailyRollup.metric)
+    )
+    rolled_up = set()
+    for day, row_metric, value in result.all():
+        if row_metric == ROLLUP_MARKER:
+            rolled_up.add(day)
+        else:
+            totals[day] = int(value or 0)
+
+    missing = [start + dt.timedelta(days=i) for i in range(days) if start + dt.timedelta(days=i) not in rolled_up]
+    if missing:
+        live = await _METRIC_QUERIES[metric](db, min(missing), today)
+        wanted = set(missing)
+        for day in wanted:
+            totals.pop(day, None)
+        for (day, _dimension), value in live.items():
+            if day in wanted:
+                totals[day] = totals.get(day, 0) + value
+
+    return [(start + dt.timedelta(days=i), totals.get(start + dt.timedelta(days=i), 0)) for i in range(days)]
+
+
+async def _rollup_loop() -> None:
+    while True:
+        try:
+            await run_rollup_cycle()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Dashboard rollup refresh failed: {e}")
+        await asyncio.sleep(DASHBOARD_ROLLUP_INTERVAL)
+
+
+_rollup_task: asyncio.Task | None = None
+
+
+def start_dashboard_rollup_refresher() -> None:
+    """启动后台任务：补齐并持续刷新仪表盘日汇总表"""
+    global _rollup_task
+    if _rollup_task is not None and not _rollup_task.done():
+        return
+    _rollup_task = asyncio.create_task(_rollup_loop())
+    logger.info(f"Dashboard rollup refresher started (interval={DASHBOARD_ROLLUP_INTERVAL}s)")
+
+
+async def stop_dashboard_rollup_refresher() -> None:
+    global _rollup_task
+    task, _rollup_task = _rollup_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+# =============================================================================
+# 响应缓存
+# =============================================================================
+
+
+class TTLResponseCache:
+    """短 TTL 的响应缓存，同一 key 的并发请求只计算一次"""
+
+    def __init__(self, ttl: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl = DASHBOARD_CACHE_TTL if ttl is None else ttl
+        self._clock = clock
+        self._entries: dict[str, tuple[float, Any]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if self.ttl <= 0:
+            return await compute()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._clock():
+            return entry[1]
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+dashboard_cache = TTLResponseCache()
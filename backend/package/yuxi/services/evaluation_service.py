@@ -8,6 +8,7 @@ from typing import Any
 from yuxi.knowledge import knowledge_base
 from yuxi.knowledge.eval.benchmark_generation import dump_benchmark_item, iter_generated_benchmark_items
 from yuxi.knowledge.eval.evaluator import aggregate_metrics, evaluate_question
+from yuxi.knowledge.eval.executor import ModelRateLimits, run_ordered_evaluation, split_detail_metrics
 from yuxi.models import select_model
 from yuxi.repositories.evaluation_repository import EvaluationRepository
 from yuxi.repositories.knowledge_base_repository import KnowledgeBaseRepository
@@ -372,7 +373,11 @@ class EvaluationService:
                 logger.error(f"获取知识库检索配置失败: {e}")
                 # 使用空配置作为默认值
 
-            # 合并前端传递的模型配置
+            # 合并前端传递的模型配置，并发度与限流配置只用于执行器，不透传给检索
+            model_config = dict(model_config or {})
+            execution = {
+                key: model_config.pop(key) for key in ("eval_concurrency", "model_rate_limits") if key in model_config
+            }
             if model_config:
                 retrieval_config.update(model_config)
 
@@ -401,6 +406,7 @@ class EvaluationService:
                     "db_id": db_id,
                     "benchmark_id": benchmark_id,
                     "retrieval_config": retrieval_config,
+                    "execution": execution,
                     "created_by": created_by,
                 },
                 coroutine=self._run_evaluation_task,
@@ -412,6 +418,41 @@ class EvaluationService:
             logger.error(f"启动评估失败: {e}")
             raise
 
+    async def resume_evaluation(self, db_id: str, task_id: str, execution: dict[str, Any] | None = None) -> str:
+        """从最后一次提交的题目继续未完成的评估"""
+        if not re.match(r"^eval_[a-f0-9]{8}$", task_id):
+            raise ValueError("Invalid task_id format")
+        row = await self.eval_repo.get_result(task_id)
+        if row is None or row.db_id != db_id:
+            raise ValueError("Result not found")
+        if row.status == "completed":
+            raise ValueError("Evaluation already completed")
+        # 仍在执行或排队的评估不能续跑，否则两个任务会并发写入同一份结果
+        if row.status in ("running", "pending"):
+            raise ValueError("Evaluation is still running")
+        if await tasker.find_active_task("rag_evaluation", task_id=task_id):
+            raise ValueError("Evaluation is still running")
+        benchmark_row = await self.eval_repo.get_benchmark(row.benchmark_id)
+        if benchmark_row is None:
+            raise ValueError("Benchmark not found")
+
+        await self.eval_repo.update_result(task_id, {"status": "running", "completed_at": None})
+        await tasker.enqueue(
+            name=f"RAG评估({benchmark_row.name})",
+            task_type="rag_evaluation",
+            payload={
+                "task_id": task_id,
+                "db_id": db_id,
+                "benchmark_id": row.benchmark_id,
+                "retrieval_config": row.retrieval_config or {},
+                "execution": execution or {},
+                "created_by": row.created_by,
+                "resume": True,
+            },
+            coroutine=self._run_evaluation_task,
+        )
+        return task_id
+
     async def _run_evaluation_task(self, context: TaskContext):
         """运行评估任务"""
         try:
@@ -448,6 +489,10 @@ class EvaluationService:
             if kb_instance.kb_type == "lightrag":
                 raise ValueError("暂不支持对 LightRAG 类型的知识库进行 RAG 评估")
 
+            execution = payload.get("execution") or {}
+            rate_limits = ModelRateLimits(execution.get("model_rate_limits"))
+            select_model_fn = rate_limits.wrap_select(select_model)
+
             # 初始化 Judge LLM
             judge_llm = None
             if benchmark_row.has_gold_answers:
@@ -456,7 +501,7 @@ class EvaluationService:
                 if judge_model_spec:
                     try:
                         logger.debug(f"Initializing Judge LLM: {judge_model_spec}")
-                        judge_llm = select_model(model_spec=judge_model_spec)
+                        judge_llm = select_model_fn(model_spec=judge_model_spec)
                     except Exception as e:
                         logger.error(f"Failed to load judge LLM: {e}")
 
@@ -464,6 +509,12 @@ class EvaluationService:
             all_retrieval_metrics = []
             all_answer_metrics = []
 
+            def collect_metrics(question_data: dict, retrieval_scores: dict, answer_scores: dict) -> None:
+                if benchmark_row.has_gold_chunks and question_data.get("gold_chunk_ids"):
+                    all_retrieval_metrics.append(retrieval_scores)
+                if benchmark_row.has_gold_answers and question_data.get("gold_answer") and judge_llm:
+                    all_answer_metrics.append(answer_scores)
+
             async def update_result_db(
                 status: str | None = None, completed: int | None = None, metrics=None, final_score=None
             ):
@@ -481,12 +532,18 @@ class EvaluationService:
                 if payload:
                     await self.eval_repo.update_result(task_id, payload)
 
-            for i, question_data in enumerate(benchmark_data):
-                await context.raise_if_cancelled()
-                progress = 10 + (i / total_questions) * 80
-                await context.set_progress(progress, f"评估 {i + 1}/{total_questions}")
-
-                question_result = await evaluate_question(
+            # 断点续跑：completed_questions 与详情在同一事务提交，从该位置继续并恢复已完成题目的指标
+            start_index = 0
+            if payload.get("resume"):
+                result_row = await self.eval_repo.get_result(task_id)
+                start_index = min(result_row.completed_questions or 0, total_questions) if result_row else 0
+                for detail in await self.eval_repo.list_result_details(task_id):
+                    if detail.query_index < start_index:
+                        collect_metrics(benchmark_data[detail.query_index], *split_detail_metrics(detail.metrics))
+                logger.info(f"Resuming evaluation {task_id} from question {start_index}/{total_questions}")
+
+            async def evaluate(_query_index: int, question_data: dict) -> dict:
+                return await evaluate_question(
                     kb_instance=kb_instance,
                     db_id=db_id,
                     question_data=question_data,
@@ -494,31 +551,44 @@ class EvaluationService:
                     has_gold_chunks=benchmark_row.has_gold_chunks,
                     has_gold_answers=benchmark_row.has_gold_answers,
                     judge_llm=judge_llm,
-                    select_model_fn=select_model,
+                    select_model_fn=select_model_fn,
                 )
 
-                if benchmark_row.has_gold_chunks and question_data.get("gold_chunk_ids"):
-                    all_retrieval_metrics.append(question_result["retrieval_scores"])
-                if benchmark_row.has_gold_answers and question_data.get("gold_answer") and judge_llm:
-                    all_answer_metrics.append(question_result["answer_scores"])
-
-                await self.eval_repo.upsert_result_detail(
-                    task_id=task_id,
-                    query_index=i,
-                    data=question_result["detail"],
+            async def commit(batch: list[tuple[int, dict, dict]]) -> None:
+                for _query_index, question_data, question_result in batch:
+                    collect_metrics(
+                        question_data, question_result["retrieval_scores"], question_result["answer_scores"]
+                    )
+                completed = batch[-1][0] + 1
+                await self.eval_repo.commit_result_details(
+                    task_id,
+                    [(query_index, question_result["detail"]) for query_index, _, question_result in batch],
+                    completed_questions=completed,
                 )
 
                 current_overall_metrics, _ = aggregate_metrics(all_retrieval_metrics, all_answer_metrics)
                 await context.set_result(
                     {
                         "current_metrics": current_overall_metrics,
-                        "completed_questions": i + 1,
+                        "completed_questions": completed,
                         "total_questions": total_questions,
                     }
                 )
+                await context.set_progress(
+                    10 + (completed / total_questions) * 80, f"评估 {completed}/{total_questions}"
+                )
 
-                if (i + 1) % 5 == 0 or (i + 1) == total_questions:
-                    await update_result_db(completed=i + 1)
+            await context.set_progress(
+                10 + (start_index / total_questions) * 80 if total_questions else 10,
+                f"评估 {start_index}/{total_questions}",
+            )
+            await run_ordered_evaluation(
+                ((i, benchmark_data[i]) for i in range(start_index, total_questions)),
+                evaluate,
+                commit,
+                concurrency=execution.get("eval_concurrency"),
+                before_each=context.raise_if_cancelled,
+            )
 
             await context.set_progress(95, "计算最终指标")
             overall_metrics, overall_score = aggregate_metrics(
@@ -10,9 +10,12 @@ Responsibilities:
 import asyncio
 import hashlib
 import json
+import os
 import re
+import time
 import traceback
 from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Any, cast
 
 from langchain_mcp_adapters.client import MultiServerMCPClient
@@ -25,17 +28,55 @@ from yuxi.utils import logger
 # === Global Cache & State ===
 # =============================================================================
 
-# Global Lock for MCP state
-_mcp_lock = asyncio.Lock()
-
-# 本地仅缓存工具对象。配置始终以数据库为准，每次按 server_name 现查。
-# cache key 使用 server_name:config_hash，当配置变化时会自然失效。
-_mcp_tools_cache: dict[str, list[Callable[..., Any]]] = {}
+# 工具缓存的新鲜期（秒），过期后先返回旧结果，同时在后台刷新
+MCP_TOOLS_TTL = float(os.getenv("MCP_TOOLS_TTL") or 300)
+# 单个服务器工具发现的超时（秒）
+MCP_DISCOVERY_TIMEOUT = float(os.getenv("MCP_DISCOVERY_TIMEOUT") or 20)
+# 连续失败多少次后熔断
+MCP_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("MCP_CIRCUIT_FAILURE_THRESHOLD") or 3)
+# 熔断后的冷却时间（秒），冷却期内不再连接该服务器
+MCP_CIRCUIT_COOLDOWN = float(os.getenv("MCP_CIRCUIT_COOLDOWN") or 60)
+# 后台刷新间隔（秒）
+MCP_REFRESH_INTERVAL = float(os.getenv("MCP_REFRESH_INTERVAL") or 120)
+
+
+@dataclass
+class _MCPServerState:
+    """单个 MCP 服务器的工具缓存与健康状态"""
+
+    # 本地仅缓存工具对象。配置始终以数据库为准，每次按 server_name 现查。
+    # cache_key 使用 server_name:config_hash，当配置变化时会自然失效。
+    cache_key: str | None = None
+    tools: list[Callable[..., Any]] | None = None
+    loaded_at: float = 0.0
+    refreshed_at: float | None = None
+    last_duration: float = 0.0
+    loads: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_error: str | None = None
+    last_failed_at: float | None = None
+    circuit_key: str | None = None
+    circuit_open_until: float = 0.0
+    inflight: asyncio.Task | None = None
+    inflight_key: str | None = None
+
+    def age(self) -> float | None:
+        return time.monotonic() - self.loaded_at if self.tools is not None else None
+
+    def circuit_open(self, cache_key: str) -> bool:
+        return self.circuit_key == cache_key and time.monotonic() < self.circuit_open_until
+
+
+# 按服务器名保存状态；同一服务器同一时刻只有一个加载任务，其余调用方复用该任务
+_mcp_servers: dict[str, _MCPServerState] = {}
 
 # MCP tools statistics (for reporting enabled/disabled counts)
 _mcp_tools_stats: dict[str, dict[str, int]] = {}
 _UNSET = object()
 
+_refresh_task: asyncio.Task | None = None
+
 # Default MCP Server configurations (Imported to DB on first run)
 _DEFAULT_MCP_SERVERS = {
     "sequentialthinking": {
@@ -213,6 +254,111 @@ async def get_enabled_mcp_server_names(*, db: AsyncSession | None = None) -> lis
     return list(configs.keys())
 
 
+def _config_cache_key(server_name: str, server_config: dict[str, Any]) -> str:
+    # 配置 hash 直接基于完整配置生成。只要数据库中的配置发生变化，
+    # 本地工具缓存 key 就会变化，从而自然触发重建。
+    config_payload = json.dumps(server_config, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+    config_hash = hashlib.sha256(config_payload.encode("utf-8")).hexdigest()[:16]
+    return f"{server_name}:{config_hash}"
+
+
+async def _discover_server_tools(server_name: str, server_config: dict[str, Any]) -> list[Callable[..., Any]]:
+    """连接 MCP 服务器获取全部工具并补充唯一 id，超时或失败时抛出异常"""
+    # disabled_tools 只影响返回值过滤，不参与 MCP client 建连参数。
+    client_config = {k: v for k, v in server_config.items() if k not in ("disabled_tools",)}
+
+    client = await get_mcp_client({server_name: client_config})
+    if client is None:
+        raise RuntimeError("Failed to initialize MCP client")
+
+    raw_tools = cast(list[Any], await asyncio.wait_for(client.get_tools(), timeout=MCP_DISCOVERY_TIMEOUT))
+
+    server_cc = to_camel_case(server_name)
+    processed_tools: list[Callable[..., Any]] = []
+    for tool in raw_tools:
+        unique_id = f"mcp__{server_cc}__{to_camel_case(tool.name)}"
+        if tool.metadata is None:
+            tool.metadata = {}
+        tool.metadata["id"] = unique_id
+        processed_tools.append(tool)
+    return processed_tools
+
+
+async def _refresh_server_tools(
+    state: _MCPServerState, server_name: str, server_config: dict[str, Any], cache_key: str
+) -> list[Callable[..., Any]] | None:
+    """加载一次工具并更新服务器状态，失败时记录错误并返回 None"""
+    start_time = time.monotonic()
+    try:
+        tools = await _discover_server_tools(server_name, server_config)
+    except Exception as e:
+        state.last_duration = time.monotonic() - start_time
+        state.failures += 1
+        state.consecutive_failures += 1
+        state.last_error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        state.last_failed_at = time.time()
+        if state.consecutive_failures >= MCP_CIRCUIT_FAILURE_THRESHOLD:
+            state.circuit_key = cache_key
+            state.circuit_open_until = time.monotonic() + MCP_CIRCUIT_COOLDOWN
+            logger.warning(
+                f"MCP server '{server_name}' failed {state.consecutive_failures} times in a row, "
+                f"circuit opened for {MCP_CIRCUIT_COOLDOWN}s"
+            )
+        logger.error(f"Failed to load tools from MCP server '{server_name}': {state.last_error}")
+        return None
+
+    state.last_duration = time.monotonic() - start_time
+    state.cache_key = cache_key
+    state.tools = tools
+    state.loaded_at = time.monotonic()
+    state.refreshed_at = time.time()
+    state.loads += 1
+    state.consecutive_failures = 0
+    state.circuit_key = None
+    state.circuit_open_until = 0.0
+
+    # 加载期间缓存被清除（配置被修改）时不再回写统计
+    if _mcp_servers.get(server_name) is state:
+        global_config_disabled = server_config.get("disabled_tools") or []
+        enabled_count = len([t for t in tools if t.name not in global_config_disabled])
+        _mcp_tools_stats[server_name] = {
+            "total": len(tools),
+            "enabled": enabled_count,
+            "disabled": len(tools) - enabled_count,
+        }
+
+    logger.info(
+        f"Refreshed MCP tools cache for '{server_name}' with key '{cache_key}': "
+        f"{len(tools)} tools loaded in {state.last_duration:.2f}s."
+    )
+    return tools
+
+
+def _start_load(server_name: str, server_config: dict[str, Any], cache_key: str) -> asyncio.Task:
+    """启动（或复用进行中的）加载任务，保证同一服务器同一配置只连接一次"""
+    state = _mcp_servers.setdefault(server_name, _MCPServerState())
+    task = state.inflight
+    if (
+        task is not None
+        and not task.done()
+        and state.inflight_key == cache_key
+        and task.get_loop() is asyncio.get_running_loop()
+    ):
+        return task
+
+    task = asyncio.create_task(_refresh_server_tools(state, server_name, server_config, cache_key))
+    state.inflight = task
+    state.inflight_key = cache_key
+
+    def _done(finished: asyncio.Task) -> None:
+        if state.inflight is finished:
+            state.inflight = None
+            state.inflight_key = None
+
+    task.add_done_callback(_done)
+    return task
+
+
 async def get_mcp_tools(
     server_name: str,
     additional_servers: dict[str, dict[str, Any]] | None = None,
@@ -223,8 +369,10 @@ async def get_mcp_tools(
     """Get MCP tools for a specific server.
 
     Architecture:
-    1. Fetching: Connects to MCP server to get ALL tools.
-    2. Caching: Stores the FULL, UNFILTERED list of tools in `_mcp_tools_cache`.
+    1. Fetching: Connects to MCP server to get ALL tools (bounded by MCP_DISCOVERY_TIMEOUT).
+    2. Caching: Stores the FULL, UNFILTERED list of tools per server. Entries older than
+       MCP_TOOLS_TTL are served stale while a background refresh runs; servers that keep
+       failing are skipped until their circuit cooldown ends.
     3. Filtering: Filters the return value based on `disabled_tools` argument.
 
     Args:
@@ -243,67 +391,34 @@ async def get_mcp_tools(
         logger.warning(f"MCP server '{server_name}' not found in database or disabled")
         return []
 
-    # 配置 hash 直接基于完整配置生成。只要数据库中的配置发生变化，
-    # 本地工具缓存 key 就会变化，从而自然触发重建。
-    config_payload = json.dumps(server_config, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
-    config_hash = hashlib.sha256(config_payload.encode("utf-8")).hexdigest()[:16]
-    cache_key = f"{server_name}:{config_hash}"
-
-    all_processed_tools: list[Callable[..., Any]] = []
+    cache_key = _config_cache_key(server_name, server_config)
 
-    async with _mcp_lock:
-        if not force_refresh and cache and cache_key in _mcp_tools_cache:
-            all_processed_tools = _mcp_tools_cache[cache_key]
-
-    if not all_processed_tools:
+    if not cache:
         try:
-            # disabled_tools 只影响返回值过滤，不参与 MCP client 建连参数。
-            client_config = {k: v for k, v in server_config.items() if k not in ("disabled_tools",)}
-
-            client = await get_mcp_client({server_name: client_config})
-            if client is None:
-                return []
-
-            raw_tools = cast(list[Any], await client.get_tools())
-
-            server_cc = to_camel_case(server_name)
-            for tool in raw_tools:
-                original_name = tool.name
-                tool_cc = to_camel_case(original_name)
-                unique_id = f"mcp__{server_cc}__{tool_cc}"
-
-                if tool.metadata is None:
-                    tool.metadata = {}
-                tool.metadata["id"] = unique_id
-                all_processed_tools.append(tool)
-
-            if cache:
-                async with _mcp_lock:
-                    stale_keys = [
-                        key for key in _mcp_tools_cache if key.startswith(f"{server_name}:") and key != cache_key
-                    ]
-                    for stale_key in stale_keys:
-                        _mcp_tools_cache.pop(stale_key, None)
-                    _mcp_tools_cache[cache_key] = all_processed_tools
-
-                global_config_disabled = server_config.get("disabled_tools") or []
-                enabled_count = len([t for t in all_processed_tools if t.name not in global_config_disabled])
-                _mcp_tools_stats[server_name] = {
-                    "total": len(all_processed_tools),
-                    "enabled": enabled_count,
-                    "disabled": len(all_processed_tools) - enabled_count,
-                }
-
-                logger.info(
-                    f"Refreshed MCP tools cache for '{server_name}' with key '{cache_key}': "
-                    f"{len(all_processed_tools)} tools loaded."
-                )
-
+            all_processed_tools = await _discover_server_tools(server_name, server_config)
         except Exception as e:
             logger.error(
                 f"Failed to load tools from MCP server '{server_name}': {e}, traceback: {traceback.format_exc()}"
             )
             return []
+    else:
+        state = _mcp_servers.setdefault(server_name, _MCPServerState())
+        cached = state.tools if state.cache_key == cache_key else None
+
+        if cached is not None and not force_refresh:
+            # stale-while-revalidate：过期的缓存照常返回，刷新放到后台
+            if state.age() > MCP_TOOLS_TTL and not state.circuit_open(cache_key):
+                _start_load(server_name, server_config, cache_key)
+            all_processed_tools = cached
+        elif state.circuit_open(cache_key) and not force_refresh:
+            logger.debug(f"MCP server '{server_name}' circuit is open, skip tool discovery")
+            return []
+        else:
+            # shield 避免调用方取消时中断其他调用方共享的加载任务
+            loaded = await asyncio.shield(_start_load(server_name, server_config, cache_key))
+            if loaded is None:
+                return []
+            all_processed_tools = loaded
 
     # 3. Filtering (Apply to Return Value Only)
     if disabled_tools:
@@ -318,29 +433,84 @@ async def get_mcp_tools(
 
 
 async def get_tools_from_all_servers() -> list[Callable[..., Any]]:
-    """Get all tools from all configured MCP servers."""
+    """Get all tools from all configured MCP servers (servers are loaded concurrently)."""
     server_configs = await _load_enabled_mcp_server_configs()
-    all_tools = []
-    for server_name in server_configs:
-        tools = await get_mcp_tools(server_name, additional_servers=server_configs)
-        all_tools.extend(tools)
-    return all_tools
+    results = await asyncio.gather(
+        *(get_mcp_tools(server_name, additional_servers=server_configs) for server_name in server_configs)
+    )
+    return [tool for tools in results for tool in tools]
+
+
+async def refresh_mcp_tools_cache(*, stale_only: bool = True) -> dict[str, int]:
+    """并发刷新所有启用服务器的工具缓存，返回各服务器的工具数量。
+
+    stale_only 为 True 时只刷新从未加载、配置已变化或超过刷新间隔的服务器；熔断中的服务器会被跳过。
+    已不再启用的服务器会从缓存中移除。
+    """
+    server_configs = await _load_enabled_mcp_server_configs()
+    for server_name in set(_mcp_servers) - set(server_configs):
+        clear_mcp_server_tools_cache(server_name)
+
+    tasks: dict[str, asyncio.Task] = {}
+    for server_name, server_config in server_configs.items():
+        cache_key = _config_cache_key(server_name, server_config)
+        state = _mcp_servers.get(server_name)
+        if state is not None:
+            if state.circuit_open(cache_key):
+                continue
+            age = state.age() if state.cache_key == cache_key else None
+            if stale_only and age is not None and age < MCP_REFRESH_INTERVAL:
+                continue
+        tasks[server_name] = _start_load(server_name, server_config, cache_key)
+
+    results = await asyncio.gather(*tasks.values())
+    return {name: len(tools) for name, tools in zip(tasks, results) if tools is not None}
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            loaded = await refresh_mcp_tools_cache()
+            if loaded:
+                logger.debug(f"MCP tools cache refreshed: {loaded}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"MCP tools background refresh failed: {e}")
+        await asyncio.sleep(MCP_REFRESH_INTERVAL)
+
+
+def start_mcp_tools_refresher() -> None:
+    """启动后台任务：立即并发预热所有启用服务器的工具，之后按间隔刷新"""
+    global _refresh_task
+    if _refresh_task is not None and not _refresh_task.done():
+        return
+    _refresh_task = asyncio.create_task(_refresh_loop())
+    logger.info(f"MCP tools refresher started (interval={MCP_REFRESH_INTERVAL}s, ttl={MCP_TOOLS_TTL}s)")
+
+
+async def stop_mcp_tools_refresher() -> None:
+    global _refresh_task
+    task, _refresh_task = _refresh_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
 
 
 def clear_mcp_cache() -> None:
     """Clear the MCP tools cache (useful for testing)."""
-    global _mcp_tools_cache, _mcp_tools_stats
-    _mcp_tools_cache = {}
+    global _mcp_servers, _mcp_tools_stats
+    _mcp_servers = {}
     _mcp_tools_stats = {}
 
 
 def clear_mcp_server_tools_cache(server_name: str) -> None:
-    """Clear the tools cache for a specific MCP server."""
-    global _mcp_tools_cache, _mcp_tools_stats
-    server_prefix = f"{server_name}:"
-    stale_keys = [key for key in _mcp_tools_cache if key.startswith(server_prefix)]
-    for stale_key in stale_keys:
-        _mcp_tools_cache.pop(stale_key, None)
+    """Clear the tools cache (and circuit state) for a specific MCP server."""
+    _mcp_servers.pop(server_name, None)
     _mcp_tools_stats.pop(server_name, None)
     logger.info(f"Cleared tools cache for MCP server '{server_name}'")
 
@@ -354,6 +524,31 @@ def get_mcp_tools_stats(server_name: str) -> dict[str, int] | None:
     return _mcp_tools_stats.get(server_name)
 
 
+def get_mcp_registry_stats() -> dict[str, dict[str, Any]]:
+    """返回每个服务器的缓存年龄、加载耗时、失败次数与熔断状态"""
+    now = time.monotonic()
+    stats: dict[str, dict[str, Any]] = {}
+    for server_name, state in _mcp_servers.items():
+        age = state.age()
+        open_for = state.circuit_open_until - now
+        stats[server_name] = {
+            "tools": len(state.tools) if state.tools is not None else None,
+            "cache_age_seconds": round(age, 3) if age is not None else None,
+            "stale": age is not None and age > MCP_TOOLS_TTL,
+            "refreshed_at": state.refreshed_at,
+            "refreshing": state.inflight is not None and not state.inflight.done(),
+            "last_duration_seconds": round(state.last_duration, 3),
+            "loads": state.loads,
+            "failures": state.failures,
+            "consecutive_failures": state.consecutive_failures,
+            "last_error": state.last_error,
+            "last_failed_at": state.last_failed_at,
+            "circuit_open": open_for > 0,
+            "circuit_retry_in_seconds": round(open_for, 3) if open_for > 0 else 0.0,
+        }
+    return stats
+
+
 # =============================================================================
 # === Server Config CRUD (Existing in mcp_service.py) ===
 # =============================================================================
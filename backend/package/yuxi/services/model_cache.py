@@ -1,7 +1,8 @@
 """模型缓存服务 - 基于 Redis 的跨进程模型信息缓存。
 
-本模块将数据库中的 model_providers 表数据序列化到 Redis，
-供 API 和 Worker 等多进程同步读取，避免在同步函数中查询异步数据库。
+本模块将数据库中的 model_providers 表数据按供应商写入 Redis 哈希，
+每次变更递增版本号并通过 pub/sub 广播，API 与 Worker 进程订阅后只拉取变更的供应商，
+在本地维护一份不可变快照，查询时直接读字典，不在请求路径上访问 Redis。
 
 v2 模型 spec 格式: provider_id:model_id（冒号分隔）
 v1 模型 spec 格式: provider/model_name（斜杠分隔）
@@ -9,6 +10,7 @@ v1 模型 spec 格式: provider/model_name（斜杠分隔）
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import time
@@ -17,9 +19,17 @@ from typing import Any
 
 from yuxi.utils.logging_config import logger
 
-REDIS_CACHE_KEY = "yuxi:model_cache:v2"
+# provider_id -> 该供应商下全部模型的 JSON 列表
+REDIS_PROVIDERS_KEY = "yuxi:model_cache:v3:providers"
+# 全局版本号，每次 rebuild 有变更时递增
+REDIS_VERSION_KEY = "yuxi:model_cache:v3:version"
+# 变更广播频道，消息体为 {"version": int, "changed": [...], "removed": [...]}
+REDIS_EVENTS_CHANNEL = "yuxi:model_cache:v3:events"
 _DEFAULT_REDIS_URL = "redis://redis:6379/0"
-_CACHE_TTL_SECONDS = 5
+# 订阅断开后的重连间隔（秒）
+_RESUBSCRIBE_DELAY_SECONDS = 1.0
+# 查询时补加载快照失败后的重试间隔（秒）
+_LOAD_RETRY_SECONDS = 5.0
 
 
 def is_v2_spec_format(spec: str) -> bool:
@@ -97,70 +107,216 @@ class ModelInfo:
         )
 
 
-class ModelCache:
-    """基于 Redis 的模型缓存，所有写入均走 Redis，保证跨进程一致。
+def _provider_models_payload(models: list[ModelInfo]) -> str:
+    return json.dumps([info.to_dict() for info in models], ensure_ascii=False, sort_keys=True)
+
+
+def _decode_provider_models(raw: str | None) -> list[ModelInfo]:
+    if not raw:
+        return []
+    return [ModelInfo.from_dict(data) for data in json.loads(raw)]
+
+
+def _new_redis_client():
+    from redis.asyncio import Redis
 
-    查询接口使用本地内存缓存（带 TTL），避免热路径反复反序列化 JSON。
+    return Redis.from_url(os.getenv("REDIS_URL", _DEFAULT_REDIS_URL), decode_responses=True)
 
-    注意：本类使用同步 Redis 客户端（redis-py），因为 LangGraph 在初始化模型时
-    通过同步路径调用 get_model_info()。后续可统一升级为异步客户端（redis.asyncio）。
+
+class ModelCache:
+    """事件驱动的模型注册表。
+
+    - 写入：``rebuild`` 对比各供应商的序列化结果，只写变更的供应商字段，递增版本号后广播事件
+    - 同步：``start`` 全量加载一次快照并订阅广播；收到连续版本的事件只拉取变更的供应商，
+      版本不连续或订阅重连时整体重新加载
+    - 读取：快照为整体替换的不可变字典，查询接口不加锁、不访问 Redis
     """
 
     def __init__(self) -> None:
         self._redis = None
-        self._local_cache: dict[str, ModelInfo] | None = None
-        self._local_cache_at: float = 0.0
-
-    def _get_redis(self):
-        """懒加载同步 Redis 客户端，异常时重置以便下次重试。"""
+        self._owns_redis = False
+        self._specs: dict[str, ModelInfo] = {}
+        self._by_provider: dict[str, list[ModelInfo]] = {}
+        self._version = 0
+        self._loaded = False
+        self._load_retry_at = 0.0
+        self._loading: asyncio.Task | None = None
+        self._listener: asyncio.Task | None = None
+        self._apply_lock = asyncio.Lock()
+
+    # ------------------------------------------------------------------
+    # Redis
+    # ------------------------------------------------------------------
+
+    async def _get_redis(self):
+        """复用 run 队列的异步 Redis 客户端；不可用时退化为本模块自建的客户端。"""
         if self._redis is None:
             try:
-                import redis
+                from yuxi.services.run_queue_service import get_redis_client
 
-                redis_url = os.getenv("REDIS_URL", _DEFAULT_REDIS_URL)
-                self._redis = redis.from_url(redis_url, decode_responses=True)
-            except Exception as e:
-                logger.warning(f"Redis client unavailable: {e}")
+                self._redis = await get_redis_client()
+            except Exception:
+                self._redis = _new_redis_client()
+                self._owns_redis = True
         return self._redis
 
-    def _reset_redis(self) -> None:
-        """重置 Redis 连接，下次调用时重新初始化。"""
+    # ------------------------------------------------------------------
+    # 本地快照
+    # ------------------------------------------------------------------
+
+    def _replace_snapshot(self, by_provider: dict[str, list[ModelInfo]], version: int) -> None:
+        """整体替换快照，读者要么看到旧快照，要么看到新快照。"""
+        self._by_provider = by_provider
+        self._specs = {info.spec: info for models in by_provider.values() for info in models}
+        self._version = version
+        self._loaded = True
+
+    async def _load_from(self, redis) -> None:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(REDIS_PROVIDERS_KEY)
+            pipe.get(REDIS_VERSION_KEY)
+            raw_providers, raw_version = await pipe.execute()
+
+        by_provider = {pid: _decode_provider_models(raw) for pid, raw in (raw_providers or {}).items()}
+        self._replace_snapshot(by_provider, int(raw_version or 0))
+        logger.info(f"Model cache loaded: {len(self._specs)} models (version={self._version})")
+
+    async def reload(self) -> None:
+        """从 Redis 全量加载快照（启动、订阅重连、版本跳变时调用）。"""
+        await self._load_from(await self._get_redis())
+
+    async def _apply_event(self, event: dict) -> None:
+        version = int(event.get("version") or 0)
+        async with self._apply_lock:
+            if version <= self._version:
+                return
+            if version != self._version + 1:
+                # 错过了中间的事件，整体重新加载
+                await self.reload()
+                return
+
+            changed = [pid for pid in event.get("changed") or [] if pid]
+            removed = set(event.get("removed") or [])
+            by_provider = {pid: models for pid, models in self._by_provider.items() if pid not in removed}
+            if changed:
+                redis = await self._get_redis()
+                raws = await redis.hmget(REDIS_PROVIDERS_KEY, changed)
+                for pid, raw in zip(changed, raws):
+                    if raw is None:
+                        by_provider.pop(pid, None)
+                    else:
+                        by_provider[pid] = _decode_provider_models(raw)
+            self._replace_snapshot(by_provider, version)
+            logger.debug(f"Model cache updated to version {version}: changed={changed}, removed={sorted(removed)}")
+
+    async def _listen(self) -> None:
+        """订阅变更事件；连接断开后重新订阅并全量加载，避免漏掉断线期间的变更。"""
+        while True:
+            try:
+                redis = await self._get_redis()
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(REDIS_EVENTS_CHANNEL)
+                try:
+                    # 先订阅再加载，保证加载之后的事件都不会丢失
+                    async with self._apply_lock:
+                        await self.reload()
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            await self._apply_event(json.loads(message["data"]))
+                        except (ValueError, TypeError) as e:
+                            logger.warning(f"Ignore invalid model cache event: {e}")
+                finally:
+                    try:
+                        await pubsub.unsubscribe(REDIS_EVENTS_CHANNEL)
+                    finally:
+                        await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Model cache subscription lost, retrying: {e}")
+                await asyncio.sleep(_RESUBSCRIBE_DELAY_SECONDS)
+
+    async def start(self) -> None:
+        """加载快照并启动后台订阅（API 与 Worker 启动时调用，可重复调用）。"""
+        if self._listener is not None and not self._listener.done():
+            return
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.warning(f"Failed to load model cache from Redis: {e}")
+        self._listener = asyncio.create_task(self._listen(), name="model-cache-listener")
+
+    async def stop(self) -> None:
+        if self._loading is not None:
+            self._loading.cancel()
+            self._loading = None
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._owns_redis and self._redis is not None:
+            await self._redis.aclose()
         self._redis = None
+        self._owns_redis = False
+
+    async def _load_in_background(self) -> None:
+        try:
+            async with self._apply_lock:
+                if not self._loaded:
+                    await self.reload()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to load model cache from Redis, retry in {_LOAD_RETRY_SECONDS}s: {e}")
+
+    async def _load_standalone(self) -> None:
+        # 临时事件循环中使用一次性客户端，避免把绑定到该循环的连接留给之后的调用
+        redis = _new_redis_client()
+        try:
+            await self._load_from(redis)
+        finally:
+            await redis.aclose()
+
+    def _ensure_loaded(self) -> None:
+        """快照尚未加载成功时补加载一次，失败后间隔 _LOAD_RETRY_SECONDS 再重试。
 
-    def _load_cache(self) -> dict[str, ModelInfo]:
-        """从 Redis 同步读取完整缓存，带本地 TTL。"""
-        now = time.monotonic()
-        if self._local_cache is not None and (now - self._local_cache_at) < _CACHE_TTL_SECONDS:
-            return self._local_cache
+        在事件循环内（未调用 start 或启动时加载失败）放到后台任务中加载，本次查询使用当前快照；
+        没有事件循环的脚本、一次性任务直接用临时事件循环加载。查询路径上不做同步 Redis 调用。
+        """
+        if self._loaded or time.monotonic() < self._load_retry_at:
+            return
+        self._load_retry_at = time.monotonic() + _LOAD_RETRY_SECONDS
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
 
-        r = self._get_redis()
-        if r is None:
-            return {}
+        if loop is not None:
+            if self._loading is None or self._loading.done():
+                self._loading = loop.create_task(self._load_in_background(), name="model-cache-load")
+            return
         try:
-            raw = r.get(REDIS_CACHE_KEY)
-            if not raw:
-                self._local_cache = {}
-                self._local_cache_at = now
-                return {}
-            items = json.loads(raw)
-            cache = {spec: ModelInfo.from_dict(data) for spec, data in items.items()}
-            self._local_cache = cache
-            self._local_cache_at = now
-            return cache
+            asyncio.run(self._load_standalone())
         except Exception as e:
-            logger.warning(f"Failed to load model cache from Redis: {e}")
-            self._reset_redis()
-            return {}
+            logger.warning(f"Failed to load model cache from Redis, retry in {_LOAD_RETRY_SECONDS}s: {e}")
 
-    def _invalidate_local(self) -> None:
-        """使本地缓存失效，下次读取将重新从 Redis 加载。"""
-        self._local_cache = None
-        self._local_cache_at = 0.0
+    # ------------------------------------------------------------------
+    # 查询（同步、无锁）
+    # ------------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     def get_model_info(self, spec: str) -> ModelInfo | None:
         """根据 spec 获取模型信息（同步）。"""
-        cache = self._load_cache()
-        return cache.get(spec)
+        self._ensure_loaded()
+        return self._specs.get(spec)
 
     def is_v2_spec(self, spec: str) -> bool:
         """判断 spec 是否为 v2 格式（存在于缓存中）。"""
@@ -168,30 +324,31 @@ class ModelCache:
 
     def get_all_specs(self, model_type: str | None = None) -> list[ModelInfo]:
         """获取所有缓存的模型信息，可按类型过滤。"""
-        cache = self._load_cache()
+        self._ensure_loaded()
+        specs = self._specs
         if model_type is None:
-            return list(cache.values())
-        return [info for info in cache.values() if info.model_type == model_type]
+            return list(specs.values())
+        return [info for info in specs.values() if info.model_type == model_type]
 
     def get_specs_grouped_by_provider(self, model_type: str = "chat") -> dict[str, list[ModelInfo]]:
         """按 provider 分组获取模型列表（供前端使用）。"""
-        cache = self._load_cache()
+        self._ensure_loaded()
         grouped: dict[str, list[ModelInfo]] = {}
-        for info in cache.values():
+        for info in self._specs.values():
             if info.model_type != model_type:
                 continue
             grouped.setdefault(info.provider_id, []).append(info)
         return grouped
 
-    def rebuild(self, providers: list[Any]) -> None:
-        """从数据库 provider 列表重建缓存并写入 Redis。
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
 
-        所有修改操作（启动初始化、CRUD）都通过此方法写入，
-        保证 Redis 中的数据始终是最新的。
-        """
+    def build_provider_models(self, providers: list[Any]) -> dict[str, list[ModelInfo]]:
+        """把数据库 provider 列表转换为 provider_id -> ModelInfo 列表，未启用的供应商不写入。"""
         from yuxi.services.model_provider_service import resolve_api_key
 
-        new_cache: dict[str, ModelInfo] = {}
+        by_provider: dict[str, list[ModelInfo]] = {}
 
         for provider in providers:
             if not provider.is_enabled:
@@ -199,41 +356,69 @@ class ModelCache:
 
             api_key = resolve_api_key(provider)
 
+            models: list[ModelInfo] = []
             for model in provider.enabled_models or []:
                 model_type = model.get("type", "chat")
                 base_url = self._get_base_url_for_type(provider, model_type)
 
-                info = ModelInfo(
-                    provider_id=provider.provider_id,
-                    model_id=model["id"],
-                    model_type=model_type,
-                    display_name=model.get("display_name", model["id"]),
-                    api_key=api_key or "",
-                    base_url=base_url,
-                    provider_type=provider.provider_type,
-                    headers=dict(provider.headers_json or {}),
-                    extra=dict(provider.extra_json or {}),
-                    dimension=model.get("dimension"),
-                    batch_size=model.get("batch_size", 40),
+                models.append(
+                    ModelInfo(
+                        provider_id=provider.provider_id,
+                        model_id=model["id"],
+                        model_type=model_type,
+                        display_name=model.get("display_name", model["id"]),
+                        api_key=api_key or "",
+                        base_url=base_url,
+                        provider_type=provider.provider_type,
+                        headers=dict(provider.headers_json or {}),
+                        extra=dict(provider.extra_json or {}),
+                        dimension=model.get("dimension"),
+                        batch_size=model.get("batch_size", 40),
+                    )
                 )
-                new_cache[info.spec] = info
+            if models:
+                by_provider[provider.provider_id] = models
 
-        self._save_cache(new_cache)
-        self._invalidate_local()
-        logger.info(f"Model cache rebuilt: {len(new_cache)} models → Redis")
+        return by_provider
 
-    def _save_cache(self, cache: dict[str, ModelInfo]) -> None:
-        """将完整缓存写入 Redis。"""
-        r = self._get_redis()
-        if r is None:
-            logger.warning("Redis unavailable, cache not saved")
-            return
-        try:
-            data = {spec: info.to_dict() for spec, info in cache.items()}
-            r.set(REDIS_CACHE_KEY, json.dumps(data, ensure_ascii=False))
-        except Exception as e:
-            logger.error(f"Failed to save model cache to Redis: {e}")
-            self._reset_redis()
+    async def rebuild(self, providers: list[Any]) -> int:
+        """从数据库 provider 列表重建缓存并写入 Redis，返回新的版本号。
+
+        所有修改操作（启动初始化、CRUD）都通过此方法写入；只有内容变化的供应商会被写入并广播，
+        其它进程据此增量更新本地快照。
+        """
+        by_provider = self.build_provider_models(providers)
+        payloads = {pid: _provider_models_payload(models) for pid, models in by_provider.items()}
+
+        redis = await self._get_redis()
+        current = await redis.hgetall(REDIS_PROVIDERS_KEY) or {}
+        changed = sorted(pid for pid, payload in payloads.items() if current.get(pid) != payload)
+        removed = sorted(set(current) - set(payloads))
+
+        if not changed and not removed:
+            if not self._loaded:
+                await self.reload()
+            logger.info(f"Model cache unchanged: {len(self._specs)} models (version={self._version})")
+            return self._version
+
+        async with redis.pipeline(transaction=True) as pipe:
+            if changed:
+                pipe.hset(REDIS_PROVIDERS_KEY, mapping={pid: payloads[pid] for pid in changed})
+            if removed:
+                pipe.hdel(REDIS_PROVIDERS_KEY, *removed)
+            pipe.incr(REDIS_VERSION_KEY)
+            results = await pipe.execute()
+        version = int(results[-1])
+
+        event = {"version": version, "changed": changed, "removed": removed}
+        await redis.publish(REDIS_EVENTS_CHANNEL, json.dumps(event, ensure_ascii=False))
+        # 本进程立即生效，不必等待自己发出的广播
+        await self._apply_event(event)
+        logger.info(
+            f"Model cache rebuilt: {len(self._specs)} models → Redis "
+            f"(version={version}, changed={len(changed)}, removed={len(removed)})"
+        )
+        return version
 
     @staticmethod
     def _get_base_url_for_type(provider: Any, model_type: str) -> str:
@@ -12,7 +12,12 @@ from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
 from yuxi.repositories.agent_run_repository import TERMINAL_RUN_STATUSES, AgentRunRepository
 from yuxi.services.chat_service import stream_agent_chat
-from yuxi.services.mcp_service import ensure_builtin_mcp_servers_in_db
+from yuxi.services.mcp_service import (
+    ensure_builtin_mcp_servers_in_db,
+    start_mcp_tools_refresher,
+    stop_mcp_tools_refresher,
+)
+from yuxi.services.model_cache import model_cache
 from yuxi.services.run_queue_service import (
     append_run_stream_event,
     clear_cancel_signal,
@@ -368,9 +373,15 @@ async def _worker_startup(ctx):
     await pg_manager.create_business_tables()
     await pg_manager.ensure_business_schema()
     await ensure_builtin_mcp_servers_in_db()
+    # 订阅模型配置变更，模型查询直接读本地快照
+    await model_cache.start()
+    # 预热 MCP 工具缓存，构建 Agent 时直接命中本地缓存
+    start_mcp_tools_refresher()
 
 
 async def _worker_shutdown(ctx):
+    await stop_mcp_tools_refresher()
+    await model_cache.stop()
     await pg_manager.close()
 
 
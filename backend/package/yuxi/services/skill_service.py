@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import json
+import os
 import re
 import shutil
 import tempfile
@@ -55,6 +57,11 @@ TEXT_FILE_EXTENSIONS = {
 BUILTIN_SKILL_OPERATOR = "builtin-system"
 _THREAD_SKILLS_LOCK = threading.Lock()
 _THREAD_SKILLS_LOCKS: dict[str, threading.Lock] = {}
+# 清单文件路径 -> ((mtime_ns, size), manifest)
+_SKILL_MANIFESTS: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+_SKILL_MANIFESTS_LOCK = threading.Lock()
+# thread_id -> 上次同步时各选中技能的 (slug, version)
+_THREAD_SYNCED_SKILLS: dict[str, tuple[tuple[str, str | None], ...]] = {}
 
 
 class BuiltinSkillUpdateConflictError(ValueError):
@@ -112,21 +119,141 @@ def get_thread_skills_root_dir(thread_id: str) -> Path:
     return root
 
 
+def _hash_file(file_path: Path) -> str:
+    hasher = hashlib.sha256()
+    with file_path.open("rb") as f:
+        while chunk := f.read(1024 * 1024):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _build_skill_manifest(skill_dir: Path) -> dict[str, Any]:
+    """遍历技能目录，生成 {相对路径: sha256} 清单及整体版本号"""
+    files = {
+        file_path.relative_to(skill_dir).as_posix(): _hash_file(file_path)
+        for file_path in sorted(skill_dir.rglob("*"))
+        if file_path.is_file()
+    }
+    hasher = hashlib.sha256()
+    for relative_path, file_hash in files.items():
+        hasher.update(f"{relative_path}\0{file_hash}\0".encode())
+    return {"version": hasher.hexdigest(), "files": files}
+
+
+def _write_json_atomic(path: Path, data: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+    temp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def _get_skill_manifest_path(slug: str) -> Path:
+    # 清单放在 skills 根目录之外，避免出现在技能树、导出包和线程挂载里
+    return Path(sys_config.save_dir) / "skill_manifests" / f"{slug}.json"
+
+
+def refresh_skill_manifest(slug: str) -> dict[str, Any] | None:
+    """技能文件变更后重新计算清单；技能目录不存在时删除清单"""
+    manifest_path = _get_skill_manifest_path(slug)
+    skill_dir = get_skills_root_dir() / slug
+    with _SKILL_MANIFESTS_LOCK:
+        _SKILL_MANIFESTS.pop(str(manifest_path), None)
+        if not skill_dir.is_dir():
+            manifest_path.unlink(missing_ok=True)
+            return None
+        manifest = _build_skill_manifest(skill_dir)
+        _write_json_atomic(manifest_path, manifest)
+        return manifest
+
+
+def get_skill_manifest(slug: str) -> dict[str, Any] | None:
+    """读取技能清单；进程内按清单文件 mtime 缓存，缺失时（历史数据）现场生成"""
+    manifest_path = _get_skill_manifest_path(slug)
+    try:
+        stat = manifest_path.stat()
+    except FileNotFoundError:
+        if not (get_skills_root_dir() / slug).is_dir():
+            return None
+        return refresh_skill_manifest(slug)
+
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = _SKILL_MANIFESTS.get(str(manifest_path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return refresh_skill_manifest(slug)
+    with _SKILL_MANIFESTS_LOCK:
+        _SKILL_MANIFESTS[str(manifest_path)] = (stamp, manifest)
+    return manifest
+
+
+def _remove_path(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _copy_skill_dir(source_dir: Path, target_dir: Path) -> None:
+    temp_target = target_dir.with_name(f".{target_dir.name}.tmp-{uuid.uuid4().hex[:8]}")
+    try:
+        shutil.copytree(source_dir, temp_target, symlinks=False)
+        _remove_path(target_dir)
+        temp_target.rename(target_dir)
+    finally:
+        if temp_target.exists():
+            shutil.rmtree(temp_target, ignore_errors=True)
+
+
+def _apply_skill_manifest_diff(
+    source_dir: Path, target_dir: Path, source_files: dict[str, str], synced_files: dict[str, str]
+) -> None:
+    """按清单差异只复制变更文件、删除多余文件"""
+    for relative_path, file_hash in source_files.items():
+        target_file = target_dir / relative_path
+        if synced_files.get(relative_path) == file_hash and target_file.is_file():
+            continue
+        target_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = target_file.with_name(f".{target_file.name}.tmp-{uuid.uuid4().hex[:8]}")
+        shutil.copyfile(source_dir / relative_path, temp_file)
+        os.replace(temp_file, target_file)
+
+    for relative_path in synced_files.keys() - source_files.keys():
+        target_file = target_dir / relative_path
+        target_file.unlink(missing_ok=True)
+        parent = target_file.parent
+        while parent != target_dir and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+
 def sync_thread_visible_skills(thread_id: str, selected_slugs: list[str] | None) -> Path:
     skills_root = get_skills_root_dir().resolve()
     thread_skills_root = get_thread_skills_root_dir(thread_id)
+    thread_manifest_path = thread_skills_root.parent / "skills-manifest.json"
     normalized_slugs = [slug for slug in _normalize_string_list(selected_slugs) if is_valid_skill_slug(slug)]
     visible_slugs = set(normalized_slugs)
+
+    # 选中技能的版本与上次同步一致时直接返回，不再遍历目录
+    manifests = {slug: get_skill_manifest(slug) for slug in normalized_slugs}
+    signature = tuple((slug, manifest["version"] if manifest else None) for slug, manifest in manifests.items())
+    if _THREAD_SYNCED_SKILLS.get(thread_id) == signature and thread_manifest_path.exists():
+        return thread_skills_root
+
     with _get_thread_skills_lock(thread_id):
+        try:
+            synced = json.loads(thread_manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            synced = {}
+
         for entry in thread_skills_root.iterdir():
-            if entry.name in visible_slugs:
-                continue
-            if entry.is_dir() and not entry.is_symlink():
-                shutil.rmtree(entry)
-            else:
-                entry.unlink()
+            if entry.name not in visible_slugs:
+                _remove_path(entry)
 
-        for slug in normalized_slugs:
+        thread_manifest: dict[str, Any] = {}
+        for slug, manifest in manifests.items():
             source_dir = (skills_root / slug).resolve()
             target_dir = thread_skills_root / slug
 
@@ -134,31 +261,22 @@ def sync_thread_visible_skills(thread_id: str, selected_slugs: list[str] | None)
                 source_dir.relative_to(skills_root)
             except ValueError:
                 continue
-            if not source_dir.is_dir():
-                if target_dir.exists() or target_dir.is_symlink():
-                    if target_dir.is_dir() and not target_dir.is_symlink():
-                        shutil.rmtree(target_dir)
-                    else:
-                        target_dir.unlink()
+            if manifest is None or not source_dir.is_dir():
+                _remove_path(target_dir)
                 continue
 
-            if target_dir.exists():
-                if target_dir.is_symlink():
-                    target_dir.unlink()
-                elif target_dir.is_dir():
-                    if _dirs_equal(target_dir, source_dir):
-                        continue
-                    shutil.rmtree(target_dir)
-                else:
-                    target_dir.unlink()
-
-            temp_target = thread_skills_root / f".{slug}.tmp-{uuid.uuid4().hex[:8]}"
-            try:
-                shutil.copytree(source_dir, temp_target, symlinks=False)
-                temp_target.rename(target_dir)
-            finally:
-                if temp_target.exists():
-                    shutil.rmtree(temp_target, ignore_errors=True)
+            synced_entry = synced.get(slug) or {}
+            target_is_dir = target_dir.is_dir() and not target_dir.is_symlink()
+            if not target_is_dir or not synced_entry:
+                # 没有同步记录（首次或历史目录）时整目录复制
+                _copy_skill_dir(source_dir, target_dir)
+            elif synced_entry.get("version") != manifest["version"]:
+                _apply_skill_manifest_diff(source_dir, target_dir, manifest["files"], synced_entry.get("files") or {})
+            thread_manifest[slug] = manifest
+
+        if thread_manifest != synced or not thread_manifest_path.exists():
+            _write_json_atomic(thread_manifest_path, thread_manifest)
+        _THREAD_SYNCED_SKILLS[thread_id] = signature
 
     return thread_skills_root
 
@@ -483,6 +601,7 @@ async def _import_skill_dir_impl(
             shutil.rmtree(final_dir, ignore_errors=True)
             raise
 
+    refresh_skill_manifest(final_slug)
     return item
 
 
@@ -671,6 +790,7 @@ async def create_skill_node(
 
     # 先写入文件，再更新元数据
     target.write_text(content or "", encoding="utf-8")
+    refresh_skill_manifest(item.slug)
 
     await _update_skill_metadata_if_skills_md(db, item, content or "", skill_dir, target, updated_by)
 
@@ -696,6 +816,7 @@ async def update_skill_file(
     await _update_skill_metadata_if_skills_md(db, item, content, skill_dir, target, updated_by)
 
     target.write_text(content, encoding="utf-8")
+    refresh_skill_manifest(item.slug)
 
 
 async def _update_skill_metadata_if_skills_md(
@@ -731,6 +852,7 @@ async def delete_skill_node(db: AsyncSession, *, slug: str, relative_path: str)
         shutil.rmtree(target)
     else:
         target.unlink()
+    refresh_skill_manifest(item.slug)
 
 
 async def export_skill_zip(db: AsyncSession, slug: str) -> tuple[str, str]:
@@ -775,6 +897,7 @@ async def delete_skill(db: AsyncSession, *, slug: str) -> None:
 
     if trash_dir and trash_dir.exists():
         shutil.rmtree(trash_dir, ignore_errors=True)
+    refresh_skill_manifest(slug)
 
 
 async def init_builtin_skills(db: AsyncSession, *, created_by: str = "system") -> None:
@@ -869,7 +992,7 @@ async def install_builtin_skill(db: AsyncSession, slug: str, *, installed_by: st
 
     shutil.copytree(Path(spec["source_dir"]), target_dir, symlinks=False)
     try:
-        return await repo.create(
+        item = await repo.create(
             slug=slug,
             name=spec["name"],
             description=spec["description"],
@@ -886,6 +1009,9 @@ async def install_builtin_skill(db: AsyncSession, slug: str, *, installed_by: st
         shutil.rmtree(target_dir, ignore_errors=True)
         raise
 
+    refresh_skill_manifest(slug)
+    return item
+
 
 async def update_builtin_skill(
     db: AsyncSession,
@@ -908,6 +1034,7 @@ async def update_builtin_skill(
 
     target_dir = _resolve_skill_dir(item)
     _replace_skill_target(target_dir, Path(spec["source_dir"]))
+    refresh_skill_manifest(slug)
 
     if item.name != spec["name"] or item.description != spec["description"]:
         await repo.update_metadata(
@@ -172,6 +172,16 @@ class Tasker:
             task = self._tasks.get(task_id)
         return task.to_dict() if task else None
 
+    async def find_active_task(self, task_type: str, **payload: Any) -> dict[str, Any] | None:
+        """查找指定类型、payload 字段匹配且尚未结束的任务"""
+        async with self._lock:
+            for task in self._tasks.values():
+                if task.type != task_type or task.status in TERMINAL_STATUSES:
+                    continue
+                if all(task.payload.get(key) == value for key, value in payload.items()):
+                    return task.to_dict()
+        return None
+
     async def cancel_task(self, task_id: str) -> bool:
         async with self._lock:
             task = self._tasks.get(task_id)
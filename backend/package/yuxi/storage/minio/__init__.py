@@ -4,7 +4,14 @@ MinIO 存储模块
 """
 
 # 导出核心功能
-from .client import MinIOClient, StorageError, UploadResult, aupload_file_to_minio, get_minio_client
+from .client import (
+    MinIOClient,
+    StorageError,
+    StorageIntegrityError,
+    UploadResult,
+    aupload_file_to_minio,
+    get_minio_client,
+)
 from .utils import generate_unique_filename, get_file_size
 
 # 为了向后兼容，导出常用的函数
@@ -15,6 +22,7 @@ __all__ = [
     "aupload_file_to_minio",
     # 异常类
     "StorageError",
+    "StorageIntegrityError",
     "UploadResult",
     # 工具函数
     "get_file_size",
@@ -4,9 +4,12 @@ MinIO 存储客户端
 """
 
 import asyncio
+import hashlib
 import json
 import mimetypes
 import os
+import tempfile
+import threading
 from contextlib import asynccontextmanager
 from datetime import timedelta
 from io import BytesIO
@@ -28,6 +31,17 @@ class StorageUploadError(StorageError):
     """存储相关异常基类"""
 
 
+class StorageIntegrityError(StorageError):
+    """下载内容与期望哈希不一致"""
+
+
+# 流式下载的分块大小，以及单进程内所有下载可同时占用的缓冲内存上限
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("MINIO_DOWNLOAD_CHUNK_SIZE") or 1024 * 1024)
+DOWNLOAD_MEMORY_BUDGET = int(os.getenv("MINIO_DOWNLOAD_MEMORY_BUDGET") or 64 * 1024 * 1024)
+
+_download_slots = threading.BoundedSemaphore(max(1, DOWNLOAD_MEMORY_BUDGET // DOWNLOAD_CHUNK_SIZE))
+
+
 class UploadResult:
     """简化的上传结果"""
 
@@ -193,6 +207,108 @@ class MinIOClient:
                 raise StorageError(f"对象 '{object_name}' 在存储桶 '{bucket_name}' 中不存在")
             raise StorageError(f"下载文件失败: {e}")
 
+    def download_to_file(
+        self,
+        bucket_name: str,
+        object_name: str,
+        file_path: str | os.PathLike[str],
+        expected_sha256: str | None = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> tuple[int, str]:
+        """
+        分块流式下载对象到本地文件，边下载边计算 SHA-256
+
+        每个下载同一时刻只持有一个分块缓冲，并受进程级内存预算限制，
+        大文件下载不会整体读入内存。
+
+        Args:
+            bucket_name: 存储桶名称
+            object_name: 对象名称
+            file_path: 目标文件路径
+            expected_sha256: 期望的内容哈希，提供时下载完成后校验
+            chunk_size: 分块大小（字节）
+
+        Returns:
+            tuple[int, str]: (写入的字节数, 内容 SHA-256)
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        response = None
+        with _download_slots:
+            try:
+                response = self.client.get_object(bucket_name=bucket_name, object_name=object_name)
+                with open(file_path, "wb") as f:
+                    for chunk in response.stream(chunk_size):
+                        sha256.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            except S3Error as e:
+                if "NoSuchKey" in str(e):
+                    raise StorageError(f"对象 '{object_name}' 在存储桶 '{bucket_name}' 中不存在")
+                raise StorageError(f"下载文件失败: {e}")
+            finally:
+                if response is not None:
+                    response.close()
+                    response.release_conn()
+
+        digest = sha256.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            raise StorageIntegrityError(
+                f"对象 '{object_name}' 内容哈希校验失败: expected={expected_sha256}, actual={digest}"
+            )
+
+        logger.info(f"成功流式下载 '{object_name}' 从存储桶 '{bucket_name}' ({size} bytes)")
+        return size, digest
+
+    async def adownload_to_file(
+        self,
+        bucket_name: str,
+        object_name: str,
+        file_path: str | os.PathLike[str],
+        expected_sha256: str | None = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> tuple[int, str]:
+        """异步流式下载对象到本地文件"""
+        return await asyncio.to_thread(
+            self.download_to_file,
+            bucket_name,
+            object_name,
+            file_path,
+            expected_sha256=expected_sha256,
+            chunk_size=chunk_size,
+        )
+
+    @asynccontextmanager
+    async def adownload_to_tempfile(
+        self,
+        bucket_name: str,
+        object_name: str,
+        suffix: str | None = None,
+        expected_sha256: str | None = None,
+    ):
+        """
+        异步上下文管理器：流式下载对象到临时文件，退出时自动删除
+
+        Yields:
+            str: 临时文件路径
+        """
+        if suffix is None:
+            suffix = os.path.splitext(object_name)[1]
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+            temp_path = temp_file.name
+
+        try:
+            await self.adownload_to_file(bucket_name, object_name, temp_path, expected_sha256=expected_sha256)
+            yield temp_path
+        finally:
+            if os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                    logger.debug(f"已删除临时文件: {temp_path}")
+                except Exception as e:
+                    logger.warning(f"删除临时文件失败: {e}")
+
     async def adownload_response(self, bucket_name: str, object_name: str) -> BaseHTTPResponse:
         """异步下载文件"""
         try:
@@ -361,7 +477,6 @@ class MinIOClient:
         Raises:
             StorageError: 如果 URL 无效或下载失败
         """
-        import tempfile
         from urllib.parse import urlparse
 
         # 验证 URL
@@ -397,33 +512,17 @@ class MinIOClient:
 
         bucket_name, object_name = path_parts
 
-        # 下载文件
-        file_data = await self.adownload_file(bucket_name, object_name)
-        logger.info(f"成功从 MinIO 下载文件: {object_name} ({len(file_data)} bytes)")
-
-        # 创建临时文件
+        # 确定临时文件后缀
         if allowed_extensions:
             suffix = next((ext for ext in allowed_extensions if url.endswith(ext)), ".tmp")
         else:
             suffix = f".{object_name.split('.')[-1]}"
 
-        temp_path = None
-        try:
-            with tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, delete=False) as temp_file:
-                temp_file.write(file_data)
-                temp_path = temp_file.name
-
+        # 流式下载到临时文件
+        async with self.adownload_to_tempfile(bucket_name, object_name, suffix=suffix) as temp_path:
             logger.info(f"文件已下载到临时路径: {temp_path}")
             yield temp_path
 
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                    logger.info(f"已删除临时文件: {temp_path}")
-                except Exception as e:
-                    logger.warning(f"删除临时文件失败: {e}")
-
 
 # 全局客户端实例
 _default_client = None
@@ -244,6 +244,9 @@ class PostgresManager(metaclass=SingletonMeta):
             "CREATE INDEX IF NOT EXISTS ix_conversations_is_pinned ON conversations(is_pinned)",
             "CREATE UNIQUE INDEX IF NOT EXISTS ix_model_providers_provider_id ON model_providers(provider_id)",
             "CREATE INDEX IF NOT EXISTS ix_model_providers_is_enabled ON model_providers(is_enabled)",
+            # 仪表盘按时间范围聚合时使用
+            "CREATE INDEX IF NOT EXISTS ix_tool_calls_created_at ON tool_calls(created_at)",
+            "CREATE INDEX IF NOT EXISTS ix_conversations_updated_at ON conversations(updated_at)",
         ]
         async with self.async_engine.begin() as conn:
             for stmt in stmts:
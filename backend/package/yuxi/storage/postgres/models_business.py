@@ -7,6 +7,7 @@ from sqlalchemy import (
     JSON,
     Boolean,
     Column,
+    Date,
     DateTime,
     Float,
     ForeignKey,
@@ -370,6 +371,20 @@ class ConversationStats(Base):
         }
 
 
+class DashboardDailyRollup(Base):
+    """DashboardDailyRollup table - 仪表盘按天（北京时间）预聚合的统计值"""
+
+    __tablename__ = "dashboard_daily_rollups"
+    __table_args__ = (UniqueConstraint("day", "metric", "dimension", name="uq_dashboard_daily_rollups_key"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="Primary key")
+    day = Column(Date, nullable=False, index=True, comment="Calendar day in Asia/Shanghai")
+    metric = Column(String(32), nullable=False, comment="Metric name, e.g. active_users/tool_calls")
+    dimension = Column(String(128), nullable=False, default="", comment="Breakdown key, e.g. tool name")
+    value = Column(Integer, nullable=False, default=0, comment="Aggregated value")
+    refreshed_at = Column(DateTime, default=utc_now_naive, comment="Last refresh time")
+
+
 class OperationLog(Base):
     """操作日志模型"""
 
@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from yuxi.storage.postgres.models_business import User, APIKey
 from server.utils.auth_middleware import get_db, get_required_user, get_superadmin_user
+from server.utils.principal_cache import invalidate_api_key
 from yuxi.utils.datetime_utils import coerce_any_to_utc_datetime, utc_now_naive
 
 apikey_router = APIRouter(prefix="/apikey", tags=["apikey"])
@@ -199,6 +200,7 @@ async def update_api_key(
 
     await db.commit()
     await db.refresh(api_key)
+    await invalidate_api_key(api_key.key_hash)
 
     return {"api_key": api_key.to_dict()}
 
@@ -220,8 +222,10 @@ async def delete_api_key(
     if api_key.user_id != current_user.id and current_user.role != "superadmin":
         raise HTTPException(status_code=403, detail="无权操作此 API Key")
 
+    key_hash = api_key.key_hash
     await db.delete(api_key)
     await db.commit()
+    await invalidate_api_key(key_hash)
 
     return {"success": True}
 
@@ -246,11 +250,13 @@ async def regenerate_api_key(
     # 生成新密钥
     full_key, key_hash, key_prefix = generate_api_key()
 
+    old_key_hash = api_key.key_hash
     api_key.key_hash = key_hash
     api_key.key_prefix = key_prefix
 
     await db.commit()
     await db.refresh(api_key)
+    await invalidate_api_key(old_key_hash)
 
     return APIKeyCreateResponse(
         api_key=APIKeyResponse(**api_key.to_dict()),
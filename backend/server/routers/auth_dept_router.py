@@ -16,6 +16,7 @@ from yuxi.repositories.user_repository import UserRepository
 from server.utils.auth_middleware import get_superadmin_user, get_admin_user, get_db
 from server.utils.auth_utils import AuthUtils
 from server.utils.common_utils import log_operation
+from server.utils.principal_cache import invalidate_all
 from server.utils.user_utils import is_valid_phone_number
 
 # 创建路由器
@@ -241,6 +242,8 @@ async def delete_department(
     await db.execute(sqlalchemy_delete(APIKey).where(APIKey.department_id == department_id))
     await db.delete(department)
     await db.commit()
+    # 部门用户迁移、部门 Key 删除，缓存的主体全部失效
+    await invalidate_all()
 
     # 记录操作
     if department_users:
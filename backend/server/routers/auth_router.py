@@ -23,6 +23,7 @@ from server.utils.auth_middleware import (
 from server.utils.auth_utils import AuthUtils
 from server.utils.user_utils import generate_unique_user_id, validate_username, is_valid_phone_number
 from server.utils.common_utils import log_operation
+from server.utils.principal_cache import invalidate_user, principal_cache
 from yuxi.storage.minio import aupload_file_to_minio
 from yuxi.utils.datetime_utils import utc_now_naive
 
@@ -188,6 +189,8 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         # 密码错误，增加失败次数
         user.increment_failed_login()
         await db.commit()
+        if user.is_login_locked():
+            await invalidate_user(user.id)
 
         # 记录失败操作
         await log_operation(db, user.id if user else None, "登录失败", f"密码错误，失败次数: {user.login_failed_count}")
@@ -394,6 +397,7 @@ async def update_profile(
         update_details.append(f"手机号: {profile_data.phone_number or '已清空'}")
 
     await db.commit()
+    await invalidate_user(current_user.id)
 
     # 记录操作
     if update_details:
@@ -644,6 +648,7 @@ async def update_user(
         update_details.append(f"部门ID: {user_data.department_id}")
 
     await db.commit()
+    await invalidate_user(user.id)
 
     # 记录操作
     await log_operation(db, current_user.id, "更新用户", f"更新用户ID {user_id}: {', '.join(update_details)}", request)
@@ -715,6 +720,7 @@ async def delete_user(
     user.avatar = None  # 清空头像
 
     await db.commit()
+    await invalidate_user(user.id)
 
     # 记录操作
     await log_operation(db, current_user.id, "删除用户", deletion_detail, request)
@@ -795,6 +801,7 @@ async def upload_user_avatar(
         # 更新用户头像
         current_user.avatar = avatar_url
         await db.commit()
+        await invalidate_user(current_user.id)
 
         # 记录操作
         await log_operation(db, current_user.id, "上传头像", f"更新头像: {avatar_url}")
@@ -805,6 +812,13 @@ async def upload_user_avatar(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"头像上传失败: {str(e)}")
 
 
+# 路由：认证主体缓存统计（超级管理员专用）
+@auth.get("/principal-cache/stats")
+async def get_principal_cache_stats(current_user: User = Depends(get_superadmin_user)):
+    """获取认证主体缓存的命中率等统计"""
+    return principal_cache.stats()
+
+
 # 路由：模拟用户登录（超级管理员专用）
 @auth.post("/impersonate/{user_id}", response_model=Token)
 async def impersonate_user(
@@ -12,12 +12,13 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import Integer, String, cast, distinct, func, or_, select, text
+from sqlalchemy import Integer, String, cast, distinct, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.routers.auth_router import get_admin_user
 from server.utils.auth_middleware import get_db
 from yuxi.repositories.conversation_repository import ConversationRepository
+from yuxi.services import dashboard_stats_service
 from yuxi.storage.postgres.models_business import User
 from yuxi.utils.datetime_utils import UTC, ensure_shanghai, shanghai_now, utc_now
 from yuxi.utils.logging_config import logger
@@ -255,59 +256,39 @@ async def get_user_activity_stats(
     try:
         from yuxi.storage.postgres.models_business import Conversation, User
 
-        now = utc_now()
-        # PostgreSQL with asyncpg requires naive datetime for naive DateTime columns
-        naive_now = now.replace(tzinfo=None)
-
-        # Conversations may store either the numeric user primary key or the login user_id string.
-        # Join condition accounts for both representations.
-        user_join_condition = or_(
-            Conversation.user_id == User.user_id,
-            Conversation.user_id == cast(User.id, String),
-        )
-
-        # 基础用户统计（排除已删除用户）
-        total_users_result = await db.execute(select(func.count(User.id)).filter(User.is_deleted == 0))
-        total_users = total_users_result.scalar() or 0
+        async def compute() -> UserActivityStats:
+            # PostgreSQL with asyncpg requires naive datetime for naive DateTime columns
+            naive_now = utc_now().replace(tzinfo=None)
+            since_24h = naive_now - timedelta(days=1)
+            since_30d = naive_now - timedelta(days=30)
+
+            # 基础用户统计（排除已删除用户）
+            total_users = (await db.execute(select(func.count(User.id)).filter(User.is_deleted == 0))).scalar() or 0
+
+            # 24 小时与 30 天活跃用户数在一次扫描中按条件聚合（基于对话活动，排除已删除用户）
+            active_row = (
+                await db.execute(
+                    select(
+                        func.count(distinct(User.id)).filter(Conversation.updated_at >= since_24h),
+                        func.count(distinct(User.id)),
+                    )
+                    .select_from(Conversation)
+                    .join(User, dashboard_stats_service.user_join_condition())
+                    .filter(Conversation.updated_at >= since_30d, User.is_deleted == 0)
+                )
+            ).one()
 
-        # 不同时间段的活跃用户数（基于对话活动，排除已删除用户）
-        active_users_24h_result = await db.execute(
-            select(func.count(distinct(User.id)))
-            .select_from(Conversation)
-            .join(User, user_join_condition)
-            .filter(Conversation.updated_at >= naive_now - timedelta(days=1), User.is_deleted == 0)
-        )
-        active_users_24h = active_users_24h_result.scalar() or 0
+            # 最近7天（北京时间自然日，含今天）每日活跃用户
+            series = await dashboard_stats_service.daily_series(db, dashboard_stats_service.METRIC_ACTIVE_USERS, days=7)
 
-        active_users_30d_result = await db.execute(
-            select(func.count(distinct(User.id)))
-            .select_from(Conversation)
-            .join(User, user_join_condition)
-            .filter(Conversation.updated_at >= naive_now - timedelta(days=30), User.is_deleted == 0)
-        )
-        active_users_30d = active_users_30d_result.scalar() or 0
-        # 最近7天每日活跃用户（排除已删除用户）
-        daily_active_users = []
-        for i in range(7):
-            day_start = naive_now - timedelta(days=i + 1)
-            day_end = naive_now - timedelta(days=i)
-
-            active_count_result = await db.execute(
-                select(func.count(distinct(User.id)))
-                .select_from(Conversation)
-                .join(User, user_join_condition)
-                .filter(Conversation.updated_at >= day_start, Conversation.updated_at < day_end, User.is_deleted == 0)
+            return UserActivityStats(
+                total_users=total_users,
+                active_users_24h=active_row[0] or 0,
+                active_users_30d=active_row[1] or 0,
+                daily_active_users=[{"date": day.strftime("%Y-%m-%d"), "active_users": count} for day, count in series],
             )
-            active_count = active_count_result.scalar() or 0
 
-            daily_active_users.append({"date": day_start.strftime("%Y-%m-%d"), "active_users": active_count})
-
-        return UserActivityStats(
-            total_users=total_users,
-            active_users_24h=active_users_24h,
-            active_users_30d=active_users_30d,
-            daily_active_users=list(reversed(daily_active_users)),  # 按时间正序
-        )
+        return await dashboard_stats_service.dashboard_cache.get_or_compute("stats:users", compute)
 
     except Exception as e:
         logger.error(f"Error getting user activity stats: {e}")
@@ -329,60 +310,48 @@ async def get_tool_call_stats(
     try:
         from yuxi.storage.postgres.models_business import ToolCall
 
-        now = utc_now()
-        # PostgreSQL with asyncpg requires naive datetime for naive DateTime columns
-        naive_now = now.replace(tzinfo=None)
-
-        # 基础工具调用统计
-        total_calls_result = await db.execute(select(func.count(ToolCall.id)))
-        total_calls = total_calls_result.scalar() or 0
-
-        successful_calls_result = await db.execute(select(func.count(ToolCall.id)).filter(ToolCall.status == "success"))
-        successful_calls = successful_calls_result.scalar() or 0
-        failed_calls = total_calls - successful_calls
-        success_rate = round((successful_calls / total_calls * 100), 2) if total_calls > 0 else 0
-
-        # 最常用工具
-        most_used_tools_result = await db.execute(
-            select(ToolCall.tool_name, func.count(ToolCall.id).label("count"))
-            .group_by(ToolCall.tool_name)
-            .order_by(func.count(ToolCall.id).desc())
-            .limit(10)
-        )
-        most_used_tools = most_used_tools_result.all()
-        most_used_tools = [{"tool_name": name, "count": count} for name, count in most_used_tools]
-
-        # 工具错误分布
-        tool_errors_result = await db.execute(
-            select(ToolCall.tool_name, func.count(ToolCall.id).label("error_count"))
-            .filter(ToolCall.status == "error")
-            .group_by(ToolCall.tool_name)
-        )
-        tool_errors = tool_errors_result.all()
-        tool_error_distribution = {name: count for name, count in tool_errors}
-
-        # 最近7天每日工具调用数
-        daily_tool_calls = []
-        for i in range(7):
-            day_start = naive_now - timedelta(days=i + 1)
-            day_end = naive_now - timedelta(days=i)
-
-            daily_count_result = await db.execute(
-                select(func.count(ToolCall.id)).filter(ToolCall.created_at >= day_start, ToolCall.created_at < day_end)
+        async def compute() -> ToolCallStats:
+            # 按工具分组一次得到调用数与失败数，总数、成功数由分组结果汇总
+            error_count = func.count(ToolCall.id).filter(ToolCall.status == "error")
+            success_count = func.count(ToolCall.id).filter(ToolCall.status == "success")
+            by_tool = (
+                await db.execute(
+                    select(
+                        ToolCall.tool_name,
+                        func.count(ToolCall.id).label("count"),
+                        success_count.label("success_count"),
+                        error_count.label("error_count"),
+                    ).group_by(ToolCall.tool_name)
+                )
+            ).all()
+
+            total_calls = sum(row.count for row in by_tool)
+            successful_calls = sum(row.success_count for row in by_tool)
+            failed_calls = total_calls - successful_calls
+            success_rate = round((successful_calls / total_calls * 100), 2) if total_calls > 0 else 0
+
+            # 最常用工具
+            most_used_tools = [
+                {"tool_name": row.tool_name, "count": row.count}
+                for row in sorted(by_tool, key=lambda row: row.count, reverse=True)[:10]
+            ]
+            # 工具错误分布
+            tool_error_distribution = {row.tool_name: row.error_count for row in by_tool if row.error_count}
+
+            # 最近7天（北京时间自然日，含今天）每日工具调用数
+            series = await dashboard_stats_service.daily_series(db, dashboard_stats_service.METRIC_TOOL_CALLS, days=7)
+
+            return ToolCallStats(
+                total_calls=total_calls,
+                successful_calls=successful_calls,
+                failed_calls=failed_calls,
+                success_rate=success_rate,
+                most_used_tools=most_used_tools,
+                tool_error_distribution=tool_error_distribution,
+                daily_tool_calls=[{"date": day.strftime("%Y-%m-%d"), "call_count": count} for day, count in series],
             )
-            daily_count = daily_count_result.scalar() or 0
-
-            daily_tool_calls.append({"date": day_start.strftime("%Y-%m-%d"), "call_count": daily_count})
-
-        return ToolCallStats(
-            total_calls=total_calls,
-            successful_calls=successful_calls,
-            failed_calls=failed_calls,
-            success_rate=success_rate,
-            most_used_tools=most_used_tools,
-            tool_error_distribution=tool_error_distribution,
-            daily_tool_calls=list(reversed(daily_tool_calls)),
-        )
+
+        return await dashboard_stats_service.dashboard_cache.get_or_compute("stats:tools", compute)
 
     except Exception as e:
         logger.error(f"Error getting tool call stats: {e}")
@@ -493,82 +462,77 @@ async def get_agent_analytics(
     try:
         from yuxi.storage.postgres.models_business import Conversation, Message, MessageFeedback, ToolCall
 
-        # 获取所有智能体
-        agents_result = await db.execute(
-            select(Conversation.agent_id, func.count(Conversation.id).label("conversation_count")).group_by(
-                Conversation.agent_id
-            )
-        )
-        agents = agents_result.all()
-
-        total_agents = len(agents)
-        agent_conversation_counts = [{"agent_id": agent_id, "conversation_count": count} for agent_id, count in agents]
-
-        # 智能体满意度统计
-        agent_satisfaction = []
-        for agent_id, _ in agents:
-            total_feedbacks_result = await db.execute(
-                select(func.count(MessageFeedback.id))
-                .join(Message, MessageFeedback.message_id == Message.id)
-                .join(Conversation, Message.conversation_id == Conversation.id)
-                .filter(Conversation.agent_id == agent_id)
+        async def compute() -> AgentAnalytics:
+            # 获取所有智能体
+            agents_result = await db.execute(
+                select(Conversation.agent_id, func.count(Conversation.id).label("conversation_count")).group_by(
+                    Conversation.agent_id
+                )
             )
-            total_feedbacks = total_feedbacks_result.scalar() or 0
+            agents = agents_result.all()
 
-            positive_feedbacks_result = await db.execute(
-                select(func.count(MessageFeedback.id))
+            # 智能体反馈统计：按 agent_id 一次聚合总数与点赞数
+            feedback_result = await db.execute(
+                select(
+                    Conversation.agent_id,
+                    func.count(MessageFeedback.id),
+                    func.count(MessageFeedback.id).filter(MessageFeedback.rating == "like"),
+                )
+                .select_from(MessageFeedback)
                 .join(Message, MessageFeedback.message_id == Message.id)
                 .join(Conversation, Message.conversation_id == Conversation.id)
-                .filter(Conversation.agent_id == agent_id, MessageFeedback.rating == "like")
-            )
-            positive_feedbacks = positive_feedbacks_result.scalar() or 0
-
-            satisfaction_rate = round((positive_feedbacks / total_feedbacks * 100), 2) if total_feedbacks > 0 else 100
-
-            agent_satisfaction.append(
-                {"agent_id": agent_id, "satisfaction_rate": satisfaction_rate, "total_feedbacks": total_feedbacks}
+                .group_by(Conversation.agent_id)
             )
+            feedbacks = {agent_id: (total, likes) for agent_id, total, likes in feedback_result.all()}
 
-        # 智能体工具使用统计
-        agent_tool_usage = []
-        for agent_id, _ in agents:
-            tool_usage_count_result = await db.execute(
-                select(func.count(ToolCall.id))
+            # 智能体工具使用统计
+            tool_usage_result = await db.execute(
+                select(Conversation.agent_id, func.count(ToolCall.id))
+                .select_from(ToolCall)
                 .join(Message, ToolCall.message_id == Message.id)
                 .join(Conversation, Message.conversation_id == Conversation.id)
-                .filter(Conversation.agent_id == agent_id)
+                .group_by(Conversation.agent_id)
             )
-            tool_usage_count = tool_usage_count_result.scalar() or 0
-
-            agent_tool_usage.append({"agent_id": agent_id, "tool_usage_count": tool_usage_count})
+            tool_usage = dict(tool_usage_result.all())
 
-        # 表现最佳的智能体（按对话数排序）
-        top_performing_agents = []
-        for i, (agent_id, conv_count) in enumerate(agents):
-            # 获取满意度数据
-            satisfaction_data = next(
-                (s for s in agent_satisfaction if s["agent_id"] == agent_id), {"satisfaction_rate": 0}
-            )
+            agent_satisfaction = []
+            for agent_id, _ in agents:
+                total_feedbacks, positive_feedbacks = feedbacks.get(agent_id, (0, 0))
+                satisfaction_rate = (
+                    round((positive_feedbacks / total_feedbacks * 100), 2) if total_feedbacks > 0 else 100
+                )
+                agent_satisfaction.append(
+                    {"agent_id": agent_id, "satisfaction_rate": satisfaction_rate, "total_feedbacks": total_feedbacks}
+                )
+            satisfaction_by_agent = {item["agent_id"]: item["satisfaction_rate"] for item in agent_satisfaction}
 
-            top_performing_agents.append(
-                {
-                    "agent_id": agent_id,
-                    "conversation_count": conv_count,
-                    "satisfaction_rate": satisfaction_data["satisfaction_rate"],
-                }
+            # 表现最佳的智能体（按对话数排序，取前5名）
+            top_performing_agents = sorted(
+                (
+                    {
+                        "agent_id": agent_id,
+                        "conversation_count": conv_count,
+                        "satisfaction_rate": satisfaction_by_agent.get(agent_id, 0),
+                    }
+                    for agent_id, conv_count in agents
+                ),
+                key=lambda x: x["conversation_count"],
+                reverse=True,
+            )[:5]
+
+            return AgentAnalytics(
+                total_agents=len(agents),
+                agent_conversation_counts=[
+                    {"agent_id": agent_id, "conversation_count": count} for agent_id, count in agents
+                ],
+                agent_satisfaction_rates=agent_satisfaction,
+                agent_tool_usage=[
+                    {"agent_id": agent_id, "tool_usage_count": tool_usage.get(agent_id, 0)} for agent_id, _ in agents
+                ],
+                top_performing_agents=top_performing_agents,
             )
 
-        # 按对话数排序，取前5名
-        top_performing_agents.sort(key=lambda x: x["conversation_count"], reverse=True)
-        top_performing_agents = top_performing_agents[:5]
-
-        return AgentAnalytics(
-            total_agents=total_agents,
-            agent_conversation_counts=agent_conversation_counts,
-            agent_satisfaction_rates=agent_satisfaction,
-            agent_tool_usage=agent_tool_usage,
-            top_performing_agents=top_performing_agents,
-        )
+        return await dashboard_stats_service.dashboard_cache.get_or_compute("stats:agents", compute)
 
     except Exception as e:
         logger.error(f"Error getting agent analytics: {e}")
@@ -590,43 +554,42 @@ async def get_dashboard_stats(
     from yuxi.storage.postgres.models_business import Conversation, Message, MessageFeedback
 
     try:
-        # Basic counts
-        total_conversations_result = await db.execute(select(func.count(Conversation.id)))
-        total_conversations = total_conversations_result.scalar() or 0
 
-        active_conversations_result = await db.execute(
-            select(func.count(Conversation.id)).filter(Conversation.status == "active")
-        )
-        active_conversations = active_conversations_result.scalar() or 0
-
-        total_messages_result = await db.execute(select(func.count(Message.id)))
-        total_messages = total_messages_result.scalar() or 0
-
-        total_users_result = await db.execute(select(func.count(User.id)).filter(User.is_deleted == 0))
-        total_users = total_users_result.scalar() or 0
-
-        # Feedback statistics
-        total_feedbacks_result = await db.execute(select(func.count(MessageFeedback.id)))
-        total_feedbacks = total_feedbacks_result.scalar() or 0
-
-        like_count_result = await db.execute(
-            select(func.count(MessageFeedback.id)).filter(MessageFeedback.rating == "like")
-        )
-        like_count = like_count_result.scalar() or 0
+        async def compute() -> dict:
+            # 各项计数作为标量子查询在一次往返中返回
+            row = (
+                await db.execute(
+                    select(
+                        select(func.count(Conversation.id)).scalar_subquery(),
+                        select(func.count(Conversation.id)).filter(Conversation.status == "active").scalar_subquery(),
+                        select(func.count(Message.id)).scalar_subquery(),
+                        select(func.count(User.id)).filter(User.is_deleted == 0).scalar_subquery(),
+                        select(func.count(MessageFeedback.id)).scalar_subquery(),
+                        select(func.count(MessageFeedback.id))
+                        .filter(MessageFeedback.rating == "like")
+                        .scalar_subquery(),
+                    )
+                )
+            ).one()
+            total_conversations, active_conversations, total_messages, total_users, total_feedbacks, like_count = (
+                value or 0 for value in row
+            )
 
-        # Calculate satisfaction rate
-        satisfaction_rate = round((like_count / total_feedbacks * 100), 2) if total_feedbacks > 0 else 100
+            # Calculate satisfaction rate
+            satisfaction_rate = round((like_count / total_feedbacks * 100), 2) if total_feedbacks > 0 else 100
+
+            return {
+                "total_conversations": total_conversations,
+                "active_conversations": active_conversations,
+                "total_messages": total_messages,
+                "total_users": total_users,
+                "feedback_stats": {
+                    "total_feedbacks": total_feedbacks,
+                    "satisfaction_rate": satisfaction_rate,
+                },
+            }
 
-        return {
-            "total_conversations": total_conversations,
-            "active_conversations": active_conversations,
-            "total_messages": total_messages,
-            "total_users": total_users,
-            "feedback_stats": {
-                "total_feedbacks": total_feedbacks,
-                "satisfaction_rate": satisfaction_rate,
-            },
-        }
+        return await dashboard_stats_service.dashboard_cache.get_or_compute("stats:basic", compute)
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {e}")
         logger.error(traceback.format_exc())
@@ -61,7 +61,7 @@ async def get_graphs(current_user: User = Depends(get_admin_user)):
         graphs = []
 
         # 1. 获取默认 Neo4j 图谱信息 (Upload 类型)
-        neo4j_info = graph_base.get_graph_info()
+        neo4j_info = await graph_base.get_graph_info()
         if neo4j_info:
             # 直接使用 Upload 适配器的默认 metadata
             from yuxi.knowledge.graphs.adapters.upload import UploadGraphAdapter
@@ -190,7 +190,7 @@ async def get_graph_stats(
             return {"success": True, "data": stats_data}
         else:
             # Neo4j stats (直接管理的图谱)
-            info = graph_base.get_graph_info(graph_name=db_id)
+            info = await graph_base.get_graph_info(graph_name=db_id)
             if not info:
                 raise HTTPException(status_code=404, detail="Graph info not found")
 
@@ -235,7 +235,7 @@ async def get_neo4j_node(
 async def get_neo4j_info(current_user: User = Depends(get_admin_user)):
     """获取Neo4j图数据库信息"""
     try:
-        graph_info = graph_base.get_graph_info()
+        graph_info = await graph_base.get_graph_info()
         if graph_info is None:
             raise HTTPException(status_code=400, detail="图数据库获取出错")
         return {"success": True, "data": graph_info}
@@ -244,6 +244,14 @@ async def get_neo4j_info(current_user: User = Depends(get_admin_user)):
         raise HTTPException(status_code=500, detail=f"获取图数据库信息失败: {str(e)}")
 
 
+@graph.get("/neo4j/metrics")
+async def get_neo4j_metrics(current_user: User = Depends(get_admin_user)):
+    """获取 Neo4j 连接池配置与各查询的耗时统计"""
+    from yuxi.knowledge.graphs.neo4j_client import get_async_neo4j_client
+
+    return {"success": True, "data": get_async_neo4j_client().stats()}
+
+
 @graph.post("/neo4j/index-entities")
 async def index_neo4j_entities(data: dict = Body(default={}), current_user: User = Depends(get_admin_user)):
     """为Neo4j图谱节点添加嵌入向量索引"""
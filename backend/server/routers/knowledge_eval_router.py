@@ -212,6 +212,23 @@ async def run_evaluation(db_id: str, params: dict = Body(...), current_user: Use
         raise HTTPException(status_code=500, detail=f"启动评估失败: {str(e)}")
 
 
+@evaluation.post("/databases/{db_id}/results/{task_id}/resume")
+async def resume_evaluation(
+    db_id: str, task_id: str, params: dict = Body(default={}), current_user: User = Depends(get_admin_user)
+):
+    """从最后一次提交的题目继续未完成的评估"""
+    from yuxi.services.evaluation_service import EvaluationService
+
+    try:
+        service = EvaluationService()
+        execution = {key: params[key] for key in ("eval_concurrency", "model_rate_limits") if key in params}
+        await service.resume_evaluation(db_id, task_id, execution=execution)
+        return {"message": "success", "data": {"task_id": task_id}}
+    except Exception as e:
+        logger.error(f"续跑评估失败: {e}, {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"续跑评估失败: {str(e)}")
+
+
 @evaluation.get("/databases/{db_id}/history")
 async def get_evaluation_history(db_id: str, current_user: User = Depends(get_admin_user)):
     """获取知识库的评估历史记录"""
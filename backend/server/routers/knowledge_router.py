@@ -3,6 +3,7 @@ import json
 import os
 import textwrap
 import traceback
+from contextlib import contextmanager
 from urllib.parse import quote, unquote
 
 import aiofiles
@@ -13,8 +14,18 @@ from starlette.responses import StreamingResponse
 from yuxi.services.task_service import TaskContext, tasker
 from server.utils.auth_middleware import get_admin_user, get_required_user
 from yuxi import config, knowledge_base
+from yuxi.agents.backends.knowledge_base_backend import knowledge_base_tree_index
+from yuxi.agents.backends.knowledge_base_grep import knowledge_base_grep_engine
 from yuxi.knowledge.chunking.ragflow_like.presets import ensure_chunk_defaults_in_additional_params
-from yuxi.plugins.parser import Parser, SUPPORTED_FILE_EXTENSIONS, is_supported_file_extension
+from yuxi.plugins.parser import (
+    Parser,
+    SUPPORTED_FILE_EXTENSIONS,
+    get_docling_pool_stats,
+    get_parse_cache_stats,
+    invalidate_parse_cache,
+    is_supported_file_extension,
+    parse_progress_callback,
+)
 from yuxi.knowledge.utils import calculate_content_hash
 from yuxi.knowledge.utils.kb_utils import parse_minio_url
 from yuxi.models.embed import test_all_embedding_models_status, test_embedding_model_status
@@ -83,6 +94,21 @@ async def _ensure_database_not_dify(db_id: str, operation: str) -> None:
         raise HTTPException(status_code=400, detail=f"Dify 知识库只支持检索，不支持{operation}")
 
 
+@contextmanager
+def _report_parse_progress(context: TaskContext, prefix: str):
+    """把解析器在工作线程中上报的页级进度转发为任务消息"""
+    loop = asyncio.get_running_loop()
+
+    def _on_progress(done: int, total: int) -> None:
+        asyncio.run_coroutine_threadsafe(context.set_message(f"{prefix}：已识别 {done}/{total} 页"), loop)
+
+    token = parse_progress_callback.set(_on_progress)
+    try:
+        yield
+    finally:
+        parse_progress_callback.reset(token)
+
+
 # =============================================================================
 # === 知识库管理分组 ===
 # =============================================================================
@@ -408,7 +434,8 @@ async def add_documents(
 
                 try:
                     # 2. Parse file (PARSING -> PARSED)
-                    file_meta = await knowledge_base.parse_file(db_id, file_id, operator_id=current_user.user_id)
+                    with _report_parse_progress(context, f"[2/2] 解析文件 {idx}/{len(added_files)}"):
+                        file_meta = await knowledge_base.parse_file(db_id, file_id, operator_id=current_user.user_id)
                     added_files[item] = (file_id, file_meta)
                     processed_items.append(file_meta)
                     parse_success_count += 1
@@ -530,7 +557,8 @@ async def parse_documents(db_id: str, file_ids: list[str] = Body(...), current_u
                 await context.set_progress(progress, f"正在解析第 {idx}/{total} 个文档")
 
                 try:
-                    result = await knowledge_base.parse_file(db_id, file_id, operator_id=current_user.user_id)
+                    with _report_parse_progress(context, f"正在解析第 {idx}/{total} 个文档"):
+                        result = await knowledge_base.parse_file(db_id, file_id, operator_id=current_user.user_id)
                     processed_items.append(result)
                 except Exception as e:
                     logger.error(f"Parse failed for {file_id}: {e}")
@@ -1394,13 +1422,13 @@ async def mark_it_down(file: UploadFile = File(...), current_user: User = Depend
     temp_path = None
 
     try:
-        content = await file.read()
-
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
             temp_path = temp_file.name
 
+        # 分块写入临时文件，避免大文件整体读入内存
         async with aiofiles.open(temp_path, "wb") as temp_buffer:
-            await temp_buffer.write(content)
+            while chunk := await file.read(1024 * 1024):
+                await temp_buffer.write(chunk)
 
         markdown_content = await Parser.aparse(temp_path)
         return {"markdown_content": markdown_content, "message": "success"}
@@ -1442,6 +1470,47 @@ async def get_knowledge_base_statistics(current_user: User = Depends(get_admin_u
         return {"message": f"获取知识库统计失败 {e}", "stats": {}}
 
 
+@knowledge.get("/parse-cache/stats")
+async def get_parse_cache_statistics(current_user: User = Depends(get_admin_user)):
+    """获取解析缓存命中统计（当前进程）"""
+    return {"stats": get_parse_cache_stats(), "message": "success"}
+
+
+@knowledge.delete("/parse-cache")
+async def clear_parse_cache(content_hash: str | None = Query(None), current_user: User = Depends(get_admin_user)):
+    """清理解析缓存，指定 content_hash 时只清理该文件的缓存"""
+    try:
+        deleted = await invalidate_parse_cache(content_hash)
+        return {"deleted": deleted, "message": "success"}
+    except Exception as e:
+        logger.error(f"清理解析缓存失败 {e}, {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"清理解析缓存失败: {e}")
+
+
+@knowledge.get("/lightrag-instances/stats")
+async def get_lightrag_instance_statistics(current_user: User = Depends(get_admin_user)):
+    """获取常驻 LightRAG 实例的数量、内存估算与淘汰指标（当前进程）"""
+    return {"stats": knowledge_base.get_lightrag_instance_stats(), "message": "success"}
+
+
+@knowledge.get("/docling-pool/stats")
+async def get_docling_pool_statistics(current_user: User = Depends(get_admin_user)):
+    """获取 Docling 转换进程池的排队与运行指标（当前进程）"""
+    return {"stats": get_docling_pool_stats(), "message": "success"}
+
+
+@knowledge.get("/tree-index/stats")
+async def get_tree_index_statistics(current_user: User = Depends(get_admin_user)):
+    """获取智能体知识库虚拟文件树索引的缓存与重建指标（当前进程）"""
+    return {"stats": knowledge_base_tree_index.stats(), "message": "success"}
+
+
+@knowledge.get("/grep/stats")
+async def get_grep_statistics(current_user: User = Depends(get_admin_user)):
+    """获取智能体知识库全文检索的并发、裁剪与提前终止指标（当前进程）"""
+    return {"stats": knowledge_base_grep_engine.stats(), "message": "success"}
+
+
 # =============================================================================
 # === Embedding模型状态检查分组 ===
 # =============================================================================
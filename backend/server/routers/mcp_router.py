@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from yuxi.services.mcp_service import (
     create_mcp_server,
     get_mcp_tools_stats,
+    get_mcp_registry_stats,
     delete_mcp_server,
     get_all_mcp_servers,
     get_all_mcp_tools,
@@ -92,6 +93,14 @@ async def get_mcp_servers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@mcp.get("/registry/stats")
+async def get_mcp_registry_status(
+    current_user: User = Depends(get_admin_user),
+):
+    """获取各 MCP 服务器的工具缓存年龄、失败次数与熔断状态"""
+    return {"success": True, "data": get_mcp_registry_stats()}
+
+
 @mcp.post("")
 async def create_mcp_server_route(
     request: CreateMcpServerRequest,
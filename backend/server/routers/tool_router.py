@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
 
+from yuxi.agents.toolkits.mysql.tools import get_mysql_pool_stats
 from yuxi.services.tool_service import get_tool_metadata
 from server.utils.auth_middleware import get_admin_user
 from yuxi.storage.postgres.models_business import User
@@ -23,3 +24,11 @@ async def get_tool_options(
     """获取工具选项（前端下拉框用）"""
     all_tools = get_tool_metadata()
     return {"success": True, "data": [{"label": t["name"], "value": t["id"]} for t in all_tools]}
+
+
+@tools.get("/mysql/pool-stats")
+async def get_mysql_pool_stats_route(
+    user: User = Depends(get_admin_user),
+):
+    """获取 MySQL 工具连接池统计（含等待时间）"""
+    return {"success": True, "data": get_mysql_pool_stats()}
@@ -1,16 +1,16 @@
-import hashlib
 import re
 
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from yuxi.storage.postgres.manager import pg_manager
 from yuxi.storage.postgres.models_business import APIKey, User
 from yuxi.utils.datetime_utils import utc_now_naive
 
 from server.utils.auth_utils import AuthUtils
+from server.utils.principal_cache import api_key_cache_key, hash_credential, jwt_cache_key, principal_cache
 
 # 定义OAuth2密码承载器，指定token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
@@ -34,7 +34,7 @@ async def get_db():
 
 async def _verify_api_key(key: str, db: AsyncSession) -> tuple[User | None, APIKey | None]:
     """验证 API Key 并返回关联用户和 APIKey 对象"""
-    key_hash = hashlib.sha256(key.encode()).hexdigest()
+    key_hash = hash_credential(key)
 
     result = await db.execute(select(APIKey).filter(APIKey.key_hash == key_hash))
     api_key = result.scalar_one_or_none()
@@ -94,10 +94,22 @@ async def get_current_user(
     # 根据 token 前缀判断认证方式
     if token.startswith("yxkey_"):
         # API Key 认证
+        cache_key = api_key_cache_key(hash_credential(token))
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            user = await cached.attach(db)
+            if principal_cache.should_touch(cached):
+                await db.execute(
+                    update(APIKey).where(APIKey.id == cached.api_key_id).values(last_used_at=utc_now_naive())
+                )
+                await db.commit()
+            return user
+
         user, api_key_obj = await _verify_api_key(token, db)
         if user is not None and api_key_obj is not None:
             api_key_obj.last_used_at = utc_now_naive()
             await db.commit()
+            principal_cache.put(cache_key, user, api_key_obj)
         return user
 
     # JWT Token 认证
@@ -115,10 +127,16 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    result = await db.execute(select(User).filter(User.id == int(user_id), User.is_deleted == 0))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise credentials_exception
+    cache_key = jwt_cache_key(token)
+    cached = principal_cache.get(cache_key)
+    if cached is not None:
+        user = await cached.attach(db)
+    else:
+        result = await db.execute(select(User).filter(User.id == int(user_id), User.is_deleted == 0))
+        user = result.scalar_one_or_none()
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(cache_key, user)
     if user.is_login_locked():
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
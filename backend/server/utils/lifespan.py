@@ -5,15 +5,27 @@ from fastapi import FastAPI
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 
 from yuxi.services.task_service import tasker
-from yuxi.services.mcp_service import ensure_builtin_mcp_servers_in_db
+from yuxi.services.dashboard_stats_service import start_dashboard_rollup_refresher, stop_dashboard_rollup_refresher
+from yuxi.services.mcp_service import (
+    ensure_builtin_mcp_servers_in_db,
+    start_mcp_tools_refresher,
+    stop_mcp_tools_refresher,
+)
+from yuxi.services.model_cache import model_cache
 from yuxi.services.model_provider_service import ensure_builtin_model_providers_in_db
 from yuxi.services.subagent_service import init_builtin_subagents
 from yuxi.services.run_queue_service import close_queue_clients, get_redis_client
 from yuxi.storage.postgres.manager import pg_manager
 from yuxi.knowledge import knowledge_base
+from yuxi.knowledge.graphs.neo4j_client import get_async_neo4j_client
+from yuxi.knowledge.implementations.lightrag_registry import start_lightrag_idle_sweeper, stop_lightrag_idle_sweeper
+from yuxi.plugins.parser import shutdown_docling_pool, start_docling_pool
+from yuxi.agents.toolkits.mysql.tools import close_mysql_connection_pool
 from yuxi.utils import logger
 from yuxi.agents.backends.sandbox import init_sandbox_provider, shutdown_sandbox_provider
+from yuxi.agents.backends.knowledge_base_grep import knowledge_base_grep_engine
 from yuxi import get_version
+from server.utils.principal_cache import start_principal_invalidation_listener, stop_principal_invalidation_listener
 
 
 @asynccontextmanager
@@ -34,6 +46,24 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to ensure builtin MCP servers during startup: {e}")
 
+    # 后台并发预热 MCP 工具缓存，慢服务器不阻塞启动
+    try:
+        start_mcp_tools_refresher()
+    except Exception as e:
+        logger.error(f"Failed to start MCP tools refresher during startup: {e}")
+
+    # 后台补齐并增量刷新仪表盘日汇总表
+    try:
+        start_dashboard_rollup_refresher()
+    except Exception as e:
+        logger.error(f"Failed to start dashboard rollup refresher during startup: {e}")
+
+    # 订阅认证主体缓存的跨进程失效广播
+    try:
+        start_principal_invalidation_listener()
+    except Exception as e:
+        logger.error(f"Failed to start principal invalidation listener during startup: {e}")
+
     # 初始化内置模型供应商配置
     try:
         async with pg_manager.get_async_session_context() as session:
@@ -43,12 +73,12 @@ async def lifespan(app: FastAPI):
 
     # 初始化模型缓存（v2 模型选择使用）
     try:
-        from yuxi.services.model_cache import model_cache
         from yuxi.services.model_provider_service import get_all_model_providers
 
         async with pg_manager.get_async_session_context() as session:
             providers = await get_all_model_providers(session)
-            model_cache.rebuild(providers)
+            await model_cache.rebuild(providers)
+        await model_cache.start()
     except Exception as e:
         logger.error(f"Failed to initialize model cache during startup: {e}")
 
@@ -61,13 +91,25 @@ async def lifespan(app: FastAPI):
 
     # 初始化知识库管理器
     if os.environ.get("LITE_MODE", "").lower() in ("true", "1"):
-        logger.info("LITE_MODE enabled, skipping knowledge base initialization")
+        logger.info("LITE_MODE enabled, skipping knowledge base initialization and docling prewarm")
     else:
         try:
             await knowledge_base.initialize()
         except Exception as e:
             logger.error(f"Failed to initialize knowledge base manager: {e}")
 
+        # 后台按间隔释放空闲的 LightRAG 实例
+        try:
+            start_lightrag_idle_sweeper()
+        except Exception as e:
+            logger.error(f"Failed to start LightRAG idle sweeper during startup: {e}")
+
+        # 提前启动 Docling 子进程并在后台加载模型，避免首个文档解析承担冷启动
+        try:
+            start_docling_pool()
+        except Exception as e:
+            logger.error(f"Failed to start docling pool during startup: {e}")
+
     # 预热 Redis（run 队列）
     try:
         redis = await get_redis_client()
@@ -102,6 +144,15 @@ async def lifespan(app: FastAPI):
     logger.info("Yuxi backend startup complete")
     yield
     await tasker.shutdown()
+    await stop_mcp_tools_refresher()
+    await stop_dashboard_rollup_refresher()
+    await stop_principal_invalidation_listener()
+    await stop_lightrag_idle_sweeper()
+    await model_cache.stop()
     shutdown_sandbox_provider()
+    shutdown_docling_pool()
+    knowledge_base_grep_engine.shutdown()
     await close_queue_clients()
+    await close_mysql_connection_pool()
+    await get_async_neo4j_client().close()
     await pg_manager.close()
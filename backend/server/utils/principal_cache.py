@@ -0,0 +1,267 @@
+"""
+认证主体缓存
+
+JWT 与 API Key 认证解析出的用户按 token 哈希 / API Key 哈希短期缓存，避免 SSE 重连和高频轮询
+重复查询同一用户。缓存的是用户列值快照，命中时以 merge(load=False) 挂到当前请求的会话上，
+下游对 current_user 的修改与提交行为保持不变。
+
+用户禁用、角色变更、密码重置与 API Key 吊销时显式失效，并通过 Redis 广播到其他进程；
+Redis 不可用时各进程依靠 TTL 收敛。
+"""
+
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from yuxi.storage.postgres.models_business import APIKey, User
+from yuxi.utils import logger
+from yuxi.utils.datetime_utils import utc_now_naive
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+# 命中缓存时 API Key 的 last_used_at 最多每隔该秒数写回一次
+API_KEY_TOUCH_INTERVAL = float(os.getenv("API_KEY_TOUCH_INTERVAL", "60"))
+PRINCIPAL_INVALIDATION_CHANNEL = os.getenv("PRINCIPAL_INVALIDATION_CHANNEL", "auth:principal:invalidate")
+
+
+def hash_credential(credential: str) -> str:
+    return hashlib.sha256(credential.encode()).hexdigest()
+
+
+def jwt_cache_key(token: str) -> str:
+    return f"jwt:{hash_credential(token)}"
+
+
+def api_key_cache_key(key_hash: str) -> str:
+    return f"apikey:{key_hash}"
+
+
+def snapshot_user(user: User) -> dict[str, Any]:
+    return {attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs}
+
+
+@dataclass
+class CachedPrincipal:
+    user_state: dict[str, Any]
+    expires_at: float
+    api_key_id: int | None = None
+    api_key_expires_at: dt.datetime | None = None
+    last_touched: float = 0.0
+
+    @property
+    def user_id(self) -> int:
+        return self.user_state["id"]
+
+    def api_key_expired(self) -> bool:
+        return self.api_key_expires_at is not None and utc_now_naive() > self.api_key_expires_at
+
+    async def attach(self, db: AsyncSession) -> User:
+        """基于快照构造用户并挂到当前会话，不发出查询"""
+        user = User(**self.user_state)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
+
+class PrincipalCache:
+    """按凭证哈希索引、可按用户失效的 TTL + LRU 缓存"""
+
+    def __init__(
+        self,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = PRINCIPAL_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max(1, max_entries or PRINCIPAL_CACHE_MAX_ENTRIES)
+        self._clock = clock
+        self._entries: OrderedDict[str, CachedPrincipal] = OrderedDict()
+        self._keys_by_user: dict[int, set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> CachedPrincipal | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self._clock() or entry.api_key_expired():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, user: User, api_key: APIKey | None = None) -> None:
+        if not self.enabled:
+            return
+        self._remove(key)
+        now = self._clock()
+        entry = CachedPrincipal(
+            user_state=snapshot_user(user),
+            expires_at=now + self.ttl,
+            api_key_id=api_key.id if api_key is not None else None,
+            api_key_expires_at=api_key.expires_at if api_key is not None else None,
+            last_touched=now,
+        )
+        self._entries[key] = entry
+        self._keys_by_user.setdefault(entry.user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def should_touch(self, entry: CachedPrincipal) -> bool:
+        """API Key 命中缓存时是否需要写回 last_used_at"""
+        now = self._clock()
+        if now - entry.last_touched < API_KEY_TOUCH_INTERVAL:
+            return False
+        entry.last_touched = now
+        return True
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._keys_by_user.pop(entry.user_id, None)
+
+    def invalidate_user(self, user_id: int) -> int:
+        """移除该用户的全部 JWT 与 API Key 缓存（含解析到该用户的部门 Key）"""
+        keys = list(self._keys_by_user.get(user_id, ()))
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def invalidate_key(self, key: str) -> bool:
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        self.invalidations += 1
+        return True
+
+    def clear(self) -> None:
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def apply(self, message: dict[str, Any]) -> None:
+        """应用一条失效消息（本地或来自 Redis 广播）"""
+        kind = message.get("type")
+        if kind == "user":
+            self.invalidate_user(int(message["user_id"]))
+        elif kind == "api_key":
+            self.invalidate_key(api_key_cache_key(message["key_hash"]))
+        elif kind == "all":
+            self.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
+
+
+principal_cache = PrincipalCache()
+
+
+# =============================================================================
+# 失效广播
+# =============================================================================
+
+
+async def _broadcast(message: dict[str, Any]) -> None:
+    principal_cache.apply(message)
+    try:
+        from yuxi.services.run_queue_service import get_redis_client
+
+        redis = await get_redis_client()
+        await redis.publish(PRINCIPAL_INVALIDATION_CHANNEL, json.dumps(message))
+    except Exception as e:
+        logger.warning(f"Failed to broadcast principal cache invalidation {message}: {e}")
+
+
+async def invalidate_user(user_id: int) -> None:
+    """用户禁用、删除、角色 / 部门变更或密码重置后调用"""
+    await _broadcast({"type": "user", "user_id": int(user_id)})
+
+
+async def invalidate_api_key(key_hash: str) -> None:
+    """API Key 禁用、删除、重新生成或有效期变更后调用"""
+    await _broadcast({"type": "api_key", "key_hash": key_hash})
+
+
+async def invalidate_all() -> None:
+    await _broadcast({"type": "all"})
+
+
+async def _invalidation_loop() -> None:
+    from yuxi.services.run_queue_service import redis_pubsub
+
+    while True:
+        try:
+            async with redis_pubsub(PRINCIPAL_INVALIDATION_CHANNEL) as pubsub:
+                # 订阅期间可能漏掉的广播由清空本地缓存兜底
+                principal_cache.clear()
+                while True:
+                    msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if msg and msg.get("type") == "message":
+                        try:
+                            principal_cache.apply(json.loads(msg["data"]))
+                        except (ValueError, KeyError, TypeError) as e:
+                            logger.warning(f"Invalid principal invalidation message {msg.get('data')!r}: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Principal invalidation listener disconnected: {e}")
+        await asyncio.sleep(5)
+
+
+_listener_task: asyncio.Task | None = None
+
+
+def start_principal_invalidation_listener() -> None:
+    """启动 Redis 订阅任务，接收其他进程的失效广播"""
+    global _listener_task
+    if not principal_cache.enabled or (_listener_task is not None and not _listener_task.done()):
+        return
+    _listener_task = asyncio.create_task(_invalidation_loop())
+
+
+async def stop_principal_invalidation_listener() -> None:
+    global _listener_task
+    task, _listener_task = _listener_task, None
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
@@ -0,0 +1,134 @@
+"""ragflow_like 分块引擎的微基准。
+
+对 test/data 中的语料按 general / book / laws / qa / separator 预设分别分块，
+重复多次后输出每个预设的耗时中位数、chunk 数与吞吐（字符/秒、chunk/秒），
+用于对比分词与合并逻辑改动前后的性能。
+
+用法（在 backend 目录下）::
+
+    uv run python test/benchmarks/chunking_benchmark.py
+    uv run python test/benchmarks/chunking_benchmark.py --data test/data/A_Dream_of_Red_Mansions.txt \\
+        --presets general laws --chunk-token-num 256 --repeat 5 --output result.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+for path in (BACKEND_ROOT, BACKEND_ROOT / "package"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.setdefault("YUXI_SKIP_APP_INIT", "1")
+
+from yuxi.knowledge.chunking.ragflow_like import nlp  # noqa: E402
+from yuxi.knowledge.chunking.ragflow_like.dispatcher import chunk_markdown  # noqa: E402
+
+DEFAULT_DATA = [
+    BACKEND_ROOT / "test" / "data" / "A_Dream_of_Red_Mansions_10hui.txt",
+    BACKEND_ROOT / "test" / "data" / "lightrag_kb_test.txt",
+]
+DEFAULT_PRESETS = ["general", "book", "laws", "qa", "separator"]
+
+
+def build_law_corpus(articles: int = 300) -> str:
+    """生成带章、条、项层级的法规文本，覆盖 laws 预设的层级合并逻辑"""
+    lines = []
+    for i in range(1, articles + 1):
+        if i % 20 == 1:
+            lines.append(f"第{i // 20 + 1}章 总则")
+        lines.append(f"第{i}条 本法所称的事项，应当遵守以下规定。" + "具体内容说明" * (i % 40 + 1))
+        lines.append("（一）细则；")
+        lines.append("（二）other english words in the article;")
+    return "\n".join(lines)
+
+
+def load_corpora(paths: list[str], with_laws: bool) -> dict[str, str]:
+    corpora = {Path(p).name: Path(p).read_text(encoding="utf-8") for p in paths}
+    if with_laws:
+        corpora["generated_laws.txt"] = build_law_corpus()
+    return corpora
+
+
+def run_case(text: str, filename: str, preset: str, parser_config: dict[str, Any], repeat: int) -> dict[str, Any]:
+    timings = []
+    chunks: list[dict] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = chunk_markdown(
+            markdown_content=text,
+            file_id="bench",
+            filename=filename,
+            processing_params={"chunk_preset_id": preset, "chunk_parser_config": parser_config},
+        )
+        timings.append(time.perf_counter() - start)
+
+    median = statistics.median(timings)
+    return {
+        "preset": preset,
+        "file": filename,
+        "chars": len(text),
+        "chunks": len(chunks),
+        "max_chunk_tokens": max((nlp.count_tokens(ck["content"]) for ck in chunks), default=0),
+        "median_ms": median * 1000,
+        "min_ms": min(timings) * 1000,
+        "chars_per_sec": len(text) / median if median else 0.0,
+        "chunks_per_sec": len(chunks) / median if median else 0.0,
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> list[dict[str, Any]]:
+    corpora = load_corpora(args.data, with_laws="laws" in args.presets)
+    parser_config = {
+        "chunk_token_num": args.chunk_token_num,
+        "overlapped_percent": args.overlap,
+        "delimiter": args.delimiter,
+    }
+    rows = []
+    for filename, text in corpora.items():
+        for preset in args.presets:
+            rows.append(run_case(text, filename, preset, parser_config, args.repeat))
+    return rows
+
+
+def print_report(rows: list[dict[str, Any]]) -> None:
+    header = f"{'file':<40} {'preset':<10} {'chunks':>7} {'median_ms':>10} {'min_ms':>9} {'kchar/s':>9} {'chunk/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['file']:<40} {row['preset']:<10} {row['chunks']:>7} {row['median_ms']:>10.1f} "
+            f"{row['min_ms']:>9.1f} {row['chars_per_sec'] / 1000:>9.1f} {row['chunks_per_sec']:>9.0f}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="ragflow_like 分块性能基准")
+    parser.add_argument("--data", nargs="+", default=[str(p) for p in DEFAULT_DATA], help="语料文件路径")
+    parser.add_argument("--presets", nargs="+", default=DEFAULT_PRESETS, choices=DEFAULT_PRESETS)
+    parser.add_argument("--chunk-token-num", type=int, default=512, help="分块 token 数")
+    parser.add_argument("--overlap", type=int, default=0, help="重叠百分比")
+    parser.add_argument("--delimiter", default="\\n", help="分隔符，与前端配置格式一致")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例重复次数")
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    rows = run_benchmark(args)
+    print_report(rows)
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Upload 图谱批量导入吞吐基准。
+
+使用记录 Cypher 的 fake 异步客户端代替 Neo4j：每条查询按给定往返延迟 sleep，
+并按行数叠加少量服务端处理耗时；向量化用固定延迟的 fake embedding 模拟。
+在不同批大小下流式导入同一份 JSONL 三元组文件，输出 triples/sec、Bolt 往返次数与向量化实体数，
+批大小为 1 时近似旧版逐条 MERGE 的写入方式。
+
+用法（在 backend 目录下）::
+
+    uv run python test/benchmarks/graph_ingest_benchmark.py
+    uv run python test/benchmarks/graph_ingest_benchmark.py --triples 100000 --batch-sizes 1 500 2000 \\
+        --rtt-ms 1 --embed-ms 50 --output result.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+for path in (BACKEND_ROOT, BACKEND_ROOT / "package"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.setdefault("YUXI_SKIP_APP_INIT", "1")
+
+from yuxi.knowledge.graphs.bulk_ingest import (  # noqa: E402
+    MISSING_EMBEDDING_CYPHER,
+    SET_EMBEDDINGS_CYPHER,
+    GraphBulkIngestor,
+    iter_jsonl_triples,
+)
+
+
+class CypherRecordingClient:
+    """模拟 neo4j_client.AsyncNeo4jClient：记录语句，按往返延迟和行数计时。"""
+
+    def __init__(self, rtt_s: float, row_cost_s: float):
+        self.rtt_s = rtt_s
+        self.row_cost_s = row_cost_s
+        self.round_trips = 0
+        self.embedded: set[str] = set()
+
+    async def write(self, name: str, query: str, /, **params) -> list[dict]:
+        rows = params.get("rows") or params.get("names") or [None]
+        await asyncio.sleep(self.rtt_s + self.row_cost_s * len(rows))
+        self.round_trips += 1
+        if query == MISSING_EMBEDDING_CYPHER:
+            return [{"name": name} for name in dict.fromkeys(params["names"]) if name not in self.embedded]
+        if query == SET_EMBEDDINGS_CYPHER:
+            self.embedded.update(row["name"] for row in params["rows"])
+        return []
+
+    read = write
+
+
+def write_triples(path: Path, count: int, entities: int, seed: int) -> None:
+    rng = random.Random(seed)
+    relations = ["属于", "位于", "包含", "相关"]
+    with path.open("w", encoding="utf-8") as f:
+        for _ in range(count):
+            triple = {
+                "h": f"实体{rng.randrange(entities)}",
+                "r": {"type": rng.choice(relations), "weight": round(rng.random(), 3)},
+                "t": {"name": f"实体{rng.randrange(entities)}", "source": "bench"},
+            }
+            f.write(json.dumps(triple, ensure_ascii=False) + "\n")
+
+
+async def run_once(args: argparse.Namespace, data_path: Path, batch_size: int) -> dict[str, Any]:
+    client = CypherRecordingClient(args.rtt_ms / 1000, args.row_cost_us / 1_000_000)
+    embed_calls = 0
+
+    async def embed(names: list[str]) -> list[list[float]]:
+        nonlocal embed_calls
+        embed_calls += 1
+        await asyncio.sleep(args.embed_ms / 1000)
+        return [[0.0] * args.dimension for _ in names]
+
+    ingestor = GraphBulkIngestor(
+        client,
+        embed if args.embed_ms >= 0 else None,
+        batch_size=batch_size,
+        max_pending_embeddings=args.max_pending,
+    )
+    stats = await ingestor.ingest(iter_jsonl_triples(str(data_path)))
+    return {
+        "batch_size": batch_size,
+        **stats.to_dict(),
+        "round_trips": client.round_trips,
+        "embed_calls": embed_calls,
+    }
+
+
+def print_report(rows: list[dict[str, Any]]) -> None:
+    header = f"{'batch':>7} {'triples':>9} {'elapsed_s':>10} {'triples/s':>11} {'round_trips':>12} {'embedded':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['batch_size']:>7} {row['triples']:>9} {row['elapsed_s']:>10.2f} {row['triples_per_sec']:>11.1f} "
+            f"{row['round_trips']:>12} {row['embedded']:>9}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upload 图谱批量导入吞吐基准")
+    parser.add_argument("--input", default=None, help="JSONL 三元组文件，缺省时生成合成数据")
+    parser.add_argument("--triples", type=int, default=20000, help="合成三元组数量")
+    parser.add_argument("--entities", type=int, default=5000, help="合成数据的实体数量")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000], help="UNWIND 批大小")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="每次 Bolt 往返延迟（毫秒）")
+    parser.add_argument("--row-cost-us", type=float, default=5.0, help="服务端每行处理耗时（微秒）")
+    parser.add_argument("--embed-ms", type=float, default=20.0, help="每次向量化调用耗时（毫秒），负数表示不向量化")
+    parser.add_argument("--dimension", type=int, default=8, help="fake 向量维度")
+    parser.add_argument("--max-pending", type=int, default=2, help="同时进行中的向量化批次数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="graph-ingest-bench-") as temp_dir:
+        data_path = Path(args.input) if args.input else Path(temp_dir) / "triples.jsonl"
+        if not args.input:
+            write_triples(data_path, args.triples, args.entities, args.seed)
+        rows = [asyncio.run(run_once(args, data_path, batch_size)) for batch_size in args.batch_sizes]
+
+    print_report(rows)
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
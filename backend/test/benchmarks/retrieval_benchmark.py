@@ -0,0 +1,263 @@
+"""Milvus 检索质量与延迟基准。
+
+使用 test/data 中的语料在本地 Milvus Lite 中建库，用确定性哈希向量代替真实 Embedding 服务，
+对固定查询集逐一运行 ``MilvusKB.aquery``，在检索模式、索引档位、融合策略的组合下输出
+recall@k、MRR、p50/p95 延迟与 QPS。
+
+用法（在 backend 目录下）::
+
+    uv run python test/benchmarks/retrieval_benchmark.py
+    uv run python test/benchmarks/retrieval_benchmark.py --data test/data/A_Dream_of_Red_Mansions.txt \\
+        --queries 200 --modes vector hybrid --profiles flat ivf_flat --output result.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+for path in (BACKEND_ROOT, BACKEND_ROOT / "package"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.setdefault("YUXI_SKIP_APP_INIT", "1")
+
+from yuxi.knowledge.chunking.ragflow_like.dispatcher import chunk_markdown  # noqa: E402
+from yuxi.knowledge.eval.metrics import RetrievalMetrics  # noqa: E402
+from yuxi.knowledge.implementations.milvus import VECTOR_INDEX_PROFILES, MilvusKB  # noqa: E402
+
+DEFAULT_DATA = BACKEND_ROOT / "test" / "data" / "A_Dream_of_Red_Mansions_10hui.txt"
+DEFAULT_MODES = ["vector", "keyword", "hybrid"]
+DEFAULT_FUSIONS = ["weighted", "rrf"]
+SENTENCE_PATTERN = re.compile(r"[^。！？!?\n]{12,60}[。！？!?]")
+
+
+class HashingEmbedding:
+    """基于字符 n-gram 特征哈希的确定性向量，跨进程、跨机器结果一致。"""
+
+    def __init__(self, dimension: int = 256, ngram: int = 2, batch_size: int = 256):
+        self.dimension = dimension
+        self.ngram = ngram
+        self.batch_size = batch_size
+
+    def _encode_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimension
+        text = re.sub(r"\s+", "", text or "")
+        for i in range(max(len(text) - self.ngram + 1, 1)):
+            gram = text[i : i + self.ngram]
+            digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def encode(self, message: list[str] | str) -> list[list[float]]:
+        messages = [message] if isinstance(message, str) else message
+        return [self._encode_one(text) for text in messages]
+
+    def batch_encode(self, messages: list[str], batch_size: int | None = None) -> list[list[float]]:
+        return self.encode(messages)
+
+    async def abatch_encode(self, messages: list[str], batch_size: int | None = None) -> list[list[float]]:
+        return self.encode(messages)
+
+
+def build_chunks(data_path: Path, chunk_token_num: int) -> list[dict[str, Any]]:
+    text = data_path.read_text(encoding="utf-8")
+    params = {"chunk_preset_id": "general", "chunk_parser_config": {"chunk_token_num": chunk_token_num}}
+    return chunk_markdown(text, hashlib.md5(data_path.name.encode()).hexdigest()[:12], data_path.name, params)
+
+
+def build_query_set(chunks: list[dict[str, Any]], size: int, seed: int) -> list[dict[str, Any]]:
+    """从分块中抽取整句作为查询，金标准为该句所在的 chunk。"""
+    rng = random.Random(seed)
+    candidates = []
+    for chunk in chunks:
+        sentences = SENTENCE_PATTERN.findall(chunk["content"])
+        if sentences:
+            candidates.append((chunk["chunk_id"], sentences))
+
+    rng.shuffle(candidates)
+    queries = []
+    for chunk_id, sentences in candidates[:size]:
+        queries.append({"query": rng.choice(sentences).strip(), "gold_chunk_ids": [chunk_id]})
+    return queries
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def index_profile(kb: MilvusKB, profile: str, chunks: list[dict[str, Any]], embedder: HashingEmbedding) -> str:
+    db_id = f"bench_{profile}"
+    kb.databases_meta[db_id] = {
+        "embed_info": {"name": "hashing", "dimension": embedder.dimension},
+        "metadata": {"index_profile": profile},
+        "query_params": {},
+    }
+    collection = kb._create_new_collection(db_id, kb.databases_meta[db_id]["embed_info"], db_id)
+
+    batch_size = 512
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start : start + batch_size]
+        collection.insert(
+            [
+                [chunk["id"] for chunk in batch],
+                [chunk["content"] for chunk in batch],
+                [chunk["source"] for chunk in batch],
+                [chunk["chunk_id"] for chunk in batch],
+                [chunk["file_id"] for chunk in batch],
+                [chunk["chunk_index"] for chunk in batch],
+                embedder.encode([chunk["content"] for chunk in batch]),
+            ]
+        )
+    collection.flush()
+    collection.load()
+    kb.collections[db_id] = collection
+    return db_id
+
+
+async def run_case(
+    kb: MilvusKB, db_id: str, queries: list[dict[str, Any]], k_values: list[int], query_kwargs: dict[str, Any]
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    recalls = {k: 0.0 for k in k_values}
+    reciprocal_ranks = 0.0
+    errors: list[dict[str, str]] = []
+
+    started = time.perf_counter()
+    for item in queries:
+        query_started = time.perf_counter()
+        try:
+            chunks = await kb.aquery(item["query"], db_id, **query_kwargs)
+        except Exception as e:  # noqa: BLE001
+            # 单条查询失败按未召回计分，记录下来后继续跑完整个查询集
+            errors.append({"query": item["query"], "error": f"{type(e).__name__}: {e}"})
+            continue
+        latencies.append(time.perf_counter() - query_started)
+
+        retrieved_ids = [str(chunk["metadata"].get("chunk_id") or "") for chunk in chunks]
+        for k in k_values:
+            recalls[k] += RetrievalMetrics.recall_at_k(retrieved_ids, item["gold_chunk_ids"], k)
+        reciprocal_ranks += RetrievalMetrics.reciprocal_rank(retrieved_ids, item["gold_chunk_ids"])
+    elapsed = time.perf_counter() - started
+
+    total = len(queries) or 1
+    result: dict[str, Any] = {f"recall@{k}": recalls[k] / total for k in k_values}
+    result.update(
+        {
+            "mrr": reciprocal_ranks / total,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "qps": len(queries) / elapsed if elapsed > 0 else 0.0,
+            "errors": len(errors),
+            "query_errors": errors,
+        }
+    )
+    return result
+
+
+def print_report(rows: list[dict[str, Any]], k_values: list[int]) -> None:
+    metric_headers = ["mrr", "p50_ms", "p95_ms", "qps", "errors"]
+    headers = ["mode", "profile", "fusion", *[f"recall@{k}" for k in k_values], *metric_headers]
+    table = [headers]
+    for row in rows:
+        if row.get("error"):
+            table.append([row["mode"], row["profile"], row["fusion"], f"error: {row['error']}"])
+            continue
+        table.append(
+            [row["mode"], row["profile"], row["fusion"]]
+            + [f"{row[f'recall@{k}']:.3f}" for k in k_values]
+            + [f"{row['mrr']:.3f}", f"{row['p50_ms']:.1f}", f"{row['p95_ms']:.1f}", f"{row['qps']:.1f}"]
+            + [str(row["errors"])]
+        )
+
+    widths = [max(len(str(line[i])) for line in table if i < len(line)) for i in range(len(headers))]
+    for line in table:
+        print("  ".join(str(cell).ljust(widths[i]) for i, cell in enumerate(line)))
+
+    # 每个组合只展示前几条失败查询，完整列表写入 --output
+    for row in rows:
+        for failure in row.get("query_errors", [])[:3]:
+            print(f"[{row['mode']}/{row['profile']}/{row['fusion']}] {failure['query']}: {failure['error']}")
+
+
+async def run_benchmark(args: argparse.Namespace) -> list[dict[str, Any]]:
+    chunks = build_chunks(Path(args.data), args.chunk_token_num)
+    queries = build_query_set(chunks, args.queries, args.seed)
+    print(f"corpus={args.data} chunks={len(chunks)} queries={len(queries)}")
+
+    embedder = HashingEmbedding(dimension=args.dimension)
+    work_dir = tempfile.mkdtemp(prefix="yuxi-retrieval-bench-")
+    kb = MilvusKB(work_dir, milvus_uri=args.milvus_uri or os.path.join(work_dir, "milvus_lite.db"))
+    kb._get_async_embedding = lambda embed_info: embedder
+
+    rows: list[dict[str, Any]] = []
+    for profile in args.profiles:
+        try:
+            db_id = await index_profile(kb, profile, chunks, embedder)
+        except Exception as e:  # noqa: BLE001
+            for mode in args.modes:
+                rows.append({"mode": mode, "profile": profile, "fusion": "-", "error": str(e)})
+            continue
+
+        for mode in args.modes:
+            fusions = args.fusions if mode == "hybrid" else ["-"]
+            for fusion in fusions:
+                query_kwargs = {
+                    "search_mode": mode,
+                    "final_top_k": max(args.k),
+                    "similarity_threshold": 0.0,
+                    "include_distances": False,
+                }
+                if fusion != "-":
+                    query_kwargs["fusion_strategy"] = fusion
+                result = await run_case(kb, db_id, queries, args.k, query_kwargs)
+                rows.append({"mode": mode, "profile": profile, "fusion": fusion, **result})
+
+    return rows
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Milvus 检索质量与延迟基准")
+    parser.add_argument("--data", default=str(DEFAULT_DATA), help="语料文件路径")
+    parser.add_argument("--queries", type=int, default=100, help="查询数量")
+    parser.add_argument("--seed", type=int, default=42, help="查询集抽样种子")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10], help="recall@k 的 k 值")
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES, choices=DEFAULT_MODES)
+    parser.add_argument("--profiles", nargs="+", default=list(VECTOR_INDEX_PROFILES), choices=VECTOR_INDEX_PROFILES)
+    parser.add_argument("--fusions", nargs="+", default=DEFAULT_FUSIONS, choices=DEFAULT_FUSIONS)
+    parser.add_argument("--dimension", type=int, default=256, help="哈希向量维度")
+    parser.add_argument("--chunk-token-num", type=int, default=256, help="分块 token 数")
+    parser.add_argument("--milvus-uri", default=None, help="Milvus 地址，默认使用临时目录中的 Milvus Lite")
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    rows = asyncio.run(run_benchmark(args))
+    print_report(rows, args.k)
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
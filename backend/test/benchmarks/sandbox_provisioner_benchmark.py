@@ -0,0 +1,134 @@
+"""sandbox provisioner 的并发基准。
+
+使用进程内的 fake 后端（模拟沙盒启动耗时）直接驱动 provisioner 的 ASGI 应用，
+按给定并发发起创建沙盒请求，输出吞吐与 p50/p95/p99 延迟，
+用于对比同步/异步实现以及开启预热池前后的尾延迟。
+
+用法（在 backend 目录下）::
+
+    uv run python test/benchmarks/sandbox_provisioner_benchmark.py
+    uv run python test/benchmarks/sandbox_provisioner_benchmark.py --requests 200 --concurrency 50 \\
+        --startup-seconds 0.5 --warm-pool-size 20 --output result.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+APP_PATH = Path(__file__).resolve().parents[3] / "docker" / "sandbox_provisioner" / "app.py"
+
+
+def load_app(startup_seconds: float, warm_pool_size: int, workers: int):
+    os.environ["PROVISIONER_BACKEND"] = "fake"
+    os.environ["FAKE_SANDBOX_STARTUP_SECONDS"] = str(startup_seconds)
+    os.environ["SANDBOX_WARM_POOL_SIZE"] = str(warm_pool_size)
+    # fake 沙盒不占用宿主机资源，容量只按 SANDBOX_MAX_SANDBOXES 计算
+    os.environ["SANDBOX_MAX_SANDBOXES"] = "100000"
+    os.environ["SANDBOX_CPUS"] = "0"
+    os.environ["SANDBOX_MEMORY_MB"] = "0"
+    os.environ["SANDBOX_PROVISIONER_WORKERS"] = str(workers)
+    os.environ.setdefault("SANDBOX_IDLE_TIMEOUT_SECONDS", "0")
+
+    spec = importlib.util.spec_from_file_location("sandbox_provisioner_app_bench", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    module = load_app(args.startup_seconds, args.warm_pool_size, args.workers)
+    await module.provisioner.start()
+    if args.warm_pool_size:
+        await module.warm_pool.fill()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def create(client: httpx.AsyncClient, index: int) -> None:
+        nonlocal errors
+        payload = {"sandbox_id": f"bench-{index}", "thread_id": f"thread-{index}", "user_id": "bench"}
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/sandboxes", json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://provisioner", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(create(client, i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+        health = (await client.get("/health")).json()
+
+    await module.provisioner.shutdown()
+
+    ordered = sorted(latencies)
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "startup_seconds": args.startup_seconds,
+        "warm_pool_size": args.warm_pool_size,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "requests_per_sec": args.requests / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "warm_pool": health["warm_pool"],
+    }
+
+
+def print_report(row: dict[str, Any]) -> None:
+    print(
+        f"requests={row['requests']} concurrency={row['concurrency']} startup={row['startup_seconds']}s "
+        f"warm_pool={row['warm_pool_size']} errors={row['errors']}"
+    )
+    print(
+        f"elapsed={row['elapsed_s']:.2f}s rps={row['requests_per_sec']:.1f} p50={row['p50_ms']:.1f}ms "
+        f"p95={row['p95_ms']:.1f}ms p99={row['p99_ms']:.1f}ms max={row['max_ms']:.1f}ms"
+    )
+    pool = row["warm_pool"]
+    if pool["enabled"]:
+        print(f"warm pool hits={pool['hits']} misses={pool['misses']} hit_rate={pool['hit_rate']}")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="sandbox provisioner 并发基准")
+    parser.add_argument("--requests", type=int, default=100, help="创建请求总数")
+    parser.add_argument("--concurrency", type=int, default=20, help="并发请求数")
+    parser.add_argument("--startup-seconds", type=float, default=0.5, help="fake 后端模拟的沙盒启动耗时")
+    parser.add_argument("--warm-pool-size", type=int, default=0, help="预热池大小，0 表示关闭")
+    parser.add_argument("--workers", type=int, default=32, help="后端调用线程数")
+    parser.add_argument("--output", default=None, help="结果 JSON 输出路径")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    row = asyncio.run(run_benchmark(args))
+    print_report(row)
+    if args.output:
+        Path(args.output).write_text(json.dumps(row, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import pytest
 from yuxi.agents.backends.knowledge_base_backend import (
     KBS_PATH,
     KnowledgeBaseReadonlyBackend,
+    KnowledgeBaseTreeIndex,
     build_knowledge_base_filepath_map,
     inject_filepaths_into_retrieval_result,
     resolve_file_relative_virtual_path,
@@ -166,7 +167,7 @@ def test_build_knowledge_base_filepath_map_matches_virtual_tree(monkeypatch, tmp
 
     mapped_virtual_paths = {path[len(KBS_PATH) :] for path in filepath_map.values()}
     for virtual_path in mapped_virtual_paths:
-        assert virtual_path in backend._files
+        assert backend._tree.file(virtual_path) is not None
 
 
 def test_resolve_file_relative_virtual_path_by_file_id(monkeypatch) -> None:
@@ -323,3 +324,34 @@ async def test_inject_filepaths_into_retrieval_result_requires_explicit_file_id(
 
     assert "filepath" not in result[0]["metadata"]
     assert "parsed_path" not in result[0]["metadata"]
+
+
+def test_tree_index_is_shared_and_rebuilds_only_changed_kb(monkeypatch, tmp_path) -> None:
+    files_meta = {
+        "file-a": {"file_id": "file-a", "database_id": "db-1", "filename": "a.txt", "size": 1},
+        "file-b": {"file_id": "file-b", "database_id": "db-2", "filename": "b.txt", "size": 2},
+    }
+    versions = {"db-1": 1, "db-2": 1}
+    monkeypatch.setattr("yuxi.agents.backends.knowledge_base_backend._all_files_meta", lambda: files_meta)
+    monkeypatch.setattr("yuxi.agents.backends.knowledge_base_backend._files_version", lambda db_id: versions[db_id])
+    index = KnowledgeBaseTreeIndex()
+    monkeypatch.setattr("yuxi.agents.backends.knowledge_base_backend.knowledge_base_tree_index", index)
+
+    visible_kbs = [{"db_id": "db-1", "name": "Alpha"}, {"db_id": "db-2", "name": "Beta"}]
+    first = KnowledgeBaseReadonlyBackend(visible_kbs=visible_kbs, cache_root=tmp_path)
+    assert [entry["path"] for entry in first.glob_info("**/*.txt")] == ["/Alpha/a.txt", "/Beta/b.txt"]
+    assert index.stats()["builds"] == 2
+
+    # 新的 backend 复用已构建的子树，不再重建
+    second = KnowledgeBaseReadonlyBackend(visible_kbs=list(reversed(visible_kbs)), cache_root=tmp_path)
+    assert {entry["path"] for entry in second.ls_info("/")} == {"/Alpha/", "/Beta/"}
+    assert {entry["path"] for entry in second.ls_info("/Beta")} == {"/Beta/b.txt"}
+    assert index.stats()["builds"] == 2
+
+    # 文件变更只让对应知识库的子树重建，已存在的 backend 也能看到新文件
+    files_meta["file-c"] = {"file_id": "file-c", "database_id": "db-1", "filename": "c.txt", "size": 3}
+    versions["db-1"] = 2
+    assert {entry["path"] for entry in first.ls_info("/Alpha")} == {"/Alpha/a.txt", "/Alpha/c.txt"}
+    assert {entry["path"] for entry in first.ls_info("/Beta")} == {"/Beta/b.txt"}
+    assert index.stats()["builds"] == 3
+    assert "Error" in first.read("/Alpha") and "directory" in first.read("/Alpha")
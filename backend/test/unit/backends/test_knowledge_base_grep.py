@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+
+from yuxi.agents.backends import knowledge_base_backend as kb_backend
+from yuxi.agents.backends.knowledge_base_grep import GrepTarget, KnowledgeBaseGrepEngine, _build_bitmap
+
+
+class _Loader:
+    def __init__(self, contents: dict[str, bytes]):
+        self.contents = contents
+        self.loads: list[str] = []
+        self._lock = threading.Lock()
+
+    def target(self, path: str, key: str = "v1", scope: str = "db-1") -> GrepTarget:
+        def load() -> bytes:
+            with self._lock:
+                self.loads.append(path)
+            return self.contents[path]
+
+        return GrepTarget(path=path, scope=scope, content_key=key, load=load)
+
+
+def test_grep_keeps_path_order_and_stops_at_match_limit() -> None:
+    contents = {f"/kb/{i:03d}.md": f"line\nhit {i}\n".encode() for i in range(200)}
+    loader = _Loader(contents)
+    engine = KnowledgeBaseGrepEngine(max_workers=2, ngram_index=False)
+
+    matches = engine.grep("hit", [loader.target(path) for path in sorted(contents)], max_matches=5)
+
+    assert [(m["path"], m["line"], m["text"]) for m in matches] == [
+        (f"/kb/{i:03d}.md", 2, f"hit {i}") for i in range(5)
+    ]
+    assert len(loader.loads) < len(contents)
+    assert engine.stats()["early_stops"] == 1
+    engine.shutdown()
+
+
+def test_ngram_index_prunes_files_until_content_changes() -> None:
+    contents = {
+        "/kb/a.md": "认证流程说明\nuse oauth token".encode(),
+        "/kb/b.md": b"plain text only",
+        "/kb/c.bin": b"\x00\x01binary",
+    }
+    loader = _Loader(contents)
+    engine = KnowledgeBaseGrepEngine(max_workers=4, ngram_index=True)
+    targets = [loader.target(path) for path in sorted(contents)]
+
+    first = engine.grep("oauth", targets)
+    assert [m["path"] for m in first] == ["/kb/a.md"]
+    assert len(loader.loads) == 3
+
+    # 已索引文件中不存在关键词片段（以及二进制文件）时不再读取
+    assert engine.grep("认证流程", targets) == [{"path": "/kb/a.md", "line": 1, "text": "认证流程说明"}]
+    assert engine.grep("zzqx", targets) == []
+    assert loader.loads.count("/kb/b.md") == 1
+    assert loader.loads.count("/kb/c.bin") == 1
+    assert engine.stats()["files_pruned"] >= 4
+
+    # 内容校验键变化后索引条目失效，文件重新读取
+    contents["/kb/b.md"] = b"now mentions zzqx"
+    changed = [loader.target(path, key="v2" if path == "/kb/b.md" else "v1") for path in sorted(contents)]
+    assert [m["path"] for m in engine.grep("zzqx", changed)] == ["/kb/b.md"]
+    engine.shutdown()
+
+
+def test_ngram_index_shares_byte_budget_across_scopes_and_drops_removed_scopes() -> None:
+    contents = {f"/kb/{i}.md": f"document {i} body".encode() for i in range(4)}
+    loader = _Loader(contents)
+    per_entry = 256 + len("/kb/0.md") + len(_build_bitmap(contents["/kb/0.md"]))
+    engine = KnowledgeBaseGrepEngine(max_workers=1, ngram_index=True, ngram_max_bytes=per_entry * 3)
+    targets = [loader.target(path, scope=f"db-{i % 2}") for i, path in enumerate(sorted(contents))]
+
+    engine.grep("zzqx", targets)
+    stats = engine.stats()
+    assert (stats["indexed_files"], stats["index_evictions"]) == (3, 1)
+    assert stats["index_bytes"] <= per_entry * 3
+
+    # 最早索引的文件已被淘汰，其余文件直接排除
+    loader.loads.clear()
+    engine.grep("zzqx", targets[1:])
+    assert loader.loads == []
+
+    engine.retain_scopes(["db-1"])
+    assert engine.stats()["indexed_scopes"] == 1
+    assert engine.stats()["indexed_files"] == 2
+    engine.shutdown()
+
+
+def test_ngram_index_sizes_bitmap_to_file_and_skips_large_files() -> None:
+    small = _build_bitmap(b"tiny file")
+    large = _build_bitmap(bytes(range(256)) * 64)
+    assert len(small) < len(large)
+
+    contents = {"/kb/big.md": b"x" * 2048 + b" needle", "/kb/small.md": b"short"}
+    loader = _Loader(contents)
+    engine = KnowledgeBaseGrepEngine(max_workers=1, ngram_index=True, ngram_max_file_bytes=1024)
+    targets = [loader.target(path) for path in sorted(contents)]
+
+    engine.grep("zzqx", targets)
+    assert engine.stats()["indexed_files"] == 1
+    assert [m["path"] for m in engine.grep("needle", targets)] == ["/kb/big.md"]
+    assert loader.loads.count("/kb/big.md") == 2
+    engine.shutdown()
+
+
+def test_backend_grep_reuses_local_cache_and_refetches_stale_content(monkeypatch, tmp_path) -> None:
+    files_meta = {
+        "file-a": {
+            "file_id": "file-a",
+            "database_id": "db-1",
+            "filename": "a.txt",
+            "path": "http://minio/kb-source/db-1/upload/a.txt",
+            "markdown_file": "http://minio/kb-parsed/db-1/parsed/file-a.md",
+            "content_hash": "hash-1",
+            "updated_at": "2026-03-26T00:00:00Z",
+        },
+    }
+    payloads = {"upload/a.txt": b"source says hello", "parsed/file-a.md": b"# parsed\nhello markdown"}
+    downloads: list[str] = []
+
+    class _FakeMinio:
+        def download_file(self, bucket_name: str, object_name: str) -> bytes:
+            downloads.append(object_name)
+            return payloads[object_name.split("/", 1)[1]]
+
+    versions = {"db-1": 1}
+    monkeypatch.setattr(kb_backend, "_all_files_meta", lambda: files_meta)
+    monkeypatch.setattr(kb_backend, "_files_version", lambda db_id: versions[db_id])
+    monkeypatch.setattr(kb_backend, "get_minio_client", lambda: _FakeMinio())
+    monkeypatch.setattr(kb_backend, "knowledge_base_grep_engine", KnowledgeBaseGrepEngine(max_workers=2))
+
+    backend = kb_backend.KnowledgeBaseReadonlyBackend(
+        visible_kbs=[{"db_id": "db-1", "name": "KB"}], cache_root=tmp_path
+    )
+
+    matches = backend.grep_raw("hello")
+    assert [(m["path"], m["line"]) for m in matches] == [("/KB/a.txt", 1), ("/KB/parsed/a.txt.md", 2)]
+    assert sorted(downloads) == ["db-1/parsed/file-a.md", "db-1/upload/a.txt"]
+
+    assert backend.grep_raw("hello", path="/KB/parsed") == [
+        {"path": "/KB/parsed/a.txt.md", "line": 2, "text": "hello markdown"}
+    ]
+    assert len(downloads) == 2
+
+    # 重新解析后更新时间变化，本地缓存按校验键失效并重新下载
+    payloads["parsed/file-a.md"] = b"# parsed\nhello again"
+    files_meta["file-a"]["updated_at"] = "2026-03-27T00:00:00Z"
+    versions["db-1"] = 2
+    assert backend.grep_raw("again") == [{"path": "/KB/parsed/a.txt.md", "line": 2, "text": "hello again"}]
+    assert downloads.count("db-1/parsed/file-a.md") == 2
+    assert downloads.count("db-1/upload/a.txt") == 1
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MODULE_NAME = "sandbox_provisioner_app_for_test"
+
+
+def _find_module_path() -> Path:
+    current = Path(__file__).resolve()
+    for parent in current.parents:
+        candidate = parent / "docker" / "sandbox_provisioner" / "app.py"
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError("docker/sandbox_provisioner/app.py not found from test path")
+
+
+def _load_module():
+    existing = sys.modules.get(MODULE_NAME)
+    if existing is not None:
+        return existing
+
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, _find_module_path())
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+async def test_warm_pool_claims_ready_sandbox_and_relabels_it(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0.05)
+    pool = module.WarmSandboxPool(backend, size=2, capacity=8)
+
+    assert await pool.fill() == 2
+    record = await pool.create("sb-1", "thread-1", "user-1")
+    cold_pool = module.WarmSandboxPool(module.FakeProvisionerBackend(startup_seconds=0.05), size=0)
+    cold = await cold_pool.create("sb-2", "thread-2", "user-1")
+
+    assert record.sandbox_id == "sb-1"
+    assert record.labels == {"sandbox-id": "sb-1", "thread-id": "thread-1", "user-id": "user-1"}
+    assert backend.discover("sb-1") is record
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["ready"]) == (1, 0, 1)
+    assert stats["hit_latency"]["p50_ms"] < 50
+    assert cold.sandbox_id == "sb-2"
+
+
+async def test_warm_pool_hands_each_warm_sandbox_to_one_thread(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    pool = module.WarmSandboxPool(backend, size=3, capacity=16)
+    await pool.fill()
+
+    records = await asyncio.gather(*(pool.create(f"sb-{i}", f"thread-{i}", "user-1") for i in range(6)))
+
+    assert len({record.sandbox_url for record in records}) == 6
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 3)
+
+
+async def test_warm_pool_refill_respects_host_capacity(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    pool = module.WarmSandboxPool(backend, size=4, capacity=3)
+    backend.create("busy", "thread-busy", "user-1")
+
+    assert await pool.fill() == 2
+    assert await pool.fill() == 0
+    assert pool.stats()["size"] == 3
+    # 未实现 warm 接口的后端不会启用预热池
+    assert module.WarmSandboxPool(module.MemoryProvisionerBackend(), size=2).enabled is False
+
+
+async def test_cold_starts_are_admitted_against_host_capacity(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0.05)
+    pool = module.WarmSandboxPool(backend, size=0, capacity=2)
+
+    results = await asyncio.gather(
+        *(pool.create(f"sb-{i}", f"thread-{i}", "user-1") for i in range(3)), return_exceptions=True
+    )
+
+    assert sum(isinstance(result, module.SandboxCapacityError) for result in results) == 1
+    assert backend.started == 2
+    # 已存在的沙盒重建不占用新的名额
+    assert (await pool.create("sb-0", "thread-0", "user-1")).sandbox_id == "sb-0"
+    assert pool.stats()["capacity_rejections"] == 1
+
+
+async def test_cold_starts_skip_admission_without_pool_or_explicit_capacity(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    monkeypatch.delenv("SANDBOX_MAX_SANDBOXES", raising=False)
+    module = _load_module()
+    monkeypatch.setattr(module, "host_sandbox_capacity", lambda: 1)
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    backend.list = lambda: (_ for _ in ()).throw(AssertionError("list() must not be called"))
+    pool = module.WarmSandboxPool(backend, size=0)
+
+    for i in range(3):
+        await pool.create(f"sb-{i}", f"thread-{i}", "user-1")
+
+    assert backend.started == 3
+    assert pool.stats()["admission"] is False
+
+
+async def test_cold_start_admission_tracks_live_sandboxes_without_listing(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    monkeypatch.setenv("SANDBOX_MAX_SANDBOXES", "2")
+    module = _load_module()
+    monkeypatch.setattr(module, "host_sandbox_capacity", lambda: 2)
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    list_calls = 0
+    original_list = backend.list
+
+    def counting_list():
+        nonlocal list_calls
+        list_calls += 1
+        return original_list()
+
+    backend.list = counting_list
+    provisioner = module.SandboxProvisioner(backend, pool=module.WarmSandboxPool(backend, size=0))
+
+    await provisioner.create("sb-1", "thread-1", "user-1")
+    await provisioner.create("sb-2", "thread-2", "user-1")
+    await provisioner.delete("sb-1")
+    await provisioner.create("sb-3", "thread-3", "user-1")
+
+    assert list_calls == 1
+    assert provisioner.pool.stats()["live"] == 2
+
+
+async def test_cold_start_reclaims_slot_from_ready_warm_sandbox(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    pool = module.WarmSandboxPool(backend, size=2, capacity=2)
+    await pool.fill()
+    backend.claim_warm = lambda *args: None
+
+    record = await pool.create("sb-1", "thread-1", "user-1")
+
+    assert record.sandbox_id == "sb-1"
+    assert pool.stats()["capacity_rejections"] == 0
+
+
+async def test_warm_pool_adopts_warm_sandboxes_from_previous_process(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    for i in range(3):
+        backend.create_warm(f"warm-old-{i}")
+    pool = module.WarmSandboxPool(backend, size=2, capacity=8)
+
+    await pool._adopt_existing()
+
+    assert pool.stats()["ready"] == 2
+    assert sorted(backend.list_warm()) == ["warm-old-0", "warm-old-1"]
+    record = await pool.create("sb-1", "thread-1", "user-1")
+    assert record.labels["thread-id"] == "thread-1"
+    assert pool.stats()["hits"] == 1
+
+
+async def test_provisioner_creates_sandboxes_concurrently_and_dedupes_same_id(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    monkeypatch.delenv("SANDBOX_MAX_SANDBOXES", raising=False)
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0.2)
+    provisioner = module.SandboxProvisioner(backend, pool=module.WarmSandboxPool(backend, size=0))
+
+    start = time.monotonic()
+    distinct = [provisioner.create(f"sb-{i}", f"thread-{i}", "user-1") for i in range(8)]
+    duplicated = [provisioner.create("sb-same", "thread-same", "user-1") for _ in range(4)]
+    records = await asyncio.gather(*distinct, *duplicated)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.2 * 3
+    assert backend.started == 9
+    assert len({id(record) for record in records[8:]}) == 1
+    assert provisioner.reaper.tracked == 9
+
+
+async def test_idle_reaper_deletes_by_deadline_and_skips_touched(monkeypatch):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    monkeypatch.setenv("SANDBOX_EXEC_TIMEOUT_SECONDS", "0")
+    monkeypatch.setenv("SANDBOX_IDLE_TIMEOUT_SECONDS", "1")
+    module = _load_module()
+    backend = module.FakeProvisionerBackend(startup_seconds=0)
+    reaper = module.SandboxIdleReaper(backend)
+    for sandbox_id in ("idle", "active"):
+        backend.create(sandbox_id, f"thread-{sandbox_id}", "user-1")
+        reaper.touch(sandbox_id)
+
+    clock = time.time()
+    monkeypatch.setattr(module.time, "time", lambda: clock + 0.6)
+    reaper.touch("active")
+    monkeypatch.setattr(module.time, "time", lambda: clock + 1.2)
+    deleted = await reaper.reap_expired()
+
+    assert deleted == ["idle"]
+    assert backend.discover("idle") is None
+    assert backend.discover("active") is not None
+    assert reaper.tracked == 1
+
+
+def _write_shim(path: Path, body: str) -> None:
+    path.write_text("#!/bin/sh\n" + body)
+    path.chmod(0o755)
+
+
+def test_warm_claim_script_binds_thread_paths_and_unmounts_the_staging_mount(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROVISIONER_BACKEND", "memory")
+    module = _load_module()
+    backend_cls = module.LocalContainerProvisionerBackend
+    volumes = backend_cls._warm_volumes(tmp_path / "host-threads")
+    root = tmp_path / "container"
+
+    def in_container(path: str) -> str:
+        return str(root) + path
+
+    # 以容器的挂载点为准：只有卷的 bind 目标和 tmpfs 的 /home/gem 是挂载点
+    mounts = tmp_path / "mounts"
+    mount_points = [spec["bind"] for spec in volumes.values()] + [module.SANDBOX_HOME]
+    mounts.write_text("".join(f"{in_container(path)}\n" for path in mount_points))
+    shims = tmp_path / "bin"
+    shims.mkdir()
+    _write_shim(shims / "mount", f'[ "$1" = --bind ] && echo "$3" >> {mounts}\nexit 0\n')
+    _write_shim(
+        shims / "umount",
+        f'grep -qx "$2" {mounts} || {{ echo "umount: $2: not mounted" >&2; exit 32; }}\n'
+        f'grep -vx "$2" {mounts} > {mounts}.new; mv {mounts}.new {mounts}\n',
+    )
+
+    env = {
+        key: in_container(value) if key in ("WARM_STAGING", "SANDBOX_HOME", "CLAIM_FILE") else value
+        for key, value in module.warm_claim_env(backend_cls._WARM_STAGING_PATH, "sb-1", "thread-1", "user-1").items()
+    }
+    result = subprocess.run(
+        ["sh", "-c", module.WARM_CLAIM_SCRIPT],
+        env={**env, "PATH": f"{shims}{os.pathsep}{os.environ['PATH']}"},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr
+    staging = in_container(backend_cls._WARM_STAGING_PATH)
+    assert Path(staging, "thread-1", "user-data", "uploads").is_dir()
+    assert Path(staging, "shared", "user-1", "workspace").is_dir()
+    assert Path(in_container(module.WARM_CLAIM_FILE)).read_text().split() == ["sb-1", "thread-1", "user-1"]
+    remaining = mounts.read_text().split()
+    assert staging not in remaining
+    assert in_container(f"{module.SANDBOX_HOME}/user-data/workspace") in remaining
+    # Kubernetes 不提供预热领取，避免沙盒容器长期持有 SYS_ADMIN 和整个线程 PVC
+    assert module.KubernetesProvisionerBackend.supports_warm_pool is False
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+from yuxi.knowledge.graphs.bulk_ingest import (
+    MERGE_TRIPLES_CYPHER,
+    MISSING_EMBEDDING_CYPHER,
+    SET_EMBEDDINGS_CYPHER,
+    GraphBulkIngestor,
+    iter_jsonl_triples,
+)
+
+
+class _RecordingClient:
+    def __init__(self):
+        self.queries: list[tuple[str, dict]] = []
+        self.embedded: set[str] = set()
+
+    async def write(self, name, query, /, **params):
+        self.queries.append((query, params))
+        if query == MISSING_EMBEDDING_CYPHER:
+            return [{"name": name} for name in params["names"] if name not in self.embedded]
+        if query == SET_EMBEDDINGS_CYPHER:
+            self.embedded.update(row["name"] for row in params["rows"])
+        return []
+
+    read = write
+
+    def count(self, query: str) -> int:
+        return sum(1 for q, _ in self.queries if q == query)
+
+
+async def test_ingest_batches_triples_into_unwind_statements():
+    client = _RecordingClient()
+    ingestor = GraphBulkIngestor(client, batch_size=3)
+    triples = [{"h": f"h{i}", "r": "REL", "t": f"t{i}"} for i in range(7)] + [{"h": "", "r": "REL", "t": "x"}]
+
+    stats = await ingestor.ingest(iter(triples))
+
+    assert (stats.triples, stats.batches, stats.skipped) == (7, 3, 1)
+    assert client.count(MERGE_TRIPLES_CYPHER) == 3
+    assert [len(params["rows"]) for q, params in client.queries if q == MERGE_TRIPLES_CYPHER] == [3, 3, 1]
+
+
+async def test_ingest_embeds_each_entity_once_and_overlaps_with_writes():
+    client = _RecordingClient()
+    embedded_batches: list[list[str]] = []
+    max_concurrent = 0
+    running = 0
+
+    async def embed(names: list[str]) -> list[list[float]]:
+        nonlocal running, max_concurrent
+        running += 1
+        max_concurrent = max(max_concurrent, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        embedded_batches.append(names)
+        return [[0.1, 0.2] for _ in names]
+
+    ingestor = GraphBulkIngestor(client, embed, batch_size=2, max_pending_embeddings=2)
+    # 实体 a 在多个批次中重复出现
+    triples = [{"h": "a", "r": "REL", "t": f"n{i}"} for i in range(6)]
+
+    stats = await ingestor.ingest(triples)
+
+    names = [name for batch in embedded_batches for name in batch]
+    assert sorted(names) == ["a", "n0", "n1", "n2", "n3", "n4", "n5"]
+    assert stats.embedded == 7
+    assert client.embedded == set(names)
+    assert max_concurrent == 2
+
+
+def test_iter_jsonl_triples_streams_non_empty_lines(tmp_path: Path):
+    path = tmp_path / "triples.jsonl"
+    path.write_text(
+        json.dumps({"h": "a", "r": "R", "t": "b"}) + "\n\n" + json.dumps({"h": "c", "r": "R", "t": "d"}) + "\n"
+    )
+
+    triples = iter_jsonl_triples(str(path))
+
+    assert next(triples)["h"] == "a"
+    assert [item["h"] for item in triples] == ["c"]
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pytest
+
+from yuxi.knowledge.graphs.adapters.base import label_clause
+from yuxi.knowledge.graphs.neo4j_client import Neo4jQueryMetrics
+
+
+def test_query_metrics_aggregates_latency_per_query():
+    metrics = Neo4jQueryMetrics()
+    for elapsed in (10.0, 20.0, 30.0, 40.0):
+        metrics.record("graph.query_node", elapsed, ok=True)
+    metrics.record("graph.info", 5.0, ok=False)
+
+    stats = metrics.stats()
+
+    assert stats["graph.query_node"]["count"] == 4
+    assert stats["graph.query_node"]["avg_ms"] == 25.0
+    assert stats["graph.query_node"]["p50_ms"] == 30.0
+    assert stats["graph.query_node"]["max_ms"] == 40.0
+    assert stats["graph.info"]["errors"] == 1
+
+    metrics.reset()
+    assert metrics.stats() == {}
+
+
+def test_label_clause_quotes_valid_labels_and_rejects_injection():
+    assert label_clause("kb_123abc") == ":`kb_123abc`"
+    assert label_clause("") == ""
+    with pytest.raises(ValueError):
+        label_clause("kb`) DETACH DELETE (m")
@@ -0,0 +1,111 @@
+import asyncio
+import random
+
+import pytest
+
+from yuxi.knowledge.eval.executor import (
+    AsyncRateLimiter,
+    ModelRateLimits,
+    run_ordered_evaluation,
+    split_detail_metrics,
+)
+
+
+async def test_run_ordered_evaluation_commits_in_order_with_bounded_concurrency():
+    rng = random.Random(7)
+    delays = {i: rng.random() * 0.01 for i in range(23)}
+    running = 0
+    max_running = 0
+    batches: list[list[int]] = []
+
+    async def evaluate(query_index: int, question: str) -> str:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(delays[query_index])
+        running -= 1
+        return question.upper()
+
+    async def commit(batch):
+        batches.append([query_index for query_index, _, _ in batch])
+        assert all(result == question.upper() for _, question, result in batch)
+
+    committed = await run_ordered_evaluation(
+        ((i, f"q{i}") for i in range(23)), evaluate, commit, concurrency=4, batch_size=5
+    )
+
+    assert committed == 23
+    assert [index for batch in batches for index in batch] == list(range(23))
+    assert [len(batch) for batch in batches] == [5, 5, 5, 5, 3]
+    assert max_running == 4
+
+
+async def test_run_ordered_evaluation_commits_contiguous_prefix_before_failing():
+    committed_indexes: list[int] = []
+
+    async def evaluate(query_index: int, question: str) -> str:
+        if query_index == 3:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("judge unavailable")
+        return question
+
+    async def commit(batch):
+        committed_indexes.extend(query_index for query_index, _, _ in batch)
+
+    with pytest.raises(RuntimeError):
+        await run_ordered_evaluation(
+            ((i, f"q{i}") for i in range(10, 0, -1)), evaluate, commit, concurrency=2, batch_size=100
+        )
+
+    # 输入顺序为 10..1，题 3 失败前连续完成的前缀为 10..4
+    assert committed_indexes == [10, 9, 8, 7, 6, 5, 4]
+
+
+async def test_model_rate_limits_wrap_only_configured_models():
+    calls: list[str] = []
+
+    class _Model:
+        name = "judge"
+
+        async def call(self, prompt, stream=False):
+            calls.append(prompt)
+            return prompt
+
+    limits = ModelRateLimits({"openai/judge": 600}, default_rpm=0)
+    select = limits.wrap_select(lambda model_spec=None: _Model())
+
+    limited = select(model_spec="openai/judge")
+    unlimited = select(model_spec="openai/answer")
+
+    assert limited.name == "judge"
+    assert isinstance(unlimited, _Model)
+    assert await limited.call("p") == "p"
+    assert limits.limiter("openai/judge") is limits.limiter("openai/judge")
+
+
+async def test_rate_limiter_spaces_requests():
+    now = 0.0
+    sleeps: list[float] = []
+    limiter = AsyncRateLimiter(60, clock=lambda: now)
+
+    original_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        await original_sleep(0)
+
+    asyncio.sleep = fake_sleep
+    try:
+        await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+    finally:
+        asyncio.sleep = original_sleep
+
+    assert sleeps == [1.0, 2.0]
+
+
+def test_split_detail_metrics_separates_answer_scores():
+    retrieval, answer = split_detail_metrics({"recall@1": 1.0, "score": 0.0, "reasoning": "x"})
+
+    assert retrieval == {"recall@1": 1.0}
+    assert answer == {"score": 0.0, "reasoning": "x"}
+    assert split_detail_metrics(None) == ({}, {})
@@ -26,3 +26,8 @@ def test_overall_score_keeps_existing_average_strategy():
     )
 
     assert score == 0.5
+
+
+def test_reciprocal_rank_uses_first_relevant_hit():
+    assert RetrievalMetrics.reciprocal_rank(["a", "b", "c"], ["c", "b"]) == 0.5
+    assert RetrievalMetrics.reciprocal_rank(["a"], ["z"]) == 0.0
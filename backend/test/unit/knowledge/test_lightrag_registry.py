@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from yuxi.knowledge.implementations import lightrag_registry
+from yuxi.knowledge.implementations.lightrag_registry import LightRAGInstanceRegistry
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _build_registry(**kwargs):
+    loads: list[str] = []
+    finalized: list[str] = []
+
+    async def loader(db_id: str) -> dict:
+        loads.append(db_id)
+        await asyncio.sleep(0.01)
+        return {"db_id": db_id}
+
+    async def finalizer(instance: dict) -> None:
+        finalized.append(instance["db_id"])
+
+    registry = LightRAGInstanceRegistry(loader, finalizer, **kwargs)
+    return registry, loads, finalized
+
+
+async def test_concurrent_gets_load_each_instance_once():
+    registry, loads, _ = _build_registry(max_instances=4, idle_ttl=0)
+
+    results = await asyncio.gather(*(registry.get("kb_a") for _ in range(5)))
+
+    assert loads == ["kb_a"]
+    assert all(result is results[0] for result in results)
+    assert registry.stats()["coalesced"] == 4
+
+
+async def test_lru_eviction_finalizes_and_skips_leased_instances():
+    registry, loads, finalized = _build_registry(max_instances=2, idle_ttl=0)
+    await registry.get("kb_a")
+    await registry.get("kb_b")
+
+    async with registry.lease("kb_a"):
+        await registry.get("kb_c")
+
+    # kb_a 持有租约，淘汰最久未使用的空闲实例 kb_b
+    assert finalized == ["kb_b"]
+    assert "kb_a" in registry and "kb_c" in registry
+
+    await registry.get("kb_b")
+    assert finalized == ["kb_b", "kb_a"]
+    assert loads == ["kb_a", "kb_b", "kb_c", "kb_b"]
+    assert registry.stats()["evictions"]["capacity"] == 2
+
+
+async def test_idle_instances_and_memory_budget_are_enforced():
+    clock = _Clock()
+    registry, _, finalized = _build_registry(
+        max_instances=10,
+        idle_ttl=60,
+        memory_budget_bytes=250,
+        size_estimator=lambda _db_id, _instance: 100,
+        clock=clock,
+    )
+    await registry.get("kb_a")
+    await registry.get("kb_b")
+    await registry.get("kb_c")
+    assert finalized == ["kb_a"]
+    assert registry.stats()["resident_bytes"] == 200
+
+    # 空闲淘汰由后台任务执行，访问路径上不会触发
+    clock.now = 120
+    await registry.get("kb_d")
+    assert finalized == ["kb_a", "kb_b"]
+    assert await lightrag_registry.sweep_idle_instances() == 1
+
+    assert finalized == ["kb_a", "kb_b", "kb_c"]
+    stats = registry.stats()
+    assert stats["evictions"]["memory"] == 2
+    assert stats["evictions"]["idle"] == 1
+    assert [item["db_id"] for item in stats["instances"]] == ["kb_d"]
+
+
+async def test_failed_load_is_not_cached():
+    attempts = 0
+
+    async def loader(db_id: str) -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("milvus unavailable")
+        return db_id
+
+    async def finalizer(_instance) -> None:
+        return None
+
+    registry = LightRAGInstanceRegistry(loader, finalizer, idle_ttl=0)
+
+    with pytest.raises(RuntimeError):
+        await registry.get("kb_a")
+    assert await registry.get("kb_a") == "kb_a"
+    assert registry.stats()["load_failures"] == 1
+
+
+async def test_idle_sweeper_evicts_in_background():
+    clock = _Clock()
+    registry, _, finalized = _build_registry(idle_ttl=60, clock=clock)
+    await registry.get("kb_a")
+    clock.now = 120
+
+    lightrag_registry.start_lightrag_idle_sweeper(interval=1)
+    try:
+        for _ in range(300):
+            if finalized:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await lightrag_registry.stop_lightrag_idle_sweeper()
+
+    assert finalized == ["kb_a"]
+    assert registry.stats()["evictions"]["idle"] == 1
@@ -136,3 +136,40 @@ def test_before_model_uses_keep_cutoff_for_message_trigger(monkeypatch: pytest.M
     new_messages = result["messages"]
     assert new_messages[1].content == "Here is a summary of the conversation to date:\n\nsummary"
     assert new_messages[2].id == "human-2"
+
+
+@pytest.mark.unit
+def test_token_cache_counts_each_message_once_and_recounts_changed_content() -> None:
+    counted: list[str] = []
+
+    def _counter(messages) -> int:
+        counted.extend(str(message.id) for message in messages)
+        return sum(len(str(message.content)) for message in messages)
+
+    middleware = SummaryOffloadMiddleware(model=_DummyModel(), trigger=("tokens", 1000), token_counter=_counter)
+    messages = [HumanMessage(content="a" * 10, id="m1"), AIMessage(content="b" * 20, id="m2")]
+
+    assert middleware._token_cache.total(messages) == 30
+    assert middleware._token_cache.total(messages) == 30
+    assert counted == ["m1", "m2"]
+
+    messages[1].content = "short"
+    assert middleware._token_cache.total(messages) == 15
+    assert counted == ["m1", "m2", "m2"]
+
+
+@pytest.mark.unit
+def test_find_cutoff_by_token_limit_matches_linear_scan() -> None:
+    middleware = SummaryOffloadMiddleware(
+        model=_DummyModel(),
+        trigger=("tokens", 1000),
+        token_counter=lambda messages: sum(len(str(message.content)) for message in messages),
+    )
+    sizes = [50, 5, 40, 3, 30, 8, 2, 60, 1, 9]
+    messages = [HumanMessage(content="x" * size, id=f"m{idx}") for idx, size in enumerate(sizes)]
+
+    for limit in range(0, sum(sizes) + 2):
+        expected = next(idx for idx in range(len(sizes) + 1) if sum(sizes[idx:]) <= limit)
+        if sum(sizes) <= limit:
+            expected = 0
+        assert middleware._find_cutoff_by_token_limit(messages, limit) == expected
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+import yuxi.plugins.parser.docling_pool as docling_pool
+
+from yuxi.plugins.parser.docling_pool import DoclingPool, DoclingTimeoutError, parse_format_limits
+
+
+def _fake_handler(file_path: str):
+    if "slow" in file_path:
+        time.sleep(30)
+    if "broken" in file_path:
+        raise ValueError("bad document")
+    return f"# {file_path}", []
+
+
+def _fake_worker(conn) -> None:
+    docling_pool._serve_jobs(conn, _fake_handler)
+
+
+def _slow_start_worker(conn) -> None:
+    time.sleep(1)
+    _fake_worker(conn)
+
+
+@pytest.fixture
+def make_pool():
+    pools: list[DoclingPool] = []
+
+    def _make(**kwargs) -> DoclingPool:
+        kwargs.setdefault("worker_target", _fake_worker)
+        pool = DoclingPool(mp_context="fork", **kwargs)
+        pool.start()
+        pools.append(pool)
+        return pool
+
+    yield _make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_parse_format_limits():
+    assert parse_format_limits("pptx=1, .DOCX=3,bad=x,,xls=") == {".pptx": 1, ".docx": 3}
+
+
+async def test_pool_converts_concurrently_in_worker_processes(make_pool):
+    pool = make_pool(workers=2, timeout=10)
+
+    results = await asyncio.gather(*(pool.convert(f"/tmp/doc{idx}.docx") for idx in range(4)))
+
+    assert [markdown for markdown, _ in results] == [f"# /tmp/doc{idx}.docx" for idx in range(4)]
+    stats = pool.stats()
+    assert stats["completed"] == 4
+    assert stats["queue_depth"] == 0
+    assert stats["alive_workers"] == 2
+
+
+async def test_pool_kills_and_replaces_worker_on_timeout(make_pool):
+    pool = make_pool(workers=1, timeout=0.5)
+
+    with pytest.raises(DoclingTimeoutError):
+        await pool.convert("/tmp/slow.pptx")
+
+    markdown, _ = await pool.convert("/tmp/after.pptx")
+    assert markdown == "# /tmp/after.pptx"
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["restarts"] == 1
+    assert stats["alive_workers"] == 1
+
+
+async def test_pool_keeps_worker_after_conversion_error(make_pool):
+    pool = make_pool(workers=1, timeout=10)
+
+    with pytest.raises(RuntimeError, match="bad document"):
+        await pool.convert("/tmp/broken.docx")
+
+    assert pool.stats()["restarts"] == 0
+    assert (await pool.convert("/tmp/ok.docx"))[0] == "# /tmp/ok.docx"
+
+
+async def test_pool_limits_concurrency_per_format(make_pool):
+    pool = make_pool(workers=2, timeout=10, format_limits={".pptx": 1})
+    active: list[int] = []
+    original = pool._run_on_worker
+
+    def _tracking_run(file_path: str):
+        active.append(pool.stats()["active"])
+        return original(file_path)
+
+    pool._run_on_worker = _tracking_run
+    tasks = [asyncio.create_task(pool.convert(f"/tmp/deck{idx}.pptx")) for idx in range(3)]
+    await asyncio.sleep(0)
+    # 第一个任务已开始执行，其余两个在格式限流处排队
+    assert pool.stats()["queue_depth_by_format"] == {".pptx": 2}
+
+    await asyncio.gather(*tasks)
+    assert max(active) == 1
+
+
+def test_warm_up_waits_for_workers_to_load(make_pool):
+    pool = make_pool(workers=2, timeout=10)
+    assert pool.stats()["ready_workers"] == 0
+
+    assert pool.warm_up(timeout=10) == 2
+    assert pool.stats()["ready_workers"] == 2
+
+
+def test_warm_up_drops_workers_that_fail_to_load(make_pool):
+    pool = make_pool(workers=1, timeout=10, worker_target=_slow_start_worker)
+    (stuck,) = pool._idle
+
+    assert pool.warm_up(timeout=0.2) == 0
+
+    assert stuck not in pool._idle
+    assert stuck not in pool._all
+    assert len(pool._idle) == 1
+    assert pool.stats()["restarts"] == 1
+
+
+async def test_start_docling_pool_warms_in_background(monkeypatch, make_pool):
+    pool = make_pool(workers=1, timeout=10)
+    monkeypatch.setattr(docling_pool, "DOCLING_PREWARM", True)
+    monkeypatch.setattr(docling_pool, "get_docling_pool", lambda: pool)
+
+    docling_pool.start_docling_pool()
+    await docling_pool._warm_up_task
+
+    assert pool.stats()["ready_workers"] == 1
+    docling_pool._warm_up_task = None
@@ -172,3 +172,39 @@ def test_collection_supports_bm25_requires_analyzed_content_sparse_field_and_fun
     collection = type("Collection", (), {"schema": schema})()
 
     assert kb._collection_supports_bm25(collection)
+
+
+async def test_hybrid_mode_rrf_fusion_skips_similarity_threshold():
+    collection = FakeCollection(distance=0.016)
+    kb = make_kb(collection)
+
+    chunks = await kb.aquery(
+        "hybrid query",
+        "db",
+        search_mode="hybrid",
+        fusion_strategy="rrf",
+        rrf_k=30,
+        similarity_threshold=0.2,
+    )
+
+    assert chunks[0]["content"] == "Hybrid result"
+    hybrid_call = collection.hybrid_calls[0]
+    assert hybrid_call["rerank"].__class__.__name__ == "RRFRanker"
+
+
+async def test_vector_search_params_follow_index_profile():
+    collection = FakeCollection()
+    kb = make_kb(collection)
+    kb.databases_meta["db"]["metadata"] = {"index_profile": "hnsw"}
+
+    await kb.aquery("vector query", "db", search_mode="vector")
+
+    search_call = collection.search_calls[0]
+    assert search_call["param"] == {"metric_type": VECTOR_METRIC_TYPE, "params": {"ef": 64}}
+
+
+def test_unknown_index_profile_falls_back_to_default():
+    kb = MilvusKB.__new__(MilvusKB)
+    kb.databases_meta = {"db": {"metadata": {"index_profile": "diskann"}}}
+
+    assert kb._get_index_profile("db") == "ivf_flat"
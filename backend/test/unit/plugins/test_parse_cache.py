@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import yuxi.plugins.parser.parse_cache as parse_cache
+import yuxi.plugins.parser.unified as parser_unified
+
+from yuxi.plugins.parser import Parser
+
+
+class FakeMinIOClient:
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+
+    def file_exists(self, bucket_name: str, object_name: str) -> bool:
+        return (bucket_name, object_name) in self.objects
+
+    async def adownload_file(self, bucket_name: str, object_name: str) -> bytes:
+        return self.objects[(bucket_name, object_name)]
+
+    async def aupload_file(self, bucket_name: str, object_name: str, data: bytes, content_type=None):
+        self.objects[(bucket_name, object_name)] = data
+
+    async def adelete_objects_by_prefix(self, bucket_name: str, prefix: str) -> int:
+        keys = [key for key in self.objects if key[0] == bucket_name and key[1].startswith(prefix)]
+        for key in keys:
+            del self.objects[key]
+        return len(keys)
+
+
+@pytest.fixture
+def fake_minio(monkeypatch: pytest.MonkeyPatch) -> FakeMinIOClient:
+    client = FakeMinIOClient()
+    monkeypatch.setattr(parse_cache, "get_minio_client", lambda: client)
+    parse_cache.parse_cache_stats.reset()
+    return client
+
+
+@pytest.fixture
+def counted_parse(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+
+    async def _fake_parse_pdf_async(file, params=None):
+        calls.append(file)
+        return f"parsed #{len(calls)}"
+
+    monkeypatch.setattr(parser_unified, "parse_pdf_async", _fake_parse_pdf_async)
+    return calls
+
+
+def test_cache_key_ignores_chunk_params_but_tracks_parser_params():
+    base = parse_cache.build_cache_key("abc", "doc.pdf", {"enable_ocr": "rapid_ocr", "chunk_size": 100})
+    rechunked = parse_cache.build_cache_key("abc", "doc.pdf", {"enable_ocr": "rapid_ocr", "chunk_size": 900})
+    other_ocr = parse_cache.build_cache_key("abc", "doc.pdf", {"enable_ocr": "mineru_ocr"})
+
+    assert base == rechunked
+    assert base != other_ocr
+    assert base.startswith("abc/ocr-rapid_ocr/")
+    assert parse_cache.build_cache_key("abc", "notes.md", {}) is None
+    assert parse_cache.build_cache_key("", "doc.pdf", {}) is None
+
+
+async def test_aparse_reuses_cached_markdown_for_same_content_hash(
+    tmp_path: Path, fake_minio: FakeMinIOClient, counted_parse: list[str]
+):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"%PDF")
+
+    first = await Parser.aparse(str(file_path), params={"chunk_size": 100}, content_hash="hash-1")
+    second = await Parser.aparse(str(file_path), params={"chunk_size": 500}, content_hash="hash-1")
+
+    assert first == second == "parsed #1"
+    assert len(counted_parse) == 1
+    stats = parse_cache.get_parse_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+async def test_invalidate_parse_cache_forces_reparse(
+    tmp_path: Path, fake_minio: FakeMinIOClient, counted_parse: list[str]
+):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"%PDF")
+
+    await Parser.aparse(str(file_path), content_hash="hash-2")
+    deleted = await parse_cache.invalidate_parse_cache("hash-2")
+    markdown = await Parser.aparse(str(file_path), content_hash="hash-2")
+
+    assert deleted == 1
+    assert markdown == "parsed #2"
+
+
+async def test_cached_markdown_with_images_is_not_reused_across_image_locations(
+    tmp_path: Path, fake_minio: FakeMinIOClient, monkeypatch: pytest.MonkeyPatch
+):
+    file_path = tmp_path / "doc.pdf"
+    file_path.write_bytes(b"%PDF")
+
+    async def _fake_parse_pdf_async(file, params=None):
+        return f"![img](http://minio/{params['image_prefix']}/a.png)"
+
+    monkeypatch.setattr(parser_unified, "parse_pdf_async", _fake_parse_pdf_async)
+
+    await Parser.aparse(str(file_path), params={"image_prefix": "kb1/kb-images"}, content_hash="hash-3")
+    markdown = await Parser.aparse(str(file_path), params={"image_prefix": "kb2/kb-images"}, content_hash="hash-3")
+
+    assert "kb2/kb-images" in markdown
@@ -7,6 +7,7 @@ from types import SimpleNamespace
 
 import fitz
 import pytest
+import yuxi.plugins.parser.docling_pool as docling_pool
 import yuxi.plugins.parser.unified as parser_unified
 from docx import Document
 from PIL import Image
@@ -65,7 +66,7 @@ def test_parser_parse_docx_file_returns_markdown_text(tmp_path: Path, monkeypatc
     assert len(markdown.strip()) > 0
 
 
-def test_convert_with_docling_reinserts_image_links_in_document_order(
+async def test_convert_with_docling_reinserts_image_links_in_document_order(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
 ):
@@ -92,12 +93,13 @@ def test_convert_with_docling_reinserts_image_links_in_document_order(
         uploaded_images.append(image_data)
         return f"https://example.test/{len(uploaded_images)}.png"
 
-    monkeypatch.setattr(parser_unified, "_get_docling_converter", lambda: FakeConverter())
+    monkeypatch.setattr(docling_pool, "create_docling_converter", lambda: FakeConverter())
+    monkeypatch.setattr(parser_unified, "get_docling_pool", lambda: docling_pool.DoclingPool(workers=0))
     monkeypatch.setattr(parser_unified, "_upload_image_to_minio", _fake_upload_image_to_minio)
     image_timestamps = iter([1.0, 2.0])
     monkeypatch.setattr(parser_unified.time, "time", lambda: next(image_timestamps))
 
-    markdown = parser_unified._convert_with_docling(file_path)
+    markdown = await parser_unified._convert_with_docling(file_path)
 
     assert uploaded_images == [b"first image", b"second image"]
     assert markdown == (
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import os
+import random
+import re
 import sys
 
 sys.path.append(os.getcwd())
 
 from yuxi.knowledge.chunking.ragflow_like.dispatcher import chunk_markdown
-from yuxi.knowledge.chunking.ragflow_like.nlp import bullets_category, count_tokens
+from yuxi.knowledge.chunking.ragflow_like.nlp import bullets_category, count_tokens, hard_split_by_token_limit
+from yuxi.knowledge.chunking.ragflow_like.parsers.separator import _slice_text_by_tokens
 from yuxi.knowledge.chunking.ragflow_like.utils.semantic_utils import split_sentences_chinese
 from yuxi.knowledge.chunking.ragflow_like.presets import (
     CHUNK_ENGINE_VERSION,
@@ -240,3 +243,63 @@ def test_sanitize_processing_params_should_drop_batch_only_fields() -> None:
     )
 
     assert sanitized == {"chunk_preset_id": "general"}
+
+
+def _reference_count_tokens(text: str) -> int:
+    parts = re.findall(r"[A-Za-z0-9_]+|[\u4e00-\u9fff]", text)
+    return max(1, len(parts)) if text.strip() else 0
+
+
+def _reference_slice_text_by_tokens(text: str, max_tokens: int, overlap_tokens: int) -> list[str]:
+    """逐字符重新计数的朴素实现，作为增量计数版本的对照"""
+    chunks: list[str] = []
+    start = 0
+    while start < len(text):
+        current, end = "", start
+        while end < len(text):
+            next_tokens = _reference_count_tokens(current + text[end])
+            if current and next_tokens > max_tokens:
+                break
+            current += text[end]
+            end += 1
+            if next_tokens >= max_tokens:
+                break
+        if current.strip():
+            chunks.append(current.strip())
+        if end >= len(text):
+            break
+        backtrack, overlap_text = end, ""
+        while overlap_tokens > 0 and backtrack > start:
+            candidate = text[backtrack - 1] + overlap_text
+            if _reference_count_tokens(candidate) > overlap_tokens:
+                break
+            overlap_text = candidate
+            backtrack -= 1
+        start = backtrack if backtrack < end else end
+    return chunks
+
+
+def test_count_tokens_matches_reference_tokenizer() -> None:
+    rng = random.Random(7)
+    alphabet = "ab_9 \n\t。，红楼梦-Z\u3000"
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert count_tokens(text) == _reference_count_tokens(text)
+
+
+def test_slice_text_by_tokens_matches_reference_implementation() -> None:
+    rng = random.Random(11)
+    alphabet = "ab_9 \n。，红楼梦-"
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 120)))
+        max_tokens = rng.randint(1, 12)
+        overlap_tokens = rng.randint(0, max_tokens - 1)
+        assert _slice_text_by_tokens(text, max_tokens, overlap_tokens) == _reference_slice_text_by_tokens(
+            text, max_tokens, overlap_tokens
+        )
+
+
+def test_hard_split_by_token_limit_keeps_trailing_punctuation_separate() -> None:
+    assert hard_split_by_token_limit("红楼梦 dream。", 2) == ["红楼", "梦 dream", "。"]
+    assert hard_split_by_token_limit("。。", 4) == ["。。"]
+    assert hard_split_by_token_limit("", 4) == []
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import fitz
+import pytest
+import yuxi.plugins.parser.rapid_ocr as rapid_ocr
+
+from yuxi.plugins.parser import parse_progress_callback
+from yuxi.plugins.parser.rapid_ocr import RapidOCRParser
+
+
+class FakeOCR:
+    """按渲染图像的宽度返回文本，用于校验页面顺序"""
+
+    def __call__(self, image):
+        return [[None, f"width={image.width}"]], None
+
+
+def make_pdf(path: Path, pages: int) -> list[str]:
+    expected = []
+    with fitz.open() as pdf_doc:
+        for idx in range(pages):
+            width = 100 + idx * 10
+            pdf_doc.new_page(width=width, height=100)
+            expected.append(f"width={width * 2}")
+        pdf_doc.save(path)
+    return expected
+
+
+@pytest.fixture
+def progress_events() -> list[tuple[int, int]]:
+    events: list[tuple[int, int]] = []
+    token = parse_progress_callback.set(lambda done, total: events.append((done, total)))
+    yield events
+    parse_progress_callback.reset(token)
+
+
+def test_process_pdf_inline_keeps_page_order(tmp_path: Path, progress_events):
+    pdf_path = tmp_path / "scan.pdf"
+    expected = make_pdf(pdf_path, 3)
+    parser = RapidOCRParser(workers=1)
+    parser.ocr = FakeOCR()
+
+    assert parser.process_pdf(str(pdf_path)) == "\n\n".join(expected)
+    assert progress_events == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_iter_pdf_pages_shards_batches_and_streams_in_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, progress_events
+):
+    pdf_path = tmp_path / "scan.pdf"
+    expected = make_pdf(pdf_path, 11)
+    submitted: list[list[int]] = []
+    original_batch = rapid_ocr._ocr_page_batch
+
+    def _record_batch(path, page_numbers, zoom_x, zoom_y):
+        submitted.append(page_numbers)
+        return original_batch(path, page_numbers, zoom_x, zoom_y)
+
+    monkeypatch.setattr(rapid_ocr, "_worker_ocr", FakeOCR())
+    monkeypatch.setattr(rapid_ocr, "_ocr_page_batch", _record_batch)
+    parser = RapidOCRParser(workers=2, page_batch_size=3)
+    # 线程池与模块全局共享，替代真实进程池
+    parser._executor = ThreadPoolExecutor(max_workers=2)
+
+    try:
+        pages = list(parser.iter_pdf_pages(str(pdf_path)))
+    finally:
+        parser.shutdown()
+
+    assert [page_num for page_num, _ in pages] == list(range(11))
+    assert [text for _, text in pages] == expected
+    assert sorted(submitted) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9, 10]]
+    assert progress_events[-1] == (11, 11)
+    assert [done for done, _ in progress_events] == list(range(1, 12))
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from yuxi.knowledge.chunking.ragflow_like.nlp import count_tokens
+from yuxi.knowledge.chunking.ragflow_like.parsers import semantic
+from yuxi.knowledge.chunking.ragflow_like.utils import semantic_utils
+from yuxi.knowledge.chunking.ragflow_like.utils.semantic_utils import (
+    CachedEmbedder,
+    adjacent_similarities,
+    find_breakpoints,
+    semantic_options_from_config,
+    semantic_segment_sentences,
+)
+
+TOPICS = {"猫": 0, "车": 1, "茶": 2}
+
+
+class TopicEmbedding:
+    """按句中出现的主题字生成确定性向量，并记录每次调用的批大小"""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        vectors = []
+        for text in texts:
+            vector = [0.05] * len(TOPICS)
+            for word, idx in TOPICS.items():
+                if word in text:
+                    vector[idx] = 1.0
+            vectors.append(vector)
+        return vectors
+
+
+def _topic_sentences(per_topic: int) -> list[str]:
+    return [f"关于{word}的第{i}句描述。" for word in TOPICS for i in range(per_topic)]
+
+
+def test_cached_embedder_batches_and_reuses_vectors():
+    embed = TopicEmbedding()
+    embedder = CachedEmbedder(embed, batch_size=2)
+
+    first = embedder(["猫一", "车一", "猫一", "茶一"])
+    second = embedder(["车一", "茶一"])
+
+    assert [len(batch) for batch in embed.batches] == [2, 1]
+    assert first.shape == (4, 3)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert np.allclose(second, first[[1, 3]])
+    assert (embedder.hits, embedder.misses) == (3, 3)
+
+
+def test_cached_embedder_evicts_least_recently_used():
+    embed = TopicEmbedding()
+    embedder = CachedEmbedder(embed, max_entries=2)
+
+    embedder(["猫", "车"])
+    embedder(["猫"])
+    embedder(["茶"])
+    embedder(["猫"])
+    embedder(["车"])
+
+    assert embed.batches == [["猫", "车"], ["茶"], ["车"]]
+
+
+def test_adjacent_similarities_match_pairwise_cosine():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(6, 4))
+
+    sims = adjacent_similarities(vectors)
+    expected = [
+        float(vectors[i] @ vectors[i + 1] / (np.linalg.norm(vectors[i]) * np.linalg.norm(vectors[i + 1])))
+        for i in range(5)
+    ]
+
+    assert sims.shape == (5,)
+    assert np.allclose(sims, expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["percentile", "gradient"])
+def test_find_breakpoints_marks_topic_shifts(method):
+    similarities = np.array([0.99, 0.98, 0.2, 0.97, 0.99, 0.1, 0.98])
+
+    breakpoints = find_breakpoints(similarities, method=method, threshold=70)
+
+    assert set(breakpoints) & {2, 5}
+    assert all(b in {1, 2, 4, 5} for b in breakpoints)
+
+
+@pytest.mark.parametrize("method", ["percentile", "cluster"])
+def test_semantic_segment_sentences_splits_on_topic_boundaries(method):
+    sentences = _topic_sentences(4)
+
+    chunks = semantic_segment_sentences(
+        sentences,
+        TopicEmbedding(),
+        count_tokens,
+        max_chunk_size=40,
+        breakpoint_method=method,
+        breakpoint_threshold=80,
+        cluster_window=len(sentences),
+    )
+
+    assert chunks == ["".join(sentences[i : i + 4]) for i in range(0, 12, 4)]
+
+
+def test_semantic_segment_sentences_respects_token_limit_and_order():
+    sentences = _topic_sentences(30)
+    max_chunk_size = 40
+
+    chunks = semantic_segment_sentences(sentences, TopicEmbedding(), count_tokens, max_chunk_size=max_chunk_size)
+
+    assert "".join(chunks) == "".join(sentences)
+    assert all(count_tokens(chunk) <= max_chunk_size for chunk in chunks)
+    # 主题切换处必然断开
+    assert all(sum(word in chunk for word in TOPICS) == 1 for chunk in chunks)
+
+
+def test_semantic_options_from_config_keeps_only_valid_settings():
+    options = semantic_options_from_config(
+        {"chunk_token_num": 256, "breakpoint_method": "Gradient", "breakpoint_threshold": "75", "cluster_window": "x"}
+    )
+
+    assert options == {"breakpoint_method": "gradient", "breakpoint_threshold": 75.0}
+    assert semantic_options_from_config({"breakpoint_method": "kmeans"}) == {}
+
+
+@pytest.mark.parametrize("method", ["gradient", "cluster"])
+def test_chunk_markdown_selects_breakpoint_method_from_parser_config(method, monkeypatch):
+    used: list[str] = []
+    original_find = semantic_utils.find_breakpoints
+    original_cluster = semantic_utils.window_cluster_breakpoints
+
+    def _find(similarities, method, threshold):
+        used.append(method)
+        return original_find(similarities, method, threshold)
+
+    def _cluster(*args, **kwargs):
+        used.append("cluster")
+        return original_cluster(*args, **kwargs)
+
+    monkeypatch.setattr(semantic_utils, "find_breakpoints", _find)
+    monkeypatch.setattr(semantic_utils, "window_cluster_breakpoints", _cluster)
+    # 纯中文文本走正则分句，不需要 NLTK punkt_tab 资源
+    monkeypatch.setattr(semantic_utils, "_punkt_checked", True)
+    sentences = _topic_sentences(4)
+    parser_config = {
+        "chunk_token_num": 40,
+        "breakpoint_method": method,
+        "breakpoint_threshold": 80,
+        "cluster_window": len(sentences),
+    }
+
+    chunks = semantic.chunk_markdown("".join(sentences), parser_config, embed_fn=TopicEmbedding())
+
+    assert used == [method]
+    assert len(chunks) == 3
+    assert all(sum(word in chunk for word in TOPICS) == 1 for chunk in chunks)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from yuxi.plugins.parser.tabular import convert_csv_to_markdown, convert_xlsx_to_markdown
+
+
+def test_csv_repeats_header_per_block_and_escapes_cells(tmp_path: Path):
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_text('name,note\nA,"x|y"\nB,"line1\nline2"\n\nC,ok,extra\n', encoding="utf-8")
+
+    markdown = convert_csv_to_markdown(csv_path, {"table_rows_per_block": 2})
+
+    assert markdown == (
+        "| name | note |\n|---|---|\n| A | x\\|y |\n| B | line1 line2 |\n\n"
+        "| name | note |  |\n|---|---|---|\n| C | ok | extra |"
+    )
+
+
+def test_csv_falls_back_to_gb18030(tmp_path: Path):
+    csv_path = tmp_path / "gbk.csv"
+    csv_path.write_bytes("名称,数量\n苹果,3\n".encode("gb18030"))
+
+    assert convert_csv_to_markdown(csv_path) == "| 名称 | 数量 |\n|---|---|\n| 苹果 | 3 |"
+
+
+def test_csv_large_table_is_split_into_bounded_blocks(tmp_path: Path):
+    csv_path = tmp_path / "large.csv"
+    with open(csv_path, "w", encoding="utf-8") as f:
+        f.write("id,value\n")
+        for idx in range(1000):
+            f.write(f"{idx},{idx * 2}\n")
+
+    markdown = convert_csv_to_markdown(csv_path, {"table_rows_per_block": 100})
+
+    assert markdown.count("| id | value |") == 10
+    assert markdown.endswith("| 999 | 1998 |")
+
+
+def test_xlsx_emits_one_section_per_sheet(tmp_path: Path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "销售"
+    sheet.append(["月份", "金额"])
+    sheet.append(["一月", 100.0])
+    workbook.create_sheet("空表")
+    xlsx_path = tmp_path / "data.xlsx"
+    workbook.save(xlsx_path)
+
+    markdown = convert_xlsx_to_markdown(xlsx_path)
+
+    assert markdown == "## 销售\n\n| 月份 | 金额 |\n|---|---|\n| 一月 | 100 |"
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from server.utils.principal_cache import PrincipalCache, api_key_cache_key, jwt_cache_key
+from yuxi.storage.postgres.models_business import APIKey, User
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _user(user_id: int = 7, role: str = "user") -> User:
+    return User(
+        id=user_id,
+        username=f"user-{user_id}",
+        user_id=f"login-{user_id}",
+        password_hash="x",
+        role=role,
+        department_id=1,
+        login_failed_count=0,
+        is_deleted=0,
+    )
+
+
+def test_entries_expire_and_hit_rate_is_tracked():
+    clock = _Clock()
+    cache = PrincipalCache(ttl=30, clock=clock)
+    key = jwt_cache_key("token-a")
+
+    assert cache.get(key) is None
+    cache.put(key, _user())
+    assert cache.get(key).user_id == 7
+
+    clock.now = 31
+    assert cache.get(key) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == round(1 / 3, 4)
+    assert stats["size"] == 0
+
+
+def test_invalidate_user_drops_jwt_and_api_key_entries():
+    cache = PrincipalCache(ttl=30)
+    api_key = APIKey(id=3, key_hash="h1", expires_at=None)
+    cache.put(jwt_cache_key("token-a"), _user(7))
+    cache.put(jwt_cache_key("token-b"), _user(7))
+    cache.put(api_key_cache_key("h1"), _user(7), api_key)
+    cache.put(jwt_cache_key("token-c"), _user(8))
+
+    cache.apply({"type": "user", "user_id": 7})
+
+    assert cache.stats()["size"] == 1
+    assert cache.get(jwt_cache_key("token-c")) is not None
+
+    cache.apply({"type": "api_key", "key_hash": "missing"})
+    cache.apply({"type": "all"})
+    assert cache.stats()["size"] == 0
+
+
+def test_expired_api_key_is_not_served_and_capacity_is_bounded():
+    cache = PrincipalCache(ttl=30, max_entries=2)
+    expired = APIKey(id=1, key_hash="h1", expires_at=dt.datetime(2000, 1, 1))
+    cache.put(api_key_cache_key("h1"), _user(1), expired)
+    assert cache.get(api_key_cache_key("h1")) is None
+
+    for i in range(3):
+        cache.put(jwt_cache_key(f"t{i}"), _user(i))
+    assert cache.get(jwt_cache_key("t0")) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_api_key_touch_is_throttled():
+    clock = _Clock()
+    cache = PrincipalCache(ttl=300, clock=clock)
+    cache.put(api_key_cache_key("h1"), _user(), APIKey(id=1, key_hash="h1", expires_at=None))
+    entry = cache.get(api_key_cache_key("h1"))
+
+    assert cache.should_touch(entry) is False
+    clock.now = 61
+    assert cache.should_touch(entry) is True
+    assert cache.should_touch(entry) is False
+
+
+async def test_attach_returns_session_bound_copy_without_query():
+    cache = PrincipalCache(ttl=30)
+    cache.put(jwt_cache_key("token-a"), _user(7, role="admin"))
+    entry = cache.get(jwt_cache_key("token-a"))
+
+    session = AsyncSession()
+    try:
+        user = await entry.attach(session)
+        state = inspect(user)
+        assert state.persistent
+        assert user.role == "admin"
+        assert not session.dirty
+
+        # 下游修改当前用户会作为普通的脏对象提交，且不影响缓存快照
+        user.avatar = "a.png"
+        assert user in session.dirty
+        assert entry.user_state["avatar"] is None
+    finally:
+        await session.close()
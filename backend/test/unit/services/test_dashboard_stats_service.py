@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+
+import pytest
+
+from yuxi.services import dashboard_stats_service as svc
+
+TODAY = dt.date(2026, 3, 10)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _FakeSession:
+    def __init__(self, rollup_rows):
+        self.rollup_rows = rollup_rows
+
+    async def execute(self, _statement):
+        return _Result(self.rollup_rows)
+
+
+async def test_cache_coalesces_concurrent_requests_and_expires():
+    clock = _Clock()
+    cache = svc.TTLResponseCache(ttl=30, clock=clock)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"calls": calls}
+
+    results = await asyncio.gather(*(cache.get_or_compute("stats", compute) for _ in range(5)))
+    assert calls == 1
+    assert all(result == {"calls": 1} for result in results)
+
+    clock.now = 29
+    assert await cache.get_or_compute("stats", compute) == {"calls": 1}
+
+    clock.now = 31
+    assert await cache.get_or_compute("stats", compute) == {"calls": 2}
+
+
+async def test_cache_does_not_store_failures():
+    cache = svc.TTLResponseCache(ttl=30)
+    attempts = 0
+
+    async def compute():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("db down")
+        return attempts
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("stats", compute)
+    assert await cache.get_or_compute("stats", compute) == 2
+
+
+def test_days_to_refresh_backfills_missing_and_always_recent_days():
+    rolled_up = {TODAY - dt.timedelta(days=d) for d in range(1, 5)}
+
+    days = svc.days_to_refresh(TODAY, rolled_up, backfill_days=7)
+
+    # 6、5 天前未汇总需要补齐；昨天与今天总是重算
+    assert days == [
+        TODAY - dt.timedelta(days=6),
+        TODAY - dt.timedelta(days=5),
+        TODAY - dt.timedelta(days=1),
+        TODAY,
+    ]
+
+
+def test_day_start_utc_uses_shanghai_midnight():
+    assert svc.day_start_utc(TODAY) == dt.datetime(2026, 3, 9, 16, 0)
+
+
+async def test_daily_series_merges_rollup_with_live_days(monkeypatch):
+    live_calls: list[tuple[dt.date, dt.date]] = []
+
+    async def live_query(_db, start, end):
+        live_calls.append((start, end))
+        return {
+            (TODAY, "search"): 4,
+            (TODAY, "fetch"): 1,
+            (TODAY - dt.timedelta(days=2), "search"): 7,
+            # 已汇总日期的实时结果不应覆盖汇总值
+            (TODAY - dt.timedelta(days=1), "search"): 99,
+        }
+
+    monkeypatch.setattr(svc, "local_today", lambda: TODAY)
+    monkeypatch.setitem(svc._METRIC_QUERIES, svc.METRIC_TOOL_CALLS, live_query)
+
+    yesterday = TODAY - dt.timedelta(days=1)
+    session = _FakeSession(
+        [
+            (yesterday, svc.ROLLUP_MARKER, 1),
+            (yesterday, svc.METRIC_TOOL_CALLS, 5),
+            (TODAY - dt.timedelta(days=3), svc.ROLLUP_MARKER, 1),
+        ]
+    )
+
+    series = await svc.daily_series(session, svc.METRIC_TOOL_CALLS, days=4)
+
+    assert series == [
+        (TODAY - dt.timedelta(days=3), 0),
+        (TODAY - dt.timedelta(days=2), 7),
+        (yesterday, 5),
+        (TODAY, 5),
+    ]
+    assert live_calls == [(TODAY - dt.timedelta(days=2), TODAY)]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+import yuxi.services.evaluation_service as evaluation_service
+from yuxi.services.evaluation_service import EvaluationService
+from yuxi.services.task_service import Task, Tasker
+
+TASK_ID = "eval_0123abcd"
+
+
+class _FakeEvalRepo:
+    def __init__(self, status: str):
+        self.row = SimpleNamespace(
+            db_id="kb_1",
+            status=status,
+            benchmark_id="bench_1",
+            retrieval_config={},
+            created_by="user_1",
+        )
+        self.updates: list[dict] = []
+
+    async def get_result(self, task_id: str):
+        return self.row if task_id == TASK_ID else None
+
+    async def get_benchmark(self, benchmark_id: str):
+        return SimpleNamespace(name="bench")
+
+    async def update_result(self, task_id: str, data: dict):
+        self.updates.append(data)
+
+
+def _make_service(monkeypatch: pytest.MonkeyPatch, status: str, *, active: bool = False):
+    tasker = Tasker()
+    if active:
+        tasker._tasks["t1"] = Task(
+            id="t1", name="eval", type="rag_evaluation", payload={"task_id": TASK_ID}, status="running"
+        )
+    enqueued: list[dict] = []
+
+    async def _enqueue(**kwargs):
+        enqueued.append(kwargs)
+
+    monkeypatch.setattr(tasker, "enqueue", _enqueue)
+    monkeypatch.setattr(evaluation_service, "tasker", tasker)
+    service = EvaluationService.__new__(EvaluationService)
+    service.eval_repo = _FakeEvalRepo(status)
+    return service, enqueued
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", ["running", "pending", "completed"])
+async def test_resume_evaluation_rejects_unfinished_or_completed_runs(monkeypatch, status):
+    service, enqueued = _make_service(monkeypatch, status)
+
+    with pytest.raises(ValueError):
+        await service.resume_evaluation("kb_1", TASK_ID)
+
+    assert enqueued == []
+    assert service.eval_repo.updates == []
+
+
+@pytest.mark.asyncio
+async def test_resume_evaluation_rejects_while_tasker_job_is_active(monkeypatch):
+    service, enqueued = _make_service(monkeypatch, "failed", active=True)
+
+    with pytest.raises(ValueError, match="still running"):
+        await service.resume_evaluation("kb_1", TASK_ID)
+
+    assert enqueued == []
+
+
+@pytest.mark.asyncio
+async def test_resume_evaluation_requeues_failed_run(monkeypatch):
+    service, enqueued = _make_service(monkeypatch, "failed")
+
+    assert await service.resume_evaluation("kb_1", TASK_ID) == TASK_ID
+
+    assert service.eval_repo.updates == [{"status": "running", "completed_at": None}]
+    assert enqueued[0]["payload"]["resume"] is True
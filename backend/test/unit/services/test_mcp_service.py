@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 from types import SimpleNamespace
 
 from yuxi.services import mcp_service
 
 
 class _FakeClient:
-    def __init__(self, tools):
+    def __init__(self, tools, delay: float = 0.0):
         self._tools = tools
+        self._delay = delay
 
     async def get_tools(self):
+        if self._delay:
+            await asyncio.sleep(self._delay)
         return self._tools
 
 
@@ -112,3 +116,108 @@ async def test_get_tools_from_all_servers_loads_names_from_db_once(monkeypatch):
         ("alpha", server_configs),
         ("beta", server_configs),
     ]
+
+
+def _install_servers(monkeypatch, behaviours: dict[str, dict]) -> list[str]:
+    """按服务器配置返回假客户端；behaviours[name] 可指定 delay 与 tools"""
+    connects: list[str] = []
+
+    async def fake_get_mcp_client(server_configs):
+        (name,) = server_configs
+        connects.append(name)
+        behaviour = behaviours[name]
+        tools = [SimpleNamespace(name=t, metadata=None) for t in behaviour["tools"]]
+        return _FakeClient(tools, delay=behaviour.get("delay", 0.0))
+
+    monkeypatch.setattr(mcp_service, "get_mcp_client", fake_get_mcp_client)
+    return connects
+
+
+async def test_get_tools_from_all_servers_loads_concurrently_and_times_out_slow_server(monkeypatch):
+    mcp_service.clear_mcp_cache()
+    monkeypatch.setattr(mcp_service, "MCP_DISCOVERY_TIMEOUT", 0.2)
+    server_configs = {
+        "slow": {"transport": "stdio", "command": "slow"},
+        "fast": {"transport": "stdio", "command": "fast"},
+    }
+
+    async def fake_load_enabled_mcp_server_configs(*, names=None, db=None):
+        del names, db
+        return server_configs
+
+    monkeypatch.setattr(mcp_service, "_load_enabled_mcp_server_configs", fake_load_enabled_mcp_server_configs)
+    _install_servers(monkeypatch, {"slow": {"tools": ["s"], "delay": 5}, "fast": {"tools": ["f"]}})
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tools = await mcp_service.get_tools_from_all_servers()
+
+    assert loop.time() - start < 1
+    assert [tool.metadata["id"] for tool in tools] == ["mcp__fast__f"]
+    stats = mcp_service.get_mcp_registry_stats()
+    assert stats["slow"]["failures"] == 1
+    assert stats["slow"]["last_error"].startswith("TimeoutError")
+    assert stats["fast"]["tools"] == 1
+
+    mcp_service.clear_mcp_cache()
+
+
+async def test_concurrent_callers_share_single_discovery(monkeypatch):
+    mcp_service.clear_mcp_cache()
+    connects = _install_servers(monkeypatch, {"demo": {"tools": ["a"], "delay": 0.05}})
+    servers = {"demo": {"transport": "stdio", "command": "demo"}}
+
+    results = await asyncio.gather(*(mcp_service.get_mcp_tools("demo", additional_servers=servers) for _ in range(5)))
+
+    assert connects == ["demo"]
+    assert all(result == results[0] and len(result) == 1 for result in results)
+
+    mcp_service.clear_mcp_cache()
+
+
+async def test_circuit_opens_after_repeated_failures(monkeypatch):
+    mcp_service.clear_mcp_cache()
+    monkeypatch.setattr(mcp_service, "MCP_DISCOVERY_TIMEOUT", 0.01)
+    monkeypatch.setattr(mcp_service, "MCP_CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(mcp_service, "MCP_CIRCUIT_COOLDOWN", 60)
+    connects = _install_servers(monkeypatch, {"dead": {"tools": ["x"], "delay": 1}})
+    servers = {"dead": {"transport": "stdio", "command": "dead"}}
+
+    for _ in range(4):
+        assert await mcp_service.get_mcp_tools("dead", additional_servers=servers) == []
+
+    assert connects == ["dead", "dead"]
+    stats = mcp_service.get_mcp_registry_stats()["dead"]
+    assert stats["circuit_open"] is True
+    assert stats["consecutive_failures"] == 2
+
+    # 配置变化（例如修复了地址）后不受旧熔断影响
+    servers["dead"] = {"transport": "stdio", "command": "fixed"}
+    _install_servers(monkeypatch, {"dead": {"tools": ["x"]}})
+    assert len(await mcp_service.get_mcp_tools("dead", additional_servers=servers)) == 1
+    assert mcp_service.get_mcp_registry_stats()["dead"]["circuit_open"] is False
+
+    mcp_service.clear_mcp_cache()
+
+
+async def test_expired_cache_is_served_stale_while_revalidating(monkeypatch):
+    mcp_service.clear_mcp_cache()
+    servers = {"demo": {"transport": "stdio", "command": "demo"}}
+    _install_servers(monkeypatch, {"demo": {"tools": ["v1"]}})
+    first = await mcp_service.get_mcp_tools("demo", additional_servers=servers)
+
+    monkeypatch.setattr(mcp_service, "MCP_TOOLS_TTL", 0)
+    connects = _install_servers(monkeypatch, {"demo": {"tools": ["v2"], "delay": 0.05}})
+    stale = await mcp_service.get_mcp_tools("demo", additional_servers=servers)
+
+    assert stale is first
+    assert mcp_service.get_mcp_registry_stats()["demo"]["refreshing"] is True
+
+    await asyncio.sleep(0.1)
+    monkeypatch.setattr(mcp_service, "MCP_TOOLS_TTL", 300)
+    fresh = await mcp_service.get_mcp_tools("demo", additional_servers=servers)
+
+    assert connects == ["demo"]
+    assert [tool.name for tool in fresh] == ["v2"]
+
+    mcp_service.clear_mcp_cache()
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import yuxi.services.model_cache as model_cache_module
+from yuxi.services.model_cache import REDIS_EVENTS_CHANNEL, ModelCache
+
+
+class _FakePubSub:
+    def __init__(self, redis: _FakeRedis):
+        self.redis = redis
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.channels: set[str] = set()
+
+    async def subscribe(self, channel: str):
+        self.channels.add(channel)
+        self.redis.subscribers.append(self)
+
+    async def unsubscribe(self, channel: str):
+        self.channels.discard(channel)
+
+    async def aclose(self):
+        if self in self.redis.subscribers:
+            self.redis.subscribers.remove(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis):
+        self.redis = redis
+        self.commands: list[tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def _queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.values: dict[str, str] = {}
+        self.subscribers: list[_FakePubSub] = []
+        self.published: list[dict] = []
+        self.hmget_calls: list[list[str]] = []
+
+    def pipeline(self, transaction: bool = True):
+        return _FakePipeline(self)
+
+    def pubsub(self):
+        return _FakePubSub(self)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hmget(self, key, fields):
+        self.hmget_calls.append(list(fields))
+        data = self.hashes.get(key, {})
+        return [data.get(f) for f in fields]
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hdel(self, key, *fields):
+        for f in fields:
+            self.hashes.get(key, {}).pop(f, None)
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def publish(self, channel, data):
+        self.published.append(json.loads(data))
+        for sub in list(self.subscribers):
+            if channel in sub.channels:
+                sub.queue.put_nowait({"type": "message", "channel": channel, "data": data})
+
+
+def _provider(provider_id: str, models: list[str], api_key: str = "sk-test", enabled: bool = True):
+    return SimpleNamespace(
+        provider_id=provider_id,
+        provider_type="openai",
+        is_enabled=enabled,
+        enabled_models=[{"id": m, "type": "chat"} for m in models],
+        base_url=f"https://{provider_id}.example/v1",
+        embedding_base_url=None,
+        rerank_base_url=None,
+        headers_json={},
+        extra_json={},
+        api_key=api_key,
+    )
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> _FakeRedis:
+    monkeypatch.setattr(
+        "yuxi.services.model_provider_service.resolve_api_key", lambda provider: provider.api_key, raising=False
+    )
+    return _FakeRedis()
+
+
+def _cache(redis: _FakeRedis) -> ModelCache:
+    cache = ModelCache()
+    cache._redis = redis
+    return cache
+
+
+async def _settle(cache: ModelCache, version: int) -> None:
+    for _ in range(100):
+        if cache.version >= version:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"model cache did not reach version {version}, got {cache.version}")
+
+
+async def test_rebuild_writes_only_changed_providers(fake_redis: _FakeRedis):
+    writer = _cache(fake_redis)
+
+    v1 = await writer.rebuild([_provider("a", ["m1"]), _provider("b", ["m2"])])
+    unchanged = await writer.rebuild([_provider("a", ["m1"]), _provider("b", ["m2"])])
+    v2 = await writer.rebuild([_provider("a", ["m1", "m3"]), _provider("b", ["m2"], enabled=False)])
+
+    assert (v1, unchanged, v2) == (1, 1, 2)
+    assert fake_redis.published == [
+        {"version": 1, "changed": ["a", "b"], "removed": []},
+        {"version": 2, "changed": ["a"], "removed": ["b"]},
+    ]
+    assert [info.spec for info in writer.get_all_specs()] == ["a:m1", "a:m3"]
+
+
+async def test_subscriber_applies_incremental_updates_without_polling(fake_redis: _FakeRedis):
+    writer = _cache(fake_redis)
+    reader = _cache(fake_redis)
+    await writer.rebuild([_provider("a", ["m1"]), _provider("b", ["m2"])])
+
+    await reader.start()
+    try:
+        assert reader.get_model_info("b:m2").api_key == "sk-test"
+
+        version = await writer.rebuild([_provider("a", ["m1"]), _provider("b", ["m2"], api_key="sk-rotated")])
+        await _settle(reader, version)
+
+        assert reader.get_model_info("b:m2").api_key == "sk-rotated"
+        # 只拉取变更的供应商
+        assert fake_redis.hmget_calls[-1] == ["b"]
+    finally:
+        await reader.stop()
+
+
+async def test_subscriber_reloads_when_versions_are_skipped(fake_redis: _FakeRedis):
+    writer = _cache(fake_redis)
+    reader = _cache(fake_redis)
+    await writer.rebuild([_provider("a", ["m1"])])
+    await reader.start()
+    try:
+        # 模拟错过一次广播：直接写入 Redis 而不通知订阅者
+        await fake_redis.hset(
+            model_cache_module.REDIS_PROVIDERS_KEY,
+            {
+                "c": '[{"provider_id": "c", "model_id": "x", '
+                '"model_type": "chat", "display_name": "x", "api_key": "", "base_url": "", '
+                '"provider_type": "openai"}]'
+            },
+        )
+        await fake_redis.incr(model_cache_module.REDIS_VERSION_KEY)
+        version = await writer.rebuild([_provider("a", ["m1", "m2"])])
+        await _settle(reader, version)
+
+        assert reader.get_model_info("a:m2") is not None
+        assert reader.get_model_info("c:x") is None
+        assert REDIS_EVENTS_CHANNEL in fake_redis.subscribers[0].channels
+    finally:
+        await reader.stop()
+
+
+class _UnavailableRedis:
+    def pipeline(self, transaction: bool = True):
+        raise ConnectionError("redis down")
+
+
+async def test_lookup_retries_failed_load_in_background(fake_redis: _FakeRedis, monkeypatch: pytest.MonkeyPatch):
+    await _cache(fake_redis).rebuild([_provider("a", ["m1"])])
+    reader = ModelCache()
+    reader._redis = _UnavailableRedis()
+
+    assert reader.get_model_info("a:m1") is None
+    await reader._loading
+    assert reader._loaded is False
+
+    # 退避期内不重复加载
+    reader._redis = fake_redis
+    reader.get_model_info("a:m1")
+    assert reader._loading.done()
+
+    monkeypatch.setattr(reader, "_load_retry_at", 0.0)
+    reader.get_model_info("a:m1")
+    await reader._loading
+    assert reader.get_model_info("a:m1") is not None
+    await reader.stop()
+
+
+def test_lookup_without_event_loop_loads_with_temporary_client(fake_redis: _FakeRedis, monkeypatch):
+    asyncio.run(_cache(fake_redis).rebuild([_provider("a", ["m1"])]))
+    closed: list[bool] = []
+
+    async def _aclose():
+        closed.append(True)
+
+    fake_redis.aclose = _aclose
+    monkeypatch.setattr(model_cache_module, "_new_redis_client", lambda: fake_redis)
+
+    assert ModelCache().get_model_info("a:m1").model_id == "m1"
+    assert closed == [True]
@@ -64,6 +64,64 @@ def test_sync_thread_visible_skills_only_keeps_selected(tmp_path: Path, monkeypa
     assert (thread_root / "beta" / "SKILL.md").read_text(encoding="utf-8") == "beta"
 
 
+def test_sync_thread_visible_skills_skips_when_versions_unchanged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(svc.sys_config, "save_dir", str(tmp_path))
+    monkeypatch.setattr(svc, "_SKILL_MANIFESTS", {})
+    monkeypatch.setattr(svc, "_THREAD_SYNCED_SKILLS", {})
+    skill_dir = tmp_path / "skills" / "alpha"
+    (skill_dir / "scripts").mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text("alpha", encoding="utf-8")
+    (skill_dir / "scripts" / "run.py").write_text("print(1)", encoding="utf-8")
+    svc.refresh_skill_manifest("alpha")
+
+    thread_root = svc.sync_thread_visible_skills("thread_1", ["alpha"])
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("unchanged skills must not be walked or copied")
+
+    monkeypatch.setattr(svc, "_build_skill_manifest", _fail)
+    monkeypatch.setattr(svc, "_copy_skill_dir", _fail)
+    monkeypatch.setattr(svc, "_apply_skill_manifest_diff", _fail)
+    assert svc.sync_thread_visible_skills("thread_1", ["alpha"]) == thread_root
+    assert (thread_root / "alpha" / "scripts" / "run.py").read_text(encoding="utf-8") == "print(1)"
+
+
+def test_sync_thread_visible_skills_copies_only_changed_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(svc.sys_config, "save_dir", str(tmp_path))
+    monkeypatch.setattr(svc, "_SKILL_MANIFESTS", {})
+    monkeypatch.setattr(svc, "_THREAD_SYNCED_SKILLS", {})
+    skill_dir = tmp_path / "skills" / "alpha"
+    (skill_dir / "scripts").mkdir(parents=True)
+    (skill_dir / "SKILL.md").write_text("alpha", encoding="utf-8")
+    (skill_dir / "ref.md").write_text("ref", encoding="utf-8")
+    (skill_dir / "scripts" / "old.py").write_text("old", encoding="utf-8")
+    svc.refresh_skill_manifest("alpha")
+    thread_root = svc.sync_thread_visible_skills("thread_1", ["alpha"])
+
+    (skill_dir / "ref.md").write_text("ref v2", encoding="utf-8")
+    (skill_dir / "scripts" / "old.py").unlink()
+    (skill_dir / "scripts").rmdir()
+    (skill_dir / "new.md").write_text("new", encoding="utf-8")
+    svc.refresh_skill_manifest("alpha")
+
+    copied: list[str] = []
+    real_copyfile = svc.shutil.copyfile
+
+    def _copyfile(src, dst, *args, **kwargs):
+        copied.append(Path(src).name)
+        return real_copyfile(src, dst, *args, **kwargs)
+
+    monkeypatch.setattr(svc.shutil, "copyfile", _copyfile)
+    svc.sync_thread_visible_skills("thread_1", ["alpha"])
+
+    target = thread_root / "alpha"
+    assert sorted(copied) == ["new.md", "ref.md"]
+    assert (target / "ref.md").read_text(encoding="utf-8") == "ref v2"
+    assert (target / "SKILL.md").read_text(encoding="utf-8") == "alpha"
+    assert not (target / "scripts").exists()
+    assert sorted(path.name for path in target.iterdir()) == ["SKILL.md", "new.md", "ref.md"]
+
+
 @pytest.mark.asyncio
 async def test_get_skill_dependency_options(monkeypatch: pytest.MonkeyPatch):
     # Mock get_tool_metadata to return tool list
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from yuxi.storage.minio.client import MinIOClient, StorageIntegrityError
+
+
+class FakeResponse:
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.chunk_sizes: list[int] = []
+        self.closed = False
+
+    def stream(self, amt: int):
+        self.chunk_sizes.append(amt)
+        for start in range(0, len(self.payload), amt):
+            yield self.payload[start : start + amt]
+
+    def read(self):
+        raise AssertionError("streaming download must not read the whole object")
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    def __init__(self, payload: bytes):
+        self.response = FakeResponse(payload)
+
+    def get_object(self, bucket_name: str, object_name: str):
+        return self.response
+
+
+def make_client(payload: bytes) -> MinIOClient:
+    client = MinIOClient()
+    client._client = FakeMinio(payload)
+    return client
+
+
+def test_download_to_file_streams_chunks_and_returns_hash(tmp_path: Path):
+    payload = os.urandom(10_000)
+    client = make_client(payload)
+    dest = tmp_path / "out.bin"
+
+    size, digest = client.download_to_file("bucket", "obj.pdf", dest, chunk_size=1024)
+
+    assert size == len(payload)
+    assert digest == hashlib.sha256(payload).hexdigest()
+    assert dest.read_bytes() == payload
+    assert client._client.response.chunk_sizes == [1024]
+    assert client._client.response.closed
+
+
+def test_download_to_file_rejects_hash_mismatch(tmp_path: Path):
+    client = make_client(b"payload")
+
+    with pytest.raises(StorageIntegrityError):
+        client.download_to_file("bucket", "obj.pdf", tmp_path / "out.bin", expected_sha256="0" * 64)
+
+
+async def test_adownload_to_tempfile_cleans_up_after_use():
+    payload = b"hello world"
+    client = make_client(payload)
+
+    async with client.adownload_to_tempfile(
+        "bucket", "docs/report.pdf", expected_sha256=hashlib.sha256(payload).hexdigest()
+    ) as temp_path:
+        assert temp_path.endswith(".pdf")
+        assert Path(temp_path).read_bytes() == payload
+
+    assert not os.path.exists(temp_path)
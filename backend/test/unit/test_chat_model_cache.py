@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+import yuxi.agents.models as agent_models
+from yuxi.agents.models import ChatModelCache, load_chat_model_v2
+from yuxi.services.model_cache import ModelInfo, model_cache
+
+
+def _info(api_key: str = "sk-test") -> ModelInfo:
+    return ModelInfo(
+        provider_id="demo",
+        model_id="demo-chat",
+        model_type="chat",
+        display_name="demo-chat",
+        api_key=api_key,
+        base_url="https://demo.example/v1",
+        provider_type="openai",
+    )
+
+
+@pytest.fixture
+def registry(monkeypatch: pytest.MonkeyPatch) -> dict[str, ModelInfo]:
+    specs = {"demo:demo-chat": _info()}
+    monkeypatch.setattr(model_cache, "_specs", specs)
+    monkeypatch.setattr(model_cache, "_loaded", True)
+    monkeypatch.setattr(model_cache, "_version", 1)
+    monkeypatch.setattr(agent_models, "chat_model_cache", ChatModelCache(max_size=4))
+    return specs
+
+
+def test_load_chat_model_v2_reuses_instance_for_same_spec_and_params(registry):
+    first = load_chat_model_v2("demo:demo-chat", temperature=0.2)
+    second = load_chat_model_v2("demo:demo-chat", temperature=0.2)
+    other = load_chat_model_v2("demo:demo-chat", temperature=0.7)
+
+    assert first is second
+    assert other is not first
+    assert agent_models.chat_model_cache.stats()["hits"] == 1
+
+
+def test_load_chat_model_v2_rebuilds_after_provider_config_change(registry, monkeypatch: pytest.MonkeyPatch):
+    before = load_chat_model_v2("demo:demo-chat")
+
+    registry["demo:demo-chat"] = _info(api_key="sk-rotated")
+    monkeypatch.setattr(model_cache, "_version", 2)
+    after = load_chat_model_v2("demo:demo-chat")
+
+    assert after is not before
+    assert after.openai_api_key.get_secret_value() == "sk-rotated"
+    assert agent_models.chat_model_cache.stats()["size"] == 1
+
+
+def test_chat_model_cache_skips_unhashable_params_and_evicts_lru():
+    cache = ChatModelCache(max_size=2)
+    built: list[str] = []
+
+    def factory(name):
+        def _build():
+            built.append(name)
+            return object()
+
+        return _build
+
+    cache.get_or_create(None, 1, factory("uncached"))
+    cache.get_or_create(None, 1, factory("uncached"))
+    for key in ("a", "b", "a", "c", "b"):
+        cache.get_or_create((key,), 1, factory(key))
+
+    assert built == ["uncached", "uncached", "a", "b", "c", "b"]
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pymysql
+import pytest
+
+from yuxi.agents.toolkits.mysql.connection import MySQLConnectionManager, QueryTimeoutError
+from yuxi.agents.toolkits.mysql.exceptions import MySQLConnectionError
+
+
+class _FakeServer:
+    def __init__(self, rows=None, delay=0.0, error=None):
+        self.rows = rows if rows is not None else [{"id": 1}]
+        self.delay = delay
+        self.error = error
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+        self.connections: list[_FakeConnection] = []
+
+    def connect(self):
+        conn = _FakeConnection(self)
+        self.connections.append(conn)
+        return conn
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = iter(())
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((sql, params))
+        if sql.startswith("SELECT @@SESSION"):
+            self._rows = iter([{"value": 0}])
+            return
+        if sql.startswith("SET SESSION"):
+            return
+        server = self.conn.server
+        with server.lock:
+            server.running += 1
+            server.max_running = max(server.max_running, server.running)
+        try:
+            time.sleep(server.delay)
+            if server.error is not None:
+                raise server.error
+        finally:
+            with server.lock:
+                server.running -= 1
+        self._rows = iter(list(server.rows))
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _FakeConnection:
+    def __init__(self, server: _FakeServer):
+        self.server = server
+        self.executed: list[tuple[str, object]] = []
+        self.open = True
+
+    def cursor(self, cursorclass=None):
+        return _FakeCursor(self)
+
+    def ping(self, reconnect=False):
+        return None
+
+    def thread_id(self):
+        return 42
+
+    def close(self):
+        self.open = False
+
+
+def _manager(server: _FakeServer, **kwargs) -> MySQLConnectionManager:
+    return MySQLConnectionManager({"database": "demo"}, connect=server.connect, **kwargs)
+
+
+async def test_concurrent_queries_run_in_parallel_without_blocking_loop():
+    server = _FakeServer(delay=0.05)
+    manager = _manager(server, pool_size=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    tick_task = asyncio.create_task(ticker())
+    try:
+        results = await asyncio.gather(*(manager.stream_query("SELECT 1", timeout=5) for _ in range(4)))
+    finally:
+        tick_task.cancel()
+
+    assert all(result.rows == [{"id": 1}] for result in results)
+    assert server.max_running == 2
+    assert len(server.connections) == 2
+    assert ticks >= 10
+
+    stats = manager.stats()
+    assert stats["acquired"] == 4
+    assert stats["idle"] == 2 and stats["in_use"] == 0
+    assert stats["wait_time_max_s"] > 0
+    await manager.close()
+
+
+async def test_server_side_timeout_is_set_once_per_value():
+    server = _FakeServer()
+    manager = _manager(server, pool_size=1)
+
+    await manager.stream_query("SELECT 1", timeout=5)
+    await manager.stream_query("SELECT 2", timeout=5)
+    await manager.stream_query("SELECT 3", timeout=7)
+
+    set_statements = [params for sql, params in server.connections[0].executed if sql.startswith("SET SESSION")]
+    assert set_statements == [(5000,), (7000,)]
+    await manager.close()
+
+
+async def test_streaming_stops_at_row_and_byte_budgets_and_discards_connection():
+    server = _FakeServer(rows=[{"id": i, "name": "x" * 20} for i in range(100)])
+    manager = _manager(server, pool_size=1)
+
+    by_rows = await manager.stream_query("SELECT * FROM t", max_rows=10, max_bytes=1_000_000)
+    assert len(by_rows.rows) == 10
+    assert by_rows.truncated_by == "rows"
+
+    by_bytes = await manager.stream_query("SELECT * FROM t", max_rows=1000, max_bytes=200)
+    assert 0 < len(by_bytes.rows) < 10
+    assert by_bytes.truncated_by == "bytes"
+
+    # 截断后的连接带有未读完的结果集，直接丢弃而不是归还
+    stats = manager.stats()
+    assert stats["connections_discarded"] == 2
+    assert stats["truncated_results"] == 2
+    assert len(server.connections) == 2
+
+    complete = await manager.stream_query("SELECT * FROM t", max_rows=1000, max_bytes=1_000_000)
+    assert len(complete.rows) == 100 and not complete.truncated
+    await manager.close()
+
+
+async def test_acquire_times_out_when_pool_exhausted():
+    server = _FakeServer(delay=0.2)
+    manager = _manager(server, pool_size=1, acquire_timeout=0.05)
+
+    slow = asyncio.create_task(manager.stream_query("SELECT SLEEP(1)", timeout=5))
+    await asyncio.sleep(0.01)
+    with pytest.raises(MySQLConnectionError):
+        await manager.stream_query("SELECT 1", timeout=5)
+
+    assert (await slow).rows == [{"id": 1}]
+    assert manager.stats()["acquire_timeouts"] == 1
+    await manager.close()
+
+
+async def test_server_timeout_error_keeps_connection():
+    server = _FakeServer(error=pymysql.err.OperationalError(3024, "Query execution was interrupted"))
+    manager = _manager(server, pool_size=1)
+
+    with pytest.raises(QueryTimeoutError):
+        await manager.stream_query("SELECT 1", timeout=1)
+
+    stats = manager.stats()
+    assert stats["query_timeouts"] == 1
+    assert stats["idle"] == 1 and stats["connections_discarded"] == 0
+    await manager.close()
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import heapq
 import logging
 import os
 import re
+import statistics
 import threading
 import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from urllib import request
 
@@ -52,11 +60,16 @@ class ListSandboxesResponse(BaseModel):
     count: int
 
 
+class SandboxCapacityError(RuntimeError):
+    """Raised when starting another sandbox would exceed the host capacity."""
+
+
 @dataclass(slots=True)
 class SandboxRecord:
     sandbox_id: str
     sandbox_url: str
     status: str | None = None
+    labels: dict[str, str] = field(default_factory=dict)
 
 
 class MemoryProvisionerBackend:
@@ -99,10 +112,138 @@ class MemoryProvisionerBackend:
             self._records.pop(sandbox_id, None)
 
 
+class FakeProvisionerBackend:
+    """In-process backend that simulates sandbox start-up latency without Docker.
+
+    Used to exercise the warm pool and the API in tests and benchmarks.
+    """
+
+    supports_warm_pool = True
+
+    def __init__(self, startup_seconds: float | None = None):
+        self._lock = threading.Lock()
+        self._records: dict[str, SandboxRecord] = {}
+        self._warm: dict[str, SandboxRecord] = {}
+        if startup_seconds is None:
+            startup_seconds = float(os.getenv("FAKE_SANDBOX_STARTUP_SECONDS", "0.5"))
+        self._startup_seconds = startup_seconds
+        self.image = os.getenv("SANDBOX_IMAGE", "fake-sandbox:latest")
+        self.started = 0
+
+    @staticmethod
+    def _url_for(sandbox_id: str) -> str:
+        return f"http://fake-sandbox/{sandbox_id}"
+
+    def _boot(self, sandbox_id: str, labels: dict[str, str]) -> SandboxRecord:
+        time.sleep(self._startup_seconds)
+        with self._lock:
+            self.started += 1
+        return SandboxRecord(
+            sandbox_id=sandbox_id, sandbox_url=self._url_for(sandbox_id), status="Running", labels=labels
+        )
+
+    def create(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord:
+        with self._lock:
+            existing = self._records.get(sandbox_id)
+        if existing is not None:
+            return existing
+        record = self._boot(sandbox_id, {"sandbox-id": sandbox_id, "thread-id": thread_id, "user-id": user_id})
+        with self._lock:
+            return self._records.setdefault(sandbox_id, record)
+
+    def create_warm(self, warm_id: str) -> SandboxRecord:
+        record = self._boot(warm_id, {"sandbox-id": warm_id, "pool": "warm"})
+        with self._lock:
+            self._warm[warm_id] = record
+        return record
+
+    def claim_warm(self, warm_id: str, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord | None:
+        with self._lock:
+            if sandbox_id in self._records:
+                return self._records[sandbox_id]
+            warm = self._warm.pop(warm_id, None)
+            if warm is None:
+                return None
+            record = SandboxRecord(
+                sandbox_id=sandbox_id,
+                sandbox_url=warm.sandbox_url,
+                status=warm.status,
+                labels={"sandbox-id": sandbox_id, "thread-id": thread_id, "user-id": user_id},
+            )
+            self._records[sandbox_id] = record
+            return record
+
+    def list_warm(self) -> list[str]:
+        with self._lock:
+            return list(self._warm)
+
+    def discover(self, sandbox_id: str) -> SandboxRecord | None:
+        with self._lock:
+            return self._records.get(sandbox_id)
+
+    def list(self) -> list[SandboxRecord]:
+        # Warm sandboxes are owned by the pool and must not be tracked by the idle reaper.
+        with self._lock:
+            return list(self._records.values())
+
+    def delete(self, sandbox_id: str) -> None:
+        with self._lock:
+            self._records.pop(sandbox_id, None)
+            self._warm.pop(sandbox_id, None)
+
+
+# Runs as root inside a warm sandbox when it is claimed. Warm sandboxes start with the whole
+# threads root mounted at $WARM_STAGING; the claim bind-mounts the thread's and user's
+# directories to the same paths a cold start uses, records the binding, and then drops the
+# staging mount so the sandbox can only reach its own data. $WARM_STAGING must be the
+# container's staging mount point itself, otherwise the final umount fails the claim.
+WARM_CLAIM_SCRIPT = r"""
+set -e
+S="$WARM_STAGING"
+H="$SANDBOX_HOME"
+WS="$S/shared/$USER_ID/workspace"
+TD="$S/$THREAD_ID"
+mkdir -p "$WS" "$TD/user-data/uploads" "$TD/user-data/outputs" "$TD/skills"
+chmod a+rwx "$WS" "$TD/user-data" "$TD/user-data/uploads" "$TD/user-data/outputs"
+mkdir -p "$H/user-data/workspace" "$H/user-data/uploads" "$H/user-data/outputs" "$H/skills"
+chmod a+rwx "$H/user-data"
+mount --bind "$WS" "$H/user-data/workspace"
+mount --bind "$TD/user-data/uploads" "$H/user-data/uploads"
+mount --bind "$TD/user-data/outputs" "$H/user-data/outputs"
+mount --bind "$TD/skills" "$H/skills"
+mount -o remount,bind,ro "$H/skills"
+mkdir -p "$(dirname "$CLAIM_FILE")"
+printf '%s\n%s\n%s\n' "$SANDBOX_ID" "$THREAD_ID" "$USER_ID" > "$CLAIM_FILE"
+umount -l "$S"
+"""
+WARM_CLAIM_FILE = "/etc/yuxi-sandbox/claim"
+SANDBOX_HOME = "/home/gem"
+
+
+def warm_claim_env(staging: str, sandbox_id: str, thread_id: str, user_id: str) -> dict[str, str]:
+    return {
+        "WARM_STAGING": staging,
+        "SANDBOX_HOME": SANDBOX_HOME,
+        "CLAIM_FILE": WARM_CLAIM_FILE,
+        "SANDBOX_ID": sandbox_id,
+        "THREAD_ID": thread_id,
+        "USER_ID": user_id,
+    }
+
+
+def validate_path_segment(value: str, name: str) -> str:
+    candidate = str(value or "").strip()
+    if not candidate or not re.fullmatch(r"[A-Za-z0-9_.-]+", candidate) or ".." in candidate:
+        raise ValueError(f"{name} must be a single safe path segment")
+    return candidate
+
+
 def wait_for_sandbox_ready(sandbox_url: str, timeout_seconds: int = 30) -> bool:
+    """Probe the sandbox HTTP API until it answers, backing off between attempts."""
     deadline = time.time() + timeout_seconds
     opener = request.build_opener(request.ProxyHandler({}))
-    while time.time() < deadline:
+    delay = 0.1
+    while True:
         try:
             with opener.open(f"{sandbox_url.rstrip('/')}/v1/sandbox", timeout=3) as response:
                 status_code = getattr(response, "status", 200)
@@ -110,12 +251,34 @@ def wait_for_sandbox_ready(sandbox_url: str, timeout_seconds: int = 30) -> bool:
                 return True
         except Exception:
             pass
-        time.sleep(1)
-    return False
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 2.0)
+
+
+class _KeyedLocks:
+    """Per-sandbox locks so operations on different sandboxes never wait for each other."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+
+    def __call__(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
 
 
 class LocalContainerProvisionerBackend:
     _SANDBOX_ENV_FILE = Path(__file__).parent / "sandbox.env"
+    # Warm containers mount the whole threads root here until they are claimed.
+    _WARM_STAGING_PATH = "/mnt/yuxi-warm-threads"
+
+    supports_warm_pool = True
 
     @staticmethod
     def _load_sandbox_env() -> dict[str, str]:
@@ -130,7 +293,7 @@ class LocalContainerProvisionerBackend:
         from docker.errors import DockerException
 
         self._docker = docker
-        self._lock = threading.Lock()
+        self._sandbox_lock = _KeyedLocks()
         self._container_port = int(os.getenv("SANDBOX_CONTAINER_PORT", "8080"))
         self._sandbox_image = os.getenv(
             "SANDBOX_IMAGE",
@@ -142,6 +305,10 @@ class LocalContainerProvisionerBackend:
         self._sandbox_host = os.getenv("DOCKER_SANDBOX_HOST", "host.docker.internal")
         self._health_timeout_seconds = int(os.getenv("SANDBOX_HEALTH_TIMEOUT_SECONDS", "300"))
         self._sandbox_env = self._load_sandbox_env()
+        # container id -> (sandbox_id, thread_id, user_id) for claimed warm containers; Docker
+        # labels are immutable, so the binding lives in the container and is cached here.
+        self._claims: dict[str, tuple[str, str, str]] = {}
+        self._claims_lock = threading.Lock()
 
         try:
             self._client = docker.from_env()
@@ -331,14 +498,49 @@ class LocalContainerProvisionerBackend:
         except NotFound:
             return None
 
+    def _wait_until_ready(self, container, sandbox_url: str, timeout_seconds: int) -> bool:
+        """Wait for the container's health events when the image defines a HEALTHCHECK,
+        then confirm with a single HTTP probe; images without one fall back to probing."""
+        healthcheck = ((container.attrs.get("Config") or {}).get("Healthcheck") or {}).get("Test") or []
+        if not healthcheck or healthcheck == ["NONE"]:
+            return wait_for_sandbox_ready(sandbox_url, timeout_seconds=timeout_seconds)
+
+        deadline = time.time() + timeout_seconds
+        # Subscribe before reading the current state so a transition in between is not missed.
+        events = self._client.events(
+            decode=True,
+            until=int(deadline) + 1,
+            filters={"container": container.id, "event": ["health_status", "die"]},
+        )
+        try:
+            container.reload()
+            health = ((container.attrs.get("State") or {}).get("Health") or {}).get("Status")
+            if health != "healthy":
+                for event in events:
+                    action = str(event.get("Action") or event.get("status") or "")
+                    if action == "health_status: healthy":
+                        break
+                    if action == "die":
+                        return False
+                else:
+                    return False
+        finally:
+            events.close()
+        return wait_for_sandbox_ready(sandbox_url, timeout_seconds=max(1, int(deadline - time.time())))
+
     def create(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord:
-        with self._lock:
+        with self._sandbox_lock(sandbox_id):
             safe_thread_id = self._validate_thread_id(thread_id)
             safe_user_id = self._validate_user_id(user_id)
             existing = self._get_container(sandbox_id)
             if existing is not None:
                 existing.reload()
-                if not self._is_expected_skills_mount(existing, safe_thread_id):
+                if self._is_warm(existing):
+                    if self._claim_of(existing) != (sandbox_id, safe_thread_id, safe_user_id):
+                        logger.info("Recreating sandbox %s because its warm claim is stale", sandbox_id)
+                        self.delete(sandbox_id)
+                        existing = None
+                elif not self._is_expected_skills_mount(existing, safe_thread_id):
                     logger.info("Recreating sandbox %s because skills mount is stale", sandbox_id)
                     self.delete(sandbox_id)
                     existing = None
@@ -353,7 +555,7 @@ class LocalContainerProvisionerBackend:
                         record = self._to_record(existing, sandbox_id)
                         if not record.sandbox_url:
                             raise RuntimeError(f"sandbox {sandbox_id} has no mapped host port")
-                        if not wait_for_sandbox_ready(record.sandbox_url, timeout_seconds=self._health_timeout_seconds):
+                        if not self._wait_until_ready(existing, record.sandbox_url, self._health_timeout_seconds):
                             raise RuntimeError(f"sandbox {sandbox_id} is not ready at {record.sandbox_url}")
                         return record
                     except Exception as exc:
@@ -364,7 +566,6 @@ class LocalContainerProvisionerBackend:
                 except Exception as exc:
                     logger.warning("Failed to delete stale sandbox %s before recreate: %s", sandbox_id, exc)
 
-            threads_root = Path(self._threads_host_path).resolve()
             shared_workspace = self._shared_workspace_host_path(safe_user_id)
             shared_workspace.mkdir(parents=True, exist_ok=True)
             thread_uploads = self._thread_uploads_host_path(safe_thread_id)
@@ -374,71 +575,175 @@ class LocalContainerProvisionerBackend:
             thread_skills = self._thread_skills_host_path(safe_thread_id)
             thread_skills.mkdir(parents=True, exist_ok=True)
 
-            container_name = self._container_name(sandbox_id)
-            run_kwargs = {
-                "name": container_name,
-                "detach": True,
-                "labels": {
-                    "app": "yuxi-sandbox",
-                    "sandbox-id": sandbox_id,
-                    "thread-id": thread_id,
-                    "user-id": user_id,
-                    "managed-by": "yuxi-sandbox-provisioner",
-                },
-                "volumes": {
+            run_kwargs = self._run_kwargs(
+                self._container_name(sandbox_id),
+                labels={"sandbox-id": sandbox_id, "thread-id": thread_id, "user-id": user_id},
+                volumes={
                     str(shared_workspace): {"bind": "/home/gem/user-data/workspace", "mode": "rw"},
                     str(thread_uploads): {"bind": "/home/gem/user-data/uploads", "mode": "rw"},
                     str(thread_outputs): {"bind": "/home/gem/user-data/outputs", "mode": "rw"},
                     str(thread_skills): {"bind": "/home/gem/skills", "mode": "ro"},
                 },
-                "ports": {f"{self._container_port}/tcp": None},
-                "security_opt": ["seccomp=unconfined"],
-                # The sandbox image expects /home/gem to be writable during boot.
-                # Keep it ephemeral and mount persistent user-data underneath it.
-                "tmpfs": {"/home/gem": "rw,exec,mode=777"},
-            }
-            if self._network:
-                run_kwargs["network"] = self._network
-            if self._sandbox_env:
-                run_kwargs["environment"] = self._sandbox_env
-
+            )
             container = self._client.containers.run(self._sandbox_image, **run_kwargs)
             container.reload()
             self._ensure_user_data_writable(container)
             record = self._to_record(container, sandbox_id)
             if not record.sandbox_url:
                 raise RuntimeError(f"sandbox {sandbox_id} has no mapped host port")
-            if not wait_for_sandbox_ready(record.sandbox_url, timeout_seconds=self._health_timeout_seconds):
+            if not self._wait_until_ready(container, record.sandbox_url, self._health_timeout_seconds):
                 raise RuntimeError(f"sandbox {sandbox_id} is not ready at {record.sandbox_url}")
             return record
 
-    def discover(self, sandbox_id: str) -> SandboxRecord | None:
-        container = self._get_container(sandbox_id)
-        if container is None:
+    def _run_kwargs(self, name: str, *, labels: dict[str, str], volumes: dict[str, dict[str, str]]) -> dict:
+        run_kwargs = {
+            "name": name,
+            "detach": True,
+            "labels": {"app": "yuxi-sandbox", "managed-by": "yuxi-sandbox-provisioner", **labels},
+            "volumes": volumes,
+            "ports": {f"{self._container_port}/tcp": None},
+            "security_opt": ["seccomp=unconfined"],
+            # The sandbox image expects /home/gem to be writable during boot.
+            # Keep it ephemeral and mount persistent user-data underneath it.
+            "tmpfs": {"/home/gem": "rw,exec,mode=777"},
+        }
+        if self._network:
+            run_kwargs["network"] = self._network
+        if self._sandbox_env:
+            run_kwargs["environment"] = self._sandbox_env
+        return run_kwargs
+
+    @staticmethod
+    def _is_warm(container) -> bool:
+        return (container.labels or {}).get("pool") == "warm"
+
+    def _is_unclaimed_warm(self, container) -> bool:
+        # A claim renames the container to the sandbox's name; until then it keeps its warm name.
+        warm_id = (container.labels or {}).get("warm-id") or ""
+        return self._is_warm(container) and container.name == self._container_name(warm_id)
+
+    def _claim_of(self, container) -> tuple[str, str, str] | None:
+        """(sandbox_id, thread_id, user_id) of a container, read from labels or the warm claim file."""
+        labels = container.labels or {}
+        if not self._is_warm(container):
+            binding = (labels.get("sandbox-id") or "", labels.get("thread-id") or "", labels.get("user-id") or "")
+            return binding if all(binding) else None
+        if self._is_unclaimed_warm(container):
             return None
-        container.reload()
-        thread_id = str((container.labels or {}).get("thread-id") or "").strip()
-        if not thread_id:
+        with self._claims_lock:
+            cached = self._claims.get(container.id)
+        if cached is not None:
+            return cached
+        try:
+            result = container.exec_run(["cat", WARM_CLAIM_FILE], user="0:0")
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to read warm claim of container %s: %s", container.name, exc)
             return None
-        user_id = str((container.labels or {}).get("user-id") or "").strip()
-        if not user_id:
+        output = result.output.decode("utf-8", errors="ignore") if isinstance(result.output, bytes) else ""
+        parts = output.split()
+        if result.exit_code != 0 or len(parts) != 3:
             return None
+        claim = (parts[0], parts[1], parts[2])
+        with self._claims_lock:
+            self._claims[container.id] = claim
+        return claim
+
+    @classmethod
+    def _warm_volumes(cls, threads_root: Path) -> dict[str, dict[str, str]]:
+        # The staging bind is the mount point the claim script unmounts.
+        return {str(threads_root): {"bind": cls._WARM_STAGING_PATH, "mode": "rw"}}
+
+    def create_warm(self, warm_id: str) -> SandboxRecord:
+        threads_root = Path(self._threads_host_path).resolve()
+        run_kwargs = self._run_kwargs(
+            self._container_name(warm_id),
+            labels={"pool": "warm", "warm-id": warm_id},
+            volumes=self._warm_volumes(threads_root),
+        )
+        container = self._client.containers.run(self._sandbox_image, **run_kwargs)
+        container.reload()
+        record = self._to_record(container, warm_id)
+        if not record.sandbox_url:
+            raise RuntimeError(f"warm sandbox {warm_id} has no mapped host port")
+        if not self._wait_until_ready(container, record.sandbox_url, self._health_timeout_seconds):
+            raise RuntimeError(f"warm sandbox {warm_id} is not ready at {record.sandbox_url}")
+        return record
+
+    def claim_warm(self, warm_id: str, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord | None:
+        from docker.errors import APIError, NotFound
+
+        safe_sandbox_id = validate_path_segment(sandbox_id, "sandbox_id")
         safe_thread_id = self._validate_thread_id(thread_id)
         safe_user_id = self._validate_user_id(user_id)
-        if not self._is_expected_skills_mount(container, safe_thread_id):
-            logger.info("Discarding stale sandbox %s with legacy skills mount", sandbox_id)
-            try:
+        with self._sandbox_lock(sandbox_id):
+            if self._get_container(sandbox_id) is not None:
+                # The pool only claims when discover() found nothing usable, so this is stale.
                 self.delete(sandbox_id)
-            except Exception as exc:
-                logger.warning("Failed to delete stale sandbox %s during discover: %s", sandbox_id, exc)
-            return None
-        if not self._has_expected_user_data_mounts(container, safe_thread_id, safe_user_id):
-            logger.info("Discarding stale sandbox %s with legacy user-data mounts", sandbox_id)
             try:
-                self.delete(sandbox_id)
-            except Exception as exc:
-                logger.warning("Failed to delete stale sandbox %s during discover: %s", sandbox_id, exc)
+                container = self._client.containers.get(self._container_name(warm_id))
+            except NotFound:
+                return None
+            try:
+                # Renaming is the atomic hand-over: afterwards the container is addressed by sandbox id.
+                container.rename(self._container_name(sandbox_id))
+            except APIError as exc:
+                logger.warning("Failed to rename warm sandbox %s for %s: %s", warm_id, sandbox_id, exc)
+                return None
+            try:
+                # Privileged exec grants the mount capability to the claim script only, not to the sandbox.
+                result = container.exec_run(
+                    ["sh", "-c", WARM_CLAIM_SCRIPT],
+                    user="0:0",
+                    privileged=True,
+                    environment=warm_claim_env(self._WARM_STAGING_PATH, safe_sandbox_id, safe_thread_id, safe_user_id),
+                )
+                if result.exit_code != 0:
+                    output = result.output.decode("utf-8", errors="ignore") if isinstance(result.output, bytes) else ""
+                    raise RuntimeError(f"failed to bind thread paths into warm sandbox: {output}")
+                container.reload()
+                record = self._to_record(container, sandbox_id)
+                if not record.sandbox_url or not wait_for_sandbox_ready(record.sandbox_url, timeout_seconds=10):
+                    raise RuntimeError(f"claimed warm sandbox {sandbox_id} is not ready")
+            except Exception:
+                container.remove(v=True, force=True)
+                raise
+            with self._claims_lock:
+                self._claims[container.id] = (safe_sandbox_id, safe_thread_id, safe_user_id)
+            return record
+
+    def list_warm(self) -> list[str]:
+        containers = self._client.containers.list(
+            filters={"label": ["app=yuxi-sandbox", "managed-by=yuxi-sandbox-provisioner", "pool=warm"]}
+        )
+        return [str(container.labels["warm-id"]) for container in containers if self._is_unclaimed_warm(container)]
+
+    def discover(self, sandbox_id: str) -> SandboxRecord | None:
+        container = self._get_container(sandbox_id)
+        if container is None:
             return None
+        container.reload()
+        claim = self._claim_of(container)
+        if claim is None:
+            return None
+        _, thread_id, user_id = claim
+        safe_thread_id = self._validate_thread_id(thread_id)
+        safe_user_id = self._validate_user_id(user_id)
+        # Claimed warm containers bind thread paths at claim time instead of through container mounts.
+        if not self._is_warm(container):
+            if not self._is_expected_skills_mount(container, safe_thread_id):
+                logger.info("Discarding stale sandbox %s with legacy skills mount", sandbox_id)
+                try:
+                    self.delete(sandbox_id)
+                except Exception as exc:
+                    logger.warning("Failed to delete stale sandbox %s during discover: %s", sandbox_id, exc)
+                return None
+            if not self._has_expected_user_data_mounts(container, safe_thread_id, safe_user_id):
+                logger.info("Discarding stale sandbox %s with legacy user-data mounts", sandbox_id)
+                try:
+                    self.delete(sandbox_id)
+                except Exception as exc:
+                    logger.warning("Failed to delete stale sandbox %s during discover: %s", sandbox_id, exc)
+                return None
         record = self._to_record(container, sandbox_id)
         if not record.sandbox_url:
             return None
@@ -452,11 +757,11 @@ class LocalContainerProvisionerBackend:
         )
         records: list[SandboxRecord] = []
         for container in containers:
-            labels = container.labels or {}
-            sandbox_id = labels.get("sandbox-id")
-            if sandbox_id:
+            # Unclaimed warm containers belong to the pool and are not tracked by the idle reaper.
+            claim = self._claim_of(container)
+            if claim is not None:
                 container.reload()
-                records.append(self._to_record(container, sandbox_id))
+                records.append(self._to_record(container, claim[0]))
         return records
 
     def delete(self, sandbox_id: str) -> None:
@@ -466,13 +771,20 @@ class LocalContainerProvisionerBackend:
         if container.status == "running":
             container.stop(timeout=10)
         container.remove(v=True, force=True)
+        with self._claims_lock:
+            self._claims.pop(container.id, None)
 
 
 class KubernetesProvisionerBackend:
+    # Claiming a warm pod would need a bind mount inside the running sandbox container, i.e.
+    # CAP_SYS_ADMIN plus the whole thread PVC for its lifetime, so pods always start cold.
+    supports_warm_pool = False
+
     def __init__(self):
-        from kubernetes import client, config
+        from kubernetes import client, config, watch
 
-        self._lock = threading.Lock()
+        self._sandbox_lock = _KeyedLocks()
+        self._watch = watch
         self._namespace = os.getenv("K8S_NAMESPACE", "yuxi-know")
         self._sandbox_image = os.getenv(
             "SANDBOX_IMAGE",
@@ -494,6 +806,7 @@ class KubernetesProvisionerBackend:
 
         self._core_api = client.CoreV1Api()
         self._client = client
+        self._health_timeout_seconds = int(os.getenv("SANDBOX_HEALTH_TIMEOUT_SECONDS", "60"))
 
     @staticmethod
     def _pod_name(sandbox_id: str) -> str:
@@ -542,6 +855,12 @@ class KubernetesProvisionerBackend:
                         name="sandbox",
                         image=self._sandbox_image,
                         ports=[self._client.V1ContainerPort(container_port=self._container_port)],
+                        # Pod readiness drives the watch in _wait_until_ready.
+                        readiness_probe=self._client.V1Probe(
+                            http_get=self._client.V1HTTPGetAction(path="/v1/sandbox", port=self._container_port),
+                            period_seconds=2,
+                            timeout_seconds=3,
+                        ),
                         volume_mounts=[
                             self._client.V1VolumeMount(name="home-dir", mount_path="/home/gem"),
                             self._client.V1VolumeMount(
@@ -605,10 +924,36 @@ class KubernetesProvisionerBackend:
             ),
         )
 
+    def _wait_until_ready(self, sandbox_id: str, sandbox_url: str, timeout_seconds: int) -> bool:
+        """Watch the pod until its Ready condition turns true, then confirm over HTTP."""
+        deadline = time.time() + timeout_seconds
+        watcher = self._watch.Watch()
+        try:
+            for event in watcher.stream(
+                self._core_api.list_namespaced_pod,
+                namespace=self._namespace,
+                field_selector=f"metadata.name={self._pod_name(sandbox_id)}",
+                timeout_seconds=timeout_seconds,
+            ):
+                pod = event["object"]
+                if event["type"] == "DELETED":
+                    return False
+                status = pod.status
+                if status is not None and status.phase in ("Failed", "Succeeded"):
+                    return False
+                conditions = (status.conditions if status is not None else None) or []
+                if any(cond.type == "Ready" and cond.status == "True" for cond in conditions):
+                    break
+            else:
+                return False
+        finally:
+            watcher.stop()
+        return wait_for_sandbox_ready(sandbox_url, timeout_seconds=max(1, int(deadline - time.time())))
+
     def create(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord:
         from kubernetes.client.rest import ApiException
 
-        with self._lock:
+        with self._sandbox_lock(sandbox_id):
             discovered = self.discover(sandbox_id)
             if discovered is not None:
                 return discovered
@@ -634,11 +979,10 @@ class KubernetesProvisionerBackend:
                 if exc.status != 409:
                     raise
 
-            health_timeout = int(os.getenv("SANDBOX_HEALTH_TIMEOUT_SECONDS", "60"))
             record = self.discover(sandbox_id)
             if record is None:
                 raise RuntimeError(f"failed to discover sandbox after create: {sandbox_id}")
-            if not wait_for_sandbox_ready(record.sandbox_url, timeout_seconds=health_timeout):
+            if not self._wait_until_ready(sandbox_id, record.sandbox_url, self._health_timeout_seconds):
                 try:
                     self.delete(sandbox_id)
                 except Exception:
@@ -711,13 +1055,351 @@ class KubernetesProvisionerBackend:
                     raise
 
 
+def host_sandbox_capacity() -> int:
+    """Upper bound of sandboxes this host can run, derived from CPU and memory.
+
+    SANDBOX_MAX_SANDBOXES caps it explicitly; SANDBOX_CPUS / SANDBOX_MEMORY_MB describe
+    the expected footprint of a single sandbox.
+    """
+    limits: list[int] = []
+    configured = int(os.getenv("SANDBOX_MAX_SANDBOXES", "0"))
+    if configured > 0:
+        limits.append(configured)
+
+    cpus_per_sandbox = float(os.getenv("SANDBOX_CPUS", "1"))
+    if cpus_per_sandbox > 0:
+        limits.append(max(1, int((os.cpu_count() or 1) / cpus_per_sandbox)))
+
+    memory_per_sandbox = int(os.getenv("SANDBOX_MEMORY_MB", "2048"))
+    try:
+        total_memory_mb = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        total_memory_mb = 0
+    if memory_per_sandbox > 0 and total_memory_mb > 0:
+        limits.append(max(1, total_memory_mb // memory_per_sandbox))
+
+    return min(limits) if limits else 1
+
+
+def _latency_summary(samples: deque[float]) -> dict[str, float | None]:
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None}
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(len(ordered) * 0.95))
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p95_ms": round(ordered[p95_index] * 1000, 1),
+    }
+
+
+PROVISIONER_WORKERS = max(1, int(os.getenv("SANDBOX_PROVISIONER_WORKERS", "32")))
+
+# Docker / Kubernetes SDK calls block; they run on a dedicated executor so slow
+# container start-ups never occupy the event loop or the server's default thread pool.
+_backend_executor = ThreadPoolExecutor(max_workers=PROVISIONER_WORKERS, thread_name_prefix="sandbox-backend")
+
+
+async def run_blocking(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_backend_executor, functools.partial(fn, *args))
+
+
+class WarmSandboxPool:
+    """Keeps ready-to-use sandboxes so new threads skip container start-up.
+
+    Backends opt in with ``supports_warm_pool`` and implement ``create_warm(warm_id)``,
+    ``claim_warm(warm_id, sandbox_id, thread_id, user_id)`` and ``list_warm()``. A claim pops a
+    warm sandbox on the event loop (so two requests never get the same one) and lets the backend
+    re-label it and bind the thread's paths; the refill task then tops the pool up within host
+    capacity. While the pool is enabled, or when a capacity is configured explicitly (the
+    ``capacity`` argument or SANDBOX_MAX_SANDBOXES), cold starts are admitted against the same
+    capacity. The pool counts live sandboxes itself, seeded from ``backend.list()`` once and
+    re-synced only when a cold start would be rejected.
+    """
+
+    def __init__(
+        self,
+        backend,
+        *,
+        size: int | None = None,
+        capacity: int | None = None,
+        refill_interval_seconds: float | None = None,
+    ):
+        self._backend = backend
+        self._image = str(getattr(backend, "image", None) or getattr(backend, "_sandbox_image", "default"))
+        self._capacity = capacity if capacity is not None else host_sandbox_capacity()
+        configured_size = size if size is not None else int(os.getenv("SANDBOX_WARM_POOL_SIZE", "0"))
+        self._size = max(0, min(configured_size, self._capacity))
+        if refill_interval_seconds is None:
+            refill_interval_seconds = float(os.getenv("SANDBOX_WARM_POOL_REFILL_INTERVAL_SECONDS", "30"))
+        self._refill_interval_seconds = max(0.01, refill_interval_seconds)
+        self._enabled = self._size > 0 and bool(getattr(backend, "supports_warm_pool", False))
+        if self._size > 0 and not self._enabled:
+            logger.warning("Warm sandbox pool requested but backend %s does not support warm claims", type(backend))
+        explicit_capacity = capacity is not None or int(os.getenv("SANDBOX_MAX_SANDBOXES", "0")) > 0
+        self._admission = self._enabled or explicit_capacity
+
+        self._ready: deque[str] = deque()
+        self._starting = 0
+        self._cold_starting = 0
+        # Sandbox ids known to be live; None until seeded from the backend.
+        self._live: set[str] | None = None
+        # Changes made while a re-sync is listing the backend, replayed onto its result.
+        self._live_changes: dict[str, bool] | None = None
+        self._live_lock = asyncio.Lock()
+        self._refill_event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+        self._hits = 0
+        self._misses = 0
+        self._warm_failures = 0
+        self._capacity_rejections = 0
+        self._hit_latency: deque[float] = deque(maxlen=512)
+        self._cold_latency: deque[float] = deque(maxlen=512)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    async def create(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord:
+        """Return the thread's sandbox, claiming a warm one before falling back to a cold start."""
+        start = time.monotonic()
+        if self._enabled and self._ready:
+            existing = await run_blocking(self._backend.discover, sandbox_id)
+            if existing is not None:
+                self._mark_live(sandbox_id)
+                return existing
+            record = await self._claim(sandbox_id, thread_id, user_id)
+            if record is not None:
+                self._mark_live(sandbox_id)
+                self._hits += 1
+                self._hit_latency.append(time.monotonic() - start)
+                return record
+
+        reserved = await self._admit_cold(sandbox_id) if self._admission else False
+        try:
+            record = await run_blocking(self._backend.create, sandbox_id, thread_id, user_id)
+        finally:
+            if reserved:
+                self._cold_starting -= 1
+        self._mark_live(sandbox_id)
+        if self._enabled:
+            self._misses += 1
+            self._cold_latency.append(time.monotonic() - start)
+        return record
+
+    def _mark_live(self, sandbox_id: str) -> None:
+        if self._live is not None:
+            self._live.add(sandbox_id)
+        if self._live_changes is not None:
+            self._live_changes[sandbox_id] = True
+
+    def forget(self, sandbox_id: str) -> None:
+        """Release the slot of a sandbox that was deleted outside the pool."""
+        if self._live is not None:
+            self._live.discard(sandbox_id)
+        if self._live_changes is not None:
+            self._live_changes[sandbox_id] = False
+
+    async def _sync_live(self) -> bool:
+        """Re-count live sandboxes from the backend; returns whether the count is known."""
+        async with self._live_lock:
+            self._live_changes = {}
+            try:
+                records = await run_blocking(self._backend.list)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to count sandboxes for capacity check: %s", exc)
+                return self._live is not None
+            finally:
+                changes, self._live_changes = self._live_changes, None
+            live = {record.sandbox_id for record in records}
+            for sandbox_id, alive in changes.items():
+                if alive:
+                    live.add(sandbox_id)
+                else:
+                    live.discard(sandbox_id)
+            self._live = live
+            return True
+
+    def _occupied(self) -> int:
+        return len(self._live or ()) + len(self._ready) + self._starting + self._cold_starting
+
+    async def _admit_cold(self, sandbox_id: str) -> bool:
+        """Reserve a host slot for a cold start, or reject it when the host is at capacity.
+
+        Re-creating an existing sandbox does not need a new slot; warm sandboxes that are ready
+        or starting occupy slots like any other sandbox, and ready ones are dropped to make room.
+        Returns whether a slot was reserved.
+        """
+        if self._live is None and not await self._sync_live():
+            return False
+        if sandbox_id in self._live:
+            return False
+        if self._occupied() >= self._capacity and not self._ready:
+            # The count may be stale (sandboxes that exited on their own); re-sync before rejecting.
+            await self._sync_live()
+            if sandbox_id in self._live:
+                return False
+        # Check and reserve without awaiting in between, so concurrent cold starts see each other.
+        occupied = self._occupied()
+        evicted: list[str] = []
+        while occupied >= self._capacity and self._ready:
+            evicted.append(self._ready.pop())
+            occupied -= 1
+        if occupied >= self._capacity:
+            self._capacity_rejections += 1
+            raise SandboxCapacityError(
+                f"sandbox capacity reached ({self._capacity}); retry after idle sandboxes are reclaimed"
+            )
+        self._cold_starting += 1
+        for warm_id in evicted:
+            await self._discard(warm_id)
+        return True
+
+    async def _claim(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord | None:
+        while self._ready:
+            warm_id = self._ready.popleft()
+            self._refill_event.set()
+            try:
+                record = await run_blocking(self._backend.claim_warm, warm_id, sandbox_id, thread_id, user_id)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to claim warm sandbox %s: %s", warm_id, exc)
+                await self._discard(warm_id)
+                continue
+            if record is not None:
+                logger.info("Claimed warm sandbox %s for sandbox %s", warm_id, sandbox_id)
+                return record
+        return None
+
+    async def _discard(self, warm_id: str) -> None:
+        try:
+            await run_blocking(self._backend.delete, warm_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to delete warm sandbox %s: %s", warm_id, exc)
+
+    async def _deficit(self) -> int:
+        want = self._size - len(self._ready) - self._starting
+        if want <= 0:
+            return 0
+        if self._live is None and not await self._sync_live():
+            return 0
+        return max(0, min(want, self._capacity - self._occupied()))
+
+    async def _adopt_existing(self) -> None:
+        """Take over unclaimed warm sandboxes left by a previous provisioner process."""
+        list_warm = getattr(self._backend, "list_warm", None)
+        if list_warm is None:
+            return
+        try:
+            warm_ids = await run_blocking(list_warm)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to list existing warm sandboxes: %s", exc)
+            return
+        for warm_id in warm_ids:
+            if warm_id in self._ready:
+                continue
+            if len(self._ready) < self._size:
+                self._ready.append(warm_id)
+            else:
+                await self._discard(warm_id)
+        if warm_ids:
+            logger.info("Adopted %s existing warm sandboxes", min(len(warm_ids), self._size))
+
+    async def _start_one(self) -> bool:
+        warm_id = f"warm-{uuid.uuid4().hex[:12]}"
+        self._starting += 1
+        try:
+            await run_blocking(self._backend.create_warm, warm_id)
+        except Exception as exc:  # noqa: BLE001
+            self._warm_failures += 1
+            logger.warning("Failed to start warm sandbox %s: %s", warm_id, exc)
+            await self._discard(warm_id)
+            return False
+        finally:
+            self._starting -= 1
+        if self._closed:
+            await self._discard(warm_id)
+            return False
+        self._ready.append(warm_id)
+        return True
+
+    async def fill(self) -> int:
+        """Start warm sandboxes concurrently until the pool is full or host capacity is reached."""
+        deficit = await self._deficit()
+        if deficit <= 0:
+            return 0
+        results = await asyncio.gather(*(self._start_one() for _ in range(deficit)))
+        return sum(results)
+
+    async def _run(self) -> None:
+        await self._adopt_existing()
+        while True:
+            await self.fill()
+            try:
+                await asyncio.wait_for(self._refill_event.wait(), timeout=self._refill_interval_seconds)
+            except TimeoutError:
+                pass
+            self._refill_event.clear()
+
+    def start(self) -> None:
+        if not self._enabled or self._task is not None:
+            return
+        self._closed = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Started warm sandbox pool for image %s with size=%s capacity=%s", self._image, self._size, self._capacity
+        )
+
+    async def shutdown(self) -> None:
+        self._closed = True
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        warm_ids = list(self._ready)
+        self._ready.clear()
+        await asyncio.gather(*(self._discard(warm_id) for warm_id in warm_ids))
+
+    def stats(self) -> dict:
+        total = self._hits + self._misses
+        return {
+            "enabled": self._enabled,
+            "image": self._image,
+            "size": self._size,
+            "capacity": self._capacity,
+            "ready": len(self._ready),
+            "starting": self._starting,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 3) if total else None,
+            "warm_failures": self._warm_failures,
+            "admission": self._admission,
+            "live": len(self._live) if self._live is not None else None,
+            "cold_starting": self._cold_starting,
+            "capacity_rejections": self._capacity_rejections,
+            "hit_latency": _latency_summary(self._hit_latency),
+            "cold_start_latency": _latency_summary(self._cold_latency),
+        }
+
+
 class SandboxIdleReaper:
+    """Deletes sandboxes that have not been touched within the idle timeout.
+
+    Deadlines live in a min-heap and the reaper sleeps until the earliest one, instead of
+    scanning every sandbox on a fixed interval. A touch pushes a new deadline; superseded
+    heap entries are skipped when they surface.
+    """
+
     def __init__(self, backend):
         self._backend = backend
-        self._lock = threading.Lock()
         self._last_activity_at: dict[str, float] = {}
-        self._stop_event = threading.Event()
-        self._thread: threading.Thread | None = None
+        self._deadlines: list[tuple[float, str]] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
         self._exec_timeout_seconds = int(os.getenv("SANDBOX_EXEC_TIMEOUT_SECONDS", "180"))
         configured_idle_timeout = int(os.getenv("SANDBOX_IDLE_TIMEOUT_SECONDS", "600"))
         if 0 < configured_idle_timeout <= self._exec_timeout_seconds:
@@ -730,63 +1412,167 @@ class SandboxIdleReaper:
             )
             configured_idle_timeout = self._exec_timeout_seconds + 30
         self._idle_timeout_seconds = configured_idle_timeout
+        # Delay before retrying a sandbox whose deletion failed.
         self._check_interval_seconds = max(1, int(os.getenv("SANDBOX_IDLE_CHECK_INTERVAL_SECONDS", "10")))
+        self.reaped = 0
+        # Called with the id of every sandbox the reaper deletes.
+        self.on_delete: Callable[[str], None] | None = None
+
+    @property
+    def tracked(self) -> int:
+        return len(self._last_activity_at)
+
+    def _schedule(self, sandbox_id: str, deadline: float) -> None:
+        if self._idle_timeout_seconds <= 0:
+            return
+        wake = not self._deadlines or deadline < self._deadlines[0][0]
+        heapq.heappush(self._deadlines, (deadline, sandbox_id))
+        # Frequent touches leave superseded entries behind; rebuild once they dominate the heap.
+        if len(self._deadlines) > 4 * max(16, len(self._last_activity_at)):
+            self._deadlines = [
+                (last_at + self._idle_timeout_seconds, key) for key, last_at in self._last_activity_at.items()
+            ]
+            heapq.heapify(self._deadlines)
+        if wake:
+            self._wakeup.set()
 
     def touch(self, sandbox_id: str) -> None:
-        with self._lock:
-            self._last_activity_at[sandbox_id] = time.time()
+        now = time.time()
+        self._last_activity_at[sandbox_id] = now
+        self._schedule(sandbox_id, now + self._idle_timeout_seconds)
 
     def forget(self, sandbox_id: str) -> None:
-        with self._lock:
-            self._last_activity_at.pop(sandbox_id, None)
+        self._last_activity_at.pop(sandbox_id, None)
 
-    def _seed_existing(self) -> None:
+    async def _seed_existing(self) -> None:
         try:
-            records = self._backend.list()
+            records = await run_blocking(self._backend.list)
         except Exception as exc:  # noqa: BLE001
             logger.warning(f"Failed to seed sandbox activity for idle reaper: {exc}")
             return
 
-        now = time.time()
-        with self._lock:
-            for record in records:
-                self._last_activity_at.setdefault(record.sandbox_id, now)
+        for record in records:
+            if record.sandbox_id not in self._last_activity_at:
+                self.touch(record.sandbox_id)
 
-    def _collect_expired_sandbox_ids(self) -> list[str]:
-        if self._idle_timeout_seconds <= 0:
-            return []
-        cutoff = time.time() - self._idle_timeout_seconds
-        with self._lock:
-            return [sandbox_id for sandbox_id, last_at in self._last_activity_at.items() if last_at <= cutoff]
+    def _pop_expired(self, now: float) -> list[str]:
+        expired: list[str] = []
+        while self._deadlines and self._deadlines[0][0] <= now:
+            _, sandbox_id = heapq.heappop(self._deadlines)
+            last_at = self._last_activity_at.get(sandbox_id)
+            if last_at is None or last_at + self._idle_timeout_seconds > now or sandbox_id in expired:
+                continue
+            expired.append(sandbox_id)
+        return expired
 
-    def _run(self) -> None:
-        while not self._stop_event.wait(self._check_interval_seconds):
-            expired_ids = self._collect_expired_sandbox_ids()
-            for sandbox_id in expired_ids:
-                try:
-                    self._backend.delete(sandbox_id)
-                    logger.info(f"Deleted idle sandbox: {sandbox_id}")
-                    self.forget(sandbox_id)
-                except Exception as exc:  # noqa: BLE001
-                    logger.warning(f"Failed to delete idle sandbox {sandbox_id}: {exc}")
+    async def reap_expired(self) -> list[str]:
+        """Delete every sandbox whose idle deadline has passed; returns the deleted ids."""
+        now = time.time()
+        expired = self._pop_expired(now)
+        results = await asyncio.gather(
+            *(run_blocking(self._backend.delete, sandbox_id) for sandbox_id in expired), return_exceptions=True
+        )
+        deleted: list[str] = []
+        for sandbox_id, result in zip(expired, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to delete idle sandbox {sandbox_id}: {result}")
+                self._schedule(sandbox_id, time.time() + self._check_interval_seconds)
+                continue
+            # A request may have touched the sandbox while it was being deleted; only forget stale entries.
+            if self._last_activity_at.get(sandbox_id, now) <= now:
+                self.forget(sandbox_id)
+            if self.on_delete is not None:
+                self.on_delete(sandbox_id)
+            logger.info(f"Deleted idle sandbox: {sandbox_id}")
+            self.reaped += 1
+            deleted.append(sandbox_id)
+        return deleted
+
+    async def _run(self) -> None:
+        while True:
+            await self.reap_expired()
+            timeout = self._deadlines[0][0] - time.time() if self._deadlines else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except TimeoutError:
+                pass
 
-    def start(self) -> None:
+    async def start(self) -> None:
         if self._idle_timeout_seconds <= 0:
             logger.info("Idle reaper disabled (SANDBOX_IDLE_TIMEOUT_SECONDS <= 0)")
             return
-        self._seed_existing()
-        self._thread = threading.Thread(target=self._run, name="sandbox-idle-reaper", daemon=True)
-        self._thread.start()
-        logger.info(
-            "Started sandbox idle reaper with timeout=%ss interval=%ss",
-            self._idle_timeout_seconds,
-            self._check_interval_seconds,
-        )
+        await self._seed_existing()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Started sandbox idle reaper with timeout=%ss", self._idle_timeout_seconds)
+
+    async def shutdown(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+class SandboxProvisioner:
+    """Async core used by the API: concurrent creates for the same sandbox share one
+    backend call, while different sandboxes proceed in parallel on the backend executor."""
+
+    def __init__(self, backend, *, pool: WarmSandboxPool | None = None, reaper: SandboxIdleReaper | None = None):
+        self.backend = backend
+        self.pool = pool if pool is not None else WarmSandboxPool(backend)
+        self.reaper = reaper if reaper is not None else SandboxIdleReaper(backend)
+        self.reaper.on_delete = self.pool.forget
+        self._creating: dict[str, asyncio.Task] = {}
+        self._create_latency: deque[float] = deque(maxlen=512)
+
+    async def create(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord:
+        task = self._creating.get(sandbox_id)
+        if task is None:
+            task = asyncio.create_task(self._create(sandbox_id, thread_id, user_id))
+            self._creating[sandbox_id] = task
+            task.add_done_callback(lambda _task: self._creating.pop(sandbox_id, None))
+        # shield: a disconnecting client must not cancel a creation other requests are waiting for
+        record = await asyncio.shield(task)
+        self.reaper.touch(record.sandbox_id)
+        return record
 
-    def shutdown(self) -> None:
-        self._stop_event.set()
-        if self._thread is not None:
-            self._thread.join(timeout=3)
+    async def _create(self, sandbox_id: str, thread_id: str, user_id: str) -> SandboxRecord:
+        start = time.monotonic()
+        record = await self.pool.create(sandbox_id, thread_id, user_id)
+        self._create_latency.append(time.monotonic() - start)
+        return record
+
+    async def discover(self, sandbox_id: str) -> SandboxRecord | None:
+        record = await run_blocking(self.backend.discover, sandbox_id)
+        if record is not None:
+            self.reaper.touch(record.sandbox_id)
+        return record
+
+    async def list(self) -> list[SandboxRecord]:
+        return await run_blocking(self.backend.list)
+
+    async def delete(self, sandbox_id: str) -> None:
+        await run_blocking(self.backend.delete, sandbox_id)
+        self.reaper.forget(sandbox_id)
+        self.pool.forget(sandbox_id)
+
+    async def start(self) -> None:
+        await self.reaper.start()
+        self.pool.start()
+
+    async def shutdown(self) -> None:
+        await self.pool.shutdown()
+        await self.reaper.shutdown()
+
+    def stats(self) -> dict:
+        return {
+            "creating": len(self._creating),
+            "create_latency": _latency_summary(self._create_latency),
+            "workers": PROVISIONER_WORKERS,
+        }
 
 
 def _build_backend():
@@ -796,47 +1582,55 @@ def _build_backend():
         return LocalContainerProvisionerBackend(), backend
     if backend == "kubernetes":
         return KubernetesProvisionerBackend(), backend
+    if backend == "fake":
+        return FakeProvisionerBackend(), backend
     return MemoryProvisionerBackend(), backend
 
 
 backend_impl, backend_name = _build_backend()
-idle_reaper = SandboxIdleReaper(backend_impl)
+provisioner = SandboxProvisioner(backend_impl)
+idle_reaper = provisioner.reaper
+warm_pool = provisioner.pool
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    idle_reaper.start()
+    await provisioner.start()
     try:
         yield
     finally:
-        idle_reaper.shutdown()
+        await provisioner.shutdown()
 
 
 app = FastAPI(title="Yuxi Sandbox Provisioner", lifespan=lifespan)
 
 
 @app.get("/health")
-def health():
-    tracked = len(idle_reaper._last_activity_at)  # noqa: SLF001
+async def health():
     return {
         "status": "ok",
         "backend": backend_name,
         "idle_timeout_seconds": idle_reaper._idle_timeout_seconds,  # noqa: SLF001
         "idle_check_interval_seconds": idle_reaper._check_interval_seconds,  # noqa: SLF001
-        "tracked_sandboxes": tracked,
+        "tracked_sandboxes": idle_reaper.tracked,
+        "reaped_sandboxes": idle_reaper.reaped,
+        "provisioner": provisioner.stats(),
+        "warm_pool": warm_pool.stats(),
     }
 
 
 @app.post("/api/sandboxes", response_model=SandboxResponse)
-def create_sandbox(payload: CreateSandboxRequest):
+async def create_sandbox(payload: CreateSandboxRequest):
     try:
-        # Backend.create() already handles container reuse (discovers existing container first)
-        record = backend_impl.create(payload.sandbox_id, payload.thread_id, payload.user_id)
+        # Backend.create() already handles container reuse (discovers existing container first);
+        # new sandboxes are claimed from the warm pool when one is ready.
+        record = await provisioner.create(payload.sandbox_id, payload.thread_id, payload.user_id)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except SandboxCapacityError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    idle_reaper.touch(record.sandbox_id)
     return SandboxResponse(
         sandbox_id=record.sandbox_id,
         sandbox_url=record.sandbox_url,
@@ -845,15 +1639,14 @@ def create_sandbox(payload: CreateSandboxRequest):
 
 
 @app.get("/api/sandboxes/{sandbox_id}", response_model=SandboxResponse)
-def get_sandbox(sandbox_id: str):
+async def get_sandbox(sandbox_id: str):
     try:
-        record = backend_impl.discover(sandbox_id)
+        record = await provisioner.discover(sandbox_id)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
     if record is None:
         raise HTTPException(status_code=404, detail="sandbox not found")
-    idle_reaper.touch(record.sandbox_id)
 
     return SandboxResponse(
         sandbox_id=record.sandbox_id,
@@ -863,21 +1656,20 @@ def get_sandbox(sandbox_id: str):
 
 
 @app.post("/api/sandboxes/{sandbox_id}/touch", response_model=TouchSandboxResponse)
-def touch_sandbox(sandbox_id: str):
+async def touch_sandbox(sandbox_id: str):
     try:
-        record = backend_impl.discover(sandbox_id)
+        record = await provisioner.discover(sandbox_id)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     if record is None:
         raise HTTPException(status_code=404, detail="sandbox not found")
-    idle_reaper.touch(sandbox_id)
     return TouchSandboxResponse(ok=True, sandbox_id=sandbox_id, status=record.status)
 
 
 @app.get("/api/sandboxes", response_model=ListSandboxesResponse)
-def list_sandboxes():
+async def list_sandboxes():
     try:
-        records = backend_impl.list()
+        records = await provisioner.list()
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
@@ -893,11 +1685,10 @@ def list_sandboxes():
 
 
 @app.delete("/api/sandboxes/{sandbox_id}", response_model=DeleteSandboxResponse)
-def delete_sandbox(sandbox_id: str):
+async def delete_sandbox(sandbox_id: str):
     try:
-        backend_impl.delete(sandbox_id)
+        await provisioner.delete(sandbox_id)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    idle_reaper.forget(sandbox_id)
 
     return DeleteSandboxResponse(ok=True, sandbox_id=sandbox_id)
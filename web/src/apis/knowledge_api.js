@@ -379,6 +379,32 @@ export const typeApi = {
    */
   getStatistics: async () => {
     return apiAdminGet('/api/knowledge/stats')
+  },
+
+  /**
+   * 获取解析缓存命中统计
+   * @returns {Promise} - 缓存统计信息
+   */
+  getParseCacheStats: async () => {
+    return apiAdminGet('/api/knowledge/parse-cache/stats')
+  },
+
+  /**
+   * 清理解析缓存
+   * @param {string|null} contentHash - 文件内容哈希，为空时清空全部缓存
+   * @returns {Promise} - 清理结果
+   */
+  clearParseCache: async (contentHash = null) => {
+    const query = contentHash ? `?content_hash=${encodeURIComponent(contentHash)}` : ''
+    return apiAdminDelete(`/api/knowledge/parse-cache${query}`)
+  },
+
+  /**
+   * 获取 Docling 转换进程池指标
+   * @returns {Promise} - 排队深度、运行中任务、超时等统计
+   */
+  getDoclingPoolStats: async () => {
+    return apiAdminGet('/api/knowledge/docling-pool/stats')
   }
 }
 